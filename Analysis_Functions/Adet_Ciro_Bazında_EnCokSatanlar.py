@@ -24,7 +24,7 @@ def yil_ay_bazinda_en_cok_satan_urunler(df):
 
     # Adet bazında en çok satan ürün
     adet_bazinda = (
-        df.groupby(['Year', 'Month', 'ProductName'])
+        df.groupby(['Year', 'Month', 'ProductName'], observed=True)
         .agg({'Sale_Amount': 'sum'})
         .reset_index()
         .sort_values(['Year', 'Month', 'Sale_Amount'], ascending=[True, True, False])
@@ -40,7 +40,7 @@ def yil_ay_bazinda_en_cok_satan_urunler(df):
     if 'Revenue' not in df.columns:
         df['Revenue'] = df['Sale_Amount'] * df['Unit_Price(TL)']
     ciro_bazinda = (
-        df.groupby(['Year', 'Month', 'ProductName'])
+        df.groupby(['Year', 'Month', 'ProductName'], observed=True)
         .agg({'Revenue': 'sum'})
         .reset_index()
         .sort_values(['Year', 'Month', 'Revenue'], ascending=[True, True, False])
@@ -1,23 +1,28 @@
-from sklearn.linear_model import LinearRegression
 import numpy as np
 import pandas as pd 
-import streamlit as st
 
-def aging_factor_analysis(df):
+from Analysis_Functions.date_index import analysis_windows, date_window, window_mask
+from Analysis_Functions.grouped_regression import group_offsets, segment_linregress, sums_linregress
+from Analysis_Functions.month_close import is_month_close_state, require_state_windows
+from Analysis_Functions.sales_cube import is_sales_cube, rollup_sales_cube
+from Analysis_Functions.sales_panel import is_sales_panel, observed_bounds, panel_linregress
+
+def aging_factor_analysis(df, as_of=None):
     """
     Analyze sales aging trends for customer-product pairs within a DataFrame.
 
-    This function filters the input DataFrame for sales data in the years 2024 and 2025,
-    identifies unique customer-product pairs, and computes monthly sales aggregates.
-    For each customer-product pair with more than 6 months of sales data, it fits a linear
-    regression model to the monthly sales amounts to determine the sales trend (increasing,
-    decreasing, or stable). The function returns a DataFrame summarizing the trend, slope,
-    first and last month sales, and last sale date for each qualifying pair.
+    This function filters the input DataFrame for sales data in the two most recent years
+    (as_of defaults to the last sale in the data, see date_index.analysis_windows), identifies unique customer-product pairs, and computes monthly sales aggregates.
+    For each customer-product pair with more than 6 months of sales data, it computes the
+    least-squares slope of the monthly sales amounts over the month index (closed form, for all
+    pairs at once) to determine the sales trend (increasing, decreasing, or stable). The function
+    returns a DataFrame summarizing the trend, slope, first and last month sales, and last sale
+    date for each qualifying pair.
 
     Parameters
     ----------
     df : pandas.DataFrame
-      Input DataFrame containing at least the following columns:
+      Either the sales cube from build_sales_cube, or a DataFrame containing at least the following columns:
       - 'Year': int, year of the sale
       - 'Date': datetime, date of the sale
       - 'CustomerCode': identifier for the customer
@@ -25,6 +30,9 @@ def aging_factor_analysis(df):
       - 'Sale_Amount': numeric, amount of the sale
       - 'CustomerName': name of the customer
       - 'ProductName': name of the product
+    as_of : str or pandas.Timestamp, optional
+      Analysis date; the recent years are the year of as_of and the one before it. Rows after
+      as_of are expected to be cut by the caller (date_index.until_as_of).
 
     Returns
     -------
@@ -45,63 +53,117 @@ def aging_factor_analysis(df):
     -----
     - Only customer-product pairs with more than 6 months of sales data are analyzed.
     - Sales trend is determined by the sign of the regression slope.
-    - The function requires pandas, numpy, and scikit-learn's LinearRegression.
+    - Slopes are computed with grouped_regression.segment_linregress; first/last month sales are
+      read at the group offsets of the sorted monthly series.
+    - A month-close state (month_close.month_close_state) can be passed instead of a DataFrame;
+      slopes then come from its running sums (grouped_regression.sums_linregress).
+    - A sales panel (sales_panel.build_sales_panel) can be passed as well; the slope is then taken
+      over the calendar month, so months without sales still advance the time axis.
     """
-    mask = df[df['Year'].isin([2024, 2025])]
+    windows = analysis_windows(as_of, df)
+    if is_month_close_state(df):
+        require_state_windows(df, as_of)
+        return _aging_from_state(df)
+    if is_sales_panel(df):
+        return _aging_from_panel(df, windows)
+    mask = date_window(df, windows['recent_since'], windows['stop'])
     pairs = mask[['CustomerCode', 'Product_Code']].drop_duplicates()
     filtered = df.merge(pairs, on=['CustomerCode', 'Product_Code'], how='inner')
-    filtered['YearMonth'] = filtered['Date'].dt.to_period('M').astype(str)
-    last_sales = (
-        filtered.groupby(['CustomerCode', 'Product_Code'])
-        .agg(Last_Sale_Date=('Date', 'max'))
-        .reset_index()
+    if is_sales_cube(df):
+        last_sales = (
+            filtered.groupby(['CustomerCode', 'Product_Code'], observed=True)
+            .agg(Last_Sale_Date=('Last_Sale_Date', 'max'))
+            .reset_index()
+        )
+        monthly_sales = rollup_sales_cube(filtered, ['CustomerCode', 'Product_Code'])[
+            ['YearMonth', 'CustomerCode', 'Product_Code', 'Sale_Amount']
+        ]
+    else:
+        filtered['YearMonth'] = filtered['Date'].dt.to_period('M').astype(str)
+        last_sales = (
+            filtered.groupby(['CustomerCode', 'Product_Code'], observed=True)
+            .agg(Last_Sale_Date=('Date', 'max'))
+            .reset_index()
+        )
+        monthly_sales = (
+            filtered
+            .groupby(['YearMonth', 'CustomerCode', 'Product_Code'], observed=True)
+            .agg(Sale_Amount=('Sale_Amount', 'sum'))
+            .reset_index()
+        )
+    monthly_sales['YearMonth'] = pd.to_datetime(monthly_sales['YearMonth'])
+    monthly_sales.sort_values(by="YearMonth", ascending=True, inplace=True, kind='stable')
+    name_map = filtered[['CustomerCode', 'Product_Code', 'CustomerName', 'ProductName']].drop_duplicates()
+
+    # Çiftlerin aylık serilerini ardışık satırlara diz (çift içinde ay sırası korunur); grup başlangıçları tek seferde bulunur
+    codes = monthly_sales.groupby(['CustomerCode', 'Product_Code'], observed=True, sort=True).ngroup().to_numpy()
+    order = np.argsort(codes, kind='stable')
+    monthly_sales = monthly_sales.iloc[order]
+    offsets = group_offsets(codes[order])
+    sales = monthly_sales['Sale_Amount'].to_numpy(dtype=np.float64)
+    n_months = np.diff(np.r_[offsets, len(sales)])
+    periods = np.arange(len(sales)) - np.repeat(offsets, n_months)
+
+    # Tüm çiftler için satış ~ ay sırası en küçük kareler eğimi (kapalı form)
+    slope = segment_linregress(periods, sales, offsets)['slope']
+    pairs = monthly_sales[['CustomerCode', 'Product_Code']].iloc[offsets].reset_index(drop=True)
+    return _aging_table(pairs, n_months, slope, sales[offsets], sales[offsets + n_months - 1], last_sales, name_map)
+
+
+def _aging_from_state(state):
+    """aging_factor_analysis'in ay kapanışı durumundan hesaplanan karşılığı."""
+    pairs = state["pairs"]
+    # Son iki yılda (durumun recent_years penceresi) satışı olan çiftler
+    pairs = pairs[pairs['Recent']].reset_index(drop=True)
+    slope = sums_linregress(pairs['Months'], pairs['Sales_Sum'], pairs['Month_SumXY'])['slope']
+    return _aging_table(
+        pairs[['CustomerCode', 'Product_Code']].copy(),
+        pairs['Months'].to_numpy(),
+        slope,
+        pairs['First_Month_Sale'].to_numpy(),
+        pairs['Last_Month_Sale'].to_numpy(),
+        pairs[['CustomerCode', 'Product_Code', 'Last_Sale_Date']],
+        pairs[['CustomerCode', 'Product_Code', 'CustomerName', 'ProductName']],
     )
-    monthly_sales = (
-        filtered
-        .groupby(['YearMonth', 'CustomerCode', 'Product_Code'])
-        .agg(Sale_Amount=('Sale_Amount', 'sum'))
-        .reset_index()
+
+
+def _aging_from_panel(panel, windows):
+    """aging_factor_analysis'in takvim ayına hizalı karşılığı (eğim satışsız ayları da zaman sayar)."""
+    observed = panel['Line_Count'] > 0
+    # Son iki yılda satışı olan çiftler
+    recent = observed[:, window_mask(panel['months'], windows['recent_since'], windows['stop'])].any(axis=1)
+    keep = np.flatnonzero(recent & (observed.sum(axis=1) > 6))
+    observed = observed[keep]
+    sales = np.asarray(panel['Sale_Amount'][keep], dtype=np.float64)
+    first, last = observed_bounds(observed)
+    rows = np.arange(len(keep))
+    entities = panel['entities'].iloc[keep].reset_index(drop=True)
+    return _aging_table(
+        entities[['CustomerCode', 'Product_Code']].copy(),
+        observed.sum(axis=1),
+        panel_linregress(sales, observed)['slope'],
+        sales[rows, first],
+        sales[rows, last],
+        entities[['CustomerCode', 'Product_Code', 'Last_Sale_Date']],
+        entities[['CustomerCode', 'Product_Code', 'CustomerName', 'ProductName']],
     )
-    monthly_sales = monthly_sales.merge(
-        last_sales, 
-        on=['CustomerCode', 'Product_Code'],
-        how='left'
+
+
+def _aging_table(aging_trend_df, n_months, slope, first_sales, last_month_sales, last_sales, name_map):
+    """Çift başına ay sayısı, eğim ve ilk/son ay satışından sonuç tablosunu kurar."""
+    aging_trend_df['Toplam Kaç Aylık Satış Var'] = n_months
+    aging_trend_df['Satış_Eğilimi'] = np.select(
+        [slope > 0, slope < 0, slope == 0],
+        ['Artıyor', 'Azalıyor', 'Sabit'],
+        default="6 aydan az satış verisi olduğu için hesaplanamaz.",
     )
-    monthly_sales['YearMonth'] = pd.to_datetime(monthly_sales['YearMonth'])
-    monthly_sales['Sale_Amount_Log'] = np.log(monthly_sales['Sale_Amount'].replace(0, 1e-5))
-    monthly_sales['Year'] = monthly_sales['YearMonth'].dt.year
-    monthly_sales['Month'] = monthly_sales['YearMonth'].dt.month 
-    monthly_sales.sort_values(by="YearMonth", ascending=True, inplace=True)
-    name_map = filtered[['CustomerCode', 'Product_Code', 'CustomerName', 'ProductName']].drop_duplicates()
-    aging_trends = []
-    for (customer, product), group in monthly_sales.groupby(['CustomerCode', 'Product_Code']):
-        group_sorted = group.sort_values('YearMonth')
-        sales = group_sorted['Sale_Amount'].values
-        periods = np.arange(len(sales)).reshape(-1, 1)
-        if len(sales) > 6:
-            model = LinearRegression().fit(periods, sales)
-            slope = model.coef_[0]
-            if slope > 0:
-                trend = 'Artıyor'
-            elif slope < 0:
-                trend = 'Azalıyor'
-            elif slope == 0:
-                trend = 'Sabit'
-            else:
-                trend = "6 aydan az satış verisi olduğu için hesaplanamaz."
-            # Son satış tarihi ekle
-            last_sale_date = group_sorted['Last_Sale_Date'].iloc[0]
-            aging_trends.append({
-                'CustomerCode': customer,
-                'Product_Code': product,
-                'Toplam Kaç Aylık Satış Var': len(sales),
-                'Satış_Eğilimi': trend,
-                'Eğim': round(slope, 2),
-                'İlk_Ay_Satış': sales[0],
-                'Son_Ay_Satış': sales[-1],
-                'Last_Sale_Date': last_sale_date
-            })
-    aging_trend_df = pd.DataFrame(aging_trends)
+    aging_trend_df['Eğim'] = np.round(slope, 2)
+    aging_trend_df['İlk_Ay_Satış'] = first_sales
+    aging_trend_df['Son_Ay_Satış'] = last_month_sales
+
+    # Yalnızca 6 aydan fazla satış verisi olan çiftler analiz edilir
+    aging_trend_df = aging_trend_df[aging_trend_df['Toplam Kaç Aylık Satış Var'] > 6]
+    aging_trend_df = aging_trend_df.merge(last_sales, on=['CustomerCode', 'Product_Code'], how='left')
     aging_trend_df = aging_trend_df.merge(name_map, on=['CustomerCode', 'Product_Code'], how='left')
-    aging_trend_df.sort_values(by="Satış_Eğilimi", ascending=True, inplace=True)
-    return aging_trend_df
\ No newline at end of file
+    aging_trend_df.sort_values(by="Satış_Eğilimi", ascending=True, inplace=True, kind='stable')
+    return aging_trend_df
@@ -1,25 +1,29 @@
 import pandas as pd 
 import numpy as np
 
-def rate_of_change_per_month(df):
+from Analysis_Functions.date_index import analysis_windows, window_mask
+from Analysis_Functions.sales_cube import is_sales_cube, rollup_sales_cube
+
+def rate_of_change_per_month(df, as_of=None):
     """
     Calculates the monthly rate of change and volatility for each customer-product pair in the given sales DataFrame.
     The function performs the following steps:
-    1. Converts the 'Date' column to datetime and extracts the year-month period.
+    1. Extracts the year-month period of each sale (without modifying the input DataFrame).
     2. Aggregates total sales per customer, product, and month.
-    3. For each customer-product pair:
-      - If there are fewer than 6 months of data, marks the result as insufficient for calculation.
-      - Otherwise, computes the mean, standard deviation, and volatility ratio (std/mean) of monthly sales.
-      - Classifies volatility as 'Düşük Değişkenlik' (Low), 'Orta Değişkenlik' (Medium), or 'Yüksek Değişkenlik' (High).
-    4. Adds the date of the last sale for each customer-product pair.
-    5. Filters results to include only those with the last sale date in 2024 or later.
-    6. Returns the last 15 rows of the filtered results, sorted by volatility ratio in descending order.
+    3. Computes, in a single grouped aggregation, the number of months, mean and standard deviation
+       (ddof=0) of monthly sales for every customer-product pair, and the volatility ratio (std/mean):
+      - Pairs with fewer than 6 months of data are marked as insufficient for calculation.
+      - Volatility is classified as 'Düşük Değişkenlik' (Low), 'Orta Değişkenlik' (Medium), or 'Yüksek Değişkenlik' (High).
+    4. Adds the date of the last sale for each customer-product pair with one join.
+    5. Filters results to include only those with the last sale date in the year before as_of or later (as_of defaults to the last sale in the data).
+    6. Returns the filtered results sorted by volatility ratio in ascending order (pairs without a ratio last).
     Parameters:
-      df (pd.DataFrame): Input DataFrame containing at least the following columns:
+      df (pd.DataFrame): The sales cube from build_sales_cube, or a DataFrame containing at least the following columns:
         - 'Date': Date of sale (string or datetime)
         - 'CustomerCode': Identifier for the customer
         - 'Product_Code': Identifier for the product
         - 'Sale_Amount': Amount of sale (numeric)
+      as_of (str or pd.Timestamp, optional): Analysis date (date_index.analysis_windows).
     Returns:
       pd.DataFrame: A DataFrame with the following columns for each customer-product pair:
         - 'CustomerCode'
@@ -30,58 +34,51 @@ def rate_of_change_per_month(df):
         - 'Volatilite_Oranı' (Volatility ratio)
         - 'Değişkenlik_Durumu' (Volatility classification)
         - 'Last_Sale_Date' (Date of last sale)
-      Only includes pairs with last sale date in 2024 or later, and returns the last 15 rows.
+      Only includes pairs with last sale date in the recent years.
     """
-    df['Date'] = pd.to_datetime(df['Date'])
-    df['YearMonth'] = df['Date'].dt.to_period('M')
+    keys = ['CustomerCode', 'Product_Code']
+    if is_sales_cube(df):
+        # Küp zaten ay düzeyinde; yalnızca müşteri-ürün-ay'a indirgenir
+        monthly_sales = rollup_sales_cube(df, keys)[keys + ['YearMonth', 'Sale_Amount']]
+        last_sales = df.groupby(keys, observed=True)['Last_Sale_Date'].max()
+    else:
+        dates = df['Date'] if pd.api.types.is_datetime64_any_dtype(df['Date']) else pd.to_datetime(df['Date'])
 
-    # Müşteri-Ürün-YılAy bazında toplam satış
-    monthly_sales = df.groupby(['CustomerCode', 'Product_Code', 'YearMonth'])['Sale_Amount'].sum().reset_index()
-    # Son satış tarihi
-    last_sales = df.groupby(['CustomerCode', 'Product_Code'])['Date'].max().reset_index().rename(columns={'Date': 'Last_Sale_Date'})
-    results = []
+        # Müşteri-Ürün-YılAy bazında toplam satış
+        monthly_sales = (
+            df[keys + ['Sale_Amount']]
+            .assign(YearMonth=dates.dt.to_period('M'))
+            .groupby(keys + ['YearMonth'], observed=True)['Sale_Amount'].sum()
+            .reset_index()
+        )
+        # Son satış tarihi
+        last_sales = dates.groupby([df[key] for key in keys], observed=True).max().rename('Last_Sale_Date')
 
-    for (customer, product), group in monthly_sales.groupby(['CustomerCode', 'Product_Code']):
-        sales_series = group.sort_values('YearMonth')['Sale_Amount'].values
-        if len(sales_series) < 6:  # 6 aydan az veri varsa
-            results.append({
-                'CustomerCode': customer,
-                'Product_Code': product,
-                'Ay_Sayısı': len(sales_series),
-                'Aylık_Ortalama': None,
-                'StdSapma': None,
-                'Volatilite_Oranı': None,
-                'Değişkenlik_Durumu': '6 Aydan az veriye sahiptir hesaplanamaz',
-                'Last_Sale_Date': last_sales[(last_sales['CustomerCode'] == customer) & (last_sales['Product_Code'] == product)]['Last_Sale_Date'].values[0]
-            })
-        else:
-            mean = sales_series.mean()
-            std = sales_series.std()
-            volatility_ratio = std / mean if mean != 0 else None
+    # Müşteri-ürün bazında ay sayısı, ortalama ve standart sapma (tek toplulaştırma)
+    stats = monthly_sales.groupby(keys, observed=True)['Sale_Amount'].agg(['size', 'mean', 'std'])
+    n = stats['size'].to_numpy()
+    mean = stats['mean'].to_numpy()
+    # pandas std ddof=1 döndürür; aylık seri için nüfus standart sapmasına (ddof=0) çevrilir
+    with np.errstate(divide='ignore', invalid='ignore'):
+        std = stats['std'].to_numpy() * np.sqrt((n - 1) / n)
+        volatility_ratio = np.where(mean != 0, std / mean, np.nan)
 
-            if volatility_ratio is None:
-                volatility_label = 'Sabit (0 ortalama)'
-            elif volatility_ratio < 0.3:
-                volatility_label = 'Düşük Değişkenlik'
-            elif volatility_ratio < 1.0:
-                volatility_label = 'Orta Değişkenlik'
-            else:
-                volatility_label = 'Yüksek Değişkenlik'
+    insufficient = n < 6
+    volatility_label = np.select(
+        [insufficient, mean == 0, volatility_ratio < 0.3, volatility_ratio < 1.0],
+        ['6 Aydan az veriye sahiptir hesaplanamaz', 'Sabit (0 ortalama)', 'Düşük Değişkenlik', 'Orta Değişkenlik'],
+        default='Yüksek Değişkenlik',
+    )
 
-            results.append({
-                'CustomerCode': customer,
-                'Product_Code': product,
-                'Ay_Sayısı': len(sales_series),
-                'Aylık_Ortalama': round(mean, 2),
-                'StdSapma': round(std, 2),
-                'Volatilite_Oranı': round(volatility_ratio, 2) if volatility_ratio is not None else None,
-                'Değişkenlik_Durumu': volatility_label,
-                'Last_Sale_Date': last_sales[(last_sales['CustomerCode'] == customer) & (last_sales['Product_Code'] == product)]['Last_Sale_Date'].values[0]
-            })
+    volatility_df = pd.DataFrame({
+        'Ay_Sayısı': n,
+        'Aylık_Ortalama': np.where(insufficient, np.nan, np.round(mean, 2)),
+        'StdSapma': np.where(insufficient, np.nan, np.round(std, 2)),
+        'Volatilite_Oranı': np.where(insufficient, np.nan, np.round(volatility_ratio, 2)),
+        'Değişkenlik_Durumu': volatility_label,
+    }, index=stats.index)
+    volatility_df = volatility_df.join(last_sales).reset_index()
 
-    volatility_df = pd.DataFrame(results)
-    volatility_df.sort_values(by='Volatilite_Oranı', ascending=True, inplace=True, na_position='last')
-    volatility_df["Year"]=volatility_df["Last_Sale_Date"].dt.year
-    df_final = volatility_df[volatility_df["Year"] >= 2024]
-    df_final = df_final.drop(columns=["Year"])
-    return df_final
\ No newline at end of file
+    volatility_df.sort_values(by='Volatilite_Oranı', ascending=True, inplace=True, na_position='last', kind='stable')
+    df_final = volatility_df[window_mask(volatility_df['Last_Sale_Date'], analysis_windows(as_of, df)['recent_since'])]
+    return df_final
@@ -1,5 +1,7 @@
 import pandas as pd 
 
+from Analysis_Functions.sales_cube import is_sales_cube
+
 def ciro_buyume_orani_analizi(df):
     """
     Aylık ve yıllık ciro büyüme oranlarını hesaplar ve analiz sonucu üretir.
@@ -12,6 +14,7 @@ def ciro_buyume_orani_analizi(df):
         - 'Sale_Amount' (numeric): Satış adedi
         - 'Unit_Price(TL)' (numeric): Birim fiyat
         Opsiyonel: 'Revenue' (numeric). Yoksa otomatik hesaplanır.
+        build_sales_cube küpü de verilebilir; küpte 'Revenue' ve ay anahtarı hazırdır.
 
     Dönüş
     ------
@@ -32,17 +35,19 @@ def ciro_buyume_orani_analizi(df):
     - 'Aylık_Büyüme_Oranı' yüzde olarak hesaplanır (örn. 0.12 = %12 artış).
     - 'Analiz' sütunu, büyüme oranına göre otomatik olarak yorum üretir.
     """
+    cube = is_sales_cube(df)
     df = df.copy()
     if 'Revenue' not in df.columns:
         df['Revenue'] = df['Sale_Amount'] * df['Unit_Price(TL)']
 
     # Aylık ciro
-    df['YearMonth'] = df['Date'].dt.to_period('M')
+    df['YearMonth'] = (df['YearMonth'] if cube else df['Date']).dt.to_period('M')
     monthly_revenue = df.groupby('YearMonth')['Revenue'].sum().reset_index()
     monthly_revenue['Aylık_Büyüme_Oranı'] = monthly_revenue['Revenue'].pct_change()
 
     # Yıllık ciro
-    df['Year'] = df['Date'].dt.year
+    if not cube:
+        df['Year'] = df['Date'].dt.year
     yearly_revenue = df.groupby('Year')['Revenue'].sum().reset_index()
     yearly_revenue['Yıllık_Büyüme_Oranı'] = yearly_revenue['Revenue'].pct_change()
 
@@ -3,20 +3,30 @@ import numpy as np
 import matplotlib.pyplot as pt 
 import streamlit as st 
 
+from Analysis_Functions.date_index import analysis_windows, date_window, window_mask
+from Analysis_Functions.grouped_topk import top_k_per_partition
+from Analysis_Functions.month_close import activity_table, is_month_close_state, require_state_windows
+from Analysis_Functions.sales_cube import is_sales_cube, rollup_sales_cube
+from Analysis_Functions.sql_backend import arrow_table, decode_columns, quote, sql_connection, use_sql
 
-def _calculate_active_months(df, group_cols):
+
+def _calculate_active_months(df, group_cols, as_of=None):
   """
   Calculates the number of active months, total months between first and last sale, and the percentage of active months for each group in the DataFrame.
 
-  This function filters groups whose last sale occurred in the years 2024 or 2025, then computes:
+  This function filters groups whose last sale occurred in the two most recent years (as_of defaults to the last sale in the data), then computes:
     - The number of unique months with sales ("Active_Months")
     - The first and last sale dates for each group
     - The total number of months between the first and last sale (inclusive)
     - The percentage of active months over the total possible months
 
   Args:
-    df (pd.DataFrame): Input DataFrame containing at least a 'Date' column (datetime64) and columns specified in `group_cols`.
+    df (pd.DataFrame): Input DataFrame containing at least a 'Date' column (datetime64) and columns specified in `group_cols`,
+      or the sales cube from build_sales_cube (first/last sale dates are then taken from the cube cells),
+      or a month-close state (month_close.month_close_state; its active-month counters are used directly).
     group_cols (list of str): List of column names to group by (e.g., customer or product identifiers).
+    as_of (str or pd.Timestamp, optional): Analysis date; the recent years are taken from date_index.analysis_windows.
+      Rows after as_of are expected to be cut by the caller (date_index.until_as_of).
 
   Returns:
     pd.DataFrame: DataFrame with one row per group, containing:
@@ -27,24 +37,74 @@ def _calculate_active_months(df, group_cols):
       - 'Total_Months': Number of months between first and last sale (inclusive)
       - 'Active_Months_Percentage': Percentage of active months over total months (rounded to 2 decimals)
   """
+  windows = analysis_windows(as_of, df)
+  if is_month_close_state(df):
+    require_state_windows(df, as_of)
+    # Active months and first/last sale dates are kept per group as months close
+    result = activity_table(df, group_cols)
+    result = result[window_mask(result['Last_Sale_Date'], windows['recent_since'], windows['stop'])].reset_index(drop=True)
+    return _add_month_span(result)
+  if use_sql():
+    return _add_month_span(_active_months_sql(df, group_cols, windows))
   # Copy the DataFrame to avoid modifying the original
   df = df.copy()
-  # Create a YearMonth column for grouping by month
-  df['YearMonth'] = df['Date'].dt.to_period('M')
+  if is_sales_cube(df):
+    # Cube cells already carry a month key and their own first/last sale dates
+    first_col, last_col = 'First_Sale_Date', 'Last_Sale_Date'
+  else:
+    first_col = last_col = 'Date'
+    # Create a YearMonth column for grouping by month
+    df['YearMonth'] = df['Date'].dt.to_period('M')
   # Find the last sale date for each group
-  last_sale = df.groupby(group_cols)['Date'].max().reset_index().rename(columns={'Date': 'Last_Sale_Date'})
-  # Filter groups whose last sale is in 2024 or 2025
-  valid_groups = last_sale[last_sale['Last_Sale_Date'].dt.year.isin([2024, 2025])][group_cols]
+  last_sale = df.groupby(group_cols, observed=True)[last_col].max().reset_index().rename(columns={last_col: 'Last_Sale_Date'})
+  # Filter groups whose last sale is in the recent years
+  valid_groups = last_sale[window_mask(last_sale['Last_Sale_Date'], windows['recent_since'], windows['stop'])][group_cols]
   # Keep only rows belonging to valid groups
   df_filtered = df.merge(valid_groups, on=group_cols, how='inner')
-  df_filtered['YearMonth'] = df_filtered['Date'].dt.to_period('M')
   # Find first and last sale dates for each group
-  first_sale = df_filtered.groupby(group_cols)['Date'].min().reset_index().rename(columns={'Date': 'First_Sale_Date'})
-  last_sale = df_filtered.groupby(group_cols)['Date'].max().reset_index().rename(columns={'Date': 'Last_Sale_Date'})
+  first_sale = df_filtered.groupby(group_cols, observed=True)[first_col].min().reset_index().rename(columns={first_col: 'First_Sale_Date'})
+  last_sale = df_filtered.groupby(group_cols, observed=True)[last_col].max().reset_index().rename(columns={last_col: 'Last_Sale_Date'})
   # Count unique months with sales for each group
-  active_months = df_filtered.groupby(group_cols)['YearMonth'].nunique().reset_index().rename(columns={'YearMonth': 'Active_Months'})
+  active_months = df_filtered.groupby(group_cols, observed=True)['YearMonth'].nunique().reset_index().rename(columns={'YearMonth': 'Active_Months'})
   # Merge results
   result = active_months.merge(first_sale, on=group_cols, how='left').merge(last_sale, on=group_cols, how='left')
+  return _add_month_span(result)
+
+def _active_months_sql(df, group_cols, windows):
+  """
+  DuckDB counterpart of the row / cube branch of _calculate_active_months: the recent-years group
+  filter, distinct month count and first/last sale dates in one SQL query over integer key codes.
+  """
+  cube = is_sales_cube(df)
+  first_col, last_col = ('First_Sale_Date', 'Last_Sale_Date') if cube else ('Date', 'Date')
+  month = '"YearMonth"' if cube else 'date_trunc(\'month\', "Date")'
+  table, labels = arrow_table(
+    df, list(dict.fromkeys(group_cols + [first_col, last_col] + (['YearMonth'] if cube else []))), coded=group_cols
+  )
+  keys = ', '.join(map(quote, group_cols))
+  valid = ' AND '.join(f'{quote(col)} >= 0' for col in group_cols)
+  with sql_connection(t=table) as con:
+    result = con.execute(f"""
+      SELECT {keys},
+        count(DISTINCT {month}) AS Active_Months,
+        min({quote(first_col)}) AS First_Sale_Date,
+        max({quote(last_col)}) AS Last_Sale_Date
+      FROM t SEMI JOIN (
+        SELECT {keys} FROM t WHERE {valid}
+        GROUP BY {keys}
+        HAVING max({quote(last_col)}) >= TIMESTAMP '{windows['recent_since']:%Y-%m-%d}'
+          AND max({quote(last_col)}) < TIMESTAMP '{windows['stop']:%Y-%m-%d}'
+      ) valid USING ({keys})
+      GROUP BY {keys}
+      ORDER BY {keys}
+    """).df()
+  result = decode_columns(result, labels)
+  for col, source in [('First_Sale_Date', first_col), ('Last_Sale_Date', last_col)]:
+    result[col] = result[col].astype(df[source].dtype)
+  return result
+
+def _add_month_span(result):
+  """Adds 'Total_Months' (first to last sale, inclusive) and 'Active_Months_Percentage' to the active-month table."""
   # Calculate total months between first and last sale (inclusive)
   result['Total_Months'] = ((result['Last_Sale_Date'].dt.to_period('M') - result['First_Sale_Date'].dt.to_period('M')).apply(lambda x: x.n) + 1)
   # Calculate percentage of active months
@@ -83,7 +143,7 @@ def _add_category_and_rename(result, regular_label, irregular_label):
     "Active_Months_Percentage": "Devamlılık Oranı "
   })
 
-def düzenlisiparişverenler_aralıklı_müşteriler_ürünler(df):
+def düzenlisiparişverenler_aralıklı_müşteriler_ürünler(df, as_of=None):
   """
   Identifies and categorizes customers and products based on their order regularity.
 
@@ -93,27 +153,29 @@ def düzenlisiparişverenler_aralıklı_müşteriler_ürünler(df):
 
   Args:
     df (pd.DataFrame): Input DataFrame containing at least 'CustomerName' and 'ProductName' columns.
+    as_of (str or pd.Timestamp, optional): Analysis date (see _calculate_active_months).
 
   Returns:
     pd.DataFrame: A DataFrame with categorized and renamed columns indicating order regularity for each customer-product pair.
   """
-  result = _calculate_active_months(df, ['CustomerName', 'ProductName'])
+  result = _calculate_active_months(df, ['CustomerName', 'ProductName'], as_of=as_of)
   return _add_category_and_rename(result, 'Düzenli Sipariş Verenler', 'Aralıklı Sipariş Verenler')
 
-def düzenlisiparişverenler_aralıklımüşteriler(df):
+def düzenlisiparişverenler_aralıklımüşteriler(df, as_of=None):
   """
   Identifies and categorizes customers as 'Düzenli Sipariş Verenler' (Regular Orderers) or 'Aralıklı Sipariş Verenler' (Intermittent Orderers) based on their order activity.
 
   Args:
     df (pd.DataFrame): Input DataFrame containing customer order data. Must include a 'CustomerName' column.
+    as_of (str or pd.Timestamp, optional): Analysis date (see _calculate_active_months).
 
   Returns:
     pd.DataFrame: DataFrame with customers categorized and columns renamed accordingly.
   """
-  result = _calculate_active_months(df, ['CustomerName'])
+  result = _calculate_active_months(df, ['CustomerName'], as_of=as_of)
   return _add_category_and_rename(result, 'Düzenli Sipariş Verenler', 'Aralıklı Sipariş Verenler')
 
-def düzenlisiparişverenler_aralıklıürünler(df):
+def düzenlisiparişverenler_aralıklıürünler(df, as_of=None):
   """
   Identifies customers who place regular orders for products at intervals.
   This function processes the given DataFrame to determine active months for each product
@@ -121,17 +183,19 @@ def düzenlisiparişverenler_aralıklıürünler(df):
   'Aralıklı Sipariş Verilenler' (Interval Orderers).
   Args:
     df (pd.DataFrame): Input DataFrame containing order data. Must include a 'ProductName' column.
+    as_of (str or pd.Timestamp, optional): Analysis date (see _calculate_active_months).
   Returns:
     pd.DataFrame: DataFrame with categorized and renamed columns indicating regular and interval orderers.
   """
   
-  result = _calculate_active_months(df, ['ProductName'])
+  result = _calculate_active_months(df, ['ProductName'], as_of=as_of)
   return _add_category_and_rename(result, 'Düzenli Sipariş Verilenler', 'Aralıklı Sipariş Verilenler')
 
 
-def aylik_en_yuksek_ciroya_sahip_3_musteri(df):
+def aylik_en_yuksek_ciroya_sahip_3_musteri(df, as_of=None):
     """
-    Finds the top 3 customers with the highest monthly revenue (Ciro) for each month starting from January 2024.
+    Finds the top 3 customers with the highest monthly revenue (Ciro) for each month starting from January of the
+    year before as_of (as_of defaults to the last sale in the data).
 
     Parameters:
       df (pd.DataFrame): Input DataFrame containing at least the following columns:
@@ -139,6 +203,7 @@ def aylik_en_yuksek_ciroya_sahip_3_musteri(df):
         - 'Unit_Price(TL)': Price per unit in TL.
         - 'Date': Date of the sale (should be datetime type).
         - 'CustomerName': Name of the customer.
+      as_of (str or pd.Timestamp, optional): Analysis date (date_index.analysis_windows); the input is not modified.
 
     Returns:
       pd.DataFrame: A DataFrame with columns:
@@ -147,56 +212,54 @@ def aylik_en_yuksek_ciroya_sahip_3_musteri(df):
         - 'Ciro(TL)': Total revenue for the customer in that month.
 
     Notes:
-      - Only includes data from January 2024 onwards.
+      - Only includes data from January of the recent years onwards.
       - For each month, returns the top 3 customers by total revenue.
     """
-    # Calculate revenue
-    df['Ciro(TL)'] = df['Sale_Amount'] * df['Unit_Price(TL)']
-    # Create YearMonth column for monthly grouping
-    df['YearMonth'] = df['Date'].dt.to_period('M')
-    # Filter for data from January 2024 onwards
-    df = df[df['YearMonth'] >= pd.Period('2024-01', freq='M')]
+    recent_since = analysis_windows(as_of, df)['recent_since']
+    if is_sales_cube(df):
+      # Revenue is already summed per cube cell; keep months from January of the recent years onwards
+      df = date_window(rollup_sales_cube(df, ['CustomerName']).rename(columns={'Revenue': 'Ciro(TL)'}), start=recent_since)
+      df = df.assign(YearMonth=df['YearMonth'].dt.to_period('M'))
+    else:
+      # Keep rows from January of the recent years onwards (a slice of the date-sorted rows), then
+      # calculate revenue and a YearMonth column for monthly grouping on that window only
+      df = date_window(df, start=recent_since)
+      df = df.assign(**{'Ciro(TL)': df['Sale_Amount'] * df['Unit_Price(TL)'], 'YearMonth': df['Date'].dt.to_period('M')})
     # Calculate total revenue per customer per month
-    monthly_revenue = df.groupby(['CustomerName', 'YearMonth'])['Ciro(TL)'].sum().reset_index()
+    monthly_revenue = df.groupby(['CustomerName', 'YearMonth'], observed=True)['Ciro(TL)'].sum().reset_index()
     # For each month, get the top 3 customers with the highest revenue
-    top3 = (
-      monthly_revenue
-      .sort_values(['YearMonth', 'Ciro(TL)'], ascending=[True, False])
-      .groupby('YearMonth')
-      .head(3)
-      .reset_index(drop=True)
-    )
+    top3 = top_k_per_partition(monthly_revenue, ['YearMonth'], 'Ciro(TL)', k=3)
     # Return only customer names, year-month, and revenue
     return top3[['YearMonth', 'CustomerName', 'Ciro(TL)']]
 
-def aylik_en_yuksek_ciroya_sahip_3_ürün(df):
+def aylik_en_yuksek_ciroya_sahip_3_ürün(df, as_of=None):
     """
-    Belirtilen DataFrame'den, 2024 Ocak ve sonrasındaki her ay için en yüksek ciroya sahip ilk 3 ürünü döndürür.
+    Belirtilen DataFrame'den, as_of'tan önceki yılın Ocak ayı (as_of verilmezse verideki son satış günü) ve sonrasındaki her ay için
+    en yüksek ciroya sahip ilk 3 ürünü döndürür.
 
     Parametreler:
       df (pd.DataFrame): Satış verilerini içeren DataFrame. 
         Gerekli sütunlar: 'Sale_Amount', 'Unit_Price(TL)', 'Date', 'ProductName'.
+      as_of (str/pd.Timestamp, optional): Analiz tarihi (date_index.analysis_windows); girdi değiştirilmez.
 
     Dönüş:
       pd.DataFrame: Her yıl-ay ('YearMonth') için en yüksek ciroya sahip ilk 3 ürünün
         ürün adı ('ProductName') ve ciro ('Ciro(TL)') ile birlikte listelendiği DataFrame.
     """
-    # Calculate revenue
-    df['Ciro(TL)'] = df['Sale_Amount'] * df['Unit_Price(TL)']
-    # Create YearMonth column for monthly grouping
-    df['YearMonth'] = df['Date'].dt.to_period('M')
-    # Filter for data from January 2024 onwards
-    df = df[df['YearMonth'] >= pd.Period('2024-01', freq='M')]
+    recent_since = analysis_windows(as_of, df)['recent_since']
+    if is_sales_cube(df):
+      # Revenue is already summed per cube cell; keep months from January of the recent years onwards
+      df = date_window(rollup_sales_cube(df, ['ProductName']).rename(columns={'Revenue': 'Ciro(TL)'}), start=recent_since)
+      df = df.assign(YearMonth=df['YearMonth'].dt.to_period('M'))
+    else:
+      # Keep rows from January of the recent years onwards (a slice of the date-sorted rows), then
+      # calculate revenue and a YearMonth column for monthly grouping on that window only
+      df = date_window(df, start=recent_since)
+      df = df.assign(**{'Ciro(TL)': df['Sale_Amount'] * df['Unit_Price(TL)'], 'YearMonth': df['Date'].dt.to_period('M')})
     # Calculate total revenue per product per month
-    monthly_revenue = df.groupby(['ProductName', 'YearMonth'])['Ciro(TL)'].sum().reset_index()
+    monthly_revenue = df.groupby(['ProductName', 'YearMonth'], observed=True)['Ciro(TL)'].sum().reset_index()
     # For each month, get the top 3 products with the highest revenue
-    top3 = (
-      monthly_revenue
-      .sort_values(['YearMonth', 'Ciro(TL)'], ascending=[True, False])
-      .groupby('YearMonth')
-      .head(3)
-      .reset_index(drop=True)
-    )
+    top3 = top_k_per_partition(monthly_revenue, ['YearMonth'], 'Ciro(TL)', k=3)
     # Return only product names, year-month, and revenue
     return top3[['YearMonth', 'ProductName', 'Ciro(TL)']]
 
@@ -5,41 +5,201 @@ import numpy as np
 
 import pandas as pd 
 import numpy as np
+import streamlit as st
 
-def yıllık_satış_rakamları(df):
-    df_test = df.copy()
-    mask = df[df['Year'].isin([2024, 2025])]
-    pairs = mask[['CustomerCode', 'Product_Code']].drop_duplicates()
-    filtered = df.merge(pairs, on=['CustomerCode', 'Product_Code'], how='inner')
-    filtered['Year'] = filtered['Date'].dt.year
-    filtered['Month'] = filtered['Date'].dt.month
-
-    # Pivot tablo: her yıl ve ay için ayrı sütun
-    monthly_sales = filtered.pivot_table(
-        index=['CustomerCode', 'Product_Code'],
-        columns=['Year', 'Month'],
-        values='Sale_Amount',
-        aggfunc='sum',
-        fill_value=0
-    )
+from Analysis_Functions.date_index import analysis_windows, date_window
+from Analysis_Functions.paged_table import compact_categories
+from Analysis_Functions.sales_cube import is_sales_cube
+from Analysis_Functions.sql_backend import ROW_COLUMN, arrow_table, decode_columns, quote, sql_connection, use_sql
+
+# Sütun adlarında kullanılan ay adları
+AYLAR = {1: 'Ocak', 2: 'Şubat', 3: 'Mart', 4: 'Nisan', 5: 'Mayıs', 6: 'Haziran',
+         7: 'Temmuz', 8: 'Ağustos', 9: 'Eylül', 10: 'Ekim', 11: 'Kasım', 12: 'Aralık'}
+KEYS = ['CustomerCode', 'Product_Code']
+# Ekranda bir sayfada gösterilen müşteri-ürün çifti sayısı
+SAYFA_BOYUTU = 50
+# Ekranda gösterilebilecek ay pencereleri (son N ay; None tüm aylar)
+AY_PENCERELERİ = {"Son 12 ay": 12, "Son 24 ay": 24, "Son 36 ay": 36, "Tüm aylar": None}
+
+def yıllık_satış_rakamları(df, as_of=None):
+    """
+    as_of'un son iki yılında (as_of verilmezse verideki son satış günü) satışı olan müşteri-ürün çiftlerinin her yıl-ay satışını geniş tablo olarak
+    döndürür (çift başına bir satır, ay başına bir "YYYY-AyAdı" sütunu, satışsız aylar 0).
+    Tablo çoğunlukla sıfırdır; ekranda gösterim için yıllık_satış_rakamları_seyrek ve
+    show_yıllık_satış_rakamları kullanılır, bu fonksiyon dışa aktarım içindir.
+    """
+    return seyrek_geniş_tablo(yıllık_satış_rakamları_seyrek(df, as_of=as_of))
+
+
+def yıllık_satış_rakamları_seyrek(df, as_of=None):
+    """
+    yıllık_satış_rakamları'nın seyrek (COO) karşılığı: yalnızca satışı olan çift × ay hücreleri tutulur.
+
+    Parameters:
+        df (pd.DataFrame): Satır verisi ya da build_sales_cube küpü (küpte Year/Month zaten ay düzeyindedir).
+        as_of (str/Timestamp, optional): Analiz tarihi; son iki yıl buna göre seçilir
+            (date_index.analysis_windows). Sonraki satırları çağıran keser.
 
-    # Sütun isimlerini "YYYY-AyAdı" şeklinde yap
-    aylar = {1: 'Ocak', 2: 'Şubat', 3: 'Mart', 4: 'Nisan', 5: 'Mayıs', 6: 'Haziran',
-             7: 'Temmuz', 8: 'Ağustos', 9: 'Eylül', 10: 'Ekim', 11: 'Kasım', 12: 'Aralık'}
-    monthly_sales.columns = [f"{year}-{aylar[month]}" for year, month in monthly_sales.columns]
-    monthly_sales = monthly_sales.reset_index()
+    Returns:
+        dict: 'kind' ('seyrek_yıllık_satış'), 'pairs' (çift başına anahtarlar, Last_Sale_Date,
+        CustomerName, ProductName; satır numarası çift indeksidir), 'periods' (Year, Month; satır
+        numarası dönem indeksidir) ve 'cells' (pair, period, Sale_Amount; pair ve period sırasına
+        göre sıralı, yani CSR gibi çift aralıkları ikili aramayla bulunur).
+    """
+    windows = analysis_windows(as_of, df)
+    if use_sql():
+        return _yıllık_satış_rakamları_seyrek_sql(df, windows)
+    cube = is_sales_cube(df)
+    mask = date_window(df, windows['recent_since'], windows['stop'])
+    pairs = mask[KEYS].drop_duplicates()
+    filtered = df.merge(pairs, on=KEYS, how='inner')
+    year = filtered['Year'] if cube else filtered['Date'].dt.year
+    month = filtered['Month'] if cube else filtered['Date'].dt.month
 
-    # Son satış tarihi, müşteri ve ürün adı ekle
+    # Çift ve dönem indeksleri: çiftler groupby sırasında, dönemler yıl-ay sırasında
+    pair = filtered.groupby(KEYS, observed=True, sort=True).ngroup().to_numpy()
+    period_key = (year * 12 + month - 1).to_numpy(dtype=np.float64)
+    valid = (pair >= 0) & ~np.isnan(period_key)
+    present, pair = np.unique(pair[valid], return_inverse=True)
+    period_keys, period = np.unique(period_key[valid], return_inverse=True)
+    cells = (
+        pd.DataFrame({'pair': pair, 'period': period, 'Sale_Amount': filtered['Sale_Amount'].to_numpy()[valid]})
+        .groupby(['pair', 'period'], sort=True)
+        .agg(Sale_Amount=('Sale_Amount', 'sum'))
+        .reset_index()
+    )
+
+    # Son satış tarihi, müşteri ve ürün adı
     last_sales = (
-        filtered.groupby(['CustomerCode', 'Product_Code'])
+        filtered.groupby(KEYS, observed=True)
         .agg(
-            Last_Sale_Date=('Date', 'max'),
+            Last_Sale_Date=('Last_Sale_Date' if cube else 'Date', 'max'),
             CustomerName=('CustomerName', 'first'),
             ProductName=('ProductName', 'first')
         )
+        .iloc[present]
         .reset_index()
     )
-    monthly_sales = monthly_sales.merge(last_sales, on=['CustomerCode', 'Product_Code'], how='left')
+    period_keys = period_keys.astype(np.int64)
+    periods = pd.DataFrame({'Year': period_keys // 12, 'Month': period_keys % 12 + 1})
+    return {"kind": "seyrek_yıllık_satış", "pairs": last_sales, "periods": periods, "cells": cells}
+
+
+def _yıllık_satış_rakamları_seyrek_sql(df, windows):
+    """
+    yıllık_satış_rakamları_seyrek'in DuckDB karşılığı. Çift filtresi, çift × yıl-ay toplamları ve
+    son satış bilgisi SQL'de hesaplanır; sonuç pandas uygulamasıyla aynı çift ve dönem sırasındadır.
+    """
+    cube = is_sales_cube(df)
+    date_col = 'Last_Sale_Date' if cube else 'Date'
+    # Satır verisinde yıl ve ay (pandas uygulamasındaki gibi) Date'ten alınır
+    year, month = ('"Year"', '"Month"') if cube else ('year("Date")', 'month("Date")')
+    recent = ", ".join(str(y) for y in windows['recent_years'])
+    table, labels = arrow_table(
+        df, KEYS + ['CustomerName', 'ProductName', 'Year', 'Sale_Amount', date_col] + (['Month'] if cube else []),
+        coded=KEYS + ['CustomerName', 'ProductName'],
+    )
+
+    with sql_connection(t=table) as con:
+        con.execute(f"""
+            CREATE TEMP TABLE filtered AS
+            SELECT t.*, {year} AS _year, {month} AS _month
+            FROM t SEMI JOIN (
+                SELECT DISTINCT CustomerCode, Product_Code FROM t WHERE "Year" IN ({recent})
+            ) pairs USING (CustomerCode, Product_Code)
+            WHERE CustomerCode >= 0 AND Product_Code >= 0
+        """)
+        pairs = con.execute(f"""
+            SELECT CustomerCode, Product_Code,
+                max({quote(date_col)}) AS Last_Sale_Date,
+                arg_min(CustomerName, {ROW_COLUMN}) FILTER (WHERE CustomerName >= 0) AS CustomerName,
+                arg_min(ProductName, {ROW_COLUMN}) FILTER (WHERE ProductName >= 0) AS ProductName
+            FROM filtered
+            WHERE _year IS NOT NULL
+            GROUP BY CustomerCode, Product_Code
+            ORDER BY CustomerCode, Product_Code
+        """).df()
+        periods = con.execute("""
+            SELECT DISTINCT _year AS "Year", _month AS "Month"
+            FROM filtered WHERE _year IS NOT NULL ORDER BY 1, 2
+        """).df()
+        # Çift ve dönem sıra numaraları (0'dan) ile hücre toplamları
+        cells = con.execute("""
+            SELECT
+                dense_rank() OVER (ORDER BY CustomerCode, Product_Code) - 1 AS pair,
+                dense_rank() OVER (ORDER BY _year, _month) - 1 AS period,
+                coalesce(sum(Sale_Amount), 0) AS Sale_Amount
+            FROM filtered
+            WHERE _year IS NOT NULL
+            GROUP BY CustomerCode, Product_Code, _year, _month
+            ORDER BY pair, period
+        """).df()
+
+    pairs = decode_columns(pairs, labels)
+    pairs['Last_Sale_Date'] = pairs['Last_Sale_Date'].astype(df[date_col].dtype)
+    periods = periods.astype(np.int64)
+    return {"kind": "seyrek_yıllık_satış", "pairs": pairs, "periods": periods, "cells": cells}
+
+
+def seyrek_geniş_tablo(seyrek, pair_start=0, pair_stop=None, last_months=None):
+    """
+    Seyrek sonucun bir çift aralığını ve ay penceresini yıllık_satış_rakamları düzeninde geniş
+    tabloya çevirir (satışsız hücreler 0). Çift aralığının hücreleri sıralı 'pair' sütununda ikili
+    aramayla bulunur; yalnızca istenen blok yoğunlaştırılır.
+
+    Parameters:
+        seyrek (dict): yıllık_satış_rakamları_seyrek çıktısı.
+        pair_start, pair_stop (int, optional): Çift indeks aralığı [pair_start, pair_stop); varsayılan tümü.
+        last_months (int, optional): Yalnızca son N dönem sütunu; varsayılan tümü.
 
-    return monthly_sales
+    Returns:
+        pd.DataFrame: Anahtarlar, "YYYY-AyAdı" sütunları, Last_Sale_Date, CustomerName, ProductName.
+    """
+    pairs, periods, cells = seyrek['pairs'], seyrek['periods'], seyrek['cells']
+    pair_stop = len(pairs) if pair_stop is None else min(pair_stop, len(pairs))
+    period_start = 0 if last_months is None else max(len(periods) - last_months, 0)
+    lo, hi = np.searchsorted(cells['pair'].to_numpy(), [pair_start, pair_stop])
+    block = cells.iloc[lo:hi]
+    block = block[block['period'].to_numpy() >= period_start]
 
+    values = np.zeros((max(pair_stop - pair_start, 0), len(periods) - period_start))
+    values[block['pair'].to_numpy() - pair_start, block['period'].to_numpy() - period_start] = block['Sale_Amount'].to_numpy()
+    window = periods.iloc[period_start:]
+    page = pairs.iloc[pair_start:pair_stop].reset_index(drop=True)
+    return pd.concat([
+        page[KEYS],
+        # Sütun isimleri "YYYY-AyAdı" şeklinde
+        pd.DataFrame(values, columns=[f"{y}-{AYLAR[m]}" for y, m in zip(window['Year'], window['Month'])]),
+        page[['Last_Sale_Date', 'CustomerName', 'ProductName']],
+    ], axis=1)
+
+
+def show_yıllık_satış_rakamları(seyrek, page_size=SAYFA_BOYUTU):
+    """
+    Seyrek sonucu sayfa sayfa gösterir: tarayıcıya yalnızca seçili sayfanın çiftleri ve seçili ay
+    penceresi gönderilir. Tüm geniş tablo yalnızca "Tam tabloyu dışa aktar" ile üretilir.
+    """
+    pairs, periods, cells = seyrek['pairs'], seyrek['periods'], seyrek['cells']
+    if pairs.empty:
+        st.info("Son iki yılda satışı olan müşteri-ürün çifti bulunamadı.")
+        return
+    n_pages = -(-len(pairs) // page_size)
+    col_window, col_page = st.columns(2)
+    window = col_window.selectbox("Gösterilen aylar", list(AY_PENCERELERİ), index=1, key="monthly_sales_window")
+    page = col_page.number_input(
+        f"Sayfa (1-{n_pages})", min_value=1, max_value=n_pages, value=1, step=1, key="monthly_sales_page"
+    )
+    start = (int(page) - 1) * page_size
+    st.dataframe(compact_categories(seyrek_geniş_tablo(seyrek, start, start + page_size, AY_PENCERELERİ[window])))
+    st.caption(
+        f"{len(pairs):,} müşteri-ürün çifti, {len(periods)} ay; {len(cells):,} dolu hücre "
+        f"(%{100 * len(cells) / (len(pairs) * len(periods)):.1f})"
+    )
+    if st.button("Tam tabloyu dışa aktar", key="monthly_sales_export"):
+        st.download_button(
+            "CSV olarak indir",
+            seyrek_geniş_tablo(seyrek).to_csv(index=False).encode("utf-8-sig"),
+            "yil_ay_satis_rakamlari.csv",
+            "text/csv",
+            on_click="ignore",
+        )
@@ -0,0 +1,655 @@
+import pandas as pd
+import streamlit as st
+
+from Analysis_Functions.Adet_Ciro_Bazında_EnCokSatanlar import yil_ay_bazinda_en_cok_satan_urunler
+from Analysis_Functions.AgingFactor import aging_factor_analysis
+from Analysis_Functions.Aylık_Değişim_Oranı import rate_of_change_per_month
+from Analysis_Functions.Aylık_Yıllık_Ciro_Büyüme_Oranı import ciro_buyume_orani_analizi
+from Analysis_Functions.Ciro_Büyüme_Oranı import (
+    aylik_en_yuksek_ciroya_sahip_3_musteri,
+    aylik_en_yuksek_ciroya_sahip_3_ürün,
+    düzenlisiparişverenler_aralıklı_müşteriler_ürünler,
+    düzenlisiparişverenler_aralıklımüşteriler,
+    düzenlisiparişverenler_aralıklıürünler,
+)
+from Analysis_Functions.Yıllık_Satış_Rakamları import show_yıllık_satış_rakamları, yıllık_satış_rakamları_seyrek
+from Analysis_Functions.date_index import analysis_windows, until_as_of
+from Analysis_Functions.figure_cache import figure_scope, show_figure
+from Analysis_Functions.macroeconomic_analysis import macroeconomic_parameters
+from Analysis_Functions.month_close import month_close_state
+from Analysis_Functions.paged_table import show_table
+from Analysis_Functions.parallel_analyses import collect_analyses, submit_analyses
+from Analysis_Functions.plot_top10 import (
+    compute_top10_productsandcustomers_per_year,
+    compute_top10_products_per_year,
+    show_top10_productsandcustomers_per_year,
+    show_top10_products_per_year,
+)
+from Analysis_Functions.plot_top_products_by_season import plot_top_products_by_season
+from Analysis_Functions.plot_top_selling_product_customer_by_season import plot_top_selling_product_customer_by_season
+from Analysis_Functions.prepare_data import preprocessing
+from Analysis_Functions.profiling import profile_section, profiled_call
+from Analysis_Functions.report_store import record_figure, record_result, report_figure, report_result
+from Analysis_Functions.result_cache import cached_call
+from Analysis_Functions.sales_cube import build_sales_cube
+from Analysis_Functions.sales_panel import build_sales_panel
+from Analysis_Functions.sales_revenue import (
+    compute_sales_revenue_product,
+    compute_sales_revenue_product_customer,
+    show_sales_revenue_product,
+    show_sales_revenue_product_customer,
+)
+from Analysis_Functions.sales_volatility import compute_sales_volatility, show_sales_volatility
+from Analysis_Functions.seasonal_sales_by_year import seasonal_sales_by_year
+from Analysis_Functions.seasonality_channel_price_specialday_analysis import (
+    compute_price_and_sales,
+    compute_seasonality_specialday_channel_price,
+    show_price_and_sales,
+    show_seasonality_specialday_channel_price,
+)
+from Analysis_Functions.top5_products_per_season import top5_products_per_season
+from Analysis_Functions.top_3_customer_product_sales_by_month_year import top_3_customer_product_sales_by_month_year
+from Analysis_Functions.total_sales_and_trend_line import total_sales_and_trend_line
+from Analysis_Functions.trend_analysis import (
+    compute_customer_product_trend,
+    compute_customer_trend,
+    compute_product_trend,
+    customer_product_segments,
+    product_segments,
+    show_customer_product_segments,
+    show_customer_product_trend,
+    show_customer_trend,
+    show_product_segments,
+    show_product_trend,
+)
+from Analysis_Functions.trend_volatility_analysis_segmentation import (
+    compute_trend_volatility_segments,
+    show_trend_volatility_segments,
+)
+from Analysis_Functions.volatility_analysis import compute_volatility, show_volatility
+
+# Makroekonomik gösterge sütunları ve ekranda görünen adları
+MACRO_METRICS = {
+    "Interest_Rate": "Faiz Oranı",
+    "Inflation": "Enflasyon",
+    "PMI": "PMI",
+    "Growth_Rate": "Büyüme Oranı"
+}
+
+
+# --- Ortak ara sonuçlar ---
+# Her bölüm ihtiyaç duyduğu ara sonucu buradan ister; sonuçlar parmak izine göre önbellekte
+# tutulduğundan ön işleme ve küp yalnızca ilk ihtiyaç duyan bölüm açıldığında hesaplanır.
+
+def _compute(ctx, func, *args, **kwargs):
+    """cached_call; profil modunda (ctx['profile']) çağrı süre ve bellek ölçülerek yapılır."""
+    if "profile" in ctx:
+        return profiled_call(ctx["profile"], ctx["fingerprint"], func, *args, **kwargs)
+    return cached_call(ctx["fingerprint"], func, *args, **kwargs)
+
+
+def _with_as_of(ctx, func, kwargs):
+    """Analiz tarihi seçildiyse (ctx['as_of']) AS_OF_FUNCTIONS çağrılarının kwargs'ına ekler."""
+    if ctx.get("as_of") is None or func not in AS_OF_FUNCTIONS:
+        return kwargs
+    return {**kwargs, "as_of": ctx["as_of"]}
+
+
+def _windows(ctx):
+    """
+    Bölüm metinlerinde gösterilen zaman pencereleri (date_index.analysis_windows). as_of seçilmediyse
+    analizler gibi verinin son satış günü; rapor modunda bu gün raporun manifestinden okunur.
+    """
+    if "report" in ctx:
+        manifest = ctx["report"]["manifest"]
+        return analysis_windows(manifest.get("as_of") or manifest.get("data_as_of"))
+    return analysis_windows(ctx.get("as_of"), _clean(ctx) if ctx["df_raw"] is not None else _cube(ctx))
+
+
+def _recent_text(ctx):
+    first, last = _windows(ctx)["recent_years"]
+    return f"{first} ve {last}"
+
+
+def _cached(ctx, func, *args, **kwargs):
+    """
+    Analiz sonucunu önbellekten/hesaplayarak döndürür. Rapor modunda (ctx['report']) sonuç
+    gece raporundan okunur; kayıt modunda (ctx['recorder']) hesaplanan sonuç rapora eklenir.
+    Analiz tarihi seçildiyse as_of parametresi alan analizlere iletilir.
+    """
+    kwargs = _with_as_of(ctx, func, kwargs)
+    if "report" in ctx:
+        return report_result(ctx["report"], func, args, kwargs)
+    value = _compute(ctx, func, *args, **kwargs)
+    if "recorder" in ctx:
+        record_result(ctx["recorder"], func, args, kwargs, value)
+    return value
+
+
+def _clean(ctx):
+    """
+    Ön işlenmiş satır verisi (df_clean). Analiz tarihi seçildiyse (ctx['as_of']) o güne kadarki
+    satırlar; tarihe göre sıralı tablodan ikili aramayla kesilen kopyasız dilimdir. Rapor modunda
+    yalnızca adı ('clean') döner.
+    """
+    if "report" in ctx:
+        return "clean"
+    df_clean = _compute(ctx, preprocessing, ctx["df_raw"].copy(deep=False))
+    if ctx.get("as_of") is not None:
+        # Dilim de önbellekten gelir: her çağrı aynı nesneyi görür, içerik özeti bir kez hesaplanır
+        df_clean = _compute(ctx, until_as_of, df_clean, ctx["as_of"])
+    if "recorder" in ctx:
+        ctx["recorder"]["frames"]["clean"] = df_clean
+    return df_clean
+
+
+def _cube(ctx):
+    """
+    Müşteri × ürün × ay satış küpü: df_clean'den kurulur ya da küp modunda (ctx['cube'])
+    veritabanında toplanmış küptür; analiz tarihi seçildiyse o aya kadarki hücreler. Rapor
+    modunda yalnızca adı ('cube') döner.
+    """
+    if "report" in ctx:
+        return "cube"
+    if ctx.get("cube") is not None:
+        cube = ctx["cube"]
+        if ctx.get("as_of") is not None:
+            cube = _compute(ctx, until_as_of, cube, ctx["as_of"])
+    else:
+        cube = _compute(ctx, build_sales_cube, _clean(ctx))
+    if "recorder" in ctx:
+        ctx["recorder"]["frames"]["cube"] = cube
+    return cube
+
+
+def _month_close(ctx):
+    """
+    Ay kapanışı durumu (month_close.month_close_state): kapanmış aylar diskteki durumdan,
+    açık ay her çağrıda eklenir. Rapor modunda yalnızca adı ('month_close') döner.
+    """
+    if "report" in ctx:
+        return "month_close"
+    state = _compute(ctx, month_close_state, _clean(ctx), option=ctx["fingerprint"][0])
+    if "recorder" in ctx:
+        ctx["recorder"]["frames"]["month_close"] = state
+    return state
+
+
+def _panel(ctx):
+    """Müşteri-ürün × takvim ayı paneli (sales_panel). Rapor modunda yalnızca adı ('panel') döner."""
+    if "report" in ctx:
+        return "panel"
+    panel = _compute(ctx, build_sales_panel, _cube(ctx))
+    if "recorder" in ctx:
+        ctx["recorder"]["frames"]["panel"] = panel
+    return panel
+
+
+def _statistics_source(ctx, frame, calendar=False):
+    """
+    Takvim modunda (ctx['calendar']) takvime hizalanabilen analizler (calendar=True) için panel,
+    artımlı modda (ctx['incremental']) ay kapanışı durumu, değilse frame(ctx) (küp ya da df_clean).
+    Analiz tarihi seçildiyse render_sections artımlı modu kapatır (durum varsayılan pencerelerle tutulur).
+    """
+    if calendar and ctx.get("calendar"):
+        return _panel(ctx)
+    return _month_close(ctx) if ctx.get("incremental") else frame(ctx)
+
+
+def _customer_product_trend(ctx):
+    return _cached(ctx, compute_customer_product_trend, _statistics_source(ctx, _cube, calendar=True))
+
+
+def _volatility(ctx):
+    return _cached(ctx, compute_volatility, _statistics_source(ctx, _clean))
+
+
+def _trend_volatility(ctx):
+    volatility_df_customer_product, _ = _volatility(ctx)
+    return _cached(ctx, compute_trend_volatility_segments, _customer_product_trend(ctx), volatility_df_customer_product, _clean(ctx))
+
+
+def _seasonality(ctx):
+    return _cached(ctx, compute_seasonality_specialday_channel_price, _clean(ctx))
+
+
+def _show_order_categories(categories, labels, key):
+    """Düzenlilik analizi sonucunu kategori başına bir alt başlık ve tablo olarak gösterir."""
+    for subheader, category in labels:
+        st.subheader(subheader)
+        show_table(categories[categories["Category"] == category], key=f"{key}_{category}")
+
+
+# --- Bölümler ---
+
+def section_raw_data(ctx):
+    st.title("Ham Veri")
+    if ctx["df_raw"] is None:
+        st.info("Ham veri gece raporlarında saklanmaz; görmek için veriyi veritabanından çekin.")
+        return
+    show_table(ctx["df_raw"], key="raw_data")
+
+
+def section_monthly_sales(ctx):
+    st.title("Yıl-Ay Bazında Satış Rakamları")
+    st.markdown(f"{_recent_text(ctx)} yıllarında aktif satışı olan müşteri-ürün grupları bazında yapılmıştır.")
+    show_yıllık_satış_rakamları(_cached(ctx, yıllık_satış_rakamları_seyrek, _cube(ctx)))
+
+
+def section_best_sellers(ctx):
+    st.title("Yıl-Ay Bazında Adet&Ciro Bazında En Çok Satan Ürünler")
+    st.markdown(f"{_recent_text(ctx)} yıllarında aktif satışı olan müşteri-ürün grupları bazında yapılmıştır.")
+    show_table(_cached(ctx, yil_ay_bazinda_en_cok_satan_urunler, _clean(ctx)), key="best_sellers")
+
+
+def section_revenue_growth(ctx):
+    result, result2 = _cached(ctx, ciro_buyume_orani_analizi, _cube(ctx))
+    st.title("Aylık ve Yıllık Ciro Büyüme Oranı")
+    st.subheader("Aylık Ciro Büyüme Oranı")
+    show_table(result, key="monthly_revenue_growth")
+    st.subheader("Yıllık Ciro Büyüme Oranı")
+    show_table(result2, key="yearly_revenue_growth")
+
+
+def section_trend(ctx):
+    st.title("Trend Analizi Sonuçları")
+    st.markdown(f"Bu analiz {_recent_text(ctx)} yıllarında aktif satışı olan müşteri-ürün grupları bazında yapılmıştır. ")
+    musteri_ürün = _customer_product_trend(ctx)
+    show_customer_product_trend(musteri_ürün)
+    ürün = _cached(ctx, compute_product_trend, _clean(ctx))
+    show_product_trend(ürün)
+    show_customer_trend(_cached(ctx, compute_customer_trend, _clean(ctx)))
+    show_customer_product_segments(_cached(ctx, customer_product_segments, musteri_ürün))
+    show_product_segments(_cached(ctx, product_segments, ürün))
+
+
+def section_volatility_segmentation(ctx):
+    show_volatility(*_volatility(ctx))
+    show_trend_volatility_segments(_trend_volatility(ctx))
+
+
+def section_seasonality_price(ctx):
+    seasonality_results = _seasonality(ctx)
+    show_seasonality_specialday_channel_price(seasonality_results)
+    show_price_and_sales(_cached(ctx, compute_price_and_sales, _trend_volatility(ctx), seasonality_results['price_std2']))
+
+
+def section_customer_product_regularity(ctx):
+    st.header("Müşteri-Ürün Sipariş Yoğunluğu ve Düzenlilik Analizi")
+    st.markdown(
+        f"Son satışı {_recent_text(ctx)} yıllarında olan müşteri-ürün gruplarının yaşam süresi boyunca ilgili üründen ne kadar sipariş verildiği hesaplanmıştır. "
+        "Bu analizde, her müşterinin ilgili üründe yaşam süresi boyunca verdiği sipariş sayısı değerlendirilmiştir. "
+        "Müşteri, yaşam süresi boyunca ilgili ürünü **tüm olası ayların %80'inden fazlasında sipariş verdiyse**, **“Düzenli Müşteri”** olarak etiketlenmiştir."
+    )
+    _show_order_categories(_cached(ctx, düzenlisiparişverenler_aralıklı_müşteriler_ürünler, _statistics_source(ctx, _cube)), [
+        ("Düzenli Siparişi Olan Müşteri-Ürün Grupları", "Düzenli Sipariş Verenler"),
+        ("Aralıklı Siparişi Olan Müşteri-Ürün Grupları", "Aralıklı Sipariş Verenler"),
+        ("Tek Seferlik Siparişi Olan Müşteri-Ürün Grupları", "Hesaplanamaz"),
+    ], key="customer_product_regularity")
+
+
+def section_customer_regularity(ctx):
+    st.header("Müşteri Sipariş Yoğunluğu ve Düzenlilik Analizi")
+    st.markdown(
+        f"Son satışı {_recent_text(ctx)} yıllarında olan müşterilerin yaşam süresi boyunca ne kadar sipariş verdiği hesaplanmıştır. "
+        "Bu analizde, her müşterinin yaşam süresi boyunca verdiği sipariş sayısı değerlendirilmiştir. "
+        "Müşteri, yaşam süresi boyunca **tüm olası ayların %80'inden fazlasında sipariş verdiyse**, **“Düzenli Sipariş Veren Müşteri”** olarak etiketlenmiştir."
+    )
+    _show_order_categories(_cached(ctx, düzenlisiparişverenler_aralıklımüşteriler, _statistics_source(ctx, _cube)), [
+        ("Düzenli Siparişi Olan Müşteriler", "Düzenli Sipariş Verenler"),
+        ("Aralıklı Siparişi Olan Müşteriler", "Aralıklı Sipariş Verenler"),
+        ("Tek Seferlik Siparişi Olan Müşteriler", "Hesaplanamaz"),
+    ], key="customer_regularity")
+
+
+def section_product_regularity(ctx):
+    st.header("Ürün Sipariş Yoğunluğu ve Düzenlilik Analizi")
+    st.markdown(
+        f"Son satışı {_recent_text(ctx)} yıllarında olan ürünlerin yaşam süresi boyunca ne kadar sipariş verildiği hesaplanmıştır. "
+        "Bu analizde, yaşam süresi boyunca verilen sipariş sayısı değerlendirilmiştir. "
+        "Ürün, yaşam süresi boyunca **tüm olası ayların %80'inden fazlasında sipariş aldıysa**, **“Düzenli Sipariş Verilen Ürün”** olarak etiketlenmiştir."
+    )
+    _show_order_categories(_cached(ctx, düzenlisiparişverenler_aralıklıürünler, _statistics_source(ctx, _cube)), [
+        ("Düzenli Siparişi Olan Ürünler", "Düzenli Sipariş Verilenler"),
+        ("Aralıklı Siparişi Olan Ürünler", "Aralıklı Sipariş Verilenler"),
+        ("Tek Seferlik Siparişi Olan Ürünler", "Hesaplanamaz"),
+    ], key="product_regularity")
+
+
+def section_top_revenue_customers(ctx):
+    st.header("En Yüksek Ciroya Sahip Müşteriler")
+    st.markdown(f"{_windows(ctx)['recent_since'].year} yılı itibari ile her ay en yüksek 3 ciroya sahip müşteriler listelenmiştir.")
+    show_table(_cached(ctx, aylik_en_yuksek_ciroya_sahip_3_musteri, _cube(ctx)), key="top_revenue_customers")
+
+
+def section_top_revenue_products(ctx):
+    st.header("En Yüksek Ciroya Sahip Ürünler")
+    st.markdown(f"{_windows(ctx)['recent_since'].year} yılı itibari ile her ay en yüksek 3 ciroya sahip ürünler listelenmiştir.")
+    show_table(_cached(ctx, aylik_en_yuksek_ciroya_sahip_3_ürün, _cube(ctx)), key="top_revenue_products")
+
+
+def section_seasonal_sales(ctx):
+    df_clean = _clean(ctx)
+    windows = _windows(ctx)
+    st.markdown(f"### {windows['overview_since'].year}-{windows['as_of'].year} Aralığında Sezon Bazlı Satış Analizi")
+    seasonal_sales_df, fig = _cached(ctx, seasonal_sales_by_year, df_clean, plot=True)
+    if fig:
+        show_figure(fig)
+
+    # En çok satan 5 ürün
+    for year, fig in _cached(ctx, plot_top_products_by_season, df_clean).items():
+        st.markdown(f"#### {year} – Sezon Bazında En Çok Satan 5 Ürün")
+        show_figure(fig)
+
+    # En çok kez satan 5 ürün
+    for year, fig in _cached(ctx, top5_products_per_season, df_clean).items():
+        st.markdown(f"#### {year} – Sezon Bazında En Çok Kez Satan 5 Ürün")
+        show_figure(fig)
+
+    # En çok satan müşteri-ürün kombinasyonları
+    for year, fig in _cached(ctx, plot_top_selling_product_customer_by_season, df_clean).items():
+        st.markdown(f"#### {year} – Sezon Bazında En Çok Satılan Ürün–Müşteri Kombinasyonları")
+        show_figure(fig)
+
+
+def section_total_sales_trend(ctx):
+    windows = _windows(ctx)
+    st.markdown(f"### {windows['overview_since'].year}-{windows['as_of'].year} Aralığında Toplam Satış ve Trend Çizgisi")
+    # Takvim pencereleri (30/90 gün); çizim LTTB ile sabit sayıda noktaya seyreltilir
+    trend_df, trend_decimated, fig = _cached(ctx, total_sales_and_trend_line, _clean(ctx), plot=True, mode="calendar")
+    if fig:
+        show_figure(fig)
+
+
+def section_sales_volatility(ctx):
+    st.markdown("## Volatilite Analizi")
+    st.markdown(f"Bu analizdeki veriler, {_recent_text(ctx)} yıllarında satış yapan müşterilere aittir.Her müşterinin satın alım hacimlerindeki zaman içindeki değişkenliği ölçmek için standart sapma ve ortalama kullanılarak bir volatilite skoru hesaplanmıştır. Bu skor, her müşterinin satın alım hacimlerinin ne kadar değişken olduğunu gösterir. Skorun yüksek olması, müşterinin satın alım hacimlerinde büyük dalgalanmalar olduğunu gösterir.")
+    customer_vol_df, cust_prod_vol_df = _cached(ctx, compute_sales_volatility, _cube(ctx))
+    show_sales_volatility(customer_vol_df, cust_prod_vol_df, top_n=10)
+
+
+def section_aging(ctx):
+    st.title("Yaşlandıkça Değişen Satış Eğilimleri")
+    show_table(_cached(ctx, aging_factor_analysis, _statistics_source(ctx, _cube, calendar=True)), key="aging")
+
+
+def section_rate_of_change(ctx):
+    st.title("Aylık Satış Değişim Oranları")
+    show_table(_cached(ctx, rate_of_change_per_month, _cube(ctx)), key="rate_of_change")
+
+
+def section_top_customer_products_by_month(ctx):
+    st.markdown("## 📈 Yıl–Ay Bazında En Çok Satan Müşteri–Ürünler")
+    results = _cached(ctx, top_3_customer_product_sales_by_month_year, _clean(ctx), plot=True)
+    for year, (data, fig) in results.items():
+        st.markdown(f"### 📊 {year} Yılı – Aylık En Çok Satanlar")
+        if fig:
+            show_figure(fig)
+        show_table(data, key=f"top_customer_products_{year}")
+
+
+def section_macroeconomics(ctx):
+    st.markdown("## Makroekonomik Göstergeler ile Satış Karşılaştırmaları")
+    st.markdown(f"{_windows(ctx)['as_of'].year} yılına kadarki tüm veriler kullanılarak hazırlanmıştır.")
+    for col, label in MACRO_METRICS.items():
+        st.markdown(f"###  Aylık Satış ve {label}")
+        sales_df, macro_df, fig = _cached(ctx, macroeconomic_parameters, _cube(ctx), macro_col=col, macro_label=label, plot=True)
+        if fig:
+            show_figure(fig)
+
+
+def section_customer_product_performance(ctx):
+    st.markdown("## Müşteri-Ürün Performans Analizi")
+    st.markdown(f"{_recent_text(ctx)} yıllarında satışı bulunan müşteri ürünler için hazırlanmıştır.Ürün her satış işleminde ortalama ne kadar para kazandırıyor sorusunun cevabını verir.")
+    show_sales_revenue_product_customer(_cached(ctx, compute_sales_revenue_product_customer, _clean(ctx)))
+
+
+def section_product_performance(ctx):
+    st.markdown("## Ürün Performans Analizi")
+    st.markdown(f"{_recent_text(ctx)} yıllarında satışı bulunan ürünler için hazırlanmıştır.Ürün her satış işleminde ortalama ne kadar para kazandırıyor sorusunun cevabını verir.")
+    show_sales_revenue_product(_cached(ctx, compute_sales_revenue_product, _clean(ctx)))
+
+
+def section_top10_products(ctx):
+    st.title(" Yıllık En Çok Satan 10 Ürün Analizi")
+    show_top10_products_per_year(_cached(ctx, compute_top10_products_per_year, _clean(ctx)))
+
+
+def section_top10_customer_products(ctx):
+    st.title(" Yıllık En Çok Satan 10 Müşteri-Ürün Analizi")
+    show_top10_productsandcustomers_per_year(_cached(ctx, compute_top10_productsandcustomers_per_year, _clean(ctx)))
+
+
+# Dashboard'da seçilebilen bölümler: başlık -> bölümü hesaplayıp çizen fonksiyon.
+# Yalnızca seçilen bölümler çalışır; sıralama menüdeki sırayı belirler.
+ANALYSIS_SECTIONS = {
+    "Yıl-Ay Bazında Satış Rakamları": section_monthly_sales,
+    "Adet & Ciro Bazında En Çok Satan Ürünler": section_best_sellers,
+    "Aylık ve Yıllık Ciro Büyüme Oranı": section_revenue_growth,
+    "Trend Analizi ve Segmentasyon": section_trend,
+    "Satış Volatilitesi (CV) ve Müşteri-Ürün Segmentasyonu": section_volatility_segmentation,
+    "Mevsimsellik, Özel Gün, Kanal ve Fiyat Analizi": section_seasonality_price,
+    "Müşteri-Ürün Sipariş Düzenliliği": section_customer_product_regularity,
+    "Müşteri Sipariş Düzenliliği": section_customer_regularity,
+    "Ürün Sipariş Düzenliliği": section_product_regularity,
+    "En Yüksek Ciroya Sahip Müşteriler": section_top_revenue_customers,
+    "En Yüksek Ciroya Sahip Ürünler": section_top_revenue_products,
+    "Sezon Bazlı Satış Analizi": section_seasonal_sales,
+    "Toplam Satış ve Trend Çizgisi": section_total_sales_trend,
+    "Müşteri Volatilite Skoru": section_sales_volatility,
+    "Yaşlandıkça Değişen Satış Eğilimleri": section_aging,
+    "Aylık Satış Değişim Oranları": section_rate_of_change,
+    "Yıl-Ay Bazında En Çok Satan Müşteri-Ürünler": section_top_customer_products_by_month,
+    "Makroekonomik Göstergeler": section_macroeconomics,
+    "Müşteri-Ürün Performans Analizi": section_customer_product_performance,
+    "Ürün Performans Analizi": section_product_performance,
+    "Yıllık En Çok Satan 10 Ürün": section_top10_products,
+    "Yıllık En Çok Satan 10 Müşteri-Ürün": section_top10_customer_products,
+    "Ham Veri": section_raw_data,
+}
+
+# Yalnızca küpü okuyan bölümler. Bunlar veritabanında toplanan küple (database.get_sales_cube)
+# fatura satırları hiç çekilmeden gösterilebilir (render_sections'ın cube parametresi).
+CUBE_SECTIONS = [
+    "Yıl-Ay Bazında Satış Rakamları",
+    "Aylık ve Yıllık Ciro Büyüme Oranı",
+    "Müşteri-Ürün Sipariş Düzenliliği",
+    "Müşteri Sipariş Düzenliliği",
+    "Ürün Sipariş Düzenliliği",
+    "En Yüksek Ciroya Sahip Müşteriler",
+    "En Yüksek Ciroya Sahip Ürünler",
+    "Müşteri Volatilite Skoru",
+    "Yaşlandıkça Değişen Satış Eğilimleri",
+    "Aylık Satış Değişim Oranları",
+    "Makroekonomik Göstergeler",
+]
+
+
+# Bölümlerin yalnızca df_clean ya da küpü okuyan, birbirinden bağımsız hesaplamaları:
+# başlık -> [(fonksiyon, girdi, kwargs)]. Her kayıt bölümdeki _cached çağrısıyla birebir aynı
+# olmalıdır; render_sections bunları süreç havuzunda önceden çalıştırır, bölüm de sonucu
+# önbellekten alır. Bu sonuçlara bağlı hesaplamalar (segmentler, trend-volatilite) ana iş
+# parçacığında kalır. benchmarks/bench_parallel_analyses her modda havuza gönderilen her sonucun
+# bölümünce aynı anahtarla okunduğunu denetler; bölümün çağrısı değişirse buradaki kayıt da değişmelidir.
+SECTION_TASKS = {
+    "Yıl-Ay Bazında Satış Rakamları": [(yıllık_satış_rakamları_seyrek, "cube", {})],
+    "Adet & Ciro Bazında En Çok Satan Ürünler": [(yil_ay_bazinda_en_cok_satan_urunler, "clean", {})],
+    "Aylık ve Yıllık Ciro Büyüme Oranı": [(ciro_buyume_orani_analizi, "cube", {})],
+    "Trend Analizi ve Segmentasyon": [
+        (compute_customer_product_trend, "cube", {}),
+        (compute_product_trend, "clean", {}),
+        (compute_customer_trend, "clean", {}),
+    ],
+    "Satış Volatilitesi (CV) ve Müşteri-Ürün Segmentasyonu": [
+        (compute_volatility, "clean", {}),
+        (compute_customer_product_trend, "cube", {}),
+    ],
+    "Mevsimsellik, Özel Gün, Kanal ve Fiyat Analizi": [
+        (compute_seasonality_specialday_channel_price, "clean", {}),
+        (compute_volatility, "clean", {}),
+        (compute_customer_product_trend, "cube", {}),
+    ],
+    "Müşteri-Ürün Sipariş Düzenliliği": [(düzenlisiparişverenler_aralıklı_müşteriler_ürünler, "cube", {})],
+    "Müşteri Sipariş Düzenliliği": [(düzenlisiparişverenler_aralıklımüşteriler, "cube", {})],
+    "Ürün Sipariş Düzenliliği": [(düzenlisiparişverenler_aralıklıürünler, "cube", {})],
+    "En Yüksek Ciroya Sahip Müşteriler": [(aylik_en_yuksek_ciroya_sahip_3_musteri, "cube", {})],
+    "En Yüksek Ciroya Sahip Ürünler": [(aylik_en_yuksek_ciroya_sahip_3_ürün, "cube", {})],
+    "Sezon Bazlı Satış Analizi": [
+        (seasonal_sales_by_year, "clean", {"plot": True}),
+        (plot_top_products_by_season, "clean", {}),
+        (top5_products_per_season, "clean", {}),
+        (plot_top_selling_product_customer_by_season, "clean", {}),
+    ],
+    "Toplam Satış ve Trend Çizgisi": [(total_sales_and_trend_line, "clean", {"plot": True, "mode": "calendar"})],
+    "Müşteri Volatilite Skoru": [(compute_sales_volatility, "cube", {})],
+    "Yaşlandıkça Değişen Satış Eğilimleri": [(aging_factor_analysis, "cube", {})],
+    "Aylık Satış Değişim Oranları": [(rate_of_change_per_month, "cube", {})],
+    "Yıl-Ay Bazında En Çok Satan Müşteri-Ürünler": [(top_3_customer_product_sales_by_month_year, "clean", {"plot": True})],
+    "Makroekonomik Göstergeler": [
+        (macroeconomic_parameters, "cube", {"macro_col": col, "macro_label": label, "plot": True})
+        for col, label in MACRO_METRICS.items()
+    ],
+    "Müşteri-Ürün Performans Analizi": [(compute_sales_revenue_product_customer, "clean", {})],
+    "Ürün Performans Analizi": [(compute_sales_revenue_product, "clean", {})],
+    "Yıllık En Çok Satan 10 Ürün": [(compute_top10_products_per_year, "clean", {})],
+    "Yıllık En Çok Satan 10 Müşteri-Ürün": [(compute_top10_productsandcustomers_per_year, "clean", {})],
+}
+
+# Artımlı modda ay kapanışı durumundan hesaplanan analizler; bunlar havuza gönderilmez, bölüm
+# içinde durumdan (saniyenin altında) türetilir
+INCREMENTAL_FUNCTIONS = {
+    compute_customer_product_trend,
+    compute_volatility,
+    düzenlisiparişverenler_aralıklı_müşteriler_ürünler,
+    düzenlisiparişverenler_aralıklımüşteriler,
+    düzenlisiparişverenler_aralıklıürünler,
+    aging_factor_analysis,
+}
+
+# Takvim modunda satış panelinden (sales_panel) hesaplanan analizler; bunlar da havuza gönderilmez
+CALENDAR_FUNCTIONS = {compute_customer_product_trend, aging_factor_analysis}
+
+# Zaman pencerelerini analiz tarihinden (as_of) türeten analizler; analiz tarihi seçildiyse
+# _cached ve havuz görevleri bunlara as_of parametresini iletir
+AS_OF_FUNCTIONS = {
+    compute_customer_product_trend,
+    compute_product_trend,
+    compute_customer_trend,
+    customer_product_segments,
+    product_segments,
+    compute_volatility,
+    compute_seasonality_specialday_channel_price,
+    düzenlisiparişverenler_aralıklı_müşteriler_ürünler,
+    düzenlisiparişverenler_aralıklımüşteriler,
+    düzenlisiparişverenler_aralıklıürünler,
+    aylik_en_yuksek_ciroya_sahip_3_musteri,
+    aylik_en_yuksek_ciroya_sahip_3_ürün,
+    seasonal_sales_by_year,
+    plot_top_products_by_season,
+    top5_products_per_season,
+    plot_top_selling_product_customer_by_season,
+    total_sales_and_trend_line,
+    compute_sales_volatility,
+    aging_factor_analysis,
+    rate_of_change_per_month,
+    top_3_customer_product_sales_by_month_year,
+    compute_sales_revenue_product_customer,
+    compute_sales_revenue_product,
+    compute_top10_products_per_year,
+    compute_top10_productsandcustomers_per_year,
+}
+
+
+def render_sections(
+    titles, df_raw, fingerprint, report=None, recorder=None, profile=None, incremental=False, calendar=False,
+    as_of=None, cube=None,
+):
+    """
+    Seçilen bölümleri sırayla hesaplar ve çizer.
+
+    Bölümlerin SECTION_TASKS'taki bağımsız hesaplamaları önce süreç havuzuna gönderilir
+    (df_clean ve küp Arrow IPC dosyası olarak paylaşılır). Bölümler menü sırasıyla çizilir;
+    her bölüm yalnızca kendi sonuçlarını bekler, diğerleri bu sırada hesaplanmaya devam eder.
+    Toplam süre böylece analizlerin toplamına değil en yavaş olanına yaklaşır.
+
+    Parameters:
+        titles (list of str): ANALYSIS_SECTIONS anahtarları.
+        df_raw (pd.DataFrame): Veritabanından/anlık görüntüden gelen ham veri; rapor modunda None olabilir.
+        fingerprint (tuple): result_cache.dataset_fingerprint(df_raw, option) çıktısı.
+        report (dict, optional): report_store.open_report çıktısı; verilirse hiçbir analiz
+            hesaplanmaz, sonuçlar ve görüntüler gece raporundan okunur.
+        recorder (dict, optional): report_store.new_recorder çıktısı; verilirse hesaplanan
+            sonuçlar ve gösterilen görüntüler rapora yazılmak üzere toplanır (batch_reports.py).
+        profile (dict, optional): profiling.new_profile çıktısı; verilirse her analiz çağrısı ve
+            bölüm ölçülüp buraya eklenir. Ölçümler bu süreçte yapılsın diye süreç havuzu kullanılmaz.
+        incremental (bool): True ise trend, volatilite, sipariş düzenliliği ve yaşlanma analizleri
+            tüm geçmiş yerine ay kapanışı durumundan (month_close) hesaplanır. Rapor modunda
+            raporun kendi ayarı kullanılır.
+        calendar (bool): True ise müşteri-ürün trendi ve yaşlanma analizi satış panelinden
+            (sales_panel) takvim ayına göre hesaplanır; satışsız aylar eğimde zaman olarak sayılır.
+            Rapor modunda raporun kendi ayarı kullanılır.
+        as_of (str/Timestamp, optional): Analiz tarihi. Verilirse bu günden sonraki satırlar atılır
+            ve "son iki yıl", "trend başlangıcı" gibi pencereler (date_index.analysis_windows) bu
+            tarihe göre kurulur; ay kapanışı durumu verinin son satış gününün pencereleriyle
+            tutulduğundan artımlı mod kapanır. Verilmezse tüm satırlar ve verideki son satış günü
+            (date_index.data_as_of) kullanılır; kayıt modunda bu gün recorder['data_as_of']'a yazılır.
+            Rapor modunda raporun kendi ayarı kullanılır.
+        cube (pd.DataFrame, optional): Veritabanında toplanmış küp (database.get_sales_cube). Verilirse
+            df_raw None olabilir; yalnızca CUBE_SECTIONS bölümleri bu küpten gösterilir, diğerleri için
+            fatura satırlarını çekme notu çıkar. Ay kapanışı durumu satırlardan kurulduğundan artımlı
+            mod kapanır; as_of küpü ay düzeyinde keser.
+    """
+    if cube is not None:
+        for title in titles:
+            if title not in CUBE_SECTIONS:
+                st.info(f"{title}: bu bölüm fatura satırlarını gerektirir; görmek için tüm veriyi çekin.")
+        titles = [title for title in titles if title in CUBE_SECTIONS]
+        incremental = False
+    if report is not None:
+        incremental = report["manifest"].get("incremental", False)
+        calendar = report["manifest"].get("calendar", False)
+        as_of = report["manifest"].get("as_of")
+    as_of = None if as_of is None else pd.Timestamp(as_of)
+    incremental = incremental and as_of is None
+    ctx = {
+        "df_raw": df_raw, "fingerprint": fingerprint, "incremental": incremental, "calendar": calendar, "as_of": as_of,
+        "cube": cube,
+    }
+    local = (INCREMENTAL_FUNCTIONS if incremental else set()) | (CALENDAR_FUNCTIONS if calendar else set())
+    lookup = record = None
+    futures, section_keys = {}, {}
+    if report is not None:
+        ctx["report"] = report
+        lookup = lambda key: report_figure(report, key)
+    else:
+        if recorder is not None:
+            ctx["recorder"] = recorder
+            record = lambda key, data: record_figure(recorder, key, data)
+        if profile is not None:
+            ctx["profile"] = profile
+        else:
+            frames = {"clean": lambda: _clean(ctx), "cube": lambda: _cube(ctx)}
+            section_keys = {
+                title: submit_analyses(
+                    [
+                        (func, frame_name, _with_as_of(ctx, func, kwargs))
+                        for func, frame_name, kwargs in SECTION_TASKS.get(title, [])
+                        if func not in local
+                    ],
+                    frames, fingerprint, futures,
+                )
+                for title in titles
+            }
+    for title in titles:
+        collect_analyses(futures, section_keys.get(title, []))
+        # Bölümün figürleri havuzda rasterleştirilir ve parmak izine göre PNG olarak önbelleğe alınır
+        with profile_section(profile, title), figure_scope(fingerprint, title, lookup=lookup, record=record):
+            try:
+                ANALYSIS_SECTIONS[title](ctx)
+            except LookupError as e:
+                if report is None:
+                    raise
+                st.warning(f"{title}: {e}. Güncel sonuç için veriyi veritabanından çekin.")
+    if recorder is not None:
+        # Rapor açıldığında bölüm metinlerinin pencereleri bu günden kurulur (bkz. _windows)
+        recorder["data_as_of"] = _windows(ctx)["as_of"].date().isoformat()
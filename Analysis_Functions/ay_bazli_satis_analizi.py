@@ -4,6 +4,8 @@ import streamlit as st
 import matplotlib.ticker as mticker
 import pandas as pd
 
+from Analysis_Functions.figure_cache import show_figure
+
 def ay_bazli_satis_analizi(df: pd.DataFrame, selected_year: int = None) -> None:
     """
     Belirli bir yıl için ayın farklı dönemlerindeki (baş, orta, son) toplam satışları analiz eder ve görselleştirir.
@@ -54,6 +56,6 @@ def ay_bazli_satis_analizi(df: pd.DataFrame, selected_year: int = None) -> None:
     plt.tight_layout()
 
     # Grafik ve tabloyu göster
-    st.pyplot(fig)
+    show_figure(fig)
     st.markdown("### 📄 Dönem Bazlı Satış Verisi")
     st.dataframe(period_sales)
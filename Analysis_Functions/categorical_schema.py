@@ -0,0 +1,125 @@
+import contextlib
+import json
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+
+DICTIONARY_DIR = os.path.join(".cache", "dictionaries")
+# Müşteri ve ürün kimlik sütunları; tüm seçenekler (option) aynı sözlükleri paylaşır
+IDENTITY_COLUMNS = ["CustomerCode", "Product_Code", "CustomerName", "ProductName"]
+ENCODED_COLUMNS = {"CustomerCode": "CustomerCode_Encoded", "Product_Code": "Product_Code_Encoded"}
+
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+_dictionary_lock = threading.Lock()
+
+
+@contextlib.contextmanager
+def _locked(dictionary_dir):
+    """Sözlük klasörünü süreçler (ve iş parçacıkları) arasında kilitler; sözlükler bu kilit altında güncellenir."""
+    os.makedirs(dictionary_dir, exist_ok=True)
+    with _dictionary_lock, open(os.path.join(dictionary_dir, ".lock"), "a+b") as f:
+        if fcntl is not None:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        else:
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def _load_dictionary(column, dictionary_dir):
+    path = os.path.join(dictionary_dir, f"{column}.json")
+    if not os.path.exists(path):
+        return []
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _save_dictionary(column, values, dictionary_dir):
+    # _locked altında çağrılır; okuyucular os.replace sayesinde ya eski ya yeni sözlüğü görür
+    path = os.path.join(dictionary_dir, f"{column}.json")
+    tmp_path = f"{path}.{os.getpid()}-{threading.get_ident()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(values, f, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+
+def _append_values(column, values, dictionary_dir):
+    """Sözlükte olmayan değerleri kilit altında sözlüğe ekler ve güncel sözlüğü döndürür."""
+    with _locked(dictionary_dir):
+        # Kilit beklenirken başka bir süreç sözlüğü büyütmüş olabilir; güncel hali okunur
+        dictionary = _load_dictionary(column, dictionary_dir)
+        new_values = pd.Index(values).difference(pd.Index(dictionary), sort=False)
+        if len(new_values):
+            dictionary = dictionary + sorted(new_values)
+            _save_dictionary(column, dictionary, dictionary_dir)
+    return dictionary
+
+
+def encode_identity_columns(df, columns=IDENTITY_COLUMNS, dictionary_dir=DICTIONARY_DIR):
+    """
+    Converts customer/product identity columns to categoricals backed by shared, persisted dictionaries.
+
+    For each column the distinct values are factorized once, normalized (strip + upper) on the
+    dictionary rather than on every row, and looked up in a dictionary stored under
+    `dictionary_dir`. Values not seen before are appended to the end of the dictionary under a
+    file lock, so the position of an existing value never changes across refreshes, options or
+    concurrent sessions; add_encoded_columns exposes these positions as stable codes.
+
+    The categoricals themselves get the dictionary's values in lexical order as categories, so
+    grouping, sorting and the category order do not depend on the order values were first seen.
+
+    Parameters:
+        df (pd.DataFrame): DataFrame containing the identity columns (object or categorical).
+        columns (list of str): Columns to encode. Missing columns are skipped.
+        dictionary_dir (str): Folder holding one JSON dictionary per column.
+
+    Returns:
+        pd.DataFrame: The input DataFrame with the columns replaced by categoricals whose
+        categories are the full shared dictionary, sorted.
+    """
+    for col in columns:
+        if col not in df.columns:
+            continue
+        codes, uniques = pd.factorize(df[col])
+        normalized = pd.Index(uniques).astype(str).str.strip().str.upper()
+
+        dictionary = _load_dictionary(col, dictionary_dir)
+        if len(pd.Index(normalized.unique()).difference(pd.Index(dictionary))):
+            dictionary = _append_values(col, normalized.unique(), dictionary_dir)
+
+        # Kategoriler sözlüğün alfabetik sırası; sözlükteki (kalıcı) sıra yalnızca *_Encoded sütunlarında
+        categories = pd.Index(dictionary).sort_values()
+        # Sona eklenen -1, eksik değerlerin (kod -1) -1 kalmasını sağlar
+        lookup = np.append(categories.get_indexer(normalized), -1)
+        df[col] = pd.Categorical.from_codes(lookup[codes], categories=categories)
+    return df
+
+
+def add_encoded_columns(df, dictionary_dir=DICTIONARY_DIR):
+    """
+    Adds int32 code columns ('CustomerCode_Encoded', 'Product_Code_Encoded') for categorical identity columns.
+
+    The codes are the positions in the shared dictionaries (not the category codes, which follow
+    the lexical order), so they can be used directly as compact, stable grouping and merge keys.
+    Missing values get -1.
+    """
+    for col, encoded_col in ENCODED_COLUMNS.items():
+        if col in df.columns and isinstance(df[col].dtype, pd.CategoricalDtype):
+            positions = pd.Index(_load_dictionary(col, dictionary_dir)).get_indexer(df[col].cat.categories)
+            df[encoded_col] = np.append(positions, -1)[df[col].cat.codes.to_numpy()].astype(np.int32)
+    return df
@@ -1,7 +1,28 @@
+import sys
+import time
+import tracemalloc
+
+import numpy as np
 import pandas as pd
 import pyodbc
+from pandas.api.types import union_categoricals
+
+from Analysis_Functions.sales_cube import MACRO_COLUMNS, load_sales_cube_from_sql
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
 
-def get_sales_data(option):
+# Kimlik/etiket sütunları kategori (sözlük + tamsayı kod) olarak tutulur
+CATEGORICAL_COLUMNS = ["CustomerCode", "CustomerName", "Product_Code", "ProductName", "Label", "Channel"]
+FLOAT_COLUMNS = ["Sale_Amount", "Unit_Price(TL)", "Interest_Rate", "Inflation", "PMI", "Growth_Rate"]
+DATETIME_COLUMNS = ["Date", "InvoiceDate"]
+# Dashboard'da seçilebilen analiz tipleri; her birinin kaynağı _build_source'ta tanımlıdır
+ANALYSIS_OPTIONS = ("Yurtiçi -Dipsos/Sachet", "Yurtiçi-Diğer Ürünler", "İhracat-Dipsos/Sachet", "İhracat-Diğer Ürünler")
+
+
+def _connect():
     server = '192.168.2.214'
     database = 'TEST'
     username = 'NilayTest'
@@ -14,31 +35,281 @@ def get_sales_data(option):
         f'UID={username};'
         f'PWD={password}'
     )
+    return pyodbc.connect(conn_str)
+
+
+def _build_source(option):
+    """Seçilen analiz tipine göre sorgulanacak tabloyu ve WHERE koşulunu döndürür."""
+    # option'a göre sorgu belirle
+    if option == "Yurtiçi -Dipsos/Sachet":
+        return "allInvoices_bi", "year(InvoiceDate) =2025"
+    elif option == "Yurtiçi-Diğer Ürünler":
+        return "sales_data", "Channel='Yurtiçi' AND ProductType='Diğer Ürünler'"
+    elif option == "İhracat-Dipsos/Sachet":
+        return "sales_data", "Channel='İhracat' AND ProductType='Dipsos/Sachet'"
+    elif option == "İhracat-Diğer Ürünler":
+        return "sales_data", "Channel='İhracat' AND ProductType='Diğer Ürünler'"
+    else:
+        return "sales_data", None
+
+
+def _build_query(option, since=None):
+    """
+    Seçilen analiz tipine göre SQL sorgusunu ve parametrelerini döndürür.
+
+    since verilirse yalnızca InvoiceDate >= since olan satırlar istenir (artımlı yenileme).
+    """
+    table, where = _build_source(option)
+    conditions = [where] if where else []
+    params = []
+    if since is not None:
+        conditions.append("InvoiceDate >= ?")
+        params.append(pd.Timestamp(since).to_pydatetime())
+    query = f"SELECT * FROM {table}"
+    if conditions:
+        query += " WHERE " + " AND ".join(conditions)
+    return query, params
+
+
+def _build_cube_query(option):
+    """
+    Müşteri × ürün × ay toplamlarını sunucuda hesaplayan SQL sorgusunu döndürür.
+
+    prepare_data'daki temizlik kuralları (negatif miktar/fiyat, HAM/YAR kodları, büyük harf
+    ve boşluk temizliği, virgüllü birim fiyat) sorgu içinde uygulanır. Ortalama ve standart
+    sapmalar yerine toplam ve kareler toplamı döndürülür; böylece istemcide hücreler
+    birleştirildiğinde de doğru hesaplanabilirler.
+    """
+    table, where = _build_source(option)
+    # Makro ortalamaları NULL olmayan değerlerin sayısına bölünür (COUNT(col), COUNT(*) değil)
+    macro_sums = ",\n".join(
+        f"        SUM(CAST({col} AS float)) AS {col}_Sum,\n        COUNT({col}) AS {col}_Count" for col in MACRO_COLUMNS
+    )
+    return f"""
+    WITH src AS (
+        SELECT
+            UPPER(LTRIM(RTRIM(CustomerCode))) AS CustomerCode,
+            UPPER(LTRIM(RTRIM(CustomerName))) AS CustomerName,
+            UPPER(LTRIM(RTRIM(Product_Code))) AS Product_Code,
+            UPPER(LTRIM(RTRIM(ProductName))) AS ProductName,
+            [Date] AS SaleDate,
+            CAST(Sale_Amount AS float) AS Sale_Amount,
+            TRY_CAST(REPLACE(REPLACE(CAST([Unit_Price(TL)] AS varchar(64)), '%', ''), ',', '.') AS float) AS Unit_Price,
+            {", ".join(MACRO_COLUMNS)}
+        FROM {table}
+        {"WHERE " + where if where else ""}
+    )
+    SELECT
+        CustomerCode, CustomerName, Product_Code, ProductName,
+        YEAR(SaleDate) AS [Year],
+        MONTH(SaleDate) AS [Month],
+        SUM(Sale_Amount) AS Sale_Amount,
+        SUM(Sale_Amount * Unit_Price) AS Revenue,
+        COUNT(*) AS Line_Count,
+        MIN(SaleDate) AS First_Sale_Date,
+        MAX(SaleDate) AS Last_Sale_Date,
+        SUM(Unit_Price) AS Unit_Price_Sum,
+        SUM(Unit_Price * Unit_Price) AS Unit_Price_SumSq,
+{macro_sums}
+    FROM src
+    WHERE Sale_Amount >= 0
+      AND Unit_Price >= 0
+      AND Product_Code NOT LIKE 'HAM%'
+      AND Product_Code NOT LIKE 'YAR%'
+    GROUP BY CustomerCode, CustomerName, Product_Code, ProductName, YEAR(SaleDate), MONTH(SaleDate)
+    """
+
+
+def get_sales_data(option, chunksize=None, progress_callback=None, since=None, trace_memory=False):
+    """
+    Seçilen analiz tipine göre satış verisini veritabanından çeker.
+
+    Parametreler:
+        option (str): Dashboard'da seçilen analiz tipi.
+        chunksize (int, optional): Verilirse sorgu sonucu bu boyutta parçalar halinde okunur
+            (bkz. read_sales_chunks). Verilmezse tüm sonuç tek seferde okunur.
+        progress_callback (callable, optional): Parçalı okumada her parçadan sonra
+            (okunan_satır, okunan_parça) argümanlarıyla çağrılır.
+        since (datetime-like, optional): Verilirse yalnızca bu tarihten (dahil) sonraki
+            faturalar çekilir.
+        trace_memory (bool): Parçalı okumada tepe bellek tracemalloc ile ölçülsün mü (profil modu)?
 
+    Döndürür:
+        pd.DataFrame: Satış verisi. Parçalı okumada yükleme istatistikleri
+        df.attrs["load_stats"] içinde yer alır. Hata durumunda (None, hata_mesajı).
+    """
     try:
-        conn = pyodbc.connect(conn_str)
-        # option'a göre sorgu belirle
-        if option == "Yurtiçi -Dipsos/Sachet":
-            query = "select * from allInvoices_bi where year(InvoiceDate) =2025"
-        elif option == "Yurtiçi-Diğer Ürünler":
-            query = "SELECT * FROM sales_data WHERE Channel='Yurtiçi' AND ProductType='Diğer Ürünler'"
-        elif option == "İhracat-Dipsos/Sachet":
-            query = "SELECT * FROM sales_data WHERE Channel='İhracat' AND ProductType='Dipsos/Sachet'"
-        elif option == "İhracat-Diğer Ürünler":
-            query = "SELECT * FROM sales_data WHERE Channel='İhracat' AND ProductType='Diğer Ürünler'"
+        conn = _connect()
+        query, params = _build_query(option, since=since)
+        if chunksize:
+            df = read_sales_chunks(
+                query, conn, chunksize=chunksize, progress_callback=progress_callback, params=params,
+                trace_memory=trace_memory,
+            )
         else:
-            query = "SELECT * FROM sales_data"
-        df = pd.read_sql(query, conn)
+            df = pd.read_sql(query, conn, params=params or None)
         conn.close()
         return df
     except Exception as e:
         return None, str(e)
-    
+
+
+def get_sales_cube(option):
+    """
+    Müşteri × ürün × ay bazında toplanmış satış küpünü doğrudan veritabanından çeker.
+
+    Yalnızca aylık toplamlarla çalışan analizler (yıllık satış rakamları, ciro büyüme oranı,
+    sezonluk satışlar, düzenlilik analizleri, makroekonomik karşılaştırmalar vb.) için fatura
+    satırlarını ağ üzerinden taşımak yerine toplamayı SQL Server'da yapar.
+
+    Parametreler:
+        option (str): Dashboard'da seçilen analiz tipi.
+
+    Döndürür:
+        pd.DataFrame: sales_cube.finalize_sales_cube ile aynı şemada küp
+        (CustomerCode, CustomerName, Product_Code, ProductName, YearMonth, Year, Month,
+        Sale_Amount, Revenue, Line_Count, First/Last_Sale_Date, Unit_Price_Mean/Std,
+        makro ortalamaları). Hata durumunda (None, hata_mesajı).
+    """
+    try:
+        conn = _connect()
+        cube = pd.read_sql(_build_cube_query(option), conn)
+        conn.close()
+        for col in ["First_Sale_Date", "Last_Sale_Date"]:
+            cube[col] = pd.to_datetime(cube[col])
+        return load_sales_cube_from_sql(cube)
+    except Exception as e:
+        return None, str(e)
+
+
+def fix_chunk_dtypes(chunk):
+    """
+    Veritabanından gelen bir parçanın veri tiplerini düzeltir.
+
+    - Kimlik ve etiket sütunları (CATEGORICAL_COLUMNS) kategoriye,
+    - Miktar, fiyat ve makro sütunlar (FLOAT_COLUMNS) float64'e,
+    - Tarih sütunları (DATETIME_COLUMNS) datetime64'e çevrilir.
+
+    'Unit_Price(TL)' virgüllü ondalık ya da '%' içeren metin olarak gelebilir; bu durumda
+    prepare_data ile aynı kurallarla sayıya çevrilir.
+
+    Parametreler:
+        chunk (pd.DataFrame): pd.read_sql'den gelen ham parça.
+
+    Döndürür:
+        pd.DataFrame: Tipleri düzeltilmiş parça.
+    """
+    for col in DATETIME_COLUMNS:
+        if col in chunk.columns:
+            chunk[col] = pd.to_datetime(chunk[col])
+    for col in FLOAT_COLUMNS:
+        if col not in chunk.columns:
+            continue
+        if chunk[col].dtype == object:
+            chunk[col] = (
+                chunk[col]
+                .astype(str)
+                .str.replace('%', '', regex=False)
+                .str.replace(',', '.', regex=False)
+            )
+        chunk[col] = pd.to_numeric(chunk[col], errors="coerce").astype("float64")
+    for col in CATEGORICAL_COLUMNS:
+        if col in chunk.columns:
+            chunk[col] = chunk[col].astype("category")
+    return chunk
+
+
+def _concat_column(parts):
+    """Tek bir sütunun parçalarını birleştirir; kategorilerde sözlükleri birleştirir."""
+    if isinstance(parts[0].dtype, pd.CategoricalDtype):
+        # Tümü NULL bir parçanın kategorileri float64 gelir; sözlük tipleri farklıysa metne çevrilir
+        if len({part.cat.categories.dtype for part in parts}) > 1:
+            parts = [part.cat.rename_categories(part.cat.categories.astype(str)) for part in parts]
+        return pd.Series(union_categoricals(parts, ignore_order=True), name=parts[0].name)
+    return pd.Series(np.concatenate([part.to_numpy() for part in parts]), name=parts[0].name)
+
+
+def _peak_rss_mb():
+    """
+    Sürecin başlangıcından beri ulaştığı en yüksek yerleşik bellek (RSS, MB). Tek bir sistem
+    çağrısıdır, her yüklemede okunabilir. resource modülü olmayan platformlarda (Windows) None.
+    """
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss Linux'ta KB, macOS'ta bayt cinsindendir
+    return round(peak / (1024 ** 2 if sys.platform == "darwin" else 1024), 1)
+
+
+def read_sales_chunks(query, conn, chunksize=100_000, progress_callback=None, params=None, trace_memory=False):
+    """
+    Sorgu sonucunu sınırlı boyutta parçalar halinde okuyarak tek bir DataFrame oluşturur.
+
+    Her parça geldiği anda fix_chunk_dtypes ile sıkıştırılır (kategori kodları, float64,
+    datetime64), böylece bellekte hiçbir zaman tüm sonucun object sütunlu hali tutulmaz.
+    Parçalar sütun sütun birleştirilir ve birleştirilen sütunun parçaları hemen bırakılır;
+    birleşik sütunlar DataFrame'e kopyalanmadan (pd.concat(copy=False), sütun başına bir blok)
+    yerleştirilir. Böylece parçaların yanında en fazla bir sütunluk ek kopya oluşur.
+
+    Parametreler:
+        query (str): Çalıştırılacak SQL sorgusu.
+        conn: Açık veritabanı bağlantısı.
+        chunksize (int): Parça başına satır sayısı.
+        progress_callback (callable, optional): Her parçadan sonra (okunan_satır, okunan_parça)
+            ile çağrılır.
+        params (list, optional): Sorgudaki '?' yer tutucularının değerleri.
+        trace_memory (bool): Tepe bellek tracemalloc ile ölçülsün mü? tracemalloc her bellek
+            ayırmasını yavaşlattığından yalnızca profil modunda açılır.
+
+    Döndürür:
+        pd.DataFrame: Birleştirilmiş veri. df.attrs["load_stats"] sözlüğü satır sayısı,
+        parça sayısı, süre (sn), sürecin tepe RSS'ini (MB, 'peak_rss_mb'; platform desteklemiyorsa
+        yok) ve trace_memory=True ise Python tarafındaki tepe bellek kullanımını (MB) içerir.
+    """
+    started_tracing = trace_memory and not tracemalloc.is_tracing()
+    if started_tracing:
+        tracemalloc.start()
+    try:
+        start = time.perf_counter()
+        columns = None
+        parts = {}
+        rows = 0
+        n_chunks = 0
+        for chunk in pd.read_sql(query, conn, params=params or None, chunksize=chunksize):
+            chunk = fix_chunk_dtypes(chunk)
+            if columns is None:
+                columns = list(chunk.columns)
+                parts = {col: [] for col in columns}
+            for col in columns:
+                parts[col].append(chunk[col])
+            rows += len(chunk)
+            n_chunks += 1
+            del chunk
+            if progress_callback is not None:
+                progress_callback(rows, n_chunks)
+
+        if columns:
+            df = pd.concat([_concat_column(parts.pop(col)) for col in columns], axis=1, copy=False)
+        else:
+            df = pd.DataFrame()
+        load_stats = {"rows": rows, "chunks": n_chunks, "seconds": round(time.perf_counter() - start, 2)}
+        # Sunucu boyutlandırması için her yüklemede: sürecin tepe RSS'i ucuzdur, tracemalloc değildir
+        peak_rss = _peak_rss_mb()
+        if peak_rss is not None:
+            load_stats["peak_rss_mb"] = peak_rss
+        if trace_memory:
+            load_stats["peak_memory_mb"] = round(tracemalloc.get_traced_memory()[1] / 1024 ** 2, 1)
+    finally:
+        if started_tracing:
+            tracemalloc.stop()
+    df.attrs["load_stats"] = load_stats
+    return df
+
 """
-    # Load dataset 
+    # Load dataset
 uploaded_file = st.file_uploader("Excel dosyasını yükleyin", type=["xlsx"])
 if uploaded_file is not None:
     df_raw = pd.read_excel(uploaded_file)
 
 
-"""
\ No newline at end of file
+"""
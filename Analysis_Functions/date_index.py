@@ -0,0 +1,197 @@
+import threading
+import weakref
+
+import numpy as np
+import pandas as pd
+
+# Tarih sütununa göre sıralı olduğu bilinen tablolar: (id(df), sütun) -> weakref(df). Sıralılık
+# tablo başına bir kez denetlenir; sonraki pencereler yalnızca ikili aramadır.
+_sorted_frames = {}
+_sorted_lock = threading.Lock()
+
+
+def data_as_of(data):
+    """
+    Verinin son satış günü; as_of verilmediğinde analiz tarihi budur. Veri boşsa bugün.
+
+    data fatura satırları ('Date'), satış küpü ya da analiz sonucu ('Last_Sale_Date' ya da
+    'YearMonth'), satış paneli (sales_panel) veya ay kapanışı durumu (month_close) olabilir.
+    """
+    if isinstance(data, dict):
+        if "as_of" in data:
+            value = data["as_of"]
+        elif "Last_Sale_Date" in data["entities"].columns:
+            value = data["entities"]["Last_Sale_Date"].max()
+        else:
+            value = data["months"].max() + pd.offsets.MonthEnd(0) if len(data["months"]) else None
+    elif "Date" in data.columns:
+        value = data["Date"].max()
+    elif "Last_Sale_Date" in data.columns:
+        value = data["Last_Sale_Date"].max()
+    else:
+        value = pd.to_datetime(data["YearMonth"]).max() + pd.offsets.MonthEnd(0)
+    if value is None or pd.isna(value):
+        return pd.Timestamp.today().normalize()
+    return pd.Timestamp(value).normalize()
+
+
+def analysis_windows(as_of=None, data=None):
+    """
+    Analiz tarihine (as_of) göre zaman pencereleri. Y = as_of yılı.
+
+    Parameters:
+        as_of (str/Timestamp, optional): Analiz tarihi; verilmezse data'nın son satış günü
+            (data_as_of), data da verilmezse bugün.
+        data (optional): Analizin girdisi (bkz. data_as_of).
+
+    Returns:
+        dict:
+            'as_of': Analiz tarihi (Timestamp).
+            'stop': as_of'tan sonraki gün; pencerelerin (hariç) bitişi.
+            'recent_years': (Y-1, Y); son satışı bu yıllarda olanlar "güncel" sayılır.
+            'recent_since': Y-1 yılının ilk günü.
+            'trend_since': Y-2 yılının ilk günü; trend eğimleri bu tarihten itibaren hesaplanır.
+            'active_since': Y-1 yılının 1 Haziran'ı; segmentlerde aktif sayılma sınırı.
+            'overview_since': Y-5 yılının ilk günü; genel görünüm grafikleri.
+            'history_since': Y-12 yılının ilk günü; müşteri trendinin geçmişi.
+    """
+    if as_of is not None:
+        as_of = pd.Timestamp(as_of)
+    elif data is not None:
+        as_of = data_as_of(data)
+    else:
+        as_of = pd.Timestamp.today().normalize()
+    year = as_of.year
+    return {
+        "as_of": as_of,
+        "stop": as_of.normalize() + pd.Timedelta(days=1),
+        "recent_years": (year - 1, year),
+        "recent_since": pd.Timestamp(year - 1, 1, 1),
+        "trend_since": pd.Timestamp(year - 2, 1, 1),
+        "active_since": pd.Timestamp(year - 1, 6, 1),
+        "overview_since": pd.Timestamp(year - 5, 1, 1),
+        "history_since": pd.Timestamp(year - 12, 1, 1),
+    }
+
+
+def date_column(df):
+    """Tablonun satır tarihini tutan sütun: küpte 'YearMonth', fatura satırlarında 'Date'."""
+    return "Date" if "Date" in df.columns else "YearMonth"
+
+
+def mark_date_sorted(df, column="Date"):
+    """df'in column'a göre artan sıralı olduğunu kaydeder (ör. preprocessing sıraladıktan sonra)."""
+    with _sorted_lock:
+        for key, ref in list(_sorted_frames.items()):
+            if ref() is None:
+                del _sorted_frames[key]
+        _sorted_frames[(id(df), column)] = weakref.ref(df)
+    return df
+
+
+def is_date_sorted(df, column="Date"):
+    """
+    df column'a göre artan sıralı mı? Sonuç tablo başına saklanır; ilk denetim O(n), sonrakiler O(1).
+    Eksik tarih (NaT) içeren sütunlar sıralı sayılmaz.
+    """
+    with _sorted_lock:
+        ref = _sorted_frames.get((id(df), column))
+        if ref is not None and ref() is df:
+            return True
+    values = df[column].to_numpy()
+    if not np.issubdtype(values.dtype, np.datetime64):
+        return False
+    ints = values.view(np.int64)
+    if len(ints) and (ints[0] == np.iinfo(np.int64).min or not (ints[1:] >= ints[:-1]).all()):
+        return False
+    mark_date_sorted(df, column)
+    return True
+
+
+def _bounds(values, start, stop):
+    lo = 0 if start is None else int(np.searchsorted(values, np.datetime64(pd.Timestamp(start)), side="left"))
+    hi = len(values) if stop is None else int(np.searchsorted(values, np.datetime64(pd.Timestamp(stop)), side="left"))
+    return lo, max(lo, hi)
+
+
+def date_window(df, start=None, stop=None, column=None):
+    """
+    column değeri [start, stop) aralığında olan satırlar.
+
+    Tablo column'a göre sıralıysa (preprocessing çıktısı) sınırlar ikili aramayla bulunur ve
+    iloc dilimi döner: O(log n), veri kopyalanmaz. Sıralı değilse (ör. küp) maske uygulanır;
+    tüm satırlar pencerede ise tablonun kendisi döner. Sonuç salt okunur kullanılmalıdır.
+
+    Parameters:
+        df (pd.DataFrame): Satırlar.
+        start (str/Timestamp, optional): Başlangıç (dahil); verilmezse alt sınır yok.
+        stop (str/Timestamp, optional): Bitiş (hariç); verilmezse üst sınır yok.
+        column (str, optional): Tarih sütunu; verilmezse date_column(df).
+    """
+    column = column or date_column(df)
+    if start is None and stop is None:
+        return df
+    if is_date_sorted(df, column):
+        lo, hi = _bounds(df[column].to_numpy(), start, stop)
+        window = df.iloc[lo:hi]
+        return mark_date_sorted(window, column) if lo or hi < len(df) else df
+    mask = window_mask(df[column], start, stop)
+    return df if mask.all() else df[mask]
+
+
+def window_mask(dates, start=None, stop=None):
+    """dates (Series, Index ya da dizi) değerlerinin [start, stop) aralığında olup olmadığı (bool dizi)."""
+    values = pd.DatetimeIndex(np.asarray(dates, dtype="datetime64[ns]"))
+    mask = np.ones(len(values), dtype=bool)
+    if start is not None:
+        mask &= values >= pd.Timestamp(start)
+    if stop is not None:
+        mask &= values < pd.Timestamp(stop)
+    return mask
+
+
+def years_window(df, years):
+    """
+    'Year' değeri years içinde olan satırlar. Ardışık yıllar, tarihe göre sıralı satırlarda tek bir
+    'Date' dilimidir (date_window); diğer durumlarda 'Year' üzerinde maske uygulanır.
+    """
+    years = sorted({int(year) for year in years})
+    if years and years == list(range(years[0], years[-1] + 1)) and "Date" in df.columns:
+        return date_window(df, pd.Timestamp(years[0], 1, 1), pd.Timestamp(years[-1] + 1, 1, 1), column="Date")
+    return df[df["Year"].isin(years)]
+
+
+def until_as_of(df, as_of):
+    """
+    as_of günü dahil ona kadarki satırlar; as_of None ise df'in kendisi. Analizler as_of'u yalnızca
+    pencereleri (analysis_windows) için kullanır; sonraki satırları çağıran bununla keser.
+    """
+    if as_of is None:
+        return df
+    return date_window(df, stop=analysis_windows(as_of)["stop"])
+
+
+def partition_offsets(df, freq="MS", column="Date"):
+    """
+    Sıralı tablonun dönem (ay: 'MS', yıl: 'YS') bölümlerinin sınırları.
+
+    Her dönem başı ikili aramayla bulunur (O(dönem sayısı × log n)); dönem i'nin satırları
+    df.iloc[offsets[i]:offsets[i + 1]] dilimidir.
+
+    Returns:
+        tuple: (starts, offsets). starts ilk ile son satırın dönemleri arasındaki tüm dönem
+        başları (pd.DatetimeIndex); offsets len(starts) + 1 uzunluğunda satır konumları.
+
+    Raises:
+        ValueError: Tablo column'a göre sıralı değilse.
+    """
+    if not is_date_sorted(df, column):
+        raise ValueError(f"partition_offsets için tablo '{column}' sütununa göre sıralı olmalı.")
+    values = df[column].to_numpy()
+    if len(values) == 0:
+        return pd.DatetimeIndex([]), np.zeros(1, dtype=np.int64)
+    first, last = pd.Timestamp(values[0]), pd.Timestamp(values[-1])
+    floor = pd.Timestamp(first.year, 1 if freq == "YS" else first.month, 1)
+    starts = pd.date_range(floor, last, freq=freq)
+    offsets = np.searchsorted(values, starts.to_numpy(), side="left")
+    return starts, np.append(offsets, len(values)).astype(np.int64)
@@ -0,0 +1,74 @@
+import numpy as np
+import pandas as pd
+
+
+def lttb_indices(x, y, n_out):
+    """
+    Largest-Triangle-Three-Buckets (LTTB) ile bir zaman serisinden görsel şekli koruyan n_out noktayı seçer.
+
+    İlk ve son nokta her zaman korunur; aradaki noktalar n_out - 2 eşit kovaya bölünür. Her
+    kovadan, bir önceki seçilen nokta ve bir sonraki kovanın ortalamasıyla en büyük üçgeni
+    oluşturan nokta seçilir. Kova ortalamaları kümülatif toplamlarla önceden hesaplanır; döngü
+    yalnızca kova sayısı kadar döner, bu yüzden maliyet O(n) ve çıktı boyutu sabittir.
+
+    Parameters:
+        x (array-like): Artan sırada sayısal eksen değerleri (ör. tarihlerin int64 karşılığı).
+        y (array-like): Değerler; NaN içermemelidir.
+        n_out (int): Seçilecek nokta sayısı (en az 3). Seri zaten bu kadar kısaysa tüm noktalar döner.
+
+    Returns:
+        np.ndarray: Seçilen noktaların artan sıradaki indeksleri (int64).
+    """
+    n = len(x)
+    if n_out >= n:
+        return np.arange(n)
+    if n_out < 3:
+        raise ValueError(f"n_out en az 3 olmalı: {n_out}")
+
+    # Büyüklükleri küçültmek için x ilk noktaya göre kaydırılır (ns cinsinden tarihler ~1e18)
+    x = np.asarray(x, dtype=np.float64) - float(x[0])
+    y = np.asarray(y, dtype=np.float64)
+
+    # Kova sınırları: iç noktalar [1, n-1) aralığında n_out - 2 kovaya bölünür
+    bounds = (np.arange(n_out - 1) * ((n - 2) / (n_out - 2))).astype(np.int64) + 1
+    bounds[-1] = n - 1
+    cum_x = np.r_[0.0, np.cumsum(x)]
+    cum_y = np.r_[0.0, np.cumsum(y)]
+    counts = np.diff(bounds)
+    mean_x = (cum_x[bounds[1:]] - cum_x[bounds[:-1]]) / counts
+    mean_y = (cum_y[bounds[1:]] - cum_y[bounds[:-1]]) / counts
+    # Son kovanın "sonraki kovası" son noktanın kendisidir
+    next_x = np.r_[mean_x[1:], x[-1]]
+    next_y = np.r_[mean_y[1:], y[-1]]
+
+    selected = np.empty(n_out, dtype=np.int64)
+    selected[0], selected[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        start, end = bounds[i], bounds[i + 1]
+        # Üçgen alanının iki katı; sabit çarpan seçimi etkilemez
+        area = np.abs(
+            (x[a] - next_x[i]) * (y[start:end] - y[a])
+            - (x[a] - x[start:end]) * (next_y[i] - y[a])
+        )
+        a = start + int(np.argmax(area))
+        selected[i + 1] = a
+    return selected
+
+
+def downsample_series(series, n_out):
+    """
+    Tarih indeksli bir pd.Series'i LTTB ile en fazla n_out noktaya indirger; NaN değerler atılır.
+
+    Parameters:
+        series (pd.Series): DatetimeIndex'e sahip, tarihe göre sıralı seri.
+        n_out (int): Nokta bütçesi (ör. grafiğin piksel genişliği).
+
+    Returns:
+        pd.Series: Seçilen noktalar (özgün indeks ve değerlerle).
+    """
+    series = series.dropna()
+    if series.empty:
+        return series
+    x = series.index.asi8 if isinstance(series.index, pd.DatetimeIndex) else series.index.to_numpy()
+    return series.iloc[lttb_indices(x, series.to_numpy(), n_out)]
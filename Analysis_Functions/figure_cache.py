@@ -0,0 +1,258 @@
+import contextlib
+import contextvars
+import io
+import itertools
+import multiprocessing
+import os
+import pickle
+import threading
+import weakref
+from concurrent.futures import ProcessPoolExecutor
+
+import matplotlib
+import matplotlib.pyplot as plt
+import streamlit as st
+from matplotlib.figure import Figure
+
+from Analysis_Functions.result_cache import cache_lookup, cache_store, describe_argument
+
+# st.pyplot ile aynı çıktı: kırpılmış kenarlar, 200 dpi PNG
+SAVEFIG_OPTIONS = {"format": "png", "dpi": 200, "bbox_inches": "tight"}
+# Tek çekirdekli makinede havuz kazanç getirmez (pickle maliyeti kalır); çizim yerinde yapılır
+MAX_WORKERS = min(4, (os.cpu_count() or 1) - 1)
+
+_settings = {"format": SAVEFIG_OPTIONS["format"], "dpi": SAVEFIG_OPTIONS["dpi"], "max_workers": MAX_WORKERS}
+_executor = None
+_executor_lock = threading.Lock()
+# Etkin çizim kapsamı (figure_scope); Streamlit her oturumun betiğini ayrı iş parçacığında çalıştırır
+_scope = contextvars.ContextVar("figure_scope", default=None)
+# Hazır Figure nesneleri için kimlik belirteci: aynı nesne (ör. result_cache'ten dönen figür)
+# yeniden gösterilirse önbellekten gelir, yeni kurulan figür ise her zaman yeniden çizilir
+_figure_tokens = weakref.WeakKeyDictionary()
+_token_counter = itertools.count()
+
+
+def _init_worker():
+    """Havuz süreçleri ekransız çalışır; unpickle edilen figürler Agg ile çizilir."""
+    matplotlib.use("Agg")
+
+
+def _pool():
+    """
+    Rasterleştirme için paylaşılan süreç havuzunu (ilk kullanımda) döndürür; max_workers 0 ise None.
+
+    matplotlib iş parçacığı güvenli değildir (ör. mathtext ayrıştırıcısı paylaşılır), bu yüzden
+    çizim iş parçacıklarına değil ayrı süreçlere dağıtılır. Streamlit sunucusu çok iş parçacıklı
+    olduğundan süreçler fork yerine spawn ile başlatılır.
+    """
+    global _executor
+    with _executor_lock:
+        if _executor is None and _settings["max_workers"] > 0:
+            _executor = ProcessPoolExecutor(
+                max_workers=_settings["max_workers"],
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+            )
+        return _executor
+
+
+def configure_figures(fmt=None, dpi=None, max_workers=None):
+    """
+    Çıktı biçimini ('png' ya da 'svg'), çözünürlüğü ve havuz boyutunu değiştirir.
+    Havuz boyutu değişirse mevcut havuz kapatılır ve bir sonraki çizimde yeniden kurulur;
+    max_workers=0 çizimi çağıran iş parçacığında yapar.
+    """
+    global _executor
+    if fmt is not None:
+        _settings["format"] = fmt
+    if dpi is not None:
+        _settings["dpi"] = dpi
+    if max_workers is not None and max_workers != _settings["max_workers"]:
+        _settings["max_workers"] = max_workers
+        with _executor_lock:
+            if _executor is not None:
+                _executor.shutdown(wait=True)
+            _executor = None
+
+
+def figure_to_bytes(fig, fmt=None, dpi=None):
+    """
+    Figürü PNG/SVG byte dizisine çevirir (st.pyplot ile aynı savefig ayarları). Figürü kapatmaz.
+    """
+    buffer = io.BytesIO()
+    options = dict(SAVEFIG_OPTIONS, format=fmt or _settings["format"], dpi=dpi or _settings["dpi"])
+    fig.savefig(buffer, **options)
+    return buffer.getvalue()
+
+
+def close_figure(fig):
+    """Figürü pyplot kaydından çıkarır; uzun yaşayan sunucuda biriken figür belleğini serbest bırakır."""
+    plt.close(fig)
+
+
+def _render_pickled(payload, fmt, dpi):
+    """Havuz sürecinde çalışır: pickle edilmiş figürü açar, byte dizisine çevirir ve kapatır."""
+    fig = pickle.loads(payload)
+    try:
+        return figure_to_bytes(fig, fmt, dpi)
+    finally:
+        close_figure(fig)
+
+
+def _submit(fig):
+    """
+    Figürü havuza gönderir ve Future döndürür; havuz kapalıysa ya da figür pickle
+    edilemiyorsa (ör. lambda içeren biçimleyiciler) None döner ve çizim yerinde yapılır.
+    """
+    pool = _pool()
+    if pool is None:
+        return None
+    try:
+        payload = pickle.dumps(fig)
+    except Exception:
+        return None
+    return pool.submit(_render_pickled, payload, _settings["format"], _settings["dpi"])
+
+
+def _display(container, data):
+    """Byte dizisini verilen Streamlit kabında görüntüler (SVG metin olarak verilir)."""
+    if data[:8] == b"\x89PNG\r\n\x1a\n":
+        container.image(data, width="stretch")
+    else:
+        container.image(data.decode("utf-8"), width="stretch")
+
+
+def _emit(state, replay_key, data, container):
+    """Görüntüyü gösterir ve kapsamın kayıt fonksiyonu varsa ona iletir."""
+    if state["record"] is not None:
+        state["record"](replay_key, data)
+    _display(container, data)
+
+
+def show_figure(figure, *args, **kwargs):
+    """
+    st.pyplot yerine kullanılır: figürü rasterleştirip st.image ile gösterir ve figürü kapatır.
+
+    figure ya hazır bir matplotlib Figure'ı, ya *args/**kwargs ile çağrıldığında Figure
+    döndüren bir fonksiyon ya da önceden rasterleştirilmiş görüntü byte'larıdır (ör. gece
+    raporundan gelen bir analiz sonucu). Bir figure_scope içinde çağrılırsa sonuç (parmak izi,
+    kapsam adı, kapsamdaki sıra, fonksiyon ve argüman tanımları) anahtarıyla result_cache'e
+    yazılır; sonraki yeniden çalıştırmalarda figür hiç kurulmadan önbellekteki byte'lar gösterilir.
+    Tablo argümanları içerik özetleriyle (result_cache.content_digest) anahtara girer: aynı boyutta
+    ama farklı verili bir tablo (ör. başka as_of ya da modda volatility.head(25)) yeniden çizilir.
+    Hazır Figure verildiğinde anahtar nesnenin kimliğidir: yalnızca aynı nesne önbellekten gelir.
+    Kapsam içinde figür pickle edilip süreç havuzunda rasterleştirilir ve hemen kapatılır:
+    yerine bir st.empty yer tutucusu konur, görüntü kapsam kapanırken doldurulur. Böylece
+    bölümün geri kalanı hesaplanırken çizimler paralel yürür. Kapsam dışında eşzamanlı çalışır.
+    """
+    state = _scope.get()
+    if isinstance(figure, bytes):
+        if state is not None:
+            state["index"] += 1
+        _display(st, figure)
+        return
+
+    builder = None if isinstance(figure, Figure) else figure
+    if state is None:
+        fig = builder(*args, **kwargs) if builder else figure
+        try:
+            _display(st, figure_to_bytes(fig))
+        finally:
+            close_figure(fig)
+        return
+
+    if builder:
+        source = f"{builder.__module__}.{builder.__qualname__}"
+    else:
+        source = ("Figure", _figure_tokens.setdefault(figure, next(_token_counter)))
+    key = (
+        "figure",
+        state["fingerprint"],
+        state["name"],
+        state["index"],
+        _settings["format"],
+        _settings["dpi"],
+        source,
+        describe_argument(args),
+        describe_argument(kwargs),
+    )
+    # Kayıt/okuma anahtarı: hazır figürler için nesne kimliği yerine yalnızca kapsamdaki sıra kullanılır
+    replay_key = key if builder else key[:6] + ("Figure",) + key[7:]
+    state["index"] += 1
+    hit, data = cache_lookup(key)
+    if not hit and state["lookup"] is not None:
+        data = state["lookup"](replay_key)
+        hit = data is not None
+        if hit:
+            cache_store(key, data)
+    if hit:
+        if not builder:
+            close_figure(figure)
+        _emit(state, replay_key, data, st)
+        return
+
+    fig = builder(*args, **kwargs) if builder else figure
+    try:
+        future = _submit(fig)
+        if future is None:
+            data = figure_to_bytes(fig)
+    finally:
+        close_figure(fig)
+    if future is None:
+        cache_store(key, data)
+        _emit(state, replay_key, data, st)
+        return
+    state["pending"].append((key, replay_key, future, st.empty()))
+
+
+def _flush(state):
+    """Kapsamdaki bekleyen çizimleri tamamlar, önbelleğe yazar ve yer tutuculara yerleştirir."""
+    pending, state["pending"] = state["pending"], []
+    error = None
+    for key, replay_key, future, placeholder in pending:
+        try:
+            data = future.result()
+        except Exception as e:
+            error = error or e
+            continue
+        cache_store(key, data)
+        _emit(state, replay_key, data, placeholder)
+    if error is not None:
+        raise error
+
+
+def _discard(state):
+    """Bölüm hata verdiğinde bekleyen çizimleri iptal eder; sonuçları ve hataları yok sayılır."""
+    pending, state["pending"] = state["pending"], []
+    for _, _, future, _ in pending:
+        future.cancel()
+
+
+@contextlib.contextmanager
+def figure_scope(fingerprint, name, lookup=None, record=None):
+    """
+    Bu blokta show_figure ile gösterilen figürleri (fingerprint, name) altında önbelleğe alır
+    ve rasterleştirmelerini süreç havuzunda paralel yürütür.
+
+    Parameters:
+        fingerprint (tuple): result_cache.dataset_fingerprint çıktısı.
+        name (str): Kapsamın adı (ör. dashboard bölüm başlığı).
+        lookup (callable, optional): Önbellekte olmayan bir görüntü için lookup(anahtar) çağrılır;
+            byte döndürürse figür çizilmeden o gösterilir (ör. gece raporundan okuma).
+        record (callable, optional): Gösterilen her görüntü için record(anahtar, byte'lar) çağrılır
+            (ör. gece raporuna yazma).
+
+    Bekleyen çizimler yalnızca blok hatasız biterse tamamlanır; blok hata verirse iptal edilir ve
+    asıl hata (bir çizim hatasıyla örtülmeden) yükseltilir.
+    """
+    state = {"fingerprint": fingerprint, "name": name, "index": 0, "pending": [], "lookup": lookup, "record": record}
+    token = _scope.set(state)
+    try:
+        yield
+    except BaseException:
+        _discard(state)
+        raise
+    else:
+        _flush(state)
+    finally:
+        _scope.reset(token)
@@ -0,0 +1,157 @@
+import numpy as np
+
+# Yuvarlama hatası sınırı: |pay| bu kadar makine epsilonu x ölçek altındaysa eğim 0 sayılır
+ROUNDING_ULPS = 64
+
+
+def group_offsets(group_ids):
+    """
+    Gruba göre sıralı bir kimlik dizisinde her grubun başladığı satırın indeksini döndürür.
+
+    Parameters:
+        group_ids (np.ndarray): Aynı gruba ait satırları ardışık olan grup kimlikleri.
+
+    Returns:
+        np.ndarray: Grup başlangıç indeksleri (int64); ilk eleman her zaman 0'dır.
+    """
+    group_ids = np.asarray(group_ids)
+    if len(group_ids) == 0:
+        return np.zeros(0, dtype=np.int64)
+    return np.flatnonzero(np.r_[True, group_ids[1:] != group_ids[:-1]])
+
+
+def snap_to_zero(value, scale):
+    """
+    Mutlak değeri ROUNDING_ULPS · eps · scale sınırında kalan (yalnızca birikmiş yuvarlama hatası
+    olan) elemanları tam 0 yapar. Eğim yollarının hepsi (segment_linregress, sums_linregress,
+    sales_panel.panel_linregress) payı bununla süzer; simetrik ya da sabit seride eğim her yolda tam 0 çıkar.
+
+    Parameters:
+        value (np.ndarray): Sıfıra çekilecek değerler (ör. Σ(x - x̄)(y - ȳ)).
+        scale (np.ndarray): value'yu oluşturan terimlerin mutlak değerleri toplamı.
+
+    Returns:
+        np.ndarray: value; sınır altındaki elemanlar 0.
+    """
+    return np.where(np.abs(value) <= ROUNDING_ULPS * np.finfo(np.float64).eps * scale, 0.0, value)
+
+
+def segment_linregress(x, y, offsets):
+    """
+    Ardışık segmentlerin her biri için y = intercept + slope * x en küçük kareler doğrusunu tek geçişte hesaplar.
+
+    Segment toplamları (Σx, Σy, Σx², Σxy, Σy²) np.add.reduceat ile alınır. Sayısal
+    kararlılık için toplamlar, segment ortalamalarından arındırılmış değerler üzerinden
+    hesaplanır (iki geçişli yöntem); sonuçlar scipy.stats.linregress ile aynıdır. Yuvarlama
+    hatası sınırındaki Σ(x - x̄)(y - ȳ) 0 alınır (bkz. snap_to_zero); simetrik seride eğim tam 0 çıkar.
+
+    Parameters:
+        x (array-like): Bağımsız değişken; segmentler ardışık olmalıdır.
+        y (array-like): Bağımlı değişken.
+        offsets (np.ndarray): Segment başlangıç indeksleri (bkz. group_offsets).
+
+    Returns:
+        dict: Segment başına numpy dizileri:
+            - 'n': gözlem sayısı
+            - 'slope', 'intercept': regresyon katsayıları (n < 2 ya da x sabitse NaN)
+            - 'resid_std': artıkların standart sapması, sqrt(SSE / (n - 2)) (n < 3 ise NaN)
+            - 'y_std': y'nin örneklem standart sapması (ddof=1, n < 2 ise NaN)
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    offsets = np.asarray(offsets, dtype=np.int64)
+    if len(offsets) == 0:
+        empty = np.zeros(0, dtype=np.float64)
+        return {"n": np.zeros(0, dtype=np.int64), "slope": empty, "intercept": empty,
+                "resid_std": empty, "y_std": empty}
+
+    n = np.diff(np.r_[offsets, len(x)])
+    x_mean = np.add.reduceat(x, offsets) / n
+    y_mean = np.add.reduceat(y, offsets) / n
+    dx = x - np.repeat(x_mean, n)
+    dy = y - np.repeat(y_mean, n)
+    sxx = np.add.reduceat(dx * dx, offsets)
+    # dx'in x̄ yuvarlamasından gelen hatası da ölçeğe girer
+    sxy = snap_to_zero(np.add.reduceat(dx * dy, offsets),
+                       np.add.reduceat((np.abs(dx) + np.repeat(np.abs(x_mean), n)) * np.abs(dy), offsets))
+    syy = np.add.reduceat(dy * dy, offsets)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        slope = np.where((n > 1) & (sxx > 0), sxy / sxx, np.nan)
+        intercept = y_mean - slope * x_mean
+        sse = np.clip(syy - slope * sxy, 0, None)
+        resid_std = np.where(n > 2, np.sqrt(sse / (n - 2)), np.nan)
+        y_std = np.where(n > 1, np.sqrt(syy / (n - 1)), np.nan)
+    return {"n": n, "slope": slope, "intercept": intercept, "resid_std": resid_std, "y_std": y_std}
+
+
+def sums_linregress(n, sum_y, sum_xy, sum_yy=None):
+    """
+    x = 0, 1, ..., n-1 (gözlemin grup içindeki sırası) için y = intercept + slope * x doğrusunu
+    grup toplamlarından hesaplar; ham gözlemler gerekmez.
+
+    Σx ve Σx² n'den kapalı formda gelir, bu yüzden grup başına yalnızca n, Σy, Σxy (ve y'nin
+    standart sapması için Σy²) tutmak yeterlidir. Yeni gözlemler bu toplamlara eklenerek
+    (bkz. month_close) regresyon geçmiş yeniden taranmadan güncellenir. Pay n·Σxy − Σx·Σy
+    biçiminde hesaplanır. Yuvarlama hatası sınırındaki paylar 0 alınır; böylece sabit seride eğim,
+    iki geçişli hesapta olduğu gibi tam 0 çıkar.
+
+    Parameters:
+        n, sum_y, sum_xy (array-like): Grup başına gözlem sayısı, Σy ve Σ(x·y).
+        sum_yy (array-like, optional): Grup başına Σy²; verilmezse 'resid_std' ve 'y_std' NaN olur.
+
+    Returns:
+        dict: segment_linregress ile aynı anahtarlar ('n', 'slope', 'intercept', 'resid_std', 'y_std').
+    """
+    n = np.asarray(n, dtype=np.float64)
+    sum_y = np.asarray(sum_y, dtype=np.float64)
+    sum_xy = np.asarray(sum_xy, dtype=np.float64)
+    sum_yy = np.full_like(n, np.nan) if sum_yy is None else np.asarray(sum_yy, dtype=np.float64)
+    sum_x = n * (n - 1) / 2
+    sum_xx = (n - 1) * n * (2 * n - 1) / 6
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        numerator = n * sum_xy - sum_x * sum_y
+        # Büyük ve neredeyse eşit iki terimin farkı: kalan yalnızca birikmiş yuvarlama hatasıysa eğim 0
+        scale = n * np.abs(sum_xy) + sum_x * np.abs(sum_y)
+        numerator = snap_to_zero(numerator, scale)
+        denominator = n * sum_xx - sum_x ** 2
+        slope = np.where((n > 1) & (denominator > 0), numerator / denominator, np.nan)
+        intercept = (sum_y - slope * sum_x) / n
+        syy = np.clip(sum_yy - sum_y ** 2 / n, 0, None)
+        sse = np.clip(syy - slope * numerator / n, 0, None)
+        resid_std = np.where(n > 2, np.sqrt(sse / (n - 2)), np.nan)
+        y_std = np.where(n > 1, np.sqrt(syy / (n - 1)), np.nan)
+    return {"n": n.astype(np.int64), "slope": slope, "intercept": intercept, "resid_std": resid_std, "y_std": y_std}
+
+
+def grouped_linregress(df, keys, x, y):
+    """
+    DataFrame'deki her grup (keys) için x'e karşı y doğrusal regresyonunu vektörel olarak hesaplar.
+
+    Satırlar grup kodlarına göre (kararlı sıralama ile) dizilir, grup başlangıçları bulunur ve
+    segment_linregress ile tüm gruplar tek seferde çözülür. Grup içi satır sırası korunur.
+
+    Parameters:
+        df (pd.DataFrame): Girdi verisi.
+        keys (list of str): Grup sütunları.
+        x (str): Bağımsız değişken sütunu.
+        y (str): Bağımlı değişken sütunu.
+
+    Returns:
+        pd.DataFrame: keys + 'n', 'Slope', 'Intercept', 'Resid_Std', 'Volatility' (y'nin
+        ddof=1 standart sapması). Gruplar, groupby(keys, observed=True, sort=True) ile
+        aynı sırada döner.
+    """
+    codes = df.groupby(keys, observed=True, sort=True).ngroup().to_numpy()
+    order = np.argsort(codes, kind="stable")
+    offsets = group_offsets(codes[order])
+    stats = segment_linregress(df[x].to_numpy()[order], df[y].to_numpy()[order], offsets)
+
+    result = df[keys].iloc[order[offsets]].reset_index(drop=True)
+    result["n"] = stats["n"]
+    result["Slope"] = stats["slope"]
+    result["Intercept"] = stats["intercept"]
+    result["Resid_Std"] = stats["resid_std"]
+    result["Volatility"] = stats["y_std"]
+    return result
@@ -0,0 +1,78 @@
+import numpy as np
+
+from Analysis_Functions.grouped_regression import group_offsets
+
+# Metrik adı → (kaynak sütun, toplama fonksiyonu); sonuç sütunu kaynak sütunun adını taşır
+TOPK_METRICS = {
+    "quantity": ("Sale_Amount", "sum"),
+    "revenue": ("Revenue", "sum"),
+    "frequency": ("Sale_Amount", "count"),
+}
+
+
+def top_k_per_partition(summary, partition_keys, value_col, k):
+    """
+    Her bölüm (partition_keys) içinde value_col değeri en yüksek k satırı tek geçişte seçer.
+
+    Satırlar bölüm kodlarına göre (kararlı sıralama ile) gruplanır; her bölümde k'inci en büyük
+    değer np.partition ile O(m) sürede bulunur ve yalnızca bu eşiği geçen aday satırlar
+    sıralanır. Eşit değerlerde girdideki satır sırası korunur, yani sonuç
+    sort_values([..., value_col], ascending=[True, False]).groupby(...).head(k) ile aynıdır.
+
+    Parameters:
+        summary (pd.DataFrame): Bölüm ve değer sütunlarını içeren (genellikle toplulaştırılmış) veri.
+        partition_keys (list of str): Bölüm sütunları (ör. ['Year', 'Season']).
+        value_col (str): Sıralamada kullanılan sayısal sütun.
+        k (int): Bölüm başına seçilecek satır sayısı.
+
+    Returns:
+        pd.DataFrame: Seçilen satırlar; bölümler groupby(sort=True) sırasında, bölüm içinde
+        value_col azalan sırada. İndeks sıfırlanır.
+    """
+    if summary.empty:
+        return summary.reset_index(drop=True)
+
+    codes = summary.groupby(partition_keys, observed=True, sort=True).ngroup().to_numpy()
+    values = summary[value_col].to_numpy(dtype=np.float64)
+    order = np.argsort(codes, kind="stable")
+    bounds = np.r_[group_offsets(codes[order]), len(order)]
+
+    selected = []
+    for start, end in zip(bounds[:-1], bounds[1:]):
+        rows = order[start:end]
+        if len(rows) > k:
+            # k'inci en büyük değer; eşitlikler kaybolmasın diye eşiğe eşit satırlar da aday kalır
+            threshold = np.partition(values[rows], len(rows) - k)[len(rows) - k]
+            rows = rows[values[rows] >= threshold]
+        # Adaylar azalan değere göre kararlı sıralanır (NaN'lar sona düşer)
+        rows = rows[np.argsort(-values[rows], kind="stable")][:k]
+        selected.append(rows)
+    return summary.iloc[np.concatenate(selected)].reset_index(drop=True)
+
+
+def compute_top_k(df, partition_keys, item_keys, metric="quantity", k=5):
+    """
+    Satış verisini (partition_keys + item_keys) düzeyinde tek groupby ile toplar ve her bölüm
+    için metriğe göre en iyi k kalemi döndürür.
+
+    Parameters:
+        df (pd.DataFrame): Satış verisi. 'Sale_Amount' ve partition_keys/item_keys sütunlarını içermelidir;
+            'revenue' metriği için 'Revenue' yoksa 'Sale_Amount' * 'Unit_Price(TL)' kullanılır.
+        partition_keys (list of str): Sıralamanın yapılacağı bölümler (ör. ['Year', 'Season'] ya da ['Year', 'Month']).
+        item_keys (list of str): Sıralanan kalemler (ör. ['ProductName'] ya da ['CustomerName', 'ProductName']).
+        metric (str): 'quantity' (toplam adet), 'revenue' (toplam ciro) ya da 'frequency' (satış satırı sayısı).
+        k (int): Bölüm başına kalem sayısı.
+
+    Returns:
+        pd.DataFrame: partition_keys + item_keys + metrik sütunu ('Sale_Amount' ya da 'Revenue').
+    """
+    value_col, aggfunc = TOPK_METRICS[metric]
+    if value_col == "Revenue" and "Revenue" not in df.columns:
+        df = df.assign(Revenue=df["Sale_Amount"] * df["Unit_Price(TL)"])
+
+    summary = (
+        df.groupby(partition_keys + item_keys, observed=True)[value_col]
+        .agg(aggfunc)
+        .reset_index()
+    )
+    return top_k_per_partition(summary, partition_keys, value_col, k)
@@ -5,13 +5,15 @@ import seaborn as sns
 import matplotlib.ticker as mticker
 import streamlit as st
 
+from Analysis_Functions.sales_cube import is_sales_cube, rollup_sales_cube
+
 
 def macroeconomic_parameters(df, macro_col, macro_label, plot=True):
     """
     Belirtilen makroekonomik gösterge ile aylık satış arasındaki ilişkiyi gösterir.
 
     Parametreler:
-        df: DataFrame (OrderDate, Sale_Amount ve makro_col içermeli)
+        df: DataFrame (OrderDate, Sale_Amount ve makro_col içermeli) ya da build_sales_cube küpü
         macro_col: Gösterge kolonu (örnek: 'Interest_Rate')
         macro_label: Grafikte gösterilecek etiket (örnek: 'Faiz Oranı')
         plot: Grafik çizilsin mi?
@@ -20,10 +22,17 @@ def macroeconomic_parameters(df, macro_col, macro_label, plot=True):
         Tuple: (monthly_sales_df, monthly_macro_df, fig)
     """
   
-    df["Year-Month"] = pd.to_datetime(df["Date"]).dt.to_period("M").astype(str)
+    if is_sales_cube(df):
+        # Ay toplamları ve satır ağırlıklı makro ortalamaları küpten tek seferde alınır
+        monthly = rollup_sales_cube(df, [])
+        monthly["Year-Month"] = monthly["YearMonth"].dt.strftime("%Y-%m")
+        monthly_sales = monthly[["Year-Month", "Sale_Amount"]]
+        monthly_macro = monthly[["Year-Month", macro_col]]
+    else:
+        df["Year-Month"] = pd.to_datetime(df["Date"]).dt.to_period("M").astype(str)
 
-    monthly_sales = df.groupby("Year-Month")["Sale_Amount"].sum().reset_index()
-    monthly_macro = df.groupby("Year-Month")[macro_col].mean().reset_index()
+        monthly_sales = df.groupby("Year-Month")["Sale_Amount"].sum().reset_index()
+        monthly_macro = df.groupby("Year-Month")[macro_col].mean().reset_index()
 
     fig = None
     if plot:
@@ -0,0 +1,347 @@
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from Analysis_Functions.date_index import analysis_windows, data_as_of, date_window, is_date_sorted, partition_offsets
+from Analysis_Functions.snapshot_cache import option_slug
+
+MONTH_CLOSE_DIR = os.path.join(".cache", "month_close")
+PAIR_KEYS = ["CustomerCode", "Product_Code"]
+# Düzenlilik analizlerinin (Ciro_Büyüme_Oranı._calculate_active_months) ad bazlı seviyeleri
+ACTIVITY_LEVELS = {
+    "customer_product": ["CustomerName", "ProductName"],
+    "customer": ["CustomerName"],
+    "product": ["ProductName"],
+}
+# Durum tabloları birleştirilirken her sütuna uygulanan kural. Aylar sırayla katlandığından
+# eski ve yeni kayıtlar toplanarak (ya da ilk/son/min/maks alınarak) birleştirilebilir.
+PAIR_RULES = {
+    "CustomerName": "first",
+    "ProductName": "first",
+    # Fatura satırı momentleri (volatilite)
+    "Line_Count": "sum",
+    "Sales_Sum": "sum",
+    "Line_SumSq": "sum",
+    "Last_Sale_Date": "max",
+    # Aylık seri: x = ayın çiftteki sırası, y = aylık satış (yaşlanma etkisi)
+    "Months": "sum",
+    "Month_SumXY": "sum",
+    "First_Month_Sale": "first",
+    "Last_Month_Sale": "last",
+    "Last_Month": "max",
+    "Recent": "max",
+    # trend_since'ten itibaren log(aylık satış) serisi (trend analizi)
+    "Trend_Months": "sum",
+    "Trend_Sum": "sum",
+    "Trend_SumXY": "sum",
+    "Trend_SumSq": "sum",
+}
+ACTIVITY_RULES = {"Active_Months": "sum", "First_Sale_Date": "min", "Last_Sale_Date": "max"}
+MONTH_RULES = {"Line_Count": "sum", "Sale_Amount": "sum"}
+
+
+def new_month_close_state(as_of):
+    """
+    Hiç ay katlanmamış boş durum. Toplamlar as_of'un pencereleriyle (date_index.analysis_windows:
+    trend_since, recent_years) tutulur; pencereler yalnızca as_of'un yılına bağlıdır.
+    """
+    return {
+        "kind": "month_close", "as_of": pd.Timestamp(as_of), "closed_through": None, "pairs": None,
+        "activity": {}, "months": None,
+    }
+
+
+def is_month_close_state(obj):
+    """Nesnenin month_close_state / fold_month_close ile üretilmiş bir durum olup olmadığını döndürür."""
+    return isinstance(obj, dict) and obj.get("kind") == "month_close"
+
+
+def require_state_windows(state, as_of):
+    """
+    Durumdan hesaplanan analizler için as_of denetimi. Durum verinin tamamını state['as_of']
+    (verinin son satış günü) pencereleriyle topladığından yalnızca bu analiz tarihini karşılar.
+
+    Raises:
+        ValueError: Başka bir as_of verilmişse; o zaman analiz satırlardan ya da küpten hesaplanmalıdır.
+    """
+    if as_of is not None and pd.Timestamp(as_of).normalize() != state["as_of"]:
+        raise ValueError(
+            f"Ay kapanışı durumu {state['as_of']:%Y-%m-%d} analiz tarihinin pencereleriyle tutuluyor; "
+            f"as_of={pd.Timestamp(as_of):%Y-%m-%d} için analiz satırlardan ya da küpten hesaplanmalı."
+        )
+
+
+def _month_starts(dates):
+    """Tarihleri ay başı tarihine (datetime64[ns]) indirir; satır başına Period nesnesi üretmez."""
+    return pd.Series(dates).to_numpy().astype("datetime64[M]").astype("datetime64[ns]")
+
+
+def _combine(old, add, keys, rules):
+    """Eski durum tablosunu yeni ayların katkısıyla birleştirir (anahtar başına bir satır)."""
+    if old is None or old.empty:
+        return add.reset_index(drop=True)
+    return (
+        pd.concat([old, add], ignore_index=True)
+        .groupby(keys, sort=True)
+        .agg(rules)
+        .reset_index()
+    )
+
+
+def fold_month_close(state, df):
+    """
+    Yeni ayların fatura satırlarını duruma katlar; geçmiş yeniden taranmaz.
+
+    Durum her müşteri-ürün çifti için yeterli istatistikleri tutar: satır sayısı, satış toplamı
+    ve kareler toplamı (volatilite), aylık seri için ay sayısı, Σy ve Σxy, ilk/son ay satışı ve
+    son ay (yaşlanma etkisi), trend_since'ten itibaren log satış için n, Σy, Σxy, Σy² (trend),
+    ayrıca ACTIVITY_LEVELS için aktif ay sayısı ve ilk/son satış tarihi (düzenlilik). Regresyonda
+    x ayın çiftteki sırası olduğundan yeni ayın x'i çiftin o ana kadarki ay sayısıdır; bu yüzden
+    katlanan satırlar durumdaki son aydan (closed_through) sonraki aylara ait olmalıdır.
+    trend_since ve "güncel" yıllar state['as_of']'un pencereleridir (date_index.analysis_windows).
+    Maliyet katlanan satır ve varlık sayısıyla orantılıdır.
+
+    Parameters:
+        state (dict): new_month_close_state ya da önceki fold_month_close çıktısı (değiştirilmez).
+        df (pd.DataFrame): preprocessing çıktısı biçiminde yeni satırlar ('Date', kimlik ve ad
+            sütunları, 'Sale_Amount'); birden çok ay içerebilir.
+
+    Returns:
+        dict: Güncellenmiş yeni durum.
+
+    Raises:
+        ValueError: Satırlar durumda zaten kapanmış bir aya aitse.
+    """
+    if len(df) == 0:
+        return state
+    months = _month_starts(df["Date"])
+    through = state["closed_through"]
+    if through is not None and months.min() <= through:
+        raise ValueError(
+            f"{pd.Timestamp(months.min()):%Y-%m} ayı durumda zaten kapanmış (son kapanan ay {through:%Y-%m}); "
+            "geçmiş aylar değiştiyse durum baştan kurulmalı."
+        )
+
+    sales = df["Sale_Amount"].astype(float).to_numpy()
+    lines = pd.DataFrame({
+        **{col: df[col].astype(str).to_numpy() for col in PAIR_KEYS + ["CustomerName", "ProductName"]},
+        "YearMonth": months,
+        "Sale_Amount": sales,
+        "SumSq": sales ** 2,
+        "Date": df["Date"].to_numpy(),
+    })
+
+    # Çift × ay hücreleri; çift içinde aylar artan sırada
+    cells = lines.groupby(PAIR_KEYS + ["YearMonth"], sort=True).agg(
+        CustomerName=("CustomerName", "first"),
+        ProductName=("ProductName", "first"),
+        Sale_Amount=("Sale_Amount", "sum"),
+        Line_Count=("Sale_Amount", "size"),
+        Line_SumSq=("SumSq", "sum"),
+        Last_Sale_Date=("Date", "max"),
+    ).reset_index()
+
+    # Yeni ayın çiftteki sırası = çiftin önceki ay sayısı + yeni aylar içindeki sırası
+    old = state["pairs"]
+    prior = cells[PAIR_KEYS]
+    if old is not None and not old.empty:
+        prior = prior.merge(old[PAIR_KEYS + ["Months", "Trend_Months"]], on=PAIR_KEYS, how="left")
+    prior_months = prior.get("Months", pd.Series(0, index=prior.index)).fillna(0).to_numpy()
+    prior_trend = prior.get("Trend_Months", pd.Series(0, index=prior.index)).fillna(0).to_numpy()
+    pair_groups = cells.groupby(PAIR_KEYS, sort=False)
+    rank = prior_months + pair_groups.cumcount().to_numpy()
+
+    windows = analysis_windows(state["as_of"])
+    in_trend = (cells["YearMonth"] >= windows["trend_since"]).to_numpy()
+    trend_rank = prior_trend + cells.assign(_trend=in_trend).groupby(PAIR_KEYS, sort=False)["_trend"].cumsum().to_numpy() - 1
+    month_sales = cells["Sale_Amount"].fillna(0).to_numpy()
+    log_sales = np.where(in_trend, np.log(np.where(month_sales <= 0, 1e-5, month_sales)), 0.0)
+
+    cells["Month_SumXY"] = rank * month_sales
+    cells["Recent"] = cells["YearMonth"].dt.year.isin(windows["recent_years"])
+    cells["Trend_Months"] = in_trend.astype(np.int64)
+    cells["Trend_Sum"] = log_sales
+    cells["Trend_SumXY"] = np.where(in_trend, trend_rank, 0) * log_sales
+    cells["Trend_SumSq"] = log_sales ** 2
+
+    add = cells.groupby(PAIR_KEYS, sort=True).agg(
+        CustomerName=("CustomerName", "first"),
+        ProductName=("ProductName", "first"),
+        Line_Count=("Line_Count", "sum"),
+        Sales_Sum=("Sale_Amount", "sum"),
+        Line_SumSq=("Line_SumSq", "sum"),
+        Last_Sale_Date=("Last_Sale_Date", "max"),
+        Months=("Sale_Amount", "size"),
+        Month_SumXY=("Month_SumXY", "sum"),
+        First_Month_Sale=("Sale_Amount", "first"),
+        Last_Month_Sale=("Sale_Amount", "last"),
+        Last_Month=("YearMonth", "max"),
+        Recent=("Recent", "max"),
+        Trend_Months=("Trend_Months", "sum"),
+        Trend_Sum=("Trend_Sum", "sum"),
+        Trend_SumXY=("Trend_SumXY", "sum"),
+        Trend_SumSq=("Trend_SumSq", "sum"),
+    ).reset_index()
+
+    activity = {}
+    for level, keys in ACTIVITY_LEVELS.items():
+        level_months = lines.groupby(keys + ["YearMonth"], sort=False).agg(
+            First_Sale_Date=("Date", "min"), Last_Sale_Date=("Date", "max"),
+        ).reset_index()
+        level_add = level_months.groupby(keys, sort=True).agg(
+            Active_Months=("YearMonth", "size"),
+            First_Sale_Date=("First_Sale_Date", "min"),
+            Last_Sale_Date=("Last_Sale_Date", "max"),
+        ).reset_index()
+        activity[level] = _combine(state["activity"].get(level), level_add, keys, ACTIVITY_RULES)
+
+    month_add = lines.groupby("YearMonth", sort=True).agg(
+        Line_Count=("Sale_Amount", "size"), Sale_Amount=("Sale_Amount", "sum"),
+    ).reset_index()
+    return {
+        "kind": "month_close",
+        "as_of": state["as_of"],
+        "closed_through": pd.Timestamp(months.max()),
+        "pairs": _combine(old, add, PAIR_KEYS, PAIR_RULES),
+        "activity": activity,
+        "months": _combine(state["months"], month_add, ["YearMonth"], MONTH_RULES),
+    }
+
+
+def activity_table(state, group_cols):
+    """Düzenlilik analizleri için group_cols seviyesindeki aktif ay tablosu."""
+    for level, keys in ACTIVITY_LEVELS.items():
+        if keys == list(group_cols):
+            return state["activity"][level]
+    raise ValueError(f"Ay kapanışı durumu {group_cols} seviyesini tutmuyor (bkz. ACTIVITY_LEVELS).")
+
+
+def _month_totals(months, sales):
+    return pd.DataFrame({"YearMonth": months, "Sale_Amount": sales}).groupby("YearMonth", sort=True).agg(
+        Line_Count=("Sale_Amount", "size"), Sale_Amount=("Sale_Amount", "sum"),
+    ).reset_index()
+
+
+def _open_month_and_totals(df):
+    """
+    Açık ay (son satırın ayı) ve aylık satır sayısı/satış toplamları. Tarihe göre sıralı
+    tablolarda (preprocessing çıktısı) aylar ikili aramayla bölümlenir; satır başına tarih
+    dönüşümü yapılmaz.
+    """
+    sales = df["Sale_Amount"].astype(float).to_numpy()
+    if not is_date_sorted(df):
+        months = _month_starts(df["Date"])
+        return pd.Timestamp(months.max()), _month_totals(months, sales)
+    starts, offsets = partition_offsets(df)
+    counts = np.diff(offsets)
+    nonempty = counts > 0
+    totals = pd.DataFrame({
+        "YearMonth": starts[nonempty],
+        "Line_Count": counts[nonempty],
+        "Sale_Amount": np.add.reduceat(sales, offsets[:-1][nonempty]),
+    })
+    return starts[-1], totals
+
+
+def _matches(state, totals):
+    """Durumun kapanmış aylarındaki satır sayısı ve satış toplamı verideki aylarla aynı mı?"""
+    known = state["months"]
+    current = totals[totals["YearMonth"] <= state["closed_through"]]
+    if known is None or len(known) != len(current):
+        return False
+    merged = known.merge(current, on="YearMonth", suffixes=("", "_now"))
+    return (
+        len(merged) == len(known)
+        and (merged["Line_Count"] == merged["Line_Count_now"]).all()
+        and np.allclose(merged["Sale_Amount"], merged["Sale_Amount_now"])
+    )
+
+
+def month_close_state(df, option=None, directory=MONTH_CLOSE_DIR):
+    """
+    preprocessing çıktısı için güncel ay kapanışı durumunu döndürür.
+
+    Verideki son ay açık (henüz kapanmamış) sayılır; önceki aylar kapanmıştır. option verilirse
+    kapanmış ayların durumu directory altında saklanır ve sonraki çağrılarda yalnızca saklı
+    durumdan sonra kapanan aylar katlanır. Saklı durumun aylık satır sayıları ve satış toplamları
+    veriyle uyuşmazsa (ör. geçmiş faturalar düzeltildiyse) ya da verinin son satış günü
+    (date_index.data_as_of) yeni bir yıla geçtiyse (pencereler değişir) durum baştan kurulur. Açık ay her
+    çağrıda saklı durumun bir kopyasına katlanır; sonuç tüm veriden hesaplananla aynıdır.
+    Tarihe göre sıralı girdide (preprocessing çıktısı) yeni kapanan aylar ve açık ay ikili
+    aramayla kopyasız dilimlenir (date_index.date_window).
+
+    Parameters:
+        df (pd.DataFrame): preprocessing çıktısı.
+        option (str, optional): Analiz tipi; verilmezse durum saklanmaz, her seferinde kurulur.
+        directory (str): Saklanan durumların kök klasörü.
+
+    Returns:
+        dict: Açık ay dahil tüm veriyi kapsayan durum (bkz. fold_month_close).
+    """
+    as_of = data_as_of(df)
+    if len(df) == 0:
+        return new_month_close_state(as_of)
+    open_month, totals = _open_month_and_totals(df)
+
+    closed = load_month_close_state(option, directory) if option else None
+    if closed is not None and (closed["as_of"] is None or closed["as_of"].year != as_of.year or not _matches(closed, totals)):
+        closed = None
+    # Aynı yıl içinde pencereler aynıdır; durum güncel son satış gününü taşır
+    closed = dict(closed, as_of=as_of) if closed else new_month_close_state(as_of)
+
+    through = closed["closed_through"]
+    newly_closed = date_window(
+        df, start=None if through is None else through + pd.offsets.MonthBegin(1), stop=open_month, column="Date"
+    )
+    if len(newly_closed):
+        closed = fold_month_close(closed, newly_closed)
+        if option:
+            save_month_close_state(closed, option, directory)
+    return fold_month_close(closed, date_window(df, start=open_month, column="Date"))
+
+
+def _state_files(option, directory):
+    folder = os.path.join(directory, option_slug(option))
+    tables = {"pairs": "pairs.parquet", "months": "months.parquet"}
+    tables.update({f"activity_{level}": f"activity_{level}.parquet" for level in ACTIVITY_LEVELS})
+    return folder, {name: os.path.join(folder, file) for name, file in tables.items()}, os.path.join(folder, "state.json")
+
+
+def save_month_close_state(state, option, directory=MONTH_CLOSE_DIR):
+    """
+    Kapanmış ayların durumunu Parquet tablolarına yazar. Meta dosyası (state.json) en son
+    yazılır; yarım kalan bir yazma load_month_close_state'te tutarlılık denetimine takılır.
+    """
+    folder, tables, meta_path = _state_files(option, directory)
+    os.makedirs(folder, exist_ok=True)
+    frames = {"pairs": state["pairs"], "months": state["months"]}
+    frames.update({f"activity_{level}": table for level, table in state["activity"].items()})
+    for name, path in tables.items():
+        frames[name].to_parquet(path + ".tmp")
+        os.replace(path + ".tmp", path)
+    with open(meta_path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(
+            {"option": option, "as_of": state["as_of"].isoformat(), "closed_through": state["closed_through"].isoformat()},
+            f, ensure_ascii=False,
+        )
+    os.replace(meta_path + ".tmp", meta_path)
+
+
+def load_month_close_state(option, directory=MONTH_CLOSE_DIR):
+    """Saklanmış kapanmış ay durumunu okur; yoksa None."""
+    folder, tables, meta_path = _state_files(option, directory)
+    if not os.path.exists(meta_path) or not all(os.path.exists(path) for path in tables.values()):
+        return None
+    with open(meta_path, encoding="utf-8") as f:
+        meta = json.load(f)
+    return {
+        "kind": "month_close",
+        # Analiz tarihini kaydetmeyen eski durumlar (as_of None) month_close_state'te baştan kurulur
+        "as_of": pd.Timestamp(meta["as_of"]) if meta.get("as_of") else None,
+        "closed_through": pd.Timestamp(meta["closed_through"]),
+        "pairs": pd.read_parquet(tables["pairs"]),
+        "activity": {level: pd.read_parquet(tables[f"activity_{level}"]) for level in ACTIVITY_LEVELS},
+        "months": pd.read_parquet(tables["months"]),
+    }
@@ -0,0 +1,138 @@
+import threading
+import weakref
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+# Sayfa başına gösterilen satır; bundan kısa tablolar denetimsiz, tek parça gösterilir
+PAGE_SIZE = 100
+# Saklanan filtre/sıralama sonucu (satır sırası) sayısı
+MAX_ORDERS = 32
+# Sayısal/tarih sütunlarda filtre metninin başında kabul edilen karşılaştırmalar (uzun olan önce)
+_OPERATORS = {">=": np.greater_equal, "<=": np.less_equal, ">": np.greater, "<": np.less, "=": np.equal}
+
+# (id(df), sütun, yön, filtre) -> (weakref(df), satır sırası). Aynı tablonun sonraki sayfaları
+# yeniden sıralanmadan okunur; tablo bellekten atılınca kaydı da geçersiz olur.
+_orders = OrderedDict()
+_orders_lock = threading.Lock()
+
+
+def compact_categories(df):
+    """Kategorik sütunlardan kullanılmayan kategorileri atar; tarayıcıya tüm sözlük gönderilmez."""
+    categorical = [col for col in df.columns if isinstance(df[col].dtype, pd.CategoricalDtype)]
+    if not categorical:
+        return df
+    df = df.copy(deep=False)
+    for col in categorical:
+        df[col] = df[col].cat.remove_unused_categories()
+    return df
+
+
+def filter_mask(column, query):
+    """
+    Sütunun filtre metnine uyan satırları (bool dizi).
+
+    Sayısal ve tarih sütunlarında metin '>=', '<=', '>', '<' ya da '=' ile başlayabilir
+    (ör. '>= 100', '< 2024-06-01'); işlemsiz metin eşitlik olarak okunur. Diğer sütunlarda büyük/küçük
+    harf duyarsız içerme aranır; kategorik sütunlarda arama yalnızca kategoriler üzerinde yapılır.
+    """
+    query = query.strip()
+    if pd.api.types.is_numeric_dtype(column) or pd.api.types.is_datetime64_any_dtype(column):
+        op = next((op for op in _OPERATORS if query.startswith(op)), "=")
+        text = query[len(op):].strip() if query.startswith(op) else query
+        if pd.api.types.is_datetime64_any_dtype(column):
+            value = pd.Timestamp(text)
+        else:
+            value = float(text)
+        return np.asarray(_OPERATORS[op](column, value), dtype=bool)
+    if isinstance(column.dtype, pd.CategoricalDtype):
+        matches = column.cat.categories.astype(str).str.contains(query, case=False, regex=False)
+        codes = column.cat.codes.to_numpy()
+        return np.append(np.asarray(matches, dtype=bool), False)[codes]
+    return column.astype(str).str.contains(query, case=False, regex=False).to_numpy(dtype=bool)
+
+
+def table_order(df, sort_by=None, ascending=True, filter_by=None, query=""):
+    """
+    Filtre ve sıralamadan sonra görünen satırların konumları (np.ndarray).
+
+    Sonuç son MAX_ORDERS çağrı için saklanır; sayfa değiştirmek tabloyu yeniden taramaz.
+
+    Parameters:
+        df (pd.DataFrame): Gösterilen tablo.
+        sort_by (str, optional): Sıralama sütunu; verilmezse özgün sıra.
+        ascending (bool): Artan sıralama.
+        filter_by (str, optional): Filtre sütunu; query boşsa filtre uygulanmaz.
+        query (str): filter_mask metni.
+
+    Raises:
+        ValueError: Sayısal ya da tarih sütunu için filtre metni okunamazsa.
+    """
+    query = query.strip() if filter_by is not None else ""
+    key = (id(df), len(df), sort_by, ascending, filter_by, query)
+    with _orders_lock:
+        entry = _orders.get(key)
+        if entry is not None and entry[0]() is df:
+            _orders.move_to_end(key)
+            return entry[1]
+
+    rows = np.arange(len(df))
+    if query:
+        rows = rows[filter_mask(df[filter_by], query)]
+    if sort_by is not None:
+        values = df[sort_by].iloc[rows].reset_index(drop=True)
+        rows = rows[values.sort_values(ascending=ascending, kind="stable", na_position="last").index.to_numpy()]
+
+    with _orders_lock:
+        _orders[key] = (weakref.ref(df), rows)
+        while len(_orders) > MAX_ORDERS:
+            _orders.popitem(last=False)
+    return rows
+
+
+def show_table(df, key, page_size=PAGE_SIZE):
+    """
+    Tabloyu sunucu tarafında sayfalayarak gösterir: tarayıcıya yalnızca görünen sayfa gönderilir.
+
+    page_size satırdan uzun tablolarda filtre (sütun + metin), sıralama (sütun + yön) ve sayfa
+    denetimleri gösterilir; filtre ve sıralama burada, pandas ile yapılır. Kısa tablolar olduğu gibi
+    st.dataframe ile gösterilir.
+
+    Parameters:
+        df (pd.DataFrame): Gösterilecek tablo (değiştirilmez).
+        key (str): Sayfadaki denetimlerin benzersiz anahtar öneki.
+        page_size (int): Sayfa başına satır.
+    """
+    if df is None:
+        return
+    if len(df) <= page_size:
+        st.dataframe(compact_categories(df))
+        return
+
+    columns = [str(col) for col in df.columns]
+    by_name = dict(zip(columns, df.columns))
+    col_filter, col_query, col_sort, col_order = st.columns([2, 2, 2, 1])
+    filter_by = col_filter.selectbox("Filtre sütunu", columns, key=f"{key}_filter_by")
+    query = col_query.text_input("Filtre", value="", key=f"{key}_query", placeholder="ör. ABC, >= 100")
+    sort_by = col_sort.selectbox("Sırala", ["(özgün sıra)"] + columns, key=f"{key}_sort_by")
+    descending = col_order.checkbox("Azalan", value=False, key=f"{key}_descending")
+
+    try:
+        rows = table_order(
+            df,
+            sort_by=by_name.get(sort_by),
+            ascending=not descending,
+            filter_by=by_name[filter_by],
+            query=query,
+        )
+    except (ValueError, TypeError):
+        st.warning(f"'{query}' filtresi {filter_by} sütununa uygulanamadı.")
+        rows = table_order(df, sort_by=by_name.get(sort_by), ascending=not descending)
+
+    n_pages = max(-(-len(rows) // page_size), 1)
+    page = st.number_input(f"Sayfa (1-{n_pages})", min_value=1, max_value=n_pages, value=1, step=1, key=f"{key}_page")
+    start = (min(int(page), n_pages) - 1) * page_size
+    st.dataframe(compact_categories(df.iloc[rows[start:start + page_size]]))
+    st.caption(f"{len(rows):,} / {len(df):,} satır; {start + 1 if len(rows) else 0:,}-{min(start + page_size, len(rows)):,} gösteriliyor")
@@ -0,0 +1,214 @@
+import hashlib
+import json
+import logging
+import multiprocessing
+import os
+import threading
+from collections import Counter, OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+
+import matplotlib
+import pyarrow as pa
+
+from Analysis_Functions.result_cache import cache_contains, cache_key, cache_store, content_digest
+from Analysis_Functions.snapshot_cache import option_slug
+from Analysis_Functions.sql_backend import active_backend, configure_backend
+
+logger = logging.getLogger(__name__)
+
+SHARED_DIR = os.path.join(".cache", "shared")
+# Tek çekirdekli makinede süreç havuzu kazanç getirmez; analizler ana iş parçacığında çalışır
+MAX_WORKERS = min(4, (os.cpu_count() or 1) - 1)
+
+_settings = {"max_workers": MAX_WORKERS, "directory": SHARED_DIR}
+_executor = None
+_executor_lock = threading.Lock()
+# Havuz sürecinde okunmuş tablolar: yol -> DataFrame (her süreç bir tabloyu bir kez okur)
+_loaded_frames = OrderedDict()
+_MAX_LOADED_FRAMES = 2
+# Bu süreçte yazılmış ve bekleyen görevlerin okuyacağı dosyalar: yol -> görev sayısı. Eski dosyalar
+# yalnızca _files_lock altında ve kullanımda değilken silinir; başka oturumun görevleri dosyayı
+# açmadan önce dosyası silinmez.
+_files_in_use = Counter()
+_files_lock = threading.Lock()
+
+
+def _init_worker():
+    """Havuz süreçleri ekransız çalışır; analizlerin ürettiği figürler Agg ile çizilir."""
+    matplotlib.use("Agg")
+
+
+def _pool():
+    """Analizler için paylaşılan süreç havuzunu (ilk kullanımda) döndürür; max_workers 0 ise None."""
+    global _executor
+    with _executor_lock:
+        if _executor is None and _settings["max_workers"] > 0:
+            # Streamlit sunucusu çok iş parçacıklı olduğundan süreçler fork yerine spawn ile başlatılır
+            _executor = ProcessPoolExecutor(
+                max_workers=_settings["max_workers"],
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+            )
+        return _executor
+
+
+def configure_parallel(max_workers=None, directory=None):
+    """
+    Havuz boyutunu ve paylaşılan Arrow dosyalarının klasörünü değiştirir.
+    max_workers=0 paralel çalıştırmayı kapatır; havuz boyutu değişirse mevcut havuz kapatılır.
+    """
+    global _executor
+    if directory is not None:
+        _settings["directory"] = directory
+    if max_workers is not None and max_workers != _settings["max_workers"]:
+        _settings["max_workers"] = max_workers
+        with _executor_lock:
+            if _executor is not None:
+                _executor.shutdown(wait=True)
+            _executor = None
+
+
+def publish_frame(df, fingerprint, name):
+    """
+    DataFrame'i süreçler arasında paylaşılmak üzere sıkıştırılmamış bir Arrow IPC dosyasına yazar.
+
+    Dosya adı tablo adı, analiz tipi (fingerprint[0]), parmak izi ve tablonun içerik özetinden
+    (result_cache.content_digest) türetilir: farklı analiz tiplerinin oturumları birbirinin
+    dosyalarına dokunmaz, aynı veri setinden kesilen farklı tablolar (ör. as_of dilimi ve ondan
+    kurulan küp) ayrı dosyalara yazılır. Aynı tablo için dosya zaten varsa yeniden yazılmaz. Aynı
+    analiz tipinin eski parmak izlerine ait dosyalar _files_lock altında silinir; bu süreçte
+    bekleyen görevlerin okuyacağı dosyalar ve silinemeyenler (Windows'ta başka bir süreçte bellek
+    eşlemeli açık olanlar) bırakılır, sonraki yayında yeniden denenir. Havuz süreçleri dosyayı
+    bellek eşlemeli (memory map) açar; böylece df her görev için ayrı ayrı pickle edilmez.
+    df.attrs (ör. küpün 'kind' etiketi) şema meta verisinde saklanır.
+
+    Returns:
+        str: Dosya yolu.
+    """
+    directory = _settings["directory"]
+    os.makedirs(directory, exist_ok=True)
+    prefix = f"{name}-{option_slug(str(fingerprint[0]))}-"
+    digest = hashlib.blake2b(repr(fingerprint).encode("utf-8"), digest_size=8).hexdigest()
+    path = os.path.abspath(os.path.join(directory, f"{prefix}{digest}-{content_digest(df)[:16]}.arrow"))
+    with _files_lock:
+        if os.path.exists(path):
+            return path
+        for stale in os.listdir(directory):
+            stale_path = os.path.abspath(os.path.join(directory, stale))
+            if (
+                stale.startswith(prefix) and stale.endswith(".arrow")
+                and not stale.startswith(f"{prefix}{digest}-") and not _files_in_use[stale_path]
+            ):
+                try:
+                    os.remove(stale_path)
+                except OSError:
+                    pass
+    table = pa.Table.from_pandas(df, preserve_index=True)
+    metadata = dict(table.schema.metadata or {})
+    metadata[b"attrs"] = json.dumps(df.attrs, default=str).encode("utf-8")
+    table = table.replace_schema_metadata(metadata)
+    # Yarıda kalan bir yazma okuyuculara görünmesin diye geçici (yazana özgü) adla yazılıp taşınır
+    temporary = f"{path}.{os.getpid()}-{threading.get_ident()}.tmp"
+    with pa.OSFile(temporary, "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+        writer.write_table(table)
+    os.replace(temporary, path)
+    return path
+
+
+def _use_file(path):
+    with _files_lock:
+        _files_in_use[path] += 1
+
+
+def _release_file(path):
+    with _files_lock:
+        _files_in_use[path] -= 1
+        if _files_in_use[path] <= 0:
+            del _files_in_use[path]
+
+
+def load_frame(path):
+    """publish_frame ile yazılmış dosyayı bellek eşlemeli okur ve DataFrame'e (attrs ile) çevirir."""
+    if path in _loaded_frames:
+        _loaded_frames.move_to_end(path)
+        return _loaded_frames[path]
+    table = pa.ipc.open_file(pa.memory_map(path)).read_all()
+    df = table.to_pandas()
+    df.attrs.update(json.loads((table.schema.metadata or {}).get(b"attrs", b"{}")))
+    _loaded_frames[path] = df
+    while len(_loaded_frames) > _MAX_LOADED_FRAMES:
+        _loaded_frames.popitem(last=False)
+    return df
+
+
+def _run_task(path, func, kwargs, backend):
+    """
+    Havuz sürecinde çalışır: ana süreçte seçili hesaplama arka ucunu (sql_backend) uygular,
+    paylaşılan tabloyu açar ve func(df, **kwargs) sonucunu döndürür.
+    """
+    configure_backend(backend)
+    return func(load_frame(path), **kwargs)
+
+
+def submit_analyses(tasks, frames, fingerprint, futures):
+    """
+    Birbirinden bağımsız analizleri süreç havuzunda başlatır.
+
+    Her görev result_cache.cached_call(fingerprint, func, frames[girdi], **kwargs) ile aynı
+    anahtarı kullanır; önbellekte sonucu olan ya da futures içinde zaten çalışan görevler
+    yeniden başlatılmaz. Girdi tabloları ilk ihtiyaçta publish_frame ile yazılır. Havuz
+    kapalıysa hiçbir şey yapılmaz ve analizler çağrıldıkları yerde sırayla hesaplanır.
+
+    Parameters:
+        tasks (list of tuple): (func, girdi_adı, kwargs) üçlüleri; func modül düzeyinde tanımlı,
+            Streamlit'e yazmayan ve sonucu pickle edilebilen bir fonksiyon olmalıdır.
+        frames (dict): Girdi adı -> DataFrame ya da DataFrame döndüren fonksiyon (ör. küpü
+            gerektiğinde kuran bir lambda).
+        fingerprint (tuple): result_cache.dataset_fingerprint çıktısı.
+        futures (dict): Önbellek anahtarı -> Future; yeni başlatılan görevler buraya eklenir.
+
+    Returns:
+        list: Görevlerin önbellek anahtarları (sonuçları collect_analyses ile beklenebilir).
+    """
+    pool = _pool()
+    if pool is None:
+        return []
+    paths, frame_objects, keys = {}, {}, []
+    for func, frame_name, kwargs in tasks:
+        if frame_name not in frame_objects:
+            frame = frames[frame_name]
+            frame_objects[frame_name] = frame() if callable(frame) else frame
+        key = cache_key(fingerprint, func, frame_objects[frame_name], **kwargs)
+        keys.append(key)
+        if key in futures or cache_contains(key):
+            continue
+        if frame_name not in paths:
+            paths[frame_name] = publish_frame(frame_objects[frame_name], fingerprint, frame_name)
+        path = paths[frame_name]
+        _use_file(path)
+        future = pool.submit(_run_task, path, func, kwargs, active_backend())
+        future.add_done_callback(lambda _, path=path: _release_file(path))
+        futures[key] = future
+    return keys
+
+
+def collect_analyses(futures, keys=None):
+    """
+    Tamamlanan (ya da beklenen) analiz sonuçlarını result_cache'e yazar.
+
+    Başarısız görevler (ör. sonucu pickle edilemeyen analizler) hatalarıyla loglanıp atlanır;
+    bu analizler daha sonra cached_call ile ana iş parçacığında yeniden hesaplanır.
+
+    Parameters:
+        futures (dict): submit_analyses çıktısı; toplanan anahtarlar sözlükten çıkarılır.
+        keys (iterable, optional): Yalnızca bu anahtarları bekler; verilmezse tümünü bekler.
+    """
+    for key in list(futures if keys is None else keys):
+        future = futures.pop(key, None)
+        if future is None:
+            continue
+        try:
+            cache_store(key, future.result())
+        except Exception:
+            # Sonuç cached_call ile ana iş parçacığında hesaplanır
+            logger.warning("Havuzdaki analiz başarısız oldu, ana iş parçacığında hesaplanacak: %s", key[1], exc_info=True)
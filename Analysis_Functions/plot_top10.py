@@ -2,24 +2,30 @@ import pandas as pd
 import matplotlib.pyplot as plt
 import streamlit as st
 
-def plot_top10_products_per_year(df: pd.DataFrame) -> None:
+from Analysis_Functions.date_index import analysis_windows, date_window
+from Analysis_Functions.figure_cache import show_figure
+
+def compute_top10_products_per_year(df: pd.DataFrame, as_of=None) -> pd.DataFrame:
     """
-    Her yıl (2020–2025) için en çok satan 10 ürünün toplam satışlarını çubuk grafik olarak gösterir.
-    Her çubuğun içine o yılın top 10 ürün isimlerini yazar. Ayrıca detaylı tabloyu gösterir.
+    as_of'a kadarki son altı yılın (as_of verilmezse verideki son satış günü) her yılı için en çok satan 10 ürünü ve toplam satışlarını hesaplar.
 
     Args:
         df (pd.DataFrame): Satış verisi. 'Year', 'Date', 'ProductName', 'Sale_Amount' sütunlarını içermelidir.
+        as_of (str/Timestamp, optional): Analiz tarihi; yıllar date_index.analysis_windows'tan alınır.
+
+    Returns:
+        pd.DataFrame: Year, ProductName, Sale_Amount; yıl içinde satışa göre azalan sırada.
     """
-    # Verinin kopyasını al ve yıl aralığını filtrele
-    df_filtered = df.copy()
+    # Yıl aralığını filtrele (tarihe göre sıralı satırlarda ikili arama + dilim) ve yalnızca pencerenin kopyasını al
+    windows = analysis_windows(as_of, df)
+    df_filtered = date_window(df, windows["overview_since"], windows["stop"], column="Date").copy()
     df_filtered["Year"] = df_filtered["Year"].astype(int)
-    df_filtered = df_filtered[df_filtered["Year"].between(2020, 2025)]
     df_filtered = df_filtered.sort_values(by="Date", ascending=True)
 
     # Yıl ve ürün bazında toplam satışları hesapla
     sales_by_year_product = (
         df_filtered
-        .groupby(['Year', 'ProductName'])['Sale_Amount']
+        .groupby(['Year', 'ProductName'], observed=True)['Sale_Amount']
         .sum()
         .reset_index()
     )
@@ -31,7 +37,14 @@ def plot_top10_products_per_year(df: pd.DataFrame) -> None:
         .groupby('Year')
         .head(10)
     )
+    return top10_per_year
 
+
+def show_top10_products_per_year(top10_per_year: pd.DataFrame) -> None:
+    """
+    compute_top10_products_per_year sonucunu çubuk grafik olarak gösterir; her çubuğun içine
+    o yılın top 10 ürün isimlerini yazar. Ayrıca detaylı tabloyu gösterir.
+    """
     # Her yılın top 10 ürünlerinin toplam satışını hesapla
     sum_top10_sales = top10_per_year.groupby('Year')['Sale_Amount'].sum().reset_index()
 
@@ -64,7 +77,7 @@ def plot_top10_products_per_year(df: pd.DataFrame) -> None:
         )
 
     # Grafik başlık ve eksen ayarları
-    ax.set_title('2020–2025 Arası Yıllık En Çok Satan 10 Ürünler', fontsize=18)
+    ax.set_title(f"{sum_top10_sales['Year'].min()}–{sum_top10_sales['Year'].max()} Arası Yıllık En Çok Satan 10 Ürünler", fontsize=18)
     ax.set_xlabel('Yıl', fontsize=14)
     ax.set_ylabel('Toplam Satış Miktarı (Top 10 Ürün)', fontsize=14)
     ax.set_xticks(sum_top10_sales['Year'])
@@ -72,29 +85,44 @@ def plot_top10_products_per_year(df: pd.DataFrame) -> None:
     ax.grid(axis='y')
 
     # Streamlit ile grafiği ve tabloyu göster
-    st.pyplot(fig)
+    show_figure(fig)
     st.subheader("📄 Detaylı Ürün Satış Tablosu (Her Yılın En Çok Satan 10 Ürünü)")
     st.dataframe(top10_per_year.sort_values(['Year', 'Sale_Amount'], ascending=[True, False]))
 
 
-def plot_top10_productsandcustomers_per_year(df: pd.DataFrame) -> None:
+def plot_top10_products_per_year(df: pd.DataFrame) -> None:
     """
-    Her yıl (2020–2025) için en çok satan 10 müşteri-ürün kombinasyonunun toplam satışlarını çubuk grafik olarak gösterir.
-    Her çubuğun içine o yılın top 10 müşteri-ürün kombinasyonunu yazar. Ayrıca detaylı tabloyu gösterir.
+    as_of'a kadarki son altı yılın (as_of verilmezse verideki son satış günü) her yılı için en çok satan 10 ürünün toplam satışlarını çubuk grafik olarak gösterir.
+    Her çubuğun içine o yılın top 10 ürün isimlerini yazar. Ayrıca detaylı tabloyu gösterir.
+
+    Args:
+        df (pd.DataFrame): Satış verisi. 'Year', 'Date', 'ProductName', 'Sale_Amount' sütunlarını içermelidir.
+    """
+    show_top10_products_per_year(compute_top10_products_per_year(df))
+
+
+def compute_top10_productsandcustomers_per_year(df: pd.DataFrame, as_of=None) -> pd.DataFrame:
+    """
+    as_of'a kadarki son altı yılın (as_of verilmezse verideki son satış günü) her yılı için en çok satan 10 müşteri-ürün kombinasyonunu ve
+    toplam satışlarını hesaplar.
 
     Args:
         df (pd.DataFrame): Satış verisi. 'Year', 'Date', 'CustomerName', 'ProductName', 'Sale_Amount' sütunlarını içermelidir.
+        as_of (str/Timestamp, optional): Analiz tarihi; yıllar date_index.analysis_windows'tan alınır.
+
+    Returns:
+        pd.DataFrame: Year, CustomerName, ProductName, Sale_Amount ve 'Müşteri - Ürün' etiketi (Label).
     """
-    # Verinin kopyasını al ve yıl aralığını filtrele
-    df_filtered = df.copy()
-    df_filtered = df_filtered[df_filtered["Year"].between(2020, 2025)]
+    # Yıl aralığını filtrele (tarihe göre sıralı satırlarda ikili arama + dilim) ve yalnızca pencerenin kopyasını al
+    windows = analysis_windows(as_of, df)
+    df_filtered = date_window(df, windows["overview_since"], windows["stop"], column="Date").copy()
     df_filtered["Year"] = df_filtered["Year"].astype(int)
     df_filtered = df_filtered.sort_values(by="Date", ascending=True)
 
     # Yıl, müşteri ve ürün bazında toplam satışları hesapla
     sales_by_year_product_customer = (
         df_filtered
-        .groupby(['Year', 'CustomerName', 'ProductName'])['Sale_Amount']
+        .groupby(['Year', 'CustomerName', 'ProductName'], observed=True)['Sale_Amount']
         .sum()
         .reset_index()
     )
@@ -109,9 +137,16 @@ def plot_top10_productsandcustomers_per_year(df: pd.DataFrame) -> None:
 
     # Müşteri ve ürün adlarını birleştir (etiket olarak)
     top10_per_year_product['Label'] = (
-        top10_per_year_product['CustomerName'] + " - " + top10_per_year_product['ProductName']
+        top10_per_year_product['CustomerName'].astype(str) + " - " + top10_per_year_product['ProductName'].astype(str)
     )
+    return top10_per_year_product
+
 
+def show_top10_productsandcustomers_per_year(top10_per_year_product: pd.DataFrame) -> None:
+    """
+    compute_top10_productsandcustomers_per_year sonucunu çubuk grafik olarak gösterir; her çubuğun
+    içine o yılın top 10 müşteri-ürün kombinasyonunu yazar. Ayrıca detaylı tabloyu gösterir.
+    """
     # Her yıl için etiketleri birleştir (çubuk içine yazmak için)
     top10_product_labels = (
         top10_per_year_product.groupby('Year')['Label']
@@ -144,7 +179,7 @@ def plot_top10_productsandcustomers_per_year(df: pd.DataFrame) -> None:
         )
 
     # Grafik başlık ve eksen ayarları
-    ax.set_title('2020–2025 Arası Yıllık En Çok Satan 10 Müşteri-Ürün', fontsize=18)
+    ax.set_title(f"{sum_top10_sales['Year'].min()}–{sum_top10_sales['Year'].max()} Arası Yıllık En Çok Satan 10 Müşteri-Ürün", fontsize=18)
     ax.set_xlabel('Yıl', fontsize=14)
     ax.set_ylabel('Toplam Satış Miktarı (Top 10)', fontsize=14)
     ax.set_xticks(sum_top10_sales['Year'])
@@ -152,6 +187,17 @@ def plot_top10_productsandcustomers_per_year(df: pd.DataFrame) -> None:
     ax.grid(axis='y')
 
     # Streamlit ile grafiği ve tabloyu göster
-    st.pyplot(fig)
+    show_figure(fig)
     st.subheader("📄 Detaylı Satış Tablosu (Her Yılın En Çok Satan 10 Müşteri-Ürün)")
-    st.dataframe(top10_per_year_product.sort_values(['Year', 'Sale_Amount'], ascending=[True, False]))
\ No newline at end of file
+    st.dataframe(top10_per_year_product.sort_values(['Year', 'Sale_Amount'], ascending=[True, False]))
+
+
+def plot_top10_productsandcustomers_per_year(df: pd.DataFrame) -> None:
+    """
+    as_of'a kadarki son altı yılın (as_of verilmezse verideki son satış günü) her yılı için en çok satan 10 müşteri-ürün kombinasyonunun toplam satışlarını çubuk grafik olarak gösterir.
+    Her çubuğun içine o yılın top 10 müşteri-ürün kombinasyonunu yazar. Ayrıca detaylı tabloyu gösterir.
+
+    Args:
+        df (pd.DataFrame): Satış verisi. 'Year', 'Date', 'CustomerName', 'ProductName', 'Sale_Amount' sütunlarını içermelidir.
+    """
+    show_top10_productsandcustomers_per_year(compute_top10_productsandcustomers_per_year(df))
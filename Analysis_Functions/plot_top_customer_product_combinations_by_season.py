@@ -2,6 +2,8 @@ import matplotlib.pyplot as plt
 import seaborn as sns
 from matplotlib.ticker import ScalarFormatter
 
+from Analysis_Functions.grouped_topk import compute_top_k
+
 def plot_top_customer_product_combinations_by_season(df, years=[2024, 2025]):
     """
     Her yıl için sezon bazında en çok satan 5 ürün–müşteri kombinasyonunu gösteren grafikler üretir.
@@ -19,24 +21,17 @@ def plot_top_customer_product_combinations_by_season(df, years=[2024, 2025]):
     # Sonuç grafiklerini saklamak için bir sözlük oluştur
     result_figures = {}
     # Sadece belirtilen yılları içeren veriyi filtrele
-    df_filtered = df[df['Year'].isin(years)].copy()
-
-    for year in years:
-        # İlgili yılın verisini al
-        year_df = df_filtered[df_filtered['Year'] == year]
+    df_filtered = df[df['Year'].isin(years)]
 
-        # Sezon + Ürün + Müşteri bazında satış toplamı (adet olarak)
-        sales = year_df.groupby(['Season', 'ProductName', 'CustomerName'])['Sale_Amount'].count().reset_index()
+    # Tüm yıllar için Sezon + Ürün + Müşteri bazında satış sayısı; her sezon için en çok satış yapan ilk 5 kombinasyonu seç
+    top_all = compute_top_k(df_filtered, ['Year', 'Season'], ['ProductName', 'CustomerName'], metric='frequency', k=5)
 
-        # Ürün ve müşteri isimlerini birleştirerek yeni bir sütun oluştur
-        sales['Product_Customer'] = sales['ProductName'] + ' - ' + sales['CustomerName']
+    # Ürün ve müşteri isimlerini yalnızca seçilen satırlar için birleştirerek yeni bir sütun oluştur
+    top_all['Product_Customer'] = top_all['ProductName'].astype(str) + ' - ' + top_all['CustomerName'].astype(str)
 
-        # Her sezon için en çok satış yapan ilk 5 ürün–müşteri kombinasyonunu seç
-        top_combinations = (
-            sales.groupby('Season')
-            .apply(lambda x: x.sort_values('Sale_Amount', ascending=False).head(5))
-            .reset_index(drop=True)
-        )
+    for year in years:
+        # İlgili yılın sonuçlarını al
+        top_combinations = top_all[top_all['Year'] == year].reset_index(drop=True)
 
         # Grafik çizimi
         fig, ax = plt.subplots(figsize=(14, 7))
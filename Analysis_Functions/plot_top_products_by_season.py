@@ -2,29 +2,34 @@ import matplotlib.pyplot as plt
 import seaborn as sns
 from matplotlib.ticker import ScalarFormatter
 
-def plot_top_products_by_season(df, years=[2024, 2025]):
+from Analysis_Functions.date_index import analysis_windows, years_window
+from Analysis_Functions.grouped_topk import compute_top_k
+
+def plot_top_products_by_season(df, years=None, as_of=None):
     """
     Her yıl için ayrı sezon bazlı en çok satan 5 ürün grafiği üretir.
 
+    Parameters:
+        df (pd.DataFrame): preprocessing çıktısı.
+        years (list of int, optional): Yıllar; verilmezse as_of'un son iki yılı (as_of verilmezse verideki son satış günü).
+        as_of (str/Timestamp, optional): Analiz tarihi (date_index.analysis_windows).
+
     Returns:
         Dict[int, matplotlib.figure.Figure]: Yıl → Grafik eşleşmesi
     """
     result_figures = {}
-    # Sadece belirtilen yılları filtrele
-    df_filtered = df[df['Year'].isin(years)].copy()
+    if years is None:
+        years = list(analysis_windows(as_of, df)['recent_years'])
+    # Sadece belirtilen yılları filtrele (ardışık yıllar tarihe göre sıralı satırlarda tek dilimdir)
+    df_filtered = years_window(df, years)
+    # Tüm yıllar için sezon ve ürün bazında toplam satış miktarını hesapla, her sezon için en çok satan 5 ürünü seç
+    top_all = compute_top_k(df_filtered, ['Year', 'Season'], ['ProductName'], metric='quantity', k=5)
 
     for year in years:
-        # İlgili yılın verilerini al
-        year_df = df_filtered[df_filtered['Year'] == year]
-        # Sezon ve ürün bazında toplam satış miktarını hesapla
-        sales = year_df.groupby(['Season', 'ProductName'])['Sale_Amount'].sum().reset_index()
-
-        # Her sezon için en çok satan 5 ürünü seç
-        top_products = (
-            sales.groupby('Season')
-            .apply(lambda x: x.sort_values('Sale_Amount', ascending=False).head(5))
-            .reset_index(drop=True)
-        )
+        # İlgili yılın sonuçlarını al
+        top_products = top_all[top_all['Year'] == year].reset_index(drop=True)
+        # Kategori sütunu lejantta tüm sözlüğü göstermesin diye metne çevrilir
+        top_products['ProductName'] = top_products['ProductName'].astype(str)
 
         # Grafik oluştur
         fig, ax = plt.subplots(figsize=(12, 6))
@@ -2,28 +2,33 @@ import matplotlib.pyplot as plt
 import seaborn as sns
 from matplotlib.ticker import ScalarFormatter
 
-def plot_top_selling_product_customer_by_season(df, years=[2024, 2025]):
+from Analysis_Functions.date_index import analysis_windows, years_window
+from Analysis_Functions.grouped_topk import compute_top_k
+
+def plot_top_selling_product_customer_by_season(df, years=None, as_of=None):
     """
     Her yıl için sezon bazında en çok satan 5 ürün–müşteri kombinasyonunu gösteren grafik üretir.
 
+    Parameters:
+        df (pd.DataFrame): preprocessing çıktısı.
+        years (list of int, optional): Yıllar; verilmezse as_of'un son iki yılı (as_of verilmezse verideki son satış günü).
+        as_of (str/Timestamp, optional): Analiz tarihi (date_index.analysis_windows).
+
     Returns:
         Dict[int, matplotlib.figure.Figure]: Yıl → Grafik eşleşmesi
     """
     result_figures = {}
-    df_filtered = df[df['Year'].isin(years)].copy()
+    if years is None:
+        years = list(analysis_windows(as_of, df)['recent_years'])
+    # Sadece belirtilen yılları filtrele (ardışık yıllar tarihe göre sıralı satırlarda tek dilimdir)
+    df_filtered = years_window(df, years)
+    # Tüm yıllar için Sezon + Ürün + Müşteri bazında satış toplamı; her sezon için en çok satış yapan ilk 5 kombinasyon
+    top_all = compute_top_k(df_filtered, ['Year', 'Season'], ['ProductName', 'CustomerName'], metric='quantity', k=5)
+    # Ürün + Müşteri ismini yalnızca seçilen satırlar için birleştir
+    top_all['Product_Customer'] = top_all['ProductName'].astype(str) + ' - ' + top_all['CustomerName'].astype(str)
 
     for year in years:
-        year_df = df_filtered[df_filtered['Year'] == year]
-        # Sezon + Ürün + Müşteri bazında satış toplamı
-        sales = year_df.groupby(['Season', 'ProductName', 'CustomerName'])['Sale_Amount'].sum().reset_index()
-        # Ürün + Müşteri ismini birleştir
-        sales['Product_Customer'] = sales['ProductName'] + ' - ' + sales['CustomerName']
-        # Her sezon için en çok satış yapan ilk 5 ürün–müşteri kombinasyonu
-        top_combinations = (
-            sales.groupby('Season')
-            .apply(lambda x: x.sort_values('Sale_Amount', ascending=False).head(5))
-            .reset_index(drop=True)
-        )
+        top_combinations = top_all[top_all['Year'] == year].reset_index(drop=True)
         # Grafik çizimi
         fig, ax = plt.subplots(figsize=(14, 7))
         sns.barplot(data=top_combinations, x='Season', y='Sale_Amount', hue='Product_Customer', ax=ax)
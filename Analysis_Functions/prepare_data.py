@@ -1,5 +1,9 @@
+import numpy as np
 import pandas as pd 
 
+from Analysis_Functions.categorical_schema import add_encoded_columns, encode_identity_columns
+from Analysis_Functions.date_index import mark_date_sorted
+
 """
 İhtiyacımız olan veriler : 
 Date  :2024-12-11 00:00:00
@@ -24,12 +28,14 @@ Gelen veri dipsos/ sachet veya diğer ürün grupları ( sos / baharat olarak ay
 def preprocessing(df):
     df=show_data(df)
     df = prepare_data(df)
-    df["Season"] = df["Month"].apply(create_season_data)
-    df["Season"] = df["Season"].astype('category')
+    df = create_season_column(df)
     df = create_special_day_data(df)
     df = label_data(df)
     df = update_customercodes(df)
-    return df
+    df = encode_identity_columns(df, columns=["CustomerCode"])
+    df = add_encoded_columns(df)
+    # Satırlar Date'e göre sıralı (prepare_data); zaman pencereleri ikili aramayla dilimlenir (date_index)
+    return mark_date_sorted(df)
 
 
 def show_data(df):
@@ -40,6 +46,7 @@ def show_data(df):
     """
     print("İlk 5 satır:",df.head(5))
     print("Sütunlar:",df.columns)
+    return df
     
 def prepare_data(df):
     #Create New Columns 
@@ -62,12 +69,8 @@ def prepare_data(df):
     #Data Formatting 
     df["Label"] = df["Label"].str.strip()
     df["Channel"]=df["Channel"].str.strip()
-    df['Product_Code'] = df['Product_Code'].str.strip()
-    df["Product_Code"]=df["Product_Code"].str.upper()
-    df['Product_Code'] = df['Product_Code'].str.strip()
-    df['Product_Code'] = df['Product_Code'].str.upper()
-    df["ProductName"]=df["ProductName"].str.upper()
-    df["CustomerName"]=df["CustomerName"].str.upper()
+    # Müşteri/ürün kimlikleri ortak sözlüklü kategoriye çevrilir; strip/upper satır başına değil sözlükte bir kez yapılır
+    df = encode_identity_columns(df)
     df['Unit_Price(TL)'] = (
         df['Unit_Price(TL)']
         .astype(str)
@@ -84,6 +87,34 @@ def prepare_data(df):
     df.sort_values(by="Date",ascending=True,inplace=True)
     return df
 
+# Ay (1-12) -> sezon tablosu; satır satır if/elif yerine tek bir dizi indekslemesiyle kullanılır
+SEASON_BY_MONTH = np.array([
+    "Kış", "Kış", "İlkbahar", "İlkbahar", "İlkbahar", "Yaz",
+    "Yaz", "Yaz", "Sonbahar", "Sonbahar", "Sonbahar", "Kış"
+], dtype=object)
+SEASON_CATEGORIES = sorted(set(SEASON_BY_MONTH))
+_SEASON_CODE_BY_MONTH = np.array([SEASON_CATEGORIES.index(season) for season in SEASON_BY_MONTH], dtype=np.int8)
+
+
+def create_season_column(df):
+    """
+    Adds a categorical 'Season' column derived from the 'Month' column.
+    The month number is used as an index into a 12-entry month -> season code table, so no
+    per-row Python call is made. Months outside 1-12 get a missing season, as
+    create_season_data would return None for them.
+    Parameters:
+        df (pd.DataFrame): DataFrame with an integer 'Month' column.
+    Returns:
+        pd.DataFrame: The input DataFrame with an added categorical 'Season' column.
+    """
+    month = df["Month"].to_numpy()
+    valid = (month >= 1) & (month <= 12)
+    codes = np.full(len(month), -1, dtype=np.int8)
+    codes[valid] = _SEASON_CODE_BY_MONTH[month[valid] - 1]
+    df["Season"] = pd.Categorical.from_codes(codes, categories=SEASON_CATEGORIES).remove_unused_categories()
+    return df
+
+
 def create_season_data(month):
     """
     Assigns a season label to the input DataFrame row based on the value of the 'Month' column.
@@ -131,70 +162,64 @@ def create_special_day_data(df):
         "Ocak": 1, "Şubat": 2, "Mart": 3, "Nisan": 4, "Mayıs": 5, "Haziran": 6,
         "Temmuz": 7, "Ağustos": 8, "Eylül": 9, "Ekim": 10, "Kasım": 11, "Aralık": 12
     }
-    # Ters çevir (sayıdan isme erişmek için)
-    number_to_month = {v: k for k, v in month_to_number.items()}
-
-    # Ay ismine göre karşılaştır
-    def is_special_day(row):
-        year = row["Year"]
-        month = number_to_month.get(row["Month"])
-        if month is None:
-            return False
-        return (
-            ramazan_bayrami.get(year) == month or
-            kurban_bayrami.get(year) == month
-        )
-
-    df["Special_Day"] = df.apply(is_special_day, axis=1)
+    # (Yıl, Ay) çiftlerini tek bir tamsayı anahtara (Yıl*100 + Ay) çevirip tablo olarak eşleştir
+    holiday_keys = np.array(
+        [year * 100 + month_to_number[month]
+         for holidays in (ramazan_bayrami, kurban_bayrami)
+         for year, month in holidays.items()],
+        dtype=np.int64
+    )
+    row_keys = df["Year"].to_numpy(dtype=np.int64) * 100 + df["Month"].to_numpy(dtype=np.int64)
+
+    df["Special_Day"] = np.isin(row_keys, holiday_keys)
     return df
 
 
+# Dipsos/Sachet olarak etiketlenen (CustomerCode, Product_Code) çiftleri
+DIPSOS_SACHET_PAIRS = [
+    ["120-35-021", "PIZ001"], ["120-34-029", "D40000004"], ["120-35-021", "PIZ004"],
+    ["120-35-021", "PIZ006"], ["120-35-041", "PIZ006"], ["120-35-042", "PIZ006"],
+    ["120-33-001", "MRN013"], ["120-41-004", "YUM005"], ["120-41-004", "YUM006"],
+    ["120-41-004", "YUM007"], ["120-41-004", "YUM008"], ["120-41-004", "YUM009"],
+    ["120-34-063", "LCE008"], ["120-34-063", "LCE009"], ["120-41-004", "YUM012"],
+    ["120-34-063", "LCE014"], ["120-34-063", "LCE015"], ["120-34-063", "LCE016"],
+    ["120-34-063", "LCE017"], ["120-34-063", "LCE019"], ["120-34-063", "LCE020"],
+    ["120-34-063", "LCE018"], ["120-34-085", "CSMK001"], ["120-34-085", "CSMK002"],
+    ["120-22-001", "CSSC001"], ["120-23-001", "CSSC001"], ["120-07-006", "CSSC001"],
+    ["120-34-097", "CSSC001"], ["120-34-095", "TVD011"], ["120-34-095", "TVD012"],
+    ["120-34-095", "TVD013"], ["120-35-149", "ORG001"], ["120-34-063", "LCE021"],
+    ["120-34-029", "D40001846"], ["120-34-063", "LCE022"], ["120-34-063", "LCE023"],
+    ["120-34-103", "CSSC001"], ["120-34-104", "CSSC001"], ["120-07-007", "CSSC001"],
+    ["120-07-008", "CSSC001"], ["120-34-106", "ORG001"], ["120-67-001", "CSSC001"],
+    ["120-35-160", "CSDO001"], ["120-35-021", "PIZ019"], ["120-35-021", "PIZ020"],
+    ["120-34-112", "CSSC001"], ["120-35-021", "PIZ021"], ["120-06-011", "CSSC001"],
+    ["120-06-012", "CSSC001"], ["120-34-119", "CSSC001"], ["120-34-120", "CSSC001"],
+    ["120-41-004", "YUM019"], ["120-25-001", "CSSC001"], ["120-10-002", "CSSC001"],
+    ["120-34-110", "CSSC001"], ["120-01-006", "CSSC001"], ["120-34-013", "CSSC001"],
+    ["120-34-013", "CSSC008"], ["120-34-013", "CSSC009"], ["120-34-013", "CSSC010"],
+    ["120-34-122", "CSSC009"], ["120-34-122", "CSSC010"], ["120-34-122", "CSSC008"],
+    ["120-34-122", "CSSC011"], ["120-34-122", "CSSC012"], ["120-34-122", "CSSC013"],
+    ["120-34-122", "CSSC014"], ["120-34-122", "CSSC015"], ["120-34-122", "CSSC016"],
+    ["120-34-122", "CSSC017"], ["120-34-122", "CSSC018"], ["120-34-122", "CSSC019"],
+    ["120-34-122", "CSSC020"], ["120-34-122", "CSSC021"], ["120-34-122", "CSSC022"],
+    ["120-34-122", "CSSC001"], ["120-34-063", "LCE027"], ["120-34-126", "CSSC018"],
+    ["120-34-126", "CSSC019"], ["120-34-126", "CSSC021"], ["120-34-126", "CSSC022"],
+    ["120-34-123", "CSSC001"], ["120-34-128", "YUM019"], ["120-34-128", "YUM007"],
+    ["120-34-128", "YUM008"], ["120-34-128", "YUM005"], ["120-34-129", "CSSC001"],
+    ["120-34-130", "CSSC001"], ["120-34-128", "YUM023"], ["120-34-137", "CSSC001"],
+    ["120-41-004", "YUM023"], ["120-34-148", "YUM005"], ["120-34-148", "YUM023"],
+    ["120-42-005", "CSSC001"], ["120-41-002", "BKN001"], ["120-34-029", "D40003146"],
+    ["120-34-029", "D40003147"], ["120-34-029", "D40003148"], ["120-41-002", "PPY001"],
+    ["120-41-002", "PPY002"], ["120-41-002", "PPY003"], ["120-34-029", "D40003659"],
+    ["120-41-002", "SBR001"], ["120-41-002", "SBR002"], ["120-34-029", "D40003790"]
+]
+
+
 def label_data(df):
-    # Tüm veriyi tabloya çevirelim
-    data = [
-        ["120-35-021", "PIZ001"], ["120-34-029", "D40000004"], ["120-35-021", "PIZ004"],
-        ["120-35-021", "PIZ006"], ["120-35-041", "PIZ006"], ["120-35-042", "PIZ006"],
-        ["120-33-001", "MRN013"], ["120-41-004", "YUM005"], ["120-41-004", "YUM006"],
-        ["120-41-004", "YUM007"], ["120-41-004", "YUM008"], ["120-41-004", "YUM009"],
-        ["120-34-063", "LCE008"], ["120-34-063", "LCE009"], ["120-41-004", "YUM012"],
-        ["120-34-063", "LCE014"], ["120-34-063", "LCE015"], ["120-34-063", "LCE016"],
-        ["120-34-063", "LCE017"], ["120-34-063", "LCE019"], ["120-34-063", "LCE020"],
-        ["120-34-063", "LCE018"], ["120-34-085", "CSMK001"], ["120-34-085", "CSMK002"],
-        ["120-22-001", "CSSC001"], ["120-23-001", "CSSC001"], ["120-07-006", "CSSC001"],
-        ["120-34-097", "CSSC001"], ["120-34-095", "TVD011"], ["120-34-095", "TVD012"],
-        ["120-34-095", "TVD013"], ["120-35-149", "ORG001"], ["120-34-063", "LCE021"],
-        ["120-34-029", "D40001846"], ["120-34-063", "LCE022"], ["120-34-063", "LCE023"],
-        ["120-34-103", "CSSC001"], ["120-34-104", "CSSC001"], ["120-07-007", "CSSC001"],
-        ["120-07-008", "CSSC001"], ["120-34-106", "ORG001"], ["120-67-001", "CSSC001"],
-        ["120-35-160", "CSDO001"], ["120-35-021", "PIZ019"], ["120-35-021", "PIZ020"],
-        ["120-34-112", "CSSC001"], ["120-35-021", "PIZ021"], ["120-06-011", "CSSC001"],
-        ["120-06-012", "CSSC001"], ["120-34-119", "CSSC001"], ["120-34-120", "CSSC001"],
-        ["120-41-004", "YUM019"], ["120-25-001", "CSSC001"], ["120-10-002", "CSSC001"],
-        ["120-34-110", "CSSC001"], ["120-01-006", "CSSC001"], ["120-34-013", "CSSC001"],
-        ["120-34-013", "CSSC008"], ["120-34-013", "CSSC009"], ["120-34-013", "CSSC010"],
-        ["120-34-122", "CSSC009"], ["120-34-122", "CSSC010"], ["120-34-122", "CSSC008"],
-        ["120-34-122", "CSSC011"], ["120-34-122", "CSSC012"], ["120-34-122", "CSSC013"],
-        ["120-34-122", "CSSC014"], ["120-34-122", "CSSC015"], ["120-34-122", "CSSC016"],
-        ["120-34-122", "CSSC017"], ["120-34-122", "CSSC018"], ["120-34-122", "CSSC019"],
-        ["120-34-122", "CSSC020"], ["120-34-122", "CSSC021"], ["120-34-122", "CSSC022"],
-        ["120-34-122", "CSSC001"], ["120-34-063", "LCE027"], ["120-34-126", "CSSC018"],
-        ["120-34-126", "CSSC019"], ["120-34-126", "CSSC021"], ["120-34-126", "CSSC022"],
-        ["120-34-123", "CSSC001"], ["120-34-128", "YUM019"], ["120-34-128", "YUM007"],
-        ["120-34-128", "YUM008"], ["120-34-128", "YUM005"], ["120-34-129", "CSSC001"],
-        ["120-34-130", "CSSC001"], ["120-34-128", "YUM023"], ["120-34-137", "CSSC001"],
-        ["120-41-004", "YUM023"], ["120-34-148", "YUM005"], ["120-34-148", "YUM023"],
-        ["120-42-005", "CSSC001"], ["120-41-002", "BKN001"], ["120-34-029", "D40003146"],
-        ["120-34-029", "D40003147"], ["120-34-029", "D40003148"], ["120-41-002", "PPY001"],
-        ["120-41-002", "PPY002"], ["120-41-002", "PPY003"], ["120-34-029", "D40003659"],
-        ["120-41-002", "SBR001"], ["120-41-002", "SBR002"], ["120-34-029", "D40003790"]
-    ]
-
-    dipsos_set = set((c, p) for c, p in data)
-    # Her satır için kontrol et
-    df["Ürün Grubu"] = df.apply(
-        lambda row: "Dipsos/Sachet" if (row["CustomerCode"], row["Product_Code"]) in dipsos_set else "Other Products",
-        axis=1
-    )
+    dipsos_pairs = pd.MultiIndex.from_tuples([tuple(pair) for pair in DIPSOS_SACHET_PAIRS])
+    # Tüm satırlar için tek seferde (müşteri, ürün) üyelik testi
+    is_dipsos = pd.MultiIndex.from_arrays([df["CustomerCode"], df["Product_Code"]]).isin(dipsos_pairs)
+    df["Ürün Grubu"] = np.where(is_dipsos, "Dipsos/Sachet", "Other Products").astype(object)
     return df
 
 
@@ -208,6 +233,10 @@ def update_customercodes(df):
         "BİOKENT": "120-34-094",
         "ALAMAR F": "120-90-020"
     }
+    if isinstance(df["CustomerCode"].dtype, pd.CategoricalDtype):
+        missing = set(mapping.values()) - set(df["CustomerCode"].cat.categories)
+        if missing:
+            df["CustomerCode"] = df["CustomerCode"].cat.add_categories(sorted(missing))
     # Sadece mapping'de olanları güncelle
     df.loc[df["CustomerName"].isin(mapping.keys()), "CustomerCode"] = \
         df["CustomerName"].map(mapping)
@@ -0,0 +1,156 @@
+import contextlib
+import cProfile
+import io
+import json
+import os
+import pstats
+import time
+import tracemalloc
+
+import pandas as pd
+
+from Analysis_Functions.result_cache import cache_key, cache_lookup, cache_store
+
+PROFILE_LOG = os.path.join(".cache", "profiling.jsonl")
+# cProfile çıktısında gösterilen fonksiyon sayısı (kümülatif süreye göre)
+CPROFILE_LINES = 25
+
+
+def new_profile(option=None, fingerprint=None, cprofile=False):
+    """
+    Bir dashboard çalıştırmasının profil kaydı.
+
+    Parameters:
+        option (str, optional): Seçilen analiz tipi.
+        fingerprint (tuple, optional): result_cache.dataset_fingerprint çıktısı.
+        cprofile (bool): True ise hesaplanan her analizin cProfile özeti de saklanır.
+    """
+    return {
+        "run": pd.Timestamp.now().isoformat(timespec="seconds"),
+        "option": option,
+        "fingerprint": list(fingerprint) if fingerprint else None,
+        "cprofile": cprofile,
+        "section": None,
+        "records": [],
+    }
+
+
+def _rows(value):
+    """Sonuçtaki ilk tablonun satır sayısı; tablo yoksa None."""
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        return int(len(value))
+    items = value.values() if isinstance(value, dict) else value if isinstance(value, (list, tuple)) else ()
+    for item in items:
+        rows = _rows(item)
+        if rows is not None:
+            return rows
+    return None
+
+
+def profiled_call(profile, fingerprint, func, *args, **kwargs):
+    """
+    result_cache.cached_call'ın ölçen karşılığı: aynı anahtarı ve önbelleği kullanır.
+
+    Her çağrı için duvar saati ve CPU süresi, tracemalloc ile Python tarafındaki tepe bellek,
+    girdi tablolarının toplam ve sonucun (ilk tablosunun) satır sayısı profile['records']
+    listesine eklenir. Önbellekten gelen sonuçlar 'cached' olarak işaretlenir ve ölçülmez.
+    tracemalloc bellek ayırmalarını yavaşlattığından süreler profil modunda biraz yüksek çıkar.
+    """
+    key = cache_key(fingerprint, func, *args, **kwargs)
+    hit, value = cache_lookup(key)
+    record = {
+        "kind": "analysis",
+        "section": profile["section"],
+        "function": f"{func.__module__}.{func.__qualname__}",
+        "cached": hit,
+        "input_rows": sum(len(arg) for arg in args if isinstance(arg, (pd.DataFrame, pd.Series))),
+    }
+    if hit:
+        record.update(wall_s=0.0, cpu_s=0.0, peak_mb=None, output_rows=_rows(value))
+        profile["records"].append(record)
+        return value
+
+    # Başka bir ölçüm (ör. veri yükleme) tracemalloc'u açtıysa onun tepe değeri sıfırlanıp ek kullanım alınır
+    started_tracing = not tracemalloc.is_tracing()
+    if started_tracing:
+        tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+    tracemalloc.reset_peak()
+    profiler = cProfile.Profile() if profile["cprofile"] else None
+    wall, cpu = time.perf_counter(), time.process_time()
+    try:
+        if profiler is not None:
+            profiler.enable()
+        try:
+            value = func(*args, **kwargs)
+        finally:
+            if profiler is not None:
+                profiler.disable()
+        record["wall_s"] = round(time.perf_counter() - wall, 3)
+        record["cpu_s"] = round(time.process_time() - cpu, 3)
+        record["peak_mb"] = round((tracemalloc.get_traced_memory()[1] - baseline) / 1024 ** 2, 1)
+    finally:
+        if started_tracing:
+            tracemalloc.stop()
+    record["output_rows"] = _rows(value)
+    if profiler is not None:
+        stream = io.StringIO()
+        pstats.Stats(profiler, stream=stream).sort_stats("cumulative").print_stats(CPROFILE_LINES)
+        record["cprofile"] = stream.getvalue()
+    profile["records"].append(record)
+    cache_store(key, value)
+    return value
+
+
+@contextlib.contextmanager
+def profile_section(profile, title):
+    """
+    Bloğu (bir dashboard bölümü) ölçer; içindeki analiz çağrıları bu bölümle etiketlenir.
+    Bölüm kaydı çizim ve gösterim dahil toplam süreyi içerir. profile None ise hiçbir şey yapmaz.
+    """
+    if profile is None:
+        yield
+        return
+    profile["section"] = title
+    wall, cpu = time.perf_counter(), time.process_time()
+    try:
+        yield
+    finally:
+        profile["records"].append({
+            "kind": "section",
+            "section": title,
+            "function": None,
+            "cached": None,
+            "input_rows": None,
+            "wall_s": round(time.perf_counter() - wall, 3),
+            "cpu_s": round(time.process_time() - cpu, 3),
+            "peak_mb": None,
+            "output_rows": None,
+        })
+        profile["section"] = None
+
+
+def profile_table(profile):
+    """Profil kayıtlarını (cProfile metni hariç) tabloya çevirir; en yavaş kayıtlar üstte."""
+    columns = ["kind", "section", "function", "cached", "wall_s", "cpu_s", "peak_mb", "input_rows", "output_rows"]
+    table = pd.DataFrame(profile["records"], columns=columns)
+    table[["input_rows", "output_rows"]] = table[["input_rows", "output_rows"]].astype("Int64")
+    # Modül yolu tabloda yer kaplamasın; günlükte tam ad saklanır
+    table["function"] = table["function"].str.rsplit(".", n=1).str[-1]
+    return table.sort_values("wall_s", ascending=False, ignore_index=True)
+
+
+def append_profile_log(profile, path=PROFILE_LOG):
+    """
+    Profil kayıtlarını JSON-lines günlüğüne ekler: her satır bir kayıt, çalıştırma zamanı,
+    analiz tipi ve veri parmak izi ile. Çalıştırmalar pd.read_json(path, lines=True) ile
+    okunup karşılaştırılabilir.
+    """
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    run = {"run": profile["run"], "option": profile["option"], "fingerprint": profile["fingerprint"]}
+    with open(path, "a", encoding="utf-8") as f:
+        for record in profile["records"]:
+            f.write(json.dumps(dict(run, **record), ensure_ascii=False) + "\n")
+    return path
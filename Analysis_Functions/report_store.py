@@ -0,0 +1,215 @@
+import json
+import os
+
+import numpy as np
+import pandas as pd
+from matplotlib.figure import Figure
+
+from Analysis_Functions.figure_cache import figure_to_bytes
+from Analysis_Functions.result_cache import describe_argument
+from Analysis_Functions.snapshot_cache import option_slug
+
+REPORT_DIR = "reports"
+MANIFEST_NAME = "manifest.json"
+
+
+# --- Kayıt (gece çalışan toplu işlem) ---
+
+def new_recorder(frames=None):
+    """
+    Bölümler çalışırken analiz sonuçlarını ve gösterilen figürleri toplayan kayıt sözlüğü.
+
+    Parameters:
+        frames (dict, optional): Girdi adı -> DataFrame (ör. {'clean': df_clean}). Bu nesneler
+            anahtarda içerikleriyle değil adlarıyla yer alır; rapor açılırken veri yüklenmez.
+
+    'data_as_of' render_sections'ın yazdığı analiz tarihidir (verinin son satış günü ya da as_of).
+    """
+    return {"frames": dict(frames or {}), "results": {}, "figures": {}, "data_as_of": None}
+
+
+def result_key(func, args, kwargs, frames=None):
+    """
+    Bir analiz çağrısının rapordaki anahtarı: fonksiyon adı ve argüman tanımları (metin).
+
+    frames içindeki tablolar adlarıyla, diğer DataFrame'ler result_cache.describe_argument ile
+    (tür + satır sayısı + içerik özeti) temsil edilir; böylece kayıt ve okuma aynı anahtarı üretir.
+    """
+    frames = frames or {}
+    named = tuple(
+        next((name for name, frame in frames.items() if arg is frame), arg) for arg in args
+    )
+    return repr((f"{func.__module__}.{func.__qualname__}", describe_argument(named), describe_argument(kwargs)))
+
+
+def record_result(recorder, func, args, kwargs, value):
+    """Analiz sonucunu kayda ekler (aynı anahtar bir kez yazılır)."""
+    recorder["results"].setdefault(result_key(func, args, kwargs, recorder["frames"]), value)
+
+
+def record_figure(recorder, key, data):
+    """figure_cache'in gösterdiği bir görüntüyü (PNG/SVG byte'ları) kapsam anahtarıyla kayda ekler."""
+    recorder["figures"].setdefault(repr(key), data)
+
+
+def _write_value(value, directory, counter):
+    """Değeri dosyalara yazar ve manifestte saklanacak JSON tanımını döndürür."""
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        counter[0] += 1
+        name = f"table_{counter[0]:04d}.parquet"
+        frame = value.to_frame() if isinstance(value, pd.Series) else value
+        columns = frame.columns.tolist()
+        # Parquet yalnızca metin sütun adlarını kabul eder; özgün adlar manifestte tutulur
+        stored = frame.set_axis([f"c{i}" for i in range(len(columns))], axis=1)
+        stored.to_parquet(os.path.join(directory, name))
+        return {
+            "type": "series" if isinstance(value, pd.Series) else "frame",
+            "path": name,
+            "columns": [list(col) if isinstance(col, tuple) else col for col in columns],
+            "column_names": list(frame.columns.names),
+            "multi": isinstance(frame.columns, pd.MultiIndex),
+            "name": value.name if isinstance(value, pd.Series) else None,
+        }
+    if isinstance(value, Figure):
+        counter[0] += 1
+        name = f"figure_{counter[0]:04d}.png"
+        with open(os.path.join(directory, name), "wb") as f:
+            f.write(figure_to_bytes(value, fmt="png"))
+        return {"type": "figure", "path": name}
+    if isinstance(value, dict):
+        return {"type": "dict", "items": [[_plain(k), _write_value(v, directory, counter)] for k, v in value.items()]}
+    if isinstance(value, (list, tuple)):
+        return {"type": type(value).__name__, "items": [_write_value(v, directory, counter) for v in value]}
+    return {"type": "value", "value": _plain(value)}
+
+
+def _plain(value):
+    """JSON'a yazılabilir skaler; numpy skalerleri Python karşılıklarına, tarihler ISO metne çevrilir."""
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, (pd.Timestamp, pd.Period)):
+        return str(value)
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    raise TypeError(f"Rapora yazılamayan değer türü: {type(value).__name__}")
+
+
+def save_report(recorder, directory, meta):
+    """
+    Kaydı bir rapor klasörüne yazar: tablolar Parquet, figürler PNG, tanımlar manifest.json.
+
+    Yazılamayan sonuçlar (ör. desteklenmeyen türler) atlanır ve manifestin 'skipped' listesine
+    hata mesajıyla eklenir. Manifest en son ve geçici adla yazılıp taşınır; manifesti olmayan
+    klasör yarım kalmış sayılır ve latest_report tarafından yok sayılır.
+
+    Parameters:
+        recorder (dict): new_recorder ile oluşturulan ve bölümler çalıştırılarak doldurulan kayıt.
+        directory (str): Raporun yazılacağı klasör (ör. reports/<sürüm>/<analiz tipi>).
+        meta (dict): Manifeste eklenecek bilgiler (analiz tipi, parmak izi, satır sayısı...).
+
+    Returns:
+        dict: Yazılan manifest.
+    """
+    os.makedirs(directory, exist_ok=True)
+    counter = [0]
+    results, skipped = {}, []
+    for key, value in recorder["results"].items():
+        try:
+            results[key] = _write_value(value, directory, counter)
+        except Exception as e:
+            skipped.append({"key": key, "error": str(e)})
+    figures = {}
+    for key, data in recorder["figures"].items():
+        counter[0] += 1
+        name = f"view_{counter[0]:04d}.img"
+        with open(os.path.join(directory, name), "wb") as f:
+            f.write(data)
+        figures[key] = name
+
+    manifest = dict(meta, results=results, figures=figures, skipped=skipped)
+    path = os.path.join(directory, MANIFEST_NAME)
+    with open(path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=1, default=str)
+    os.replace(path + ".tmp", path)
+    return manifest
+
+
+# --- Okuma (dashboard) ---
+
+def latest_report(option, root=REPORT_DIR):
+    """
+    Analiz tipi için en yeni tamamlanmış raporun klasörünü döndürür; yoksa None.
+
+    Sürüm klasörleri zaman damgasıyla adlandırıldığından ada göre sıralanır.
+    """
+    if not os.path.isdir(root):
+        return None
+    for version in sorted(os.listdir(root), reverse=True):
+        directory = os.path.join(root, version, option_slug(option))
+        if os.path.exists(os.path.join(directory, MANIFEST_NAME)):
+            return directory
+    return None
+
+
+def open_report(directory):
+    """
+    Rapor klasörünü açar; tablolar ve figürler ilk istendiklerinde okunur.
+
+    Returns:
+        dict: 'directory', 'manifest' ve okunmuş değerler için 'loaded' anahtarlarını içerir.
+    """
+    with open(os.path.join(directory, MANIFEST_NAME), encoding="utf-8") as f:
+        manifest = json.load(f)
+    return {"directory": directory, "manifest": manifest, "loaded": {}}
+
+
+def report_fingerprint(report):
+    """Raporun kaydedildiği veri setinin parmak izi (figure_scope anahtarları için tuple olarak)."""
+    return tuple(report["manifest"]["fingerprint"])
+
+
+def _read_value(spec, directory):
+    kind = spec["type"]
+    if kind in ("frame", "series"):
+        frame = pd.read_parquet(os.path.join(directory, spec["path"]))
+        columns = [tuple(col) if spec["multi"] else col for col in spec["columns"]]
+        index = pd.MultiIndex.from_tuples(columns, names=spec["column_names"]) if spec["multi"] \
+            else pd.Index(columns, name=spec["column_names"][0])
+        frame = frame.set_axis(index, axis=1)
+        if kind == "series":
+            return frame.iloc[:, 0].rename(spec["name"])
+        return frame
+    if kind == "figure":
+        with open(os.path.join(directory, spec["path"]), "rb") as f:
+            return f.read()
+    if kind == "dict":
+        return {key: _read_value(item, directory) for key, item in spec["items"]}
+    if kind in ("list", "tuple"):
+        items = [_read_value(item, directory) for item in spec["items"]]
+        return tuple(items) if kind == "tuple" else items
+    return spec["value"]
+
+
+def report_result(report, func, args, kwargs):
+    """
+    Kayıttaki analiz sonucunu döndürür; figürler PNG byte'ları olarak gelir (bkz. show_figure).
+
+    Raises:
+        LookupError: Rapor bu çağrının sonucunu içermiyorsa.
+    """
+    key = result_key(func, args, kwargs)
+    if key not in report["loaded"]:
+        spec = report["manifest"]["results"].get(key)
+        if spec is None:
+            raise LookupError(f"Raporda {func.__qualname__} sonucu yok")
+        report["loaded"][key] = _read_value(spec, report["directory"])
+    return report["loaded"][key]
+
+
+def report_figure(report, key):
+    """figure_scope için: kapsam anahtarına karşılık gelen kayıtlı görüntünün byte'ları ya da None."""
+    name = report["manifest"]["figures"].get(repr(key))
+    if name is None:
+        return None
+    with open(os.path.join(report["directory"], name), "rb") as f:
+        return f.read()
@@ -0,0 +1,232 @@
+import hashlib
+import sys
+import threading
+import weakref
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+# Önbellek sınırları; configure_cache ile değiştirilebilir
+MAX_ENTRIES = 256
+MAX_BYTES = 512 * 1024 ** 2
+
+_cache = OrderedDict()
+_stats = {"hits": 0, "misses": 0, "evictions": 0, "bytes": 0}
+_limits = {"max_entries": MAX_ENTRIES, "max_bytes": MAX_BYTES}
+_lock = threading.Lock()
+# İçerik özeti hesaplanmış tablolar: id(nesne) -> (weakref(nesne), özet). Büyük tablolar (df_clean,
+# küp) her çağrıda yeniden hash'lenmez; nesne bellekten atılınca kaydı da geçersiz olur.
+_digests = {}
+_digests_lock = threading.Lock()
+
+
+def dataset_fingerprint(df, option=None):
+    """
+    Veri seti için ucuz ve kararlı bir parmak izi üretir.
+
+    Parmak izi seçilen analiz tipi (option), satır sayısı, en büyük InvoiceDate (yoksa Date)
+    ve içeriğin hash'inden oluşur. İçerik hash'i pandas'ın vektörel satır hash'leriyle
+    hesaplanır; kategori sütunlarında yalnızca sözlük hash'lenip kodlar kullanılır.
+
+    Parameters:
+        df (pd.DataFrame): Veritabanından/anlık görüntüden gelen ham veri.
+        option (str, optional): Dashboard'da seçilen analiz tipi.
+
+    Returns:
+        tuple: (option, satır_sayısı, son_tarih_iso, içerik_hash)
+    """
+    date_col = "InvoiceDate" if "InvoiceDate" in df.columns else "Date"
+    max_date = pd.to_datetime(df[date_col]).max() if date_col in df.columns and len(df) else None
+    row_hashes = pd.util.hash_pandas_object(df, index=False).to_numpy()
+    content_hash = hashlib.blake2b(row_hashes.tobytes(), digest_size=16).hexdigest()
+    return (
+        option,
+        int(len(df)),
+        None if max_date is None or pd.isna(max_date) else max_date.isoformat(),
+        content_hash,
+    )
+
+
+def _estimate_size(value):
+    """Önbellekteki bir sonucun bellek maliyetini yaklaşık olarak (byte) hesaplar."""
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        usage = value.memory_usage(deep=True, index=True)
+        return int(usage.sum() if isinstance(value, pd.DataFrame) else usage)
+    if isinstance(value, np.ndarray):
+        return int(value.nbytes)
+    if isinstance(value, (list, tuple, set)):
+        return sys.getsizeof(value) + sum(_estimate_size(item) for item in value)
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(_estimate_size(k) + _estimate_size(v) for k, v in value.items())
+    if hasattr(value, "get_size_inches") and hasattr(value, "dpi"):
+        # matplotlib Figure: çizim tuvali (RGBA) baskın maliyettir
+        width, height = value.get_size_inches()
+        return int(width * value.dpi * height * value.dpi * 4)
+    return sys.getsizeof(value)
+
+
+def content_digest(value):
+    """
+    DataFrame/Series/Index ya da ndarray içeriğinin özeti (değerler, index ve sütun adları).
+
+    pandas'ın vektörel satır hash'leriyle hesaplanır ve nesne başına bir kez hesaplanıp saklanır;
+    analizlerin girdiye sonradan sütun eklemesi aynı nesnenin özetini değiştirmez. Aynı uzunlukta
+    ama farklı içerikte türetilmiş tablolar (ör. takvim modundaki trend tablosu) farklı özet alır.
+    """
+    with _digests_lock:
+        entry = _digests.get(id(value))
+        if entry is not None and entry[0]() is value:
+            return entry[1]
+    if isinstance(value, np.ndarray):
+        hashes = pd.util.hash_array(np.asarray(value).ravel())
+        labels = (value.shape, str(value.dtype))
+    else:
+        try:
+            hashes = pd.util.hash_pandas_object(value, index=True).to_numpy()
+        except TypeError:
+            # Hash'lenemeyen hücreler (ör. liste) metin karşılıklarıyla özetlenir
+            hashes = pd.util.hash_pandas_object(value.astype(str), index=True).to_numpy()
+        labels = list(value.columns) if isinstance(value, pd.DataFrame) else value.name
+    digest = hashlib.blake2b(hashes.tobytes(), digest_size=16)
+    digest.update(repr(labels).encode("utf-8"))
+    digest = digest.hexdigest()
+    with _digests_lock:
+        for key, (ref, _) in list(_digests.items()):
+            if ref() is None:
+                del _digests[key]
+        _digests[id(value)] = (weakref.ref(value), digest)
+    return digest
+
+
+def describe_argument(value):
+    """
+    Önbellek anahtarı için argümanı tanımlar.
+
+    DataFrame'ler türleri (df.attrs["kind"]), satır sayıları ve içerik özetleriyle
+    (content_digest) temsil edilir; aynı veri setinden türeyen ama içeriği farklı tablolar
+    (ör. as_of dilimi, artımlı/takvim modunda hesaplanan sonuçlar) aynı anahtarı paylaşmaz.
+    """
+    if isinstance(value, pd.DataFrame):
+        return ("DataFrame", value.attrs.get("kind", "rows"), len(value), content_digest(value))
+    if isinstance(value, pd.Series):
+        return ("Series", value.name, len(value), content_digest(value))
+    if isinstance(value, pd.Index):
+        return ("Index", value.name, len(value), content_digest(value))
+    if isinstance(value, np.ndarray):
+        return ("ndarray", value.shape, str(value.dtype), content_digest(value))
+    if isinstance(value, (list, tuple)):
+        return tuple(describe_argument(item) for item in value)
+    if isinstance(value, dict):
+        return tuple(sorted((k, describe_argument(v)) for k, v in value.items()))
+    return value
+
+
+def cached_call(fingerprint, func, *args, **kwargs):
+    """
+    func(*args, **kwargs) sonucunu veri seti parmak izi ve parametrelere göre önbellekten döndürür.
+
+    Anahtar (parmak izi, fonksiyonun modül + adı, argüman tanımları) üçlüsüdür. Önbellek
+    en fazla MAX_ENTRIES kayıt ve MAX_BYTES tahmini bellek tutar; sınır aşıldığında en uzun
+    süredir kullanılmayan kayıtlar atılır (LRU). Tek başına sınırı aşan sonuçlar önbelleğe
+    alınmaz. Dönen nesneler önbellekteki nesnelerin kendisidir; çağıran değiştirmemelidir.
+
+    Parameters:
+        fingerprint (tuple): dataset_fingerprint çıktısı.
+        func (callable): Çalıştırılacak (Streamlit'e yazmayan) hesaplama fonksiyonu.
+        *args, **kwargs: func'a iletilen argümanlar.
+
+    Returns:
+        func'ın döndürdüğü değer.
+    """
+    key = cache_key(fingerprint, func, *args, **kwargs)
+    hit, value = cache_lookup(key)
+    if hit:
+        return value
+    value = func(*args, **kwargs)
+    cache_store(key, value)
+    return value
+
+
+def cache_key(fingerprint, func, *args, **kwargs):
+    """cached_call'ın func(*args, **kwargs) için kullandığı önbellek anahtarını döndürür."""
+    return (
+        fingerprint,
+        f"{func.__module__}.{func.__qualname__}",
+        describe_argument(args),
+        describe_argument(kwargs),
+    )
+
+
+def cache_contains(key):
+    """Anahtarın önbellekte olup olmadığını sayaçları ve LRU sırasını değiştirmeden söyler."""
+    with _lock:
+        return key in _cache
+
+
+def cache_lookup(key):
+    """
+    Anahtarı önbellekte arar ve isabet/ıska sayaçlarını günceller.
+
+    Returns:
+        tuple: (bulundu_mu, değer); bulunamazsa (False, None).
+    """
+    with _lock:
+        if key in _cache:
+            _cache.move_to_end(key)
+            _stats["hits"] += 1
+            return True, _cache[key][0]
+        _stats["misses"] += 1
+    return False, None
+
+
+def cache_store(key, value):
+    """Değeri anahtarla önbelleğe yazar; tek başına MAX_BYTES'ı aşan değerler saklanmaz."""
+    size = _estimate_size(value)
+    with _lock:
+        if size > _limits["max_bytes"]:
+            return
+        if key in _cache:
+            _stats["bytes"] -= _cache.pop(key)[1]
+        _cache[key] = (value, size)
+        _stats["bytes"] += size
+        _evict()
+
+
+def _evict():
+    """Sınırlar aşıldıkça en eski kayıtları atar. _lock altında çağrılmalıdır."""
+    while _cache and (len(_cache) > _limits["max_entries"] or _stats["bytes"] > _limits["max_bytes"]):
+        _, (_, size) = _cache.popitem(last=False)
+        _stats["bytes"] -= size
+        _stats["evictions"] += 1
+
+
+def cache_stats():
+    """İsabet/ıska/atılma sayaçlarını, kayıt sayısını ve tahmini belleği (MB) döndürür."""
+    with _lock:
+        lookups = _stats["hits"] + _stats["misses"]
+        return {
+            "hits": _stats["hits"],
+            "misses": _stats["misses"],
+            "hit_rate": round(_stats["hits"] / lookups, 3) if lookups else 0.0,
+            "evictions": _stats["evictions"],
+            "entries": len(_cache),
+            "memory_mb": round(_stats["bytes"] / 1024 ** 2, 1),
+        }
+
+
+def configure_cache(max_entries=None, max_bytes=None):
+    """Önbellek sınırlarını değiştirir; yeni sınırları aşan kayıtlar hemen atılır."""
+    with _lock:
+        if max_entries is not None:
+            _limits["max_entries"] = max_entries
+        if max_bytes is not None:
+            _limits["max_bytes"] = max_bytes
+        _evict()
+
+
+def clear_cache():
+    """Tüm kayıtları ve sayaçları sıfırlar."""
+    with _lock:
+        _cache.clear()
+        _stats.update(hits=0, misses=0, evictions=0, bytes=0)
@@ -0,0 +1,150 @@
+import numpy as np
+import pandas as pd
+
+from Analysis_Functions.categorical_schema import add_encoded_columns, encode_identity_columns
+from Analysis_Functions.prepare_data import update_customercodes
+
+# Küp boyutları: her satır bir müşteri-ürün-ay hücresidir
+CUBE_KEYS = ["CustomerCode", "CustomerName", "Product_Code", "ProductName", "YearMonth"]
+MACRO_COLUMNS = ["Interest_Rate", "Inflation", "PMI", "Growth_Rate"]
+# Hücreler birleştirilirken toplanan (ya da min/max alınan) ham sütunlar
+CELL_COLUMNS = [
+    "Sale_Amount", "Revenue", "Line_Count", "First_Sale_Date", "Last_Sale_Date",
+    "Unit_Price_Sum", "Unit_Price_SumSq",
+]
+
+
+def _aggregate_cells(cells, keys):
+    """
+    Hücre toplamlarını (sum / sum of squares / count) verilen anahtarlarda birleştirir ve
+    ortalama, standart sapma ile makro ortalamalarını türetir. Makro ortalaması boş olmayan
+    değerlerin toplamının sayısına ('<makro>_Count') bölümüdür; satır düzeyindeki groupby.mean
+    gibi eksik (NULL) değerleri atlar.
+    """
+    macros = [col for col in MACRO_COLUMNS if f"{col}_Sum" in cells.columns]
+    agg = {col: "sum" for col in CELL_COLUMNS}
+    agg.update({"First_Sale_Date": "min", "Last_Sale_Date": "max"})
+    agg.update({f"{col}_{part}": "sum" for col in macros for part in ("Sum", "Count")})
+    out = cells.groupby(keys, as_index=False, observed=True, sort=False).agg(agg)
+
+    n = out["Line_Count"].astype(float)
+    out["Unit_Price_Mean"] = out["Unit_Price_Sum"] / n
+    variance = (out["Unit_Price_SumSq"] - out["Unit_Price_Sum"] ** 2 / n) / (n - 1)
+    out["Unit_Price_Std"] = np.sqrt(variance.clip(lower=0)).where(n > 1)
+    for col in macros:
+        count = out[f"{col}_Count"]
+        out[col] = out.pop(f"{col}_Sum") / count.where(count > 0)
+
+    out["Year"] = out["YearMonth"].dt.year
+    out["Month"] = out["YearMonth"].dt.month
+    out.attrs = {}
+    return out
+
+
+def finalize_sales_cube(cube):
+    """
+    Ham toplamlardan (sum / sum of squares / count) müşteri × ürün × ay küpünü tamamlar.
+
+    Girdi, her hücre için 'Year', 'Month', 'Sale_Amount', 'Revenue', 'Line_Count',
+    'First_Sale_Date', 'Last_Sale_Date', 'Unit_Price_Sum', 'Unit_Price_SumSq' ve varsa
+    '<makro>_Sum' ile '<makro>_Count' (boş olmayan değer sayısı) sütunlarını içermelidir. Aynı
+    hücreye düşen satırlar (ör. müşteri kodu düzeltmesi sonrası) toplamlar üzerinden
+    birleştirilir, ardından ortalama/standart sapma ve makro ortalamaları türetilir.
+
+    Parameters:
+        cube (pd.DataFrame): Hücre bazında ham toplamlar. 'YearMonth' sütunu yerinde eklenir.
+
+    Returns:
+        pd.DataFrame: CUBE_KEYS + 'Year', 'Month', 'Sale_Amount', 'Revenue', 'Line_Count',
+        'First_Sale_Date', 'Last_Sale_Date', 'Unit_Price_Mean', 'Unit_Price_Std',
+        'Unit_Price_Sum', 'Unit_Price_SumSq', makro ortalama ve '<makro>_Count' sütunları.
+    """
+    # Ay başı tarihi: (yıl, ay) -> datetime64[M], satır başına Period nesnesi üretmeden
+    months = (cube["Year"].to_numpy(dtype=np.int64) - 1970) * 12 + cube["Month"].to_numpy(dtype=np.int64) - 1
+    cube["YearMonth"] = months.astype("datetime64[M]").astype("datetime64[ns]")
+    cube = _aggregate_cells(cube, CUBE_KEYS)
+    cube.sort_values(["YearMonth", "CustomerCode", "Product_Code"], inplace=True, ignore_index=True)
+    cube.attrs["kind"] = "sales_cube"
+    return cube
+
+
+def build_sales_cube(df):
+    """
+    preprocessing çıktısından müşteri × ürün × ay küpünü tek geçişte üretir.
+
+    Her fatura satırı tek satırlık bir hücre olarak ele alınır (Line_Count = 1) ve
+    finalize_sales_cube ile toplanır; böylece veritabanında toplanan küp
+    (database.get_sales_cube) ile aynı şema ve aynı kurallar kullanılır.
+
+    Parameters:
+        df (pd.DataFrame): preprocessing'den geçmiş satış verisi ('Date', 'Year', 'Month',
+            'Sale_Amount', 'Unit_Price(TL)', kimlik sütunları ve varsa makro sütunlar).
+
+    Returns:
+        pd.DataFrame: finalize_sales_cube şemasında küp; df.attrs["kind"] == "sales_cube".
+    """
+    price = df["Unit_Price(TL)"].astype(float)
+    cells = pd.DataFrame({
+        "CustomerCode": df["CustomerCode"],
+        "CustomerName": df["CustomerName"],
+        "Product_Code": df["Product_Code"],
+        "ProductName": df["ProductName"],
+        "Year": df["Year"],
+        "Month": df["Month"],
+        "Sale_Amount": df["Sale_Amount"],
+        "Revenue": df["Sale_Amount"] * price,
+        "Line_Count": 1,
+        "First_Sale_Date": df["Date"],
+        "Last_Sale_Date": df["Date"],
+        "Unit_Price_Sum": price,
+        "Unit_Price_SumSq": price ** 2,
+    })
+    for col in MACRO_COLUMNS:
+        if col in df.columns:
+            cells[f"{col}_Sum"] = df[col].astype(float)
+            cells[f"{col}_Count"] = df[col].notna().astype(np.int64)
+    return add_encoded_columns(finalize_sales_cube(cells))
+
+
+def is_sales_cube(df):
+    """DataFrame'in build_sales_cube / get_sales_cube ile üretilmiş bir küp olup olmadığını döndürür."""
+    return df.attrs.get("kind") == "sales_cube"
+
+
+def rollup_sales_cube(cube, keys):
+    """
+    Küpü verilen anahtarlar + 'YearMonth' düzeyine yeniden toplar.
+
+    Örneğin keys=['CustomerCode'] müşteri × ay, keys=[] yalnızca ay bazında toplamları verir.
+    Miktar, ciro ve satır sayısı toplanır; ilk/son satış tarihi, birim fiyat ortalaması ve
+    standart sapması ile makro ortalamaları satır düzeyindeki veriyle aynı sonucu verecek
+    şekilde yeniden hesaplanır.
+
+    Parameters:
+        cube (pd.DataFrame): build_sales_cube ya da get_sales_cube çıktısı.
+        keys (list of str): 'YearMonth' dışındaki gruplama sütunları.
+
+    Returns:
+        pd.DataFrame: keys + 'YearMonth' sırasına göre sıralı toplamlar.
+    """
+    keys = list(keys) + ["YearMonth"]
+    cells = cube[keys + CELL_COLUMNS].copy()
+    for col in MACRO_COLUMNS:
+        if col in cube.columns:
+            cells[f"{col}_Sum"] = cube[col].fillna(0) * cube[f"{col}_Count"]
+            cells[f"{col}_Count"] = cube[f"{col}_Count"]
+    out = _aggregate_cells(cells, keys)
+    return out.sort_values(keys, ignore_index=True)
+
+
+def load_sales_cube_from_sql(cube):
+    """
+    Veritabanında toplanmış küpü (bkz. database.get_sales_cube) analizlere hazır hale getirir.
+
+    prepare_data'daki müşteri kodu düzeltmesi (update_customercodes) burada uygulanır; kodu
+    değişen satırlar aynı hücreye düşerse finalize_sales_cube içinde birleştirilir. Kimlik
+    sütunları satır verisiyle aynı ortak sözlüklere göre kodlanır.
+    """
+    cube = update_customercodes(cube)
+    cube = encode_identity_columns(cube)
+    return add_encoded_columns(finalize_sales_cube(cube))
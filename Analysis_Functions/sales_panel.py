@@ -0,0 +1,262 @@
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from Analysis_Functions.grouped_regression import snap_to_zero
+from Analysis_Functions.sales_cube import is_sales_cube
+
+PANEL_KEYS = ["CustomerCode", "Product_Code"]
+# Panelde tutulan aylık seriler ve saklama türleri; Line_Count = 0 o ay satış olmadığını gösterir
+PANEL_ARRAYS = {"Sale_Amount": np.float32, "Revenue": np.float32, "Line_Count": np.int32}
+# Varlık tablosunda (girdide varsa) taşınan ad sütunları
+NAME_COLUMNS = ["CustomerName", "ProductName"]
+# Satır bazlı çekirdeklerin bir seferde işlediği varlık sayısı; float64 ara dizileri sınırlar
+CHUNK_ROWS = 65_536
+
+
+def _month_numbers(dates):
+    """Tarihlerin 1970-01'den beri takvim ayı numarası (int64) ve geçerli (NaT olmayan) maske."""
+    dates = pd.DatetimeIndex(dates)
+    valid = ~dates.isna()
+    months = (dates.year.to_numpy(dtype=np.float64) - 1970) * 12 + dates.month.to_numpy(dtype=np.float64) - 1
+    return np.where(valid, months, 0).astype(np.int64), valid
+
+
+def build_sales_panel(df, keys=PANEL_KEYS, start=None, end=None, directory=None):
+    """
+    Satır verisinden ya da satış küpünden yoğun [varlık, ay] paneli kurar.
+
+    Aylar küresel bir takvime hizalanır: panel start ile end arasındaki her ayı (satış olmasa da)
+    bir sütun olarak içerir, böylece bir varlığın satışsız ayları da sütun sırasında yer alır.
+    Satış miktarı ve ciro float32, fatura satırı sayısı int32 olarak saklanır (toplamlar float64'te
+    alınıp dönüştürülür). Varlıklar groupby(keys, sort=True) sırasındadır.
+
+    Parameters:
+        df (pd.DataFrame): preprocessing çıktısı ya da build_sales_cube küpü.
+        keys (list of str): Varlık anahtarları (varsayılan müşteri-ürün çifti).
+        start, end (str or Timestamp, optional): Panelin ilk ve son ayı; verilmezse verinin ilk ve son ayı.
+        directory (str, optional): Verilirse diziler bu klasörde .npy dosyalarına bellek eşlemeli
+            (np.memmap) yazılır; load_sales_panel ile yeniden açılabilir.
+
+    Returns:
+        dict: 'kind' ('sales_panel'), 'keys', 'entities' (anahtarlar, varsa adlar ve
+        First_Sale_Date/Last_Sale_Date; satır numarası panel satırıdır), 'months' (ay başları),
+        'Sale_Amount', 'Revenue', 'Line_Count' ([varlık, ay] dizileri) ve 'directory'.
+    """
+    cube = is_sales_cube(df)
+    keys = list(keys)
+    months, valid = _month_numbers(df["YearMonth"] if cube else df["Date"])
+    first = _month_numbers([start])[0][0] if start is not None else months[valid].min()
+    last = _month_numbers([end])[0][0] if end is not None else months[valid].max()
+    n_months = int(last - first + 1)
+
+    codes = df.groupby(keys, observed=True, sort=True).ngroup().to_numpy()
+    rows = np.flatnonzero(valid & (months >= first) & (months <= last) & (codes >= 0))
+    used, first_rows, entity = np.unique(codes[rows], return_index=True, return_inverse=True)
+    flat = entity * n_months + (months[rows] - first)
+    size = len(used) * n_months
+
+    sales = df["Sale_Amount"].to_numpy(dtype=np.float64)[rows]
+    if cube:
+        revenue = df["Revenue"].to_numpy(dtype=np.float64)[rows]
+        lines = df["Line_Count"].to_numpy(dtype=np.float64)[rows]
+    else:
+        revenue = sales * df["Unit_Price(TL)"].to_numpy(dtype=np.float64)[rows]
+        lines = None
+    # Eksik değerler toplamlarda (pandas sum gibi) atlanır
+    values = {
+        "Sale_Amount": np.bincount(flat, weights=np.nan_to_num(sales), minlength=size),
+        "Revenue": np.bincount(flat, weights=np.nan_to_num(revenue), minlength=size),
+        "Line_Count": np.bincount(flat, weights=lines, minlength=size),
+    }
+
+    # Varlık tablosu: anahtarlar ve adlar ilk satırdan, satış tarihleri tüm satırlardan
+    columns = keys + [col for col in NAME_COLUMNS if col in df.columns and col not in keys]
+    entities = df[columns].iloc[rows[first_rows]].reset_index(drop=True)
+    first_dates = df["First_Sale_Date" if cube else "Date"].to_numpy()[rows]
+    last_dates = df["Last_Sale_Date" if cube else "Date"].to_numpy()[rows]
+    entities["First_Sale_Date"] = pd.Series(first_dates).groupby(entity).min().to_numpy()
+    entities["Last_Sale_Date"] = pd.Series(last_dates).groupby(entity).max().to_numpy()
+
+    panel = {
+        "kind": "sales_panel",
+        "keys": keys,
+        "entities": entities,
+        "months": pd.date_range(pd.Timestamp(np.datetime64(int(first), "M")), periods=n_months, freq="MS"),
+        "directory": directory,
+    }
+    for name, dtype in PANEL_ARRAYS.items():
+        shape = (len(used), n_months)
+        if directory is None:
+            panel[name] = values[name].reshape(shape).astype(dtype)
+        else:
+            os.makedirs(directory, exist_ok=True)
+            array = np.lib.format.open_memmap(os.path.join(directory, f"{name}.npy"), mode="w+", dtype=dtype, shape=shape)
+            array[:] = values[name].reshape(shape)
+            array.flush()
+            panel[name] = array
+    if directory is not None:
+        _save_panel_meta(panel, directory)
+    return panel
+
+
+def _save_panel_meta(panel, directory):
+    """Varlık tablosunu ve meta dosyasını yazar; meta (panel.json) en son, geçici adla yazılıp taşınır."""
+    panel["entities"].to_parquet(os.path.join(directory, "entities.parquet"))
+    meta_path = os.path.join(directory, "panel.json")
+    with open(meta_path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump({"keys": panel["keys"], "start": panel["months"][0].isoformat(), "months": len(panel["months"])}, f)
+    os.replace(meta_path + ".tmp", meta_path)
+
+
+def load_sales_panel(directory, mode="r"):
+    """
+    build_sales_panel(directory=...) ile yazılmış paneli diziler belleğe okunmadan (np.memmap) açar.
+
+    Parameters:
+        directory (str): Panel klasörü.
+        mode (str): np.load mmap_mode ('r' salt okunur, 'r+' yerinde güncelleme).
+
+    Returns:
+        dict: build_sales_panel ile aynı yapıda panel; yoksa None.
+    """
+    meta_path = os.path.join(directory, "panel.json")
+    if not os.path.exists(meta_path):
+        return None
+    with open(meta_path, encoding="utf-8") as f:
+        meta = json.load(f)
+    panel = {
+        "kind": "sales_panel",
+        "keys": meta["keys"],
+        "entities": pd.read_parquet(os.path.join(directory, "entities.parquet")),
+        "months": pd.date_range(meta["start"], periods=meta["months"], freq="MS"),
+        "directory": directory,
+    }
+    for name in PANEL_ARRAYS:
+        panel[name] = np.load(os.path.join(directory, f"{name}.npy"), mmap_mode=mode)
+    return panel
+
+
+def is_sales_panel(obj):
+    """Nesnenin build_sales_panel ile üretilmiş bir panel olup olmadığını döndürür."""
+    return isinstance(obj, dict) and obj.get("kind") == "sales_panel"
+
+
+def panel_window(panel, start=None, end=None):
+    """Panelin yalnızca start..end aylarını kapsayan görünümü; diziler kopyalanmaz (sütun dilimi)."""
+    months = panel["months"]
+    lo = 0 if start is None else int(months.searchsorted(pd.Timestamp(start)))
+    hi = len(months) if end is None else int(months.searchsorted(pd.Timestamp(end), side="right"))
+    window = dict(panel, months=months[lo:hi])
+    for name in PANEL_ARRAYS:
+        window[name] = panel[name][:, lo:hi]
+    return window
+
+
+def observed_bounds(observed):
+    """Her satırda ilk ve son True sütunun indeksi (satırda hiç True yoksa -1)."""
+    observed = np.asarray(observed, dtype=bool)
+    any_observed = observed.any(axis=1)
+    first = np.where(any_observed, observed.argmax(axis=1), -1)
+    last = np.where(any_observed, observed.shape[1] - 1 - observed[:, ::-1].argmax(axis=1), -1)
+    return first, last
+
+
+def _chunks(n_rows):
+    for lo in range(0, n_rows, CHUNK_ROWS):
+        yield lo, min(lo + CHUNK_ROWS, n_rows)
+
+
+def _chunk(values, observed, lo, hi):
+    """Satır bloğunu float64'e çevirir; gözlenmeyen hücreler 0 (ağırlık 0) olur."""
+    y = np.asarray(values[lo:hi], dtype=np.float64)
+    if observed is None:
+        return y, np.ones_like(y)
+    w = np.asarray(observed[lo:hi], dtype=bool)
+    return np.where(w, y, 0.0), w.astype(np.float64)
+
+
+def panel_linregress(values, observed=None):
+    """
+    Panelin her satırı için y = intercept + slope * t doğrusunu hesaplar; t takvim ayının paneldeki
+    sırasıdır (0, 1, ..., T-1).
+
+    observed verilirse yalnızca True hücreler regresyona girer ve aradaki satışsız aylar t'yi yine
+    ilerletir: altı ay ara veren bir çift her ay sipariş verenle aynı görünmez. observed
+    verilmezse satışsız aylar 0 satış olarak sayılır. Hesap satır bloklarında float64 ile, iki
+    geçişli (ortalamadan arındırılmış) yöntemle yapılır; yuvarlama hatası sınırındaki eğimler
+    grouped_regression.snap_to_zero ile 0 alınır.
+
+    Parameters:
+        values (np.ndarray): [varlık, ay] dizisi (ör. panel['Sale_Amount'] ya da ondan türetilen seri).
+        observed (np.ndarray of bool, optional): Hangi hücrelerin gözlem olduğu (ör. Line_Count > 0).
+
+    Returns:
+        dict: grouped_regression.segment_linregress ile aynı anahtarlar ('n', 'slope', 'intercept',
+        'resid_std', 'y_std'); satır başına bir değer.
+    """
+    n_rows, n_months = values.shape
+    t = np.arange(n_months, dtype=np.float64)
+    result = {name: np.full(n_rows, np.nan) for name in ("slope", "intercept", "resid_std", "y_std")}
+    result["n"] = np.zeros(n_rows, dtype=np.int64)
+    for lo, hi in _chunks(n_rows):
+        y, w = _chunk(values, observed, lo, hi)
+        n = w.sum(axis=1)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            x_mean = (w @ t) / n
+            y_mean = y.sum(axis=1) / n
+            dx = (t - x_mean[:, None]) * w
+            dy = (y - y_mean[:, None]) * w
+            sxx = (dx * dx).sum(axis=1)
+            sxy = snap_to_zero((dx * dy).sum(axis=1), ((np.abs(dx) + np.abs(x_mean)[:, None] * w) * np.abs(dy)).sum(axis=1))
+            syy = (dy * dy).sum(axis=1)
+            slope = np.where((n > 1) & (sxx > 0), sxy / sxx, np.nan)
+            sse = np.clip(syy - slope * sxy, 0, None)
+            result["slope"][lo:hi] = slope
+            result["intercept"][lo:hi] = y_mean - slope * x_mean
+            result["resid_std"][lo:hi] = np.where(n > 2, np.sqrt(sse / (n - 2)), np.nan)
+            result["y_std"][lo:hi] = np.where(n > 1, np.sqrt(syy / (n - 1)), np.nan)
+        result["n"][lo:hi] = n.astype(np.int64)
+    return result
+
+
+def panel_volatility(values, observed=None):
+    """
+    Panelin her satırı için aylık serinin ortalaması, standart sapması (ddof=1) ve değişim
+    katsayısı (CV = std / ortalama). observed verilirse yalnızca True hücreler, verilmezse tüm
+    aylar (satışsız aylar 0) kullanılır.
+
+    Returns:
+        dict: 'n', 'mean', 'std', 'cv' (satır başına; n < 2 ya da ortalama 0 ise std/cv NaN).
+    """
+    n_rows = values.shape[0]
+    result = {name: np.full(n_rows, np.nan) for name in ("mean", "std", "cv")}
+    result["n"] = np.zeros(n_rows, dtype=np.int64)
+    for lo, hi in _chunks(n_rows):
+        y, w = _chunk(values, observed, lo, hi)
+        n = w.sum(axis=1)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            mean = y.sum(axis=1) / n
+            dy = (y - mean[:, None]) * w
+            std = np.where(n > 1, np.sqrt((dy * dy).sum(axis=1) / (n - 1)), np.nan)
+            result["mean"][lo:hi] = mean
+            result["std"][lo:hi] = std
+            result["cv"][lo:hi] = np.where(mean != 0, std / mean, np.nan)
+        result["n"][lo:hi] = n.astype(np.int64)
+    return result
+
+
+def panel_month_of_year(values, months):
+    """
+    Panelin her satırı için takvim ayı (Ocak..Aralık) başına toplamlar: [varlık, 12] float64.
+    Aylar tek sıcak (one-hot) bir matrisle çarpılarak tek seferde toplanır; mevsimsellik
+    profilleri (ör. satırın toplamına bölünerek pay) bundan türetilir.
+    """
+    onehot = np.zeros((len(months), 12))
+    onehot[np.arange(len(months)), pd.DatetimeIndex(months).month - 1] = 1.0
+    result = np.empty((values.shape[0], 12))
+    for lo, hi in _chunks(values.shape[0]):
+        result[lo:hi] = np.asarray(values[lo:hi], dtype=np.float64) @ onehot
+    return result
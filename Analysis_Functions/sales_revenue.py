@@ -1,27 +1,33 @@
 import pandas as pd
-import matplotlib.pyplot as plt 
-import seaborn as sns 
-import numpy as np 
-import streamlit as st 
+import matplotlib.pyplot as plt
+import seaborn as sns
+import numpy as np
+import streamlit as st
 
-def sales_revenue_product_customer(df):
+from Analysis_Functions.date_index import analysis_windows, date_window
+from Analysis_Functions.figure_cache import show_figure
+from Analysis_Functions.paged_table import show_table
+
+
+def _revenue_segments(df, keys, as_of=None):
     """
-    Ürün bazlı satış sayısı ve satış başına ortalama gelir analizini yapar,
-    ürünleri dört segmente ayırır ve scatter plot ile Streamlit'te görselleştirir.
+    as_of'tan (verilmezse verideki son satış günü) önceki yıl ve sonrası satışları verilen anahtarlara (keys) göre toplar;
+    satış sayısı ve satış başına ortalama geliri hesaplar ve her grubu medyanlara göre dört segmentten
+    birine atar.
     """
-    # 1. Filtreleme: Yalnızca 2024 ve 2025 verisi
-    df_filtered = df[df["Year"] >= 2024].copy()
+    # 1. Filtreleme: Yalnızca son iki yılın verisi (tarihe göre sıralı satırlarda ikili arama + dilim)
+    df_filtered = date_window(df, start=analysis_windows(as_of, df)["recent_since"]).copy()
 
     # 2. Row Revenue hesapla
     df_filtered['Row_Revenue_TL'] = df_filtered['Sale_Amount'] * df_filtered['Unit_Price(TL)']
     df_filtered['Date'] = pd.to_datetime(df_filtered['Date'])
-    last_dates = df_filtered.groupby(['CustomerName', 'ProductName'])['Date'].max().reset_index()
+    last_dates = df_filtered.groupby(keys, observed=True)['Date'].max().reset_index()
     last_dates.rename(columns={'Date': 'Last_Sale_Date'}, inplace=True)
     last_dates['Last_Sale_Date'] = last_dates['Last_Sale_Date'].dt.strftime('%d-%m-%Y')
-    df_filtered = df_filtered.merge(last_dates, on=['CustomerName', 'ProductName'], how='left')
+    df_filtered = df_filtered.merge(last_dates, on=keys, how='left')
 
-    # 3. Müşteri-Ürün bazında toplulaştırma
-    summary = df_filtered.groupby(['CustomerName', 'ProductName']).agg(
+    # 3. Anahtar bazında toplulaştırma
+    summary = df_filtered.groupby(keys, observed=True).agg(
         Sales_Count=('Sale_Amount', 'count'),
         Total_Revenue=('Row_Revenue_TL', 'sum'),
         Last_Sale_Date=('Last_Sale_Date', 'max')
@@ -42,14 +48,18 @@ def sales_revenue_product_customer(df):
             return 'Low Sales - High Revenue'
         else:
             return 'Low Sales - Low Revenue'
-        
+
     summary['Segment'] = summary.apply(assign_segment, axis=1)
+    return summary
+
 
+def _show_revenue_segments(summary, title):
+    """Segment özetini scatter plot ve tablo olarak Streamlit'te gösterir."""
     # 6. Görselleştirme (matplotlib + seaborn)
     fig, ax = plt.subplots(figsize=(14, 10))
     sns.scatterplot(
         data=summary,
-        x='Sales_Count', 
+        x='Sales_Count',
         y='Avg_Revenue_Per_Sale',
         hue='Segment',
         palette={
@@ -64,7 +74,7 @@ def sales_revenue_product_customer(df):
 
     ax.axvline(x=70, color='gray', linestyle='--')
     ax.axhline(y=2.0e6, color='gray', linestyle='--')
-    ax.set_title('Müşteri- Ürün Bazlı Satış Sayısı ve Ortalama Gelir Segmentasyonu', fontsize=18)
+    ax.set_title(title, fontsize=18)
     ax.set_xlabel('Satış Sayısı', fontsize=14)
     ax.set_ylabel('Satış Başına Ortalama Gelir (₺)', fontsize=14)
     ax.ticklabel_format(style='plain', axis='y')
@@ -72,84 +82,43 @@ def sales_revenue_product_customer(df):
     ax.legend(title='Segment', fontsize=10, title_fontsize=12, loc='upper right')
 
     # 7. Streamlit üzerinden göster
-    st.pyplot(fig)
+    show_figure(fig)
 
     # Opsiyonel: tablo olarak da göster
-    st.dataframe(summary.sort_values(by='Segment'))
+    show_table(summary.sort_values(by='Segment'), key=f"revenue_segments_{title}")
 
 
-def sales_revenue_product(df):
-    """
-    Ürün bazlı satış sayısı ve satış başına ortalama gelir analizini yapar,
-    ürünleri dört segmente ayırır ve scatter plot ile Streamlit'te görselleştirir.
-    """
+def compute_sales_revenue_product_customer(df, as_of=None):
+    """Müşteri-ürün bazlı satış sayısı / satış başına ortalama gelir segment özetini döndürür."""
+    return _revenue_segments(df, ['CustomerName', 'ProductName'], as_of=as_of)
 
-    # 1. Filtreleme: Yalnızca 2024 ve 2025 verisi
-    df_filtered = df[df["Year"] >= 2024].copy()
 
-    # 2. Row Revenue hesapla
-    df_filtered['Row_Revenue_TL'] = df_filtered['Sale_Amount'] * df_filtered['Unit_Price(TL)']
-    df_filtered['Date'] = pd.to_datetime(df_filtered['Date'])
-    last_dates = df_filtered.groupby(['ProductName'])['Date'].max().reset_index()
-    last_dates.rename(columns={'Date': 'Last_Sale_Date'}, inplace=True)
-    last_dates['Last_Sale_Date'] = last_dates['Last_Sale_Date'].dt.strftime('%d-%m-%Y')
-    df_filtered = df_filtered.merge(last_dates, on=['ProductName'], how='left')
+def show_sales_revenue_product_customer(summary):
+    """compute_sales_revenue_product_customer özetini Streamlit'te gösterir."""
+    _show_revenue_segments(summary, 'Müşteri- Ürün Bazlı Satış Sayısı ve Ortalama Gelir Segmentasyonu')
 
-    # 3. Müşteri-Ürün bazında toplulaştırma
-    summary = df_filtered.groupby(['ProductName']).agg(
-        Sales_Count=('Sale_Amount', 'count'),
-        Total_Revenue=('Row_Revenue_TL', 'sum'),
-        Last_Sale_Date=('Last_Sale_Date', 'max')
-    ).reset_index()
-
-    # 4. Ortalama gelir
-    summary['Avg_Revenue_Per_Sale'] = summary['Total_Revenue'] / summary['Sales_Count']
-    sales_median = summary['Sales_Count'].median()
-    revenue_median = summary['Avg_Revenue_Per_Sale'].median()
-
-    # 5. Segment atama
-    def assign_segment(row):
-        if row['Sales_Count'] >= sales_median and row['Avg_Revenue_Per_Sale'] >= revenue_median:
-            return 'High Sales - High Revenue'
-        elif row['Sales_Count'] >= sales_median and row['Avg_Revenue_Per_Sale'] < revenue_median:
-            return 'High Sales - Low Revenue'
-        elif row['Sales_Count'] < sales_median and row['Avg_Revenue_Per_Sale'] >= revenue_median:
-            return 'Low Sales - High Revenue'
-        else:
-            return 'Low Sales - Low Revenue'
 
-    summary['Segment'] = summary.apply(assign_segment, axis=1)
+def sales_revenue_product_customer(df):
+    """
+    Müşteri-ürün bazlı satış sayısı ve satış başına ortalama gelir analizini yapar,
+    müşteri-ürünleri dört segmente ayırır ve scatter plot ile Streamlit'te görselleştirir.
+    """
+    show_sales_revenue_product_customer(compute_sales_revenue_product_customer(df))
 
-    # 6. Görselleştirme (matplotlib + seaborn)
-    fig, ax = plt.subplots(figsize=(14, 10))
-    sns.scatterplot(
-        data=summary,
-        x='Sales_Count', 
-        y='Avg_Revenue_Per_Sale',
-        hue='Segment',
-        palette={
-            'High Sales - High Revenue': 'green',
-            'High Sales - Low Revenue': 'blue',
-            'Low Sales - High Revenue': 'orange',
-            'Low Sales - Low Revenue': 'red'
-        },
-        s=100,
-        ax=ax
-    )
 
-    ax.axvline(x=70, color='gray', linestyle='--')
-    ax.axhline(y=2.0e6, color='gray', linestyle='--')
-    ax.set_title('Ürün Bazlı Satış Sayısı ve Ortalama Gelir Segmentasyonu', fontsize=18)
-    ax.set_xlabel('Satış Sayısı', fontsize=14)
-    ax.set_ylabel('Satış Başına Ortalama Gelir (₺)', fontsize=14)
-    ax.ticklabel_format(style='plain', axis='y')
-    ax.grid(True)
-    ax.legend(title='Segment', fontsize=10, title_fontsize=12, loc='upper right')
+def compute_sales_revenue_product(df, as_of=None):
+    """Ürün bazlı satış sayısı / satış başına ortalama gelir segment özetini döndürür."""
+    return _revenue_segments(df, ['ProductName'], as_of=as_of)
 
-    # 7. Streamlit üzerinden göster
-    st.pyplot(fig)
 
-    # Opsiyonel: tablo olarak da göster
-    st.dataframe(summary.sort_values(by='Segment'))
+def show_sales_revenue_product(summary):
+    """compute_sales_revenue_product özetini Streamlit'te gösterir."""
+    _show_revenue_segments(summary, 'Ürün Bazlı Satış Sayısı ve Ortalama Gelir Segmentasyonu')
 
 
+def sales_revenue_product(df):
+    """
+    Ürün bazlı satış sayısı ve satış başına ortalama gelir analizini yapar,
+    ürünleri dört segmente ayırır ve scatter plot ile Streamlit'te görselleştirir.
+    """
+    show_sales_revenue_product(compute_sales_revenue_product(df))
@@ -1,6 +1,15 @@
 import pandas as pd
 import streamlit as st
 
+from Analysis_Functions.date_index import analysis_windows
+from Analysis_Functions.sales_cube import is_sales_cube
+from Analysis_Functions.volatility_engine import compute_volatility_levels
+
+
+def _last_sale_column(df):
+    """Satır verisinde 'Date', build_sales_cube küpünde 'Last_Sale_Date' sütununu döndürür."""
+    return 'Last_Sale_Date' if is_sales_cube(df) else 'Date'
+
 def filter_recent_customers(df, year_range=(2024, 2025)):
     """
     Filters the DataFrame to include only customers whose most recent sale occurred within the specified year range.
@@ -12,10 +21,11 @@ def filter_recent_customers(df, year_range=(2024, 2025)):
     Returns:
         pd.DataFrame: Filtered DataFrame containing only recent customers.
     """
+    date_col = _last_sale_column(df)
     # Find the last sale date for each customer
-    last_sales = df.groupby('CustomerCode')['Date'].max().reset_index()
+    last_sales = df.groupby('CustomerCode', observed=True)[date_col].max().reset_index()
     # Select customers whose last sale year is in the specified range
-    recent_customers = last_sales[last_sales['Date'].dt.year.isin(year_range)]['CustomerCode'].unique()
+    recent_customers = last_sales[last_sales[date_col].dt.year.isin(year_range)]['CustomerCode'].unique()
     # Filter the original DataFrame for these customers
     return df[df['CustomerCode'].isin(recent_customers)]
 
@@ -30,95 +40,102 @@ def filter_recent_customers_products(df, year_range=(2024, 2025)):
     Returns:
         pd.DataFrame: Filtered DataFrame containing only recent customer-product pairs.
     """
+    date_col = _last_sale_column(df)
     # 1. Find last sale date for each customer-product pair
-    last_sales = df.groupby(['CustomerCode', 'Product_Code'])['Date'].max().reset_index()
+    last_sales = df.groupby(['CustomerCode', 'Product_Code'], observed=True)[date_col].max().reset_index()
     # 2. Select pairs with last sale year in the specified range
-    recent_pairs = last_sales[last_sales['Date'].dt.year.isin(year_range)][['CustomerCode', 'Product_Code']]
+    recent_pairs = last_sales[last_sales[date_col].dt.year.isin(year_range)][['CustomerCode', 'Product_Code']]
     # 3. Filter the original DataFrame for these pairs
     df_filtered = df.merge(recent_pairs, on=['CustomerCode', 'Product_Code'], how='inner')
+    df_filtered.attrs = df.attrs
     return df_filtered
 
+def _customer_volatility_table(vol):
+    """compute_volatility_levels 'customer' sonucunu eski sütun düzenine çevirir."""
+    return vol[['CustomerCode', 'CustomerName', 'Last_Sale_Date']].assign(Volatility_Score=vol['CV'])
+
+def _customer_product_volatility_table(vol):
+    """compute_volatility_levels 'customer_product' sonucunu eski sütun düzenine çevirir."""
+    return vol[['CustomerCode', 'CustomerName', 'Product_Code', 'ProductName', 'Last_Sale_Date']].assign(
+        Volatility_Score=vol['CV']
+    )
+
 def compute_customer_volatility(df):
     """
     Computes volatility score for each customer based on monthly sales.
 
     Args:
-        df (pd.DataFrame): Input sales data with 'CustomerCode', 'CustomerName', 'Date', and 'Sale_Amount' columns.
+        df (pd.DataFrame): Input sales data with 'CustomerCode', 'CustomerName', 'Date', and 'Sale_Amount' columns,
+            or the sales cube from build_sales_cube.
 
     Returns:
-        pd.DataFrame: DataFrame with customer code, name, last sale date, and volatility score.
+        pd.DataFrame: DataFrame with customer code, name, last sale date, and volatility score (std/mean of monthly sales).
     """
-    # Add YearMonth column for monthly grouping
-    df['YearMonth'] = df['Date'].dt.to_period('M')
-    # Calculate monthly sales per customer
-    monthly = df.groupby(['CustomerCode', 'YearMonth'])['Sale_Amount'].sum().reset_index()
-    # Compute standard deviation and mean of monthly sales
-    vol = monthly.groupby('CustomerCode')['Sale_Amount'].agg(['std', 'mean']).reset_index()
-    # Calculate volatility score as std/mean
-    vol['Volatility_Score'] = vol['std'] / vol['mean']
-    # Get customer names
-    names = df.groupby('CustomerCode')['CustomerName'].first().reset_index()
-    # Get last sale date for each customer
-    last_sale = df.groupby('CustomerCode')['Date'].max().reset_index().rename(columns={'Date': 'Last_Sale_Date'})
-    # Merge additional info
-    vol = vol.merge(names, on='CustomerCode', how='left')
-    vol = vol.merge(last_sale, on='CustomerCode', how='left')
-    # Return relevant columns
-    return vol[['CustomerCode', 'CustomerName', 'Last_Sale_Date', 'Volatility_Score']]
+    vol = compute_volatility_levels(df, ['customer'], granularity='month')['customer']
+    return _customer_volatility_table(vol)
 
 def compute_customer_product_volatility(df):
     """
     Computes volatility score for each customer-product pair based on monthly sales.
 
     Args:
-        df (pd.DataFrame): Input sales data with 'CustomerCode', 'CustomerName', 'Product_Code', 'ProductName', 'Date', and 'Sale_Amount' columns.
+        df (pd.DataFrame): Input sales data with 'CustomerCode', 'CustomerName', 'Product_Code', 'ProductName', 'Date', and 'Sale_Amount' columns,
+            or the sales cube from build_sales_cube.
 
     Returns:
         pd.DataFrame: DataFrame with customer code, name, product code, product name, last sale date, and volatility score.
     """
-    # Add YearMonth column for monthly grouping
-    df['YearMonth'] = df['Date'].dt.to_period('M')
-    # Calculate monthly sales per customer-product pair
-    monthly = df.groupby(['CustomerCode', 'Product_Code', 'YearMonth'])['Sale_Amount'].sum().reset_index()
-    # Compute standard deviation and mean of monthly sales
-    vol = monthly.groupby(['CustomerCode', 'Product_Code'])['Sale_Amount'].agg(['std', 'mean']).reset_index()
-    # Calculate volatility score as std/mean
-    vol['Volatility_Score'] = vol['std'] / vol['mean']
-    # Get customer and product names
-    customer_names = df.groupby('CustomerCode')['CustomerName'].first().reset_index()
-    product_names = df.groupby('Product_Code')['ProductName'].first().reset_index()
-    # Get last sale date for each customer-product pair
-    last_sale = df.groupby(['CustomerCode', 'Product_Code'])['Date'].max().reset_index().rename(columns={'Date': 'Last_Sale_Date'})
-    # Merge additional info
-    vol = vol.merge(customer_names, on='CustomerCode', how='left')
-    vol = vol.merge(product_names, on='Product_Code', how='left')
-    vol = vol.merge(last_sale, on=['CustomerCode', 'Product_Code'], how='left')
-    # Return relevant columns
-    return vol[['CustomerCode', 'CustomerName', 'Product_Code', 'ProductName', 'Last_Sale_Date', 'Volatility_Score']]
+    vol = compute_volatility_levels(df, ['customer_product'], granularity='month')['customer_product']
+    return _customer_product_volatility_table(vol)
 
-def sales_volatility(df, top_n=10):
+def compute_sales_volatility(df, year_range=None, as_of=None):
     """
-    Displays and returns the top N customers and customer-product pairs with the highest sales volatility.
+    Computes customer and customer-product volatility scores for recently active customers / pairs.
+
+    Both levels come from one scan of the data (see volatility_engine.compute_volatility_levels);
+    a customer / pair is kept when its own last sale falls in year_range.
 
     Args:
-        df (pd.DataFrame): Input sales data.
-        top_n (int): Number of top results to display (default: 10).
+        df (pd.DataFrame): Input sales data, or the sales cube from build_sales_cube.
+        year_range (tuple, optional): Years to consider as recent; defaults to the recent years of as_of
+            (date_index.analysis_windows; as_of defaults to the last sale in the data).
+        as_of (str or pd.Timestamp, optional): Analysis date used when year_range is not given.
 
     Returns:
-        tuple: (customer volatility DataFrame, customer-product volatility DataFrame)
+        tuple: (customer volatility DataFrame, customer-product volatility DataFrame), both sorted
+        by 'Volatility_Score' in descending order.
+    """
+    if year_range is None:
+        year_range = analysis_windows(as_of, df)['recent_years']
+    levels = compute_volatility_levels(
+        df, ['customer', 'customer_product'], granularity='month', recent_years=year_range
+    )
+    cust_vol = _customer_volatility_table(levels['customer']).sort_values('Volatility_Score', ascending=False, kind='stable')
+    cust_prod_vol = _customer_product_volatility_table(levels['customer_product']).sort_values(
+        'Volatility_Score', ascending=False, kind='stable'
+    )
+    return cust_vol, cust_prod_vol
+
+def show_sales_volatility(cust_vol, cust_prod_vol, top_n=10):
+    """
+    Displays the top N rows of the volatility tables returned by compute_sales_volatility.
     """
-    # Filter for recent customers
-    df_filtered = filter_recent_customers(df)
     st.markdown("### 🔹 Müşteri Bazlı Volatilite Skoru")
-    # Compute and display customer volatility
-    cust_vol = compute_customer_volatility(df_filtered).sort_values('Volatility_Score', ascending=False)
     st.dataframe(cust_vol.head(top_n))
-
-    # Filter for recent customer-product pairs
-    df_filtered = filter_recent_customers_products(df)
     st.markdown("### 🔹 Müşteri-Ürün Bazlı Volatilite Skoru")
-    # Compute and display customer-product volatility
-    cust_prod_vol = compute_customer_product_volatility(df_filtered).sort_values('Volatility_Score', ascending=False)
     st.dataframe(cust_prod_vol.head(top_n))
 
+def sales_volatility(df, top_n=10):
+    """
+    Displays and returns the top N customers and customer-product pairs with the highest sales volatility.
+
+    Args:
+        df (pd.DataFrame): Input sales data, or the sales cube from build_sales_cube.
+        top_n (int): Number of top results to display (default: 10).
+
+    Returns:
+        tuple: (customer volatility DataFrame, customer-product volatility DataFrame)
+    """
+    cust_vol, cust_prod_vol = compute_sales_volatility(df)
+    show_sales_volatility(cust_vol, cust_prod_vol, top_n=top_n)
     return cust_vol, cust_prod_vol
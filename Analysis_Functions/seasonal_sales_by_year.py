@@ -2,22 +2,28 @@ import matplotlib.pyplot as plt
 import matplotlib.ticker as mticker
 import seaborn as sns
 
-def seasonal_sales_by_year(df, years=[2020, 2021, 2022, 2023, 2024, 2025], plot=True):
+from Analysis_Functions.date_index import analysis_windows, years_window
+
+def seasonal_sales_by_year(df, years=None, plot=True, as_of=None):
     """
     Sezon ve yıl bazında toplam satışları hesaplar. İsteğe bağlı olarak grafiğini çizer.
     
     Parametreler:
     - df: DataFrame (içinde 'Season', 'Year' ve 'Sale_Amount' sütunları olmalı)
-    - years: Gösterilecek yıl listesi
+    - years: Gösterilecek yıl listesi; verilmezse as_of'un son altı yılı (as_of verilmezse verideki son satış günü)
     - plot: True ise grafik çizer
+    - as_of: Analiz tarihi (date_index.analysis_windows)
 
     Geri dönüş: Sezon & yıl bazında toplam satışlar (DataFrame)
     """
-    # Yalnızca belirtilen yıllardaki verileri filtrele
-    df_filtered = df[df["Year"].isin(years)].copy()
+    if years is None:
+        windows = analysis_windows(as_of, df)
+        years = list(range(windows["overview_since"].year, windows["as_of"].year + 1))
+    # Yalnızca belirtilen yıllardaki verileri filtrele (ardışık yıllar tarihe göre sıralı satırlarda tek dilimdir)
+    df_filtered = years_window(df, years)
     
     # Sezon ve yıl bazında toplam satışları grupla ve hesapla
-    sales_by_season_year = df_filtered.groupby(['Season', 'Year'])['Sale_Amount'].sum().reset_index()
+    sales_by_season_year = df_filtered.groupby(['Season', 'Year'], observed=True)['Sale_Amount'].sum().reset_index()
 
     if plot:
         # Grafik oluştur
@@ -25,7 +31,7 @@ def seasonal_sales_by_year(df, years=[2020, 2021, 2022, 2023, 2024, 2025], plot=
         sns.barplot(data=sales_by_season_year, x='Season', y='Sale_Amount', hue='Year', ax=ax)
         # Y eksenini binlik ayırıcı ile biçimlendir
         ax.yaxis.set_major_formatter(mticker.StrMethodFormatter('{x:,.0f}'))
-        ax.set_title('2020-2025 Yılları Arasında Sezon Bazlı Toplam Satışlar')
+        ax.set_title(f'{min(years)}-{max(years)} Yılları Arasında Sezon Bazlı Toplam Satışlar')
         ax.set_xlabel('Sezon')
         ax.set_ylabel('Toplam Satış Adedi')
         ax.grid(axis='y')
@@ -4,11 +4,29 @@ import matplotlib.pyplot as plt
 import seaborn as sns
 import streamlit as st
 
+from Analysis_Functions.date_index import analysis_windows
+from Analysis_Functions.figure_cache import show_figure
+from Analysis_Functions.paged_table import show_table
+from Analysis_Functions.sql_backend import arrow_table, decode_columns, quote, sql_connection, use_sql
+
+
+def _heatmap_figure(data, x_label, y_label, title, cmap='YlGnBu'):
+  """Builds the annotated 30x20 inch heatmap figure used by plot_heatmap."""
+  fig, ax = plt.subplots(figsize=(30, 20))
+  sns.heatmap(data, cmap=cmap, annot=True, fmt=".1f", linewidths=0.1, ax=ax)
+  ax.set_xlabel(x_label)
+  ax.set_ylabel(y_label)
+  ax.set_title(title, fontsize=16)
+  fig.tight_layout()
+  return fig
+
 
 # Helper function to create and display heatmaps in Streamlit
 def plot_heatmap(data, x_label, y_label, title, cmap='YlGnBu'):
   """
   Creates and displays a heatmap using Seaborn and Matplotlib, and renders it in a Streamlit app.
+  The figure is built and rasterized through figure_cache.show_figure, so on reruns with the
+  same data the cached PNG is shown without rebuilding it.
 
   Parameters:
     data (DataFrame or 2D array-like): The data to be visualized in the heatmap.
@@ -21,51 +39,28 @@ def plot_heatmap(data, x_label, y_label, title, cmap='YlGnBu'):
     - The heatmap plot in the Streamlit app.
     - The title as a markdown header below the plot.
   """
-  fig, ax = plt.subplots(figsize=(30, 20))
-  sns.heatmap(data, cmap=cmap, annot=True, fmt=".1f", linewidths=0.1, ax=ax)
-  ax.set_xlabel(x_label)
-  ax.set_ylabel(y_label)
-  ax.set_title(title, fontsize=16)
-  plt.tight_layout()
-  st.pyplot(fig)
+  show_figure(_heatmap_figure, data, x_label, y_label, title, cmap=cmap)
   st.markdown(f"## {title}")
 
 
-# Function to analyze seasonality, special day, channel, and price effects on product sales
-def check_seasonality_specialday_channel_price(df):
+def _seasonality_aggregates(df, active_since):
   """
-  Analyzes seasonality, special day, channel, and price effects on product sales.
-  This function processes a sales DataFrame to:
-    - Calculate the first and last sale dates for each product.
-    - Filter products with recent sales (after or on "2024-06-01").
-    - Aggregate and display sales by season, special day, and channel for each product.
-    - Compute and display the standard deviation of unit prices per product.
-    - Compute the standard deviation of unit prices per customer-product pair (returned).
-  The results are displayed using Streamlit dataframes for interactive analysis.
-  Parameters:
-    df (pd.DataFrame): Input DataFrame containing at least the following columns:
-      - 'Product_Code'
-      - 'ProductName'
-      - 'Date'
-      - 'Sale_Amount'
-      - 'Season'
-      - 'Special_Day'
-      - 'Channel'
-      - 'Unit_Price(TL)'
-      - 'CustomerCode'
+  Row-level aggregations behind compute_seasonality_specialday_channel_price (pandas backend).
+
   Returns:
-    pd.DataFrame: DataFrame with standard deviation of unit prices per customer-product pair,
-            with columns ['CustomerCode', 'Product_Code', 'Price_STD2'].
+    dict: 'last_sale_dates' / 'first_sale_dates' per product, the sales sums per product and
+    season / special day / channel as Series (unstacked by the caller), and the unit price
+    standard deviations per product ('price_std') and per customer-product pair ('price_std2').
   """
   # Calculate last sale dates for each customer-product pair
   last_sale_dates_product = (
-    df.groupby(['Product_Code', 'ProductName'])['Date']
+    df.groupby(['Product_Code', 'ProductName'], observed=True)['Date']
     .max()
     .reset_index()
     .rename(columns={'Date': 'Product_Last_Sale_Date'})
   )
   first_sale_dates_product = (
-    df.groupby(['Product_Code', 'ProductName'])['Date']
+    df.groupby(['Product_Code', 'ProductName'], observed=True)['Date']
     .min()
     .reset_index()
     .rename(columns={'Date': 'Product_First_Sale_Date'})
@@ -75,11 +70,115 @@ def check_seasonality_specialday_channel_price(df):
   df = df.merge(last_sale_dates_product, on=['Product_Code', 'ProductName'], how='left')
   df = df.merge(first_sale_dates_product, on=['Product_Code', 'ProductName'], how='left')
 
-  # Filter products with last sale date after or on 2024-06-01
-  df_filtered = df[df['Product_Last_Sale_Date'] >= "2024-06-01"]
-  
-  # Group and calculate seasonality results
-  seasonality_results = df_filtered.groupby(['ProductName','Product_Code', 'Season'])['Sale_Amount'].sum().unstack()
+  # Filter products with last sale date after or on active_since
+  df_filtered = df[df['Product_Last_Sale_Date'] >= active_since]
+
+  return {
+    'last_sale_dates': last_sale_dates_product,
+    'first_sale_dates': first_sale_dates_product,
+    'seasonality': df_filtered.groupby(['ProductName','Product_Code', 'Season'], observed=True)['Sale_Amount'].sum(),
+    'special_day': df_filtered.groupby(['ProductName','Product_Code', 'Special_Day'], observed=True)['Sale_Amount'].sum(),
+    'channel': df_filtered.groupby(['ProductName','Product_Code', 'Channel'], observed=True)['Sale_Amount'].sum(),
+    # Calculate price standard deviation per product
+    'price_std': df_filtered.groupby(['ProductName', 'Product_Code'], observed=True)['Unit_Price(TL)'].std().reset_index().rename(
+      columns={'Unit_Price(TL)': 'Price_STD'}
+    ),
+    # Calculate price standard deviation per customer-product pair
+    'price_std2': df_filtered.groupby(['CustomerCode', 'Product_Code'], observed=True)['Unit_Price(TL)'].std().reset_index().rename(
+      columns={'Unit_Price(TL)': 'Price_STD2'}
+    ),
+  }
+
+
+def _seasonality_aggregates_sql(df, active_since):
+  """
+  DuckDB counterpart of _seasonality_aggregates: the product date filter and all sums and
+  standard deviations run as SQL over the rows, grouped on integer key codes; only the small
+  results come back to pandas, in groupby order and with the input dtypes.
+  """
+  product = ['Product_Code', 'ProductName']
+  coded = ['CustomerCode', 'Product_Code', 'ProductName', 'Season', 'Special_Day', 'Channel']
+  table, labels = arrow_table(df, coded + ['Date', 'Sale_Amount', 'Unit_Price(TL)'], coded=coded)
+
+  def aggregate(con, keys, expression, name):
+    key_list = ', '.join(map(quote, keys))
+    valid = ' AND '.join(f'{quote(key)} >= 0' for key in keys)
+    return decode_columns(con.execute(
+      f"SELECT {key_list}, {expression} AS {quote(name)} FROM filtered WHERE {valid} "
+      f"GROUP BY {key_list} ORDER BY {key_list}"
+    ).df(), labels)
+
+  def sales_by(con, col):
+    keys = ['ProductName', 'Product_Code', col]
+    return aggregate(con, keys, 'coalesce(sum(Sale_Amount), 0)', 'Sale_Amount').set_index(keys)['Sale_Amount']
+
+  with sql_connection(t=table) as con:
+    con.execute("""
+      CREATE TEMP TABLE dates AS
+      SELECT Product_Code, ProductName, max("Date") AS Product_Last_Sale_Date, min("Date") AS Product_First_Sale_Date
+      FROM t WHERE Product_Code >= 0 AND ProductName >= 0
+      GROUP BY Product_Code, ProductName
+    """)
+    con.execute(f"""
+      CREATE TEMP TABLE filtered AS
+      SELECT t.* FROM t JOIN dates USING (Product_Code, ProductName)
+      WHERE Product_Last_Sale_Date >= TIMESTAMP '{active_since:%Y-%m-%d}'
+    """)
+    dates = decode_columns(con.execute("SELECT * FROM dates ORDER BY Product_Code, ProductName").df(), labels)
+    for col in ['Product_Last_Sale_Date', 'Product_First_Sale_Date']:
+      dates[col] = dates[col].astype(df['Date'].dtype)
+    return {
+      'last_sale_dates': dates[product + ['Product_Last_Sale_Date']],
+      'first_sale_dates': dates[product + ['Product_First_Sale_Date']],
+      'seasonality': sales_by(con, 'Season'),
+      'special_day': sales_by(con, 'Special_Day'),
+      'channel': sales_by(con, 'Channel'),
+      'price_std': aggregate(con, ['ProductName', 'Product_Code'], 'stddev_samp("Unit_Price(TL)")', 'Price_STD'),
+      'price_std2': aggregate(con, ['CustomerCode', 'Product_Code'], 'stddev_samp("Unit_Price(TL)")', 'Price_STD2'),
+    }
+
+
+# Function to analyze seasonality, special day, channel, and price effects on product sales
+def compute_seasonality_specialday_channel_price(df, as_of=None):
+  """
+  Computes seasonality, special day, channel, and price effects on product sales.
+  This function processes a sales DataFrame to:
+    - Calculate the first and last sale dates for each product.
+    - Filter products with recent sales (on or after June 1st of the year before as_of, as_of defaults to the last sale in the data).
+    - Aggregate sales by season, special day, and channel for each product.
+    - Compute the standard deviation of unit prices per product.
+    - Compute the standard deviation of unit prices per customer-product pair.
+  Nothing is rendered; see show_seasonality_specialday_channel_price.
+  Parameters:
+    df (pd.DataFrame): Input DataFrame containing at least the following columns:
+      - 'Product_Code'
+      - 'ProductName'
+      - 'Date'
+      - 'Sale_Amount'
+      - 'Season'
+      - 'Special_Day'
+      - 'Channel'
+      - 'Unit_Price(TL)'
+      - 'CustomerCode'
+    as_of (str or pd.Timestamp, optional): Analysis date (date_index.analysis_windows). Rows after as_of
+      are expected to be cut by the caller (date_index.until_as_of).
+  Returns:
+    dict: {
+      'seasonality': sales per product and season,
+      'special_day': sales per product and special day,
+      'channel': sales per product and channel,
+      'price_std': unit price standard deviation per product,
+      'price_std2': unit price standard deviation per customer-product pair,
+            with columns ['CustomerCode', 'Product_Code', 'Price_STD2'],
+    }
+  """
+  active_since = analysis_windows(as_of, df)['active_since']
+  aggregates = _seasonality_aggregates_sql(df, active_since) if use_sql() else _seasonality_aggregates(df, active_since)
+  last_sale_dates_product = aggregates['last_sale_dates']
+  first_sale_dates_product = aggregates['first_sale_dates']
+
+  # Seasonality results: one column per season
+  seasonality_results = aggregates['seasonality'].unstack()
   seasonality_results = seasonality_results.merge(
       last_sale_dates_product,
       on=['Product_Code', 'ProductName'],
@@ -91,8 +190,8 @@ def check_seasonality_specialday_channel_price(df):
       how='left'
   )
 
-  # Group and calculate special day results
-  special_day_results = df_filtered.groupby(['ProductName','Product_Code', 'Special_Day'])['Sale_Amount'].sum().unstack()
+  # Special day results: one column per special day flag
+  special_day_results = aggregates['special_day'].unstack()
   special_day_results= special_day_results.merge(
     last_sale_dates_product,
     on=['Product_Code', 'ProductName'],
@@ -104,8 +203,8 @@ def check_seasonality_specialday_channel_price(df):
     how='left'
   )
 
-  # Group and calculate channel results
-  channel_results = df_filtered.groupby(['ProductName','Product_Code', 'Channel'])['Sale_Amount'].sum().unstack()
+  # Channel results: one column per channel
+  channel_results = aggregates['channel'].unstack()
   channel_results= channel_results.merge(
     last_sale_dates_product,
     on=['Product_Code', 'ProductName'],
@@ -117,12 +216,8 @@ def check_seasonality_specialday_channel_price(df):
     how='left'
   )
 
-  # Calculate price standard deviation per product
-  price_std = df_filtered.groupby(['ProductName', 'Product_Code'])['Unit_Price(TL)'].std().reset_index().rename(
-    columns={'Unit_Price(TL)': 'Price_STD'}
-  )
   # Merge sale dates with price_std
-  price_std = price_std.merge(
+  price_std = aggregates['price_std'].merge(
       last_sale_dates_product,
       on=['Product_Code', 'ProductName'],
       how='left'
@@ -132,48 +227,66 @@ def check_seasonality_specialday_channel_price(df):
       on=['Product_Code', 'ProductName'],
       how='left'
   )
+  price_std2 = aggregates['price_std2']
+  return {
+    'seasonality': seasonality_results,
+    'special_day': special_day_results,
+    'channel': channel_results,
+    'price_std': price_std,
+    'price_std2': price_std2,
+  }
 
-  # Calculate price standard deviation per customer-product pair
-  price_std2= df_filtered.groupby(['CustomerCode', 'Product_Code'])['Unit_Price(TL)'].std().reset_index().rename(
-    columns={'Unit_Price(TL)': 'Price_STD2'}
-  )
 
+def show_seasonality_specialday_channel_price(results):
+  """
+  Displays the tables computed by compute_seasonality_specialday_channel_price in Streamlit.
+  """
   # Display seasonality analysis in Streamlit
   st.markdown("### Ürün Bazında Mevsimsellik Analizi")
-  st.dataframe(seasonality_results)
+  show_table(results['seasonality'], key="seasonality")
   #plot_heatmap(seasonality_results, "Sezon", "Satış Miktarı", "Sezonsallık Analizi")
 
   # Display special day analysis in Streamlit
   st.markdown("### Ürün Bazında Özel Gün Analizi")
-  st.dataframe(special_day_results)
+  show_table(results['special_day'], key="special_day")
   #plot_heatmap(special_day_results, "Özel Gün", "Satış Miktarı", "Özel Gün Analizi")
 
   # Display channel analysis in Streamlit
   st.markdown("### Ürün Bazında Kanal Analizi")
-  st.dataframe(channel_results)
+  show_table(results['channel'], key="channel")
   #plot_heatmap(channel_results, "Kanal", "Satış Miktarı", "Kanal Analizi")
 
   # Display price effect analysis in Streamlit
   st.markdown("### Ürün Bazında Fiyat Etkisi Analizi")
-  st.dataframe(price_std)
+  show_table(results['price_std'], key="price_std")
   #plot_heatmap(price_std, "Ürün", "Fiyat Standart Sapması", "Fiyat Etkisi Analizi")
-  return price_std2
+
+
+def check_seasonality_specialday_channel_price(df):
+  """
+  Analyzes seasonality, special day, channel, and price effects on product sales and displays
+  the tables in Streamlit. Returns the per customer-product unit price standard deviation
+  (['CustomerCode', 'Product_Code', 'Price_STD2']).
+  """
+  results = compute_seasonality_specialday_channel_price(df)
+  show_seasonality_specialday_channel_price(results)
+  return results['price_std2']
 
 # trend+volatility dataframe ile price_std birleştir  
 
-def check_price_and_sales(combined_df_customer_product, price_std):
+def compute_price_and_sales(combined_df_customer_product, price_std):
   """
-  Analyzes the balance between price volatility and sales fluctuation for customer-product pairs.
-  This function merges customer-product sales data with price standard deviation data, categorizes each pair
-  based on price volatility (Price_STD2) and coefficient of variation (coef_var), and visualizes the results
-  in a scatter plot. The function also displays the categorized data in a Streamlit dataframe.
+  Computes the balance between price volatility and sales fluctuation for customer-product pairs.
+  This function merges customer-product sales data with price standard deviation data and categorizes each pair
+  based on price volatility (Price_STD2) and coefficient of variation (coef_var). The results are
+  visualized by show_price_and_sales.
   Parameters:
     combined_df_customer_product (pd.DataFrame): DataFrame containing sales data for customer-product pairs.
     price_std (pd.DataFrame): DataFrame containing price standard deviation and coefficient of variation
           for customer-product pairs.
   Returns:
-    pd.DataFrame: A DataFrame with columns ["CustomerCode", "Product_Code", "Price_STD2", "coef_var",
-    "Last_Sale_Date", "Kategori"], sorted by price volatility and sales fluctuation.
+    pd.DataFrame: The merged DataFrame, one row per customer-product pair, sorted by Price_STD2,
+    with 'Customer_Product' and 'Kategori' columns added.
   """
   # Merge combined_df_customer_product with price_std on CustomerCode and Product_Code
   merged_df = pd.merge(combined_df_customer_product, price_std, on=["CustomerCode", "Product_Code"], how="left")
@@ -182,7 +295,7 @@ def check_price_and_sales(combined_df_customer_product, price_std):
   merged_df.drop_duplicates(subset=["CustomerCode", "Product_Code"], inplace=True)
 
   # Create a new column combining CustomerCode and Product_Code
-  merged_df["Customer_Product"] = merged_df["CustomerCode"] + "-" + merged_df["Product_Code"]
+  merged_df["Customer_Product"] = merged_df["CustomerCode"].astype(str) + "-" + merged_df["Product_Code"].astype(str)
 
   # Categorize products based on Price_STD and coef_var
   def categorize(row):
@@ -197,7 +310,13 @@ def check_price_and_sales(combined_df_customer_product, price_std):
       return "Dengeli"
 
   merged_df["Kategori"] = merged_df.apply(categorize, axis=1)
+  return merged_df
+
 
+def show_price_and_sales(merged_df):
+  """
+  Displays the price vs. sales fluctuation scatter plot and table for the output of compute_price_and_sales.
+  """
   # Create a scatter plot
   fig, ax = plt.subplots(figsize=(10, 7))
   colors = {
@@ -207,7 +326,7 @@ def check_price_and_sales(combined_df_customer_product, price_std):
   }
 
   # Plot each category with a different color
-  for kategori, group in merged_df.groupby("Kategori"):
+  for kategori, group in merged_df.groupby("Kategori", observed=True):
     ax.scatter(group["Price_STD2"], group["coef_var"], label=kategori, color=colors[kategori], s=100)
 
   ax.set_xlabel("Price_STD (Fiyat Oynaklığı)", fontsize=12)
@@ -217,12 +336,23 @@ def check_price_and_sales(combined_df_customer_product, price_std):
   ax.grid(True)
 
   # Display the scatter plot in Streamlit
-  st.pyplot(fig)
+  show_figure(fig)
 
   # Display the merged dataframe in Streamlit
   st.markdown("### Fiyat ve Satış Dengesi Analizi")
-  st.dataframe(merged_df[["CustomerCode", "Product_Code", "Price_STD2", "coef_var", "Last_Sale_Date", "Kategori"]])
+  show_table(merged_df[["CustomerCode", "Product_Code", "Price_STD2", "coef_var", "Last_Sale_Date", "Kategori"]], key="price_and_sales")
+
+
+def check_price_and_sales(combined_df_customer_product, price_std):
+  """
+  Analyzes the balance between price volatility and sales fluctuation for customer-product pairs,
+  displays the scatter plot and table in Streamlit and returns a DataFrame with columns
+  ["CustomerCode", "Product_Code", "Price_STD2", "coef_var", "Last_Sale_Date", "Kategori"],
+  sorted by price volatility and sales fluctuation.
+  """
+  merged_df = compute_price_and_sales(combined_df_customer_product, price_std)
+  show_price_and_sales(merged_df)
 
   # Sort and return the dataframe
-  merged_df.sort_values(by=["Price_STD2", "coef_var"], ascending=True, inplace=True)
-  return merged_df[["CustomerCode", "Product_Code", "Price_STD2", "coef_var", "Last_Sale_Date", "Kategori"]]
\ No newline at end of file
+  merged_df = merged_df.sort_values(by=["Price_STD2", "coef_var"], ascending=True)
+  return merged_df[["CustomerCode", "Product_Code", "Price_STD2", "coef_var", "Last_Sale_Date", "Kategori"]]
@@ -0,0 +1,146 @@
+import json
+import os
+import re
+
+import pandas as pd
+
+from Analysis_Functions.database import get_sales_data
+
+SNAPSHOT_DIR = os.path.join(".cache", "snapshots")
+# Artımlı yenilemede filigrandan geriye yeniden çekilen gün sayısı: bu süre içinde düzeltilen faturalar güncellenir
+LOOKBACK_DAYS = 30
+
+
+def option_slug(option):
+    """Analiz tipinden dosya/klasör adı olarak kullanılabilecek ASCII bir ad türetir."""
+    return re.sub(r"[^0-9A-Za-z]+", "_", option.encode("ascii", "ignore").decode()).strip("_").lower()
+
+
+def _snapshot_paths(option, cache_dir=SNAPSHOT_DIR):
+    """Seçilen analiz tipi için Parquet dosyası ve meta dosyası yollarını döndürür."""
+    slug = option_slug(option)
+    return (
+        os.path.join(cache_dir, f"{slug}.parquet"),
+        os.path.join(cache_dir, f"{slug}.json"),
+    )
+
+
+def read_snapshot(option, cache_dir=SNAPSHOT_DIR):
+    """
+    Seçilen analiz tipinin yerel anlık görüntüsünü okur.
+
+    Returns:
+        tuple: (pd.DataFrame, dict) veya anlık görüntü yoksa (None, None).
+    """
+    data_path, meta_path = _snapshot_paths(option, cache_dir)
+    if not (os.path.exists(data_path) and os.path.exists(meta_path)):
+        return None, None
+    with open(meta_path, encoding="utf-8") as f:
+        meta = json.load(f)
+    return pd.read_parquet(data_path), meta
+
+
+def write_snapshot(df, option, cache_dir=SNAPSHOT_DIR):
+    """
+    DataFrame'i seçilen analiz tipi için Parquet olarak yazar ve InvoiceDate filigranını kaydeder.
+
+    Dosyalar önce geçici adla yazılıp sonra yerine taşınır; yarıda kalan bir yazma
+    mevcut anlık görüntüyü bozmaz.
+    """
+    os.makedirs(cache_dir, exist_ok=True)
+    data_path, meta_path = _snapshot_paths(option, cache_dir)
+    watermark = pd.to_datetime(df["InvoiceDate"]).max() if len(df) else None
+    meta = {
+        "option": option,
+        "rows": int(len(df)),
+        "watermark": None if watermark is None or pd.isna(watermark) else watermark.isoformat(),
+        "refreshed_at": pd.Timestamp.now().isoformat(),
+    }
+    df.to_parquet(data_path + ".tmp", index=False)
+    os.replace(data_path + ".tmp", data_path)
+    with open(meta_path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(meta, f, ensure_ascii=False, indent=2)
+    os.replace(meta_path + ".tmp", meta_path)
+    return meta
+
+
+def _merge_increment(snapshot, increment, since):
+    """
+    Yeni çekilen satırları anlık görüntüyle birleştirir.
+
+    Artımlı sorgu InvoiceDate >= since koşuluyla çalıştığı için anlık görüntüdeki aynı
+    aralıktaki satırlar atılır ve yerlerine veritabanındaki güncel halleri konur; böylece
+    filigran gününe sonradan eklenen faturalar çift sayılmaz ya da kaçırılmaz.
+
+    InvoiceDate'i boş (NaT) satırlar artımlı sorguya hiç gelmediğinden anlık görüntüdeki halleriyle
+    korunur; bu satırlara sonradan yapılan değişiklikler yalnızca tam çekimde (full_refresh) alınır.
+    """
+    invoice_date = pd.to_datetime(snapshot["InvoiceDate"])
+    keep = snapshot[(invoice_date < since) | invoice_date.isna()]
+    merged = pd.concat([keep, increment], ignore_index=True)
+    # Parçalı okumada oluşan kategori sözlükleri birleşimde object'e düşebilir
+    for col in snapshot.columns:
+        if isinstance(snapshot[col].dtype, pd.CategoricalDtype) and col in merged.columns:
+            merged[col] = merged[col].astype("category")
+    return merged
+
+
+def load_sales_data(option, refresh=True, full_refresh=False, lookback_days=LOOKBACK_DAYS,
+                    chunksize=100_000, progress_callback=None, cache_dir=SNAPSHOT_DIR, trace_memory=False):
+    """
+    Satış verisini yerel Parquet anlık görüntüsünden okur, gerekirse artımlı olarak yeniler.
+
+    - Anlık görüntü yoksa ya da full_refresh=True ise tüm veri veritabanından çekilir.
+    - refresh=True ise yalnızca kayıtlı en büyük InvoiceDate'ten (filigran) itibaren olan
+      satırlar çekilip anlık görüntüyle birleştirilir. Filigrandan lookback_days gün öncesinden
+      itibaren yeniden çekilir; böylece bu süre içinde düzeltilen faturalar da güncellenir. Daha
+      eski düzeltmeler yalnızca tam çekimde (full_refresh) alınır.
+    - refresh=False ise veritabanına hiç gidilmeden yerel dosya döndürülür.
+
+    Parametreler:
+        option (str): Dashboard'da seçilen analiz tipi.
+        refresh (bool): Veritabanından artımlı yenileme yapılsın mı?
+        full_refresh (bool): Anlık görüntü yok sayılıp tam çekim yapılsın mı?
+        lookback_days (int): Filigrandan geriye doğru yeniden çekilecek gün sayısı (0: yalnızca filigran günü).
+        chunksize (int): get_sales_data'ya iletilen parça boyutu.
+        progress_callback (callable, optional): get_sales_data'ya iletilir.
+        cache_dir (str): Anlık görüntülerin tutulduğu klasör.
+        trace_memory (bool): get_sales_data'ya iletilir (yüklemenin tepe belleği ölçülür).
+
+    Döndürür:
+        pd.DataFrame: Satış verisi. Hata durumunda get_sales_data gibi (None, hata_mesajı).
+        df.attrs["snapshot"] hangi yoldan gelindiğini ("cache", "incremental", "full"),
+        çekilen satır sayısını ve filigranı içerir. Veritabanından okunduysa df.attrs["load_stats"]
+        (bkz. database.read_sales_chunks) artımlı çekimde de korunur.
+    """
+    snapshot, meta = (None, None) if full_refresh else read_snapshot(option, cache_dir)
+
+    if snapshot is not None and (not refresh or meta.get("watermark") is None):
+        # Parquet attrs'ı sakladığından dosyada önceki yüklemenin istatistikleri durur; veritabanına gidilmedi
+        snapshot.attrs.pop("load_stats", None)
+        snapshot.attrs["snapshot"] = {"mode": "cache", "fetched_rows": 0, "watermark": meta.get("watermark")}
+        return snapshot
+
+    if snapshot is None:
+        df = get_sales_data(
+            option, chunksize=chunksize, progress_callback=progress_callback, trace_memory=trace_memory,
+        )
+        if isinstance(df, tuple):
+            return df
+        meta = write_snapshot(df, option, cache_dir)
+        df.attrs["snapshot"] = {"mode": "full", "fetched_rows": len(df), "watermark": meta["watermark"]}
+        return df
+
+    since = pd.Timestamp(meta["watermark"]).normalize() - pd.Timedelta(days=lookback_days)
+    increment = get_sales_data(
+        option, chunksize=chunksize, progress_callback=progress_callback, since=since, trace_memory=trace_memory,
+    )
+    if isinstance(increment, tuple):
+        return increment
+    df = _merge_increment(snapshot, increment, since)
+    # Birleşim attrs'ı korumaz; artımlı çekimin yükleme istatistikleri taşınır
+    if "load_stats" in increment.attrs:
+        df.attrs["load_stats"] = increment.attrs["load_stats"]
+    meta = write_snapshot(df, option, cache_dir)
+    df.attrs["snapshot"] = {"mode": "incremental", "fetched_rows": len(increment), "watermark": meta["watermark"]}
+    return df
@@ -0,0 +1,131 @@
+import contextlib
+import os
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+try:
+    import duckdb
+except ImportError:  # DuckDB isteğe bağlıdır; yalnızca 'duckdb' arka ucu seçilirse gerekir
+    duckdb = None
+
+# Ağır gruplama analizlerinin çalışabileceği arka uçlar; varsayılan pandas
+BACKENDS = ("pandas", "duckdb")
+# Girdi tablolarına eklenen satır sırası sütunu (pandas'ın 'first' davranışı için)
+ROW_COLUMN = "_row"
+
+_settings = {"backend": "pandas", "threads": os.cpu_count() or 1}
+
+
+def configure_backend(backend=None, threads=None):
+    """
+    Ağır gruplama analizlerinin (yıllık satış pivotu, mevsimsellik/kanal/fiyat, aktif ay) arka
+    ucunu seçer. 'duckdb' seçilirse bu analizler süreç içi bir DuckDB veritabanında SQL olarak
+    çok iş parçacıklı çalışır; sonuçlar pandas arka ucuyla aynıdır.
+
+    Parameters:
+        backend (str, optional): BACKENDS içinden biri.
+        threads (int, optional): DuckDB iş parçacığı sayısı (varsayılan: CPU sayısı).
+
+    Raises:
+        ValueError: Bilinmeyen arka uç ya da DuckDB kurulu değilken 'duckdb' seçilirse.
+    """
+    if backend is not None:
+        if backend not in BACKENDS:
+            raise ValueError(f"Bilinmeyen arka uç: {backend} (seçenekler: {', '.join(BACKENDS)})")
+        if backend == "duckdb" and duckdb is None:
+            raise ValueError("DuckDB arka ucu için 'duckdb' paketi kurulu olmalıdır.")
+        _settings["backend"] = backend
+    if threads is not None:
+        _settings["threads"] = max(1, int(threads))
+
+
+def active_backend():
+    """Seçili arka ucun adı."""
+    return _settings["backend"]
+
+
+def available_backends():
+    """Bu ortamda kullanılabilen arka uçlar (DuckDB kurulu değilse yalnızca pandas)."""
+    return [name for name in BACKENDS if name != "duckdb" or duckdb is not None]
+
+
+def use_sql():
+    """Analizlerin SQL (DuckDB) uygulamasının kullanılıp kullanılmayacağını döndürür."""
+    return _settings["backend"] == "duckdb"
+
+
+def _codes(values):
+    """
+    Değerlerin pandas groupby sırasındaki tam sayı kodları (eksik değer -1) ve kodları değerlere
+    geri çevirmek için kategori türü ya da sıralı benzersiz değerler.
+    """
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        return values.cat.codes.to_numpy(), values.dtype
+    codes, uniques = pd.factorize(values, sort=True)
+    return codes, uniques
+
+
+def arrow_table(df, columns, coded=()):
+    """
+    DataFrame'in yalnızca gereken sütunlarını Arrow tablosuna çevirir; sayısal sütunlar kopyalanmaz.
+
+    coded sütunları (gruplama anahtarları, ad sütunları) değerleri yerine pandas groupby
+    sırasındaki tam sayı kodlarıyla yer alır (eksik değer -1). SQL tam sayılar üzerinde gruplar
+    ve bu sütunlara göre ORDER BY pandas groupby ile aynı sırayı verir. Satır sırası ROW_COLUMN
+    olarak eklenir (pandas'ın 'first' davranışı için).
+
+    Returns:
+        tuple: (pa.Table, dict) — tablo ve decode_columns için sütun -> kod çözücü.
+    """
+    table = pa.Table.from_pandas(df, columns=[col for col in columns if col not in coded], preserve_index=False)
+    labels = {}
+    for col in coded:
+        codes, labels[col] = _codes(df[col])
+        table = table.append_column(col, pa.array(codes))
+    table = table.append_column(ROW_COLUMN, pa.array(np.arange(len(df), dtype=np.int64)))
+    return table, labels
+
+
+def decode_columns(result, labels):
+    """SQL sonucundaki kodlanmış sütunları (bkz. arrow_table) girdideki değer ve türlere çevirir."""
+    for col, label in labels.items():
+        if col not in result.columns:
+            continue
+        # arg_min gibi toplamlarda hiç geçerli değer yoksa NULL döner; pandas'taki gibi eksik değer olur
+        codes = result[col].fillna(-1).to_numpy(dtype=np.int64)
+        if isinstance(label, pd.CategoricalDtype):
+            result[col] = pd.Categorical.from_codes(codes, dtype=label)
+        elif (codes < 0).any():
+            # pandas groupby'ın 'first' sonucu gibi eksik değerler None olur
+            values = np.asarray(label.take(np.maximum(codes, 0)), dtype=object)
+            values[codes < 0] = None
+            result[col] = values
+        else:
+            result[col] = np.asarray(label.take(codes))
+    return result
+
+
+def quote(name):
+    """SQL tanımlayıcısı olarak tırnaklanmış sütun adı."""
+    return '"' + str(name).replace('"', '""') + '"'
+
+
+@contextlib.contextmanager
+def sql_connection(**tables):
+    """
+    Yeni bir süreç içi DuckDB bağlantısı açar ve verilen tabloları bu adlarla kaydeder.
+    Bağlantı çağrı başına açılıp kapatılır; böylece Streamlit'in iş parçacıkları ve havuz
+    süreçleri bağlantı paylaşmaz.
+
+    Parameters:
+        **tables: Sorgularda bu adlarla görünen Arrow tabloları (bkz. arrow_table) ya da DataFrame'ler.
+    """
+    con = duckdb.connect(config={"threads": _settings["threads"]})
+    try:
+        for name, table in tables.items():
+            con.register(name, table)
+        yield con
+    finally:
+        con.close()
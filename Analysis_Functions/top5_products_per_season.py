@@ -2,27 +2,33 @@ import matplotlib.pyplot as plt
 import seaborn as sns
 from matplotlib.ticker import ScalarFormatter
 
-def top5_products_per_season(df, years=[2024, 2025]):
+from Analysis_Functions.date_index import analysis_windows, years_window
+from Analysis_Functions.grouped_topk import compute_top_k
+
+def top5_products_per_season(df, years=None, as_of=None):
     """
     Her yıl için ayrı sezon bazlı en çok satan 5 ürün grafiği üretir.
 
+    Parameters:
+        df (pd.DataFrame): preprocessing çıktısı.
+        years (list of int, optional): Yıllar; verilmezse as_of'un son iki yılı (as_of verilmezse verideki son satış günü).
+        as_of (str/Timestamp, optional): Analiz tarihi (date_index.analysis_windows).
+
     Returns:
         Dict[int, matplotlib.figure.Figure]: Yıl → Grafik eşleşmesi
     """
     result_figures = {}  # Sonuçları saklamak için bir sözlük
-    df_filtered = df[df['Year'].isin(years)].copy()  # Sadece belirtilen yılları filtrele
+    if years is None:
+        years = list(analysis_windows(as_of, df)['recent_years'])
+    # Sadece belirtilen yılları filtrele (ardışık yıllar tarihe göre sıralı satırlarda tek dilimdir)
+    df_filtered = years_window(df, years)
+    # Tüm yıllar için sezon ve ürün bazında satış adedini say, her sezon için en çok satan 5 ürünü seç
+    top_all = compute_top_k(df_filtered, ['Year', 'Season'], ['ProductName'], metric='frequency', k=5)
 
     for year in years:
-        year_df = df_filtered[df_filtered['Year'] == year]  # O yılın verisini al
-        # Sezon ve ürün bazında satış adedini say
-        sales = year_df.groupby(['Season', 'ProductName'])['Sale_Amount'].count().reset_index()
-
-        # Her sezon için en çok satan 5 ürünü seç
-        top_products = (
-            sales.groupby('Season')
-            .apply(lambda x: x.sort_values('Sale_Amount', ascending=False).head(5))
-            .reset_index(drop=True)
-        )
+        top_products = top_all[top_all['Year'] == year].reset_index(drop=True)  # O yılın sonuçlarını al
+        # Kategori sütunu lejantta tüm sözlüğü göstermesin diye metne çevrilir
+        top_products['ProductName'] = top_products['ProductName'].astype(str)
 
         # Grafik oluştur
         fig, ax = plt.subplots(figsize=(12, 6))
@@ -5,15 +5,17 @@ import seaborn as sns
 import streamlit as st
 import matplotlib.ticker as mticker
 
-def top_3_customer_product_sales_by_month_year(df, plot=True):
+from Analysis_Functions.date_index import analysis_windows, date_window
+from Analysis_Functions.grouped_topk import compute_top_k
+
+def top_3_customer_product_sales_by_month_year(df, plot=True, as_of=None):
     """
     Analyzes and visualizes the top 3 best-selling customer-product combinations for each month and year.
-    For each year in the range 2023 to 2025 (inclusive), this function:
-        - Filters the input DataFrame for the given year.
+    For the year of as_of and the two years before it (as_of defaults to the last sale in the data), this function:
+        - Aggregates total sales by year, month and customer-product combination in one pass.
+        - Selects the top 3 customer-product combinations for each month based on sales (grouped_topk.compute_top_k).
         - Combines customer and product names into a single identifier.
-        - Aggregates total sales by month and customer-product combination.
-        - Selects the top 3 customer-product combinations for each month based on sales.
-        - Optionally plots the results using a barplot.
+        - Optionally plots the results of each year using a barplot.
     Parameters
     ----------
     df : pandas.DataFrame
@@ -25,6 +27,8 @@ def top_3_customer_product_sales_by_month_year(df, plot=True):
             - "Sale_Amount": numeric, the amount of the sale.
     plot : bool, optional (default=True)
         If True, generates a barplot for each year showing the top 3 customer-product sales per month.
+    as_of : str or pandas.Timestamp, optional
+        Analysis date; the years come from date_index.analysis_windows.
     Returns
     -------
     result_dict : dict
@@ -35,24 +39,21 @@ def top_3_customer_product_sales_by_month_year(df, plot=True):
     """
     # Initialize result dictionary to store results for each year
     result_dict = {}
-    # Loop through each year in the specified range
-    for year in range(2023, 2026):
-        # Filter DataFrame for the current year
-        df_filtered = df[df["Year"] == year].copy()
-        # Combine customer and product names into a single identifier
-        df_filtered["Customer_Product"] = df_filtered["CustomerName"] + " - " + df_filtered["ProductName"]
+    windows = analysis_windows(as_of, df)
+    years = range(windows["trend_since"].year, windows["as_of"].year + 1)
+    # Aggregate total sales by year, month and customer-product combination and select the
+    # top 3 combinations of every month of every year in one pass (the years are a slice of the date-sorted rows)
+    top3_all = compute_top_k(
+        date_window(df, windows["trend_since"], windows["stop"], column="Date"),
+        ["Year", "Month"], ["CustomerName", "ProductName"], metric="quantity", k=3,
+    )
+    # Combine customer and product names into a single identifier (only for the selected rows)
+    top3_all["Customer_Product"] = top3_all["CustomerName"].astype(str) + " - " + top3_all["ProductName"].astype(str)
 
-        # Aggregate total sales by month and customer-product combination
-        sales_by_month = df_filtered.groupby(["Month", "Customer_Product"])["Sale_Amount"].sum().reset_index()
-        # Sort sales by month and descending sale amount
-        sales_by_month = sales_by_month.sort_values(by=["Month", "Sale_Amount"], ascending=[True, False])
-
-        # Select the top 3 customer-product combinations for each month
-        top3 = (
-            sales_by_month.groupby("Month")
-            .head(3)
-            .reset_index(drop=True)
-        )
+    # Loop through each year in the specified range
+    for year in years:
+        # Top 3 customer-product combinations of each month of the current year
+        top3 = top3_all.loc[top3_all["Year"] == year, ["Month", "Customer_Product", "Sale_Amount"]].reset_index(drop=True)
 
         fig = None
         if plot:
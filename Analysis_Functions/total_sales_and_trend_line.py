@@ -1,22 +1,57 @@
 import pandas as pd
 import matplotlib.pyplot as plt
 
-def total_sales_and_trend_line(df: pd.DataFrame, plot: bool = True):
+from Analysis_Functions.date_index import analysis_windows, date_window
+from Analysis_Functions.downsampling import downsample_series
+
+# Takvim modunda varsayılan pencereler ve grafik başına nokta bütçesi (14 inç genişlikte ~1 nokta / 2 piksel)
+CALENDAR_WINDOWS = ("30D", "90D")
+MAX_PLOT_POINTS = 1200
+WINDOW_COLORS = ["red", "darkorange", "green", "purple"]
+
+
+def total_sales_and_trend_line(df: pd.DataFrame, plot: bool = True, mode: str = "rows",
+                               windows=CALENDAR_WINDOWS, max_points: int = MAX_PLOT_POINTS, as_of=None):
     """
-    Calculates daily total sales and a 30-day moving average trend line for sales data from 2020 onwards.
-    
+    Calculates daily total sales and a moving average trend line for sales data from January of the
+    fifth year before as_of onwards (as_of defaults to the last sale in the data).
+
+    In the default 'rows' mode the trend is a 30-row rolling mean, so days without sales shorten
+    the effective window. The 'calendar' mode fills days without sales with zero and uses
+    time-based windows over that daily series (e.g. '30D', '90D' average the last 30/90 calendar
+    days, so quiet days pull the average down), and plots the series after
+    largest-triangle-three-buckets (LTTB) downsampling to max_points, so the plot cost stays
+    constant as history grows.
+
     Args:
         df (pd.DataFrame): Input DataFrame containing at least 'Year', 'Date', and 'Sale_Amount' columns.
-        plot (bool, optional): If True, generates a plot of daily sales and the 30-day moving average. Defaults to True.
-    
+        plot (bool, optional): If True, generates a plot of daily sales and the moving averages. Defaults to True.
+        mode (str, optional): 'rows' (30-row rolling mean) or 'calendar' (time-based windows + LTTB). Defaults to 'rows'.
+        windows (iterable of str, optional): Pandas offset strings for the calendar mode. Defaults to ('30D', '90D').
+        max_points (int, optional): Points kept per plotted line in the calendar mode. Defaults to 1200.
+        as_of (str or pd.Timestamp, optional): Analysis date (date_index.analysis_windows). Rows after as_of
+            are expected to be cut by the caller (date_index.until_as_of).
+
     Returns:
-        tuple: (pd.Series of 30-day moving average sales, matplotlib.figure.Figure or None)
+        tuple:
+            - 'rows' mode: (pd.Series of 30-day moving average sales, matplotlib.figure.Figure or None)
+            - 'calendar' mode: (full-resolution pd.DataFrame indexed by every calendar day with 'Sale_Amount'
+              (0 on days without sales) and one 'Rolling_<window>' column per window, dict of column
+              name -> downsampled pd.Series,
+              matplotlib.figure.Figure or None)
     """
-    df_filtered = df[df["Year"] >= 2020]
+    if mode not in ("rows", "calendar"):
+        raise ValueError(f"Unknown mode: {mode!r} (expected 'rows' or 'calendar')")
+
+    # Date-sorted rows (preprocessing output) are sliced with a binary search instead of a full scan
+    df_filtered = date_window(df, start=analysis_windows(as_of, df)["overview_since"], column="Date")
 
     # Group by date and sum sales
     sales_by_date = df_filtered.groupby('Date')['Sale_Amount'].sum().sort_index()
 
+    if mode == "calendar":
+        return _calendar_trend(sales_by_date, plot, windows, max_points)
+
     # Calculate 30-day moving average
     sales_rolling = sales_by_date.rolling(window=30).mean()
 
@@ -33,3 +68,31 @@ def total_sales_and_trend_line(df: pd.DataFrame, plot: bool = True):
         return sales_rolling, fig
 
     return sales_rolling, None
+
+
+def _calendar_trend(sales_by_date, plot, windows, max_points):
+    """Time-based rolling means over the zero-filled daily totals, LTTB-decimated copies of every line and the plot."""
+    # Satış olmayan günler 0; aksi halde '30D' yalnızca satış olan günlerin ortalaması olur
+    daily = sales_by_date.resample('D').sum()
+    full = daily.to_frame('Sale_Amount')
+    for window in windows:
+        full[f'Rolling_{window}'] = daily.rolling(window).mean()
+    decimated = {column: downsample_series(full[column], max_points) for column in full.columns}
+
+    fig = None
+    if plot:
+        fig, ax = plt.subplots(figsize=(14, 8))
+        daily = decimated['Sale_Amount']
+        ax.plot(daily.index, daily.values, label='Günlük Satış', linewidth=1.5)
+        for i, window in enumerate(windows):
+            # WINDOW_COLORS'tan fazla pencere matplotlib'in renk döngüsünden renk alır
+            color = WINDOW_COLORS[i] if i < len(WINDOW_COLORS) else None
+            line = decimated[f'Rolling_{window}']
+            label = f"{pd.Timedelta(window).days} Günlük Ort." if window.endswith('D') else f"{window} Ort."
+            ax.plot(line.index, line.values, label=label, color=color, linewidth=2)
+        ax.set_xlabel('Tarih', fontsize=12)
+        ax.set_ylabel('Toplam Satış Miktarı', fontsize=12)
+        ax.legend()
+        ax.grid(True)
+        fig.tight_layout()
+    return full, decimated, fig
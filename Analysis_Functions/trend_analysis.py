@@ -3,27 +3,44 @@ import numpy as np
 import matplotlib.pyplot as plt
 import seaborn as sns
 import streamlit as st
-from scipy.stats import linregress, zscore
+from scipy.stats import zscore
 
-def customer_product_trend_analysis(df):
+from Analysis_Functions.date_index import analysis_windows, date_window, window_mask
+from Analysis_Functions.figure_cache import show_figure
+from Analysis_Functions.grouped_regression import grouped_linregress, sums_linregress
+from Analysis_Functions.month_close import is_month_close_state, require_state_windows
+from Analysis_Functions.paged_table import show_table
+from Analysis_Functions.sales_cube import is_sales_cube, rollup_sales_cube
+from Analysis_Functions.sales_panel import is_sales_panel, observed_bounds, panel_linregress, panel_window
+
+def compute_customer_product_trend(df, as_of=None):
     """
-    Analyzes sales trends for customer-product pairs in a given DataFrame and classifies them as 'Stable', 'Increasing', 'Decreasing', or 'Volatile' based on sales data from 2023 onwards.
+    Analyzes sales trends for customer-product pairs in a given DataFrame and classifies them as 'Stable', 'Increasing', 'Decreasing', or 'Volatile' based on sales data from January two years before as_of onwards (as_of defaults to the last sale in the data).
     The function performs the following steps:
-    1. Filters customer-product pairs with sales in 2024 or 2025.
-    2. Selects all sales records for these pairs from 2013-2025.
+    1. Filters customer-product pairs with sales in the two most recent years (the year of as_of and the year before).
+    2. Selects all sales records for these pairs.
     3. Aggregates monthly sales and computes log-transformed sales amounts.
     4. Filters pairs with sufficient data and recent sales.
     5. Calculates trend slope and volatility for each pair using linear regression on log sales.
     6. Standardizes slope and volatility, then classifies trends.
-    7. Displays results in a Streamlit dataframe and returns the trend classification DataFrame.
+    7. Returns the trend classification DataFrame (shown by show_customer_product_trend).
     Parameters:
         df (pd.DataFrame): Input DataFrame containing at least the following columns:
             - 'CustomerName', 'ProductName', 'CustomerCode_Encoded', 'Product_Code_Encoded',
             - 'CustomerCode', 'Product_Code', 'Date', 'Sale_Amount', 'Year'
+            The sales cube from build_sales_cube can be passed instead; its cells are rolled up
+            to customer-product-month without rescanning the invoice lines. A month-close state
+            (month_close.month_close_state) can be passed as well; slopes and volatilities then
+            come from its running sums and no history is scanned. A sales panel
+            (sales_panel.build_sales_panel) regresses against the calendar month instead of the
+            index of observed months, so months without sales still advance the time axis.
+        as_of (str or pd.Timestamp, optional): Analysis date; the windows come from date_index.analysis_windows.
+            Rows after as_of are expected to be cut by the caller (date_index.until_as_of).
     Returns:
         pd.DataFrame: DataFrame with trend classification for each customer-product pair, including:
             - 'CustomerCode', 'Product_Code', 'CustomerName', 'ProductName',
             - 'Trend_Type', and the date of last sale.
+            None if no customer-product pair has enough recent data.
     # function body...
         Classifies the trend type for a customer-product pair based on standardized slope and volatility.
         Parameters:
@@ -32,25 +49,37 @@ def customer_product_trend_analysis(df):
             str: Trend type, one of 'Stable', 'Increasing', 'Decreasing', or 'Volatile'.
         # function body...
     """
-    # 1. Copy the input DataFrame to avoid modifying the original
-    df_test3 = df.copy()
+    windows = analysis_windows(as_of, df)
+    if is_month_close_state(df):
+        require_state_windows(df, as_of)
+        return _customer_product_trend_from_state(df, windows)
+    if is_sales_panel(df):
+        return _customer_product_trend_from_panel(df, windows)
 
-    # 2. Filter for sales in 2024 or 2025
-    mask_2024_2025 = df_test3[df_test3['Year'].isin([2024, 2025])]
-    customer_product_pairs = mask_2024_2025[['CustomerName', 'ProductName','CustomerCode_Encoded', 'Product_Code_Encoded']].drop_duplicates()
+    # 1. The input is not modified: the recent window below is a slice of it and the merge builds a new frame
+    df_test3 = df
 
-    # 3. Select all records for these customer-product pairs from the full data (2013-2025)
+    # 2. Filter for sales in the recent years (a binary-search slice of date-sorted rows)
+    recent = date_window(df_test3, windows['recent_since'], windows['stop'])
+    customer_product_pairs = recent[['CustomerName', 'ProductName','CustomerCode_Encoded', 'Product_Code_Encoded']].drop_duplicates()
+
+    # 3. Select all records for these customer-product pairs from the full data
     df_selected = df_test3.merge(customer_product_pairs, on=['CustomerName', 'ProductName','CustomerCode_Encoded', 'Product_Code_Encoded'], how='inner')
-    df_selected.sort_values(by="Date", ascending=True, inplace=True)
-    df_selected['YearMonth'] = df_selected['Date'].dt.to_period('M').astype(str)
 
     # 4. Aggregate monthly sales for each customer-product pair
-    monthly_sales = (
-        df_selected
-        .groupby(['YearMonth', 'CustomerCode', 'Product_Code'])
-        .agg(Sale_Amount=('Sale_Amount', 'sum'))
-        .reset_index()
-    )
+    if is_sales_cube(df):
+        monthly_sales = rollup_sales_cube(df_selected, ['CustomerCode', 'Product_Code'])[
+            ['YearMonth', 'CustomerCode', 'Product_Code', 'Sale_Amount']
+        ]
+    else:
+        df_selected.sort_values(by="Date", ascending=True, inplace=True)
+        df_selected['YearMonth'] = df_selected['Date'].dt.to_period('M').astype(str)
+        monthly_sales = (
+            df_selected
+            .groupby(['YearMonth', 'CustomerCode', 'Product_Code'], observed=True)
+            .agg(Sale_Amount=('Sale_Amount', 'sum'))
+            .reset_index()
+        )
    
     # 5. Prepare columns for trend analysis
     monthly_sales['YearMonth'] = pd.to_datetime(monthly_sales['YearMonth'])
@@ -60,48 +89,83 @@ def customer_product_trend_analysis(df):
     monthly_sales.sort_values(by="YearMonth", ascending=True, inplace=True)
     name_map = df_selected[['CustomerCode', 'Product_Code', 'CustomerName', 'ProductName']].drop_duplicates()
 
-    # 6. Filter pairs with sufficient data and recent sales
-    cleaned_data = []
-    for (customer_code, product_code), group in monthly_sales.groupby(['CustomerCode', 'Product_Code']):
-        df_filtered = group[group['YearMonth'] >= '2023-01-01'].copy()
-        if df_filtered.empty or len(df_filtered) < 2:
-            continue
-        if df_filtered['YearMonth'].max().year not in [2024, 2025]:
-            continue
-        df_filtered['CustomerCode'] = customer_code
-        df_filtered['Product_Code'] = product_code
-        cleaned_data.append(df_filtered)
-
-    if not cleaned_data:
-        st.warning("Yeterli temiz müşteri-ürün çifti bulunamadı.")
-        return
+    # 6. Filter pairs with sufficient data (>= 2 months since trend_since) and a last sale in the recent years
+    df_cleaned = monthly_sales[window_mask(monthly_sales['YearMonth'], windows['trend_since'])]
+    pair_groups = df_cleaned.groupby(['CustomerCode', 'Product_Code'], observed=True)['YearMonth']
+    keep = (pair_groups.transform('size') >= 2) & window_mask(pair_groups.transform('max'), windows['recent_since'], windows['stop'])
+    df_cleaned = df_cleaned[keep]
+
+    if df_cleaned.empty:
+        return None
+
+    # 7. Calculate trend slope and volatility for all pairs at once (grouped OLS on log sales vs. month index)
+    df_cleaned = df_cleaned.sort_values(['CustomerCode', 'Product_Code', 'YearMonth'], kind='stable')
+    sales = df_cleaned['Sale_Amount'].fillna(0).to_numpy()
+    df_cleaned = df_cleaned.assign(
+        Month=df_cleaned.groupby(['CustomerCode', 'Product_Code'], observed=True).cumcount(),
+        Sale_Amount_Log=np.log(np.where(sales <= 0, 1e-5, sales)),
+    )
+    trend_results = grouped_linregress(df_cleaned, ['CustomerCode', 'Product_Code'], 'Month', 'Sale_Amount_Log')
 
-    df_cleaned = pd.concat(cleaned_data, ignore_index=True)
-
-    # 7. Calculate trend slope and volatility for each pair using linear regression on log sales
-    trend_results = []
-    for (customer_code, product_code), df_p in df_cleaned.groupby(['CustomerCode', 'Product_Code']):
-        df_p_sorted = df_p.sort_values('YearMonth').copy()
-        df_p_sorted['Month'] = np.arange(len(df_p_sorted))
-        df_p_sorted['Sale_Amount'] = df_p_sorted['Sale_Amount'].fillna(0)
-        df_p_sorted.loc[df_p_sorted['Sale_Amount'] <= 0, 'Sale_Amount'] = 1e-5
-        df_p_sorted['Sale_Amount_Log'] = np.log(df_p_sorted['Sale_Amount'])
-
-        if len(df_p_sorted) > 1:
-            slope, _, _, _, _ = linregress(df_p_sorted['Month'], df_p_sorted['Sale_Amount_Log'])
-            std_dev = df_p_sorted['Sale_Amount_Log'].std()
-
-            trend_results.append({
-                'CustomerCode': customer_code,
-                'Product_Code': product_code,
-                'Slope': slope,
-                'Volatility': std_dev
-            })
-
-    # 8. Create DataFrame for trend results and merge with names
-    trend_df = pd.DataFrame(trend_results)
+    # 8. Keep slope/volatility and merge with names
+    trend_df = trend_results[['CustomerCode', 'Product_Code', 'Slope', 'Volatility']]
     trend_df = trend_df.merge(name_map, on=['CustomerCode', 'Product_Code'], how='left')
 
+    last_sale_dates = (
+      monthly_sales
+      .groupby(['CustomerCode', 'Product_Code'], observed=True)['YearMonth']
+      .max()
+      .reset_index()
+      .rename(columns={'YearMonth': 'Last_Sale_Date'})
+    )
+    return _classify_customer_product_trend(trend_df, last_sale_dates)
+
+
+def _customer_product_trend_from_state(state, windows):
+    """compute_customer_product_trend'in ay kapanışı durumundan hesaplanan karşılığı."""
+    pairs = state["pairs"]
+    if pairs is None:
+        return None
+    # >= 2 ay (trend_since'ten beri) ve son satışı son iki yılda (recent_years) olan çiftler
+    pairs = pairs[(pairs['Trend_Months'] >= 2) & pairs['Last_Month'].dt.year.isin(windows['recent_years'])]
+    if pairs.empty:
+        return None
+    stats = sums_linregress(pairs['Trend_Months'], pairs['Trend_Sum'], pairs['Trend_SumXY'], pairs['Trend_SumSq'])
+    trend_df = pairs[['CustomerCode', 'Product_Code']].reset_index(drop=True)
+    trend_df['Slope'] = stats['slope']
+    trend_df['Volatility'] = stats['y_std']
+    trend_df['CustomerName'] = pairs['CustomerName'].to_numpy()
+    trend_df['ProductName'] = pairs['ProductName'].to_numpy()
+    last_sale_dates = pairs[['CustomerCode', 'Product_Code', 'Last_Month']].rename(columns={'Last_Month': 'Last_Sale_Date'})
+    return _classify_customer_product_trend(trend_df, last_sale_dates)
+
+
+def _customer_product_trend_from_panel(panel, windows):
+    """compute_customer_product_trend'in takvim ayına hizalı karşılığı (satışsız aylar eğimde zaman sayılır)."""
+    window = panel_window(panel, start=windows['trend_since'])
+    observed = window['Line_Count'] > 0
+    n_months = observed.sum(axis=1)
+    _, last = observed_bounds(observed)
+    last_month = window['months'][np.maximum(last, 0)]
+    # >= 2 ay (trend_since'ten beri) ve son satışı son iki yılda olan çiftler
+    keep = np.flatnonzero((n_months >= 2) & window_mask(last_month, windows['recent_since'], windows['stop']))
+    if len(keep) == 0:
+        return None
+    sales = np.asarray(window['Sale_Amount'][keep], dtype=np.float64)
+    stats = panel_linregress(np.log(np.where(sales <= 0, 1e-5, sales)), observed[keep])
+    entities = panel['entities'].iloc[keep].reset_index(drop=True)
+    trend_df = entities[['CustomerCode', 'Product_Code']].copy()
+    trend_df['Slope'] = stats['slope']
+    trend_df['Volatility'] = stats['y_std']
+    trend_df['CustomerName'] = entities['CustomerName'].to_numpy()
+    trend_df['ProductName'] = entities['ProductName'].to_numpy()
+    last_sale_dates = entities[['CustomerCode', 'Product_Code']].copy()
+    last_sale_dates['Last_Sale_Date'] = window['months'][last[keep]]
+    return _classify_customer_product_trend(trend_df, last_sale_dates)
+
+
+def _classify_customer_product_trend(trend_df, last_sale_dates):
+    """Eğim ve volatiliteyi standartlaştırır, trend tipini atar ve son satış tarihini ekler."""
     # 9. Standardize slope and volatility (z-score)
     trend_df["Slope_Z"] = zscore(trend_df["Slope"])
     trend_df["Volatility_Z"] = zscore(trend_df["Volatility"])
@@ -121,23 +185,7 @@ def customer_product_trend_analysis(df):
     trend_df = trend_df.sort_values(by='Slope', ascending=False)
 
     # 11. Add last sale date for each customer-product pair
-    last_sale_dates = (
-      monthly_sales
-      .groupby(['CustomerCode', 'Product_Code'])['YearMonth']
-      .max()
-      .reset_index()
-      .rename(columns={'YearMonth': 'Last_Sale_Date'})
-    )
-
     trend_df = trend_df.merge(last_sale_dates, on=['CustomerCode', 'Product_Code'], how='left')
-
-    # 12. Prepare DataFrame for display (remove intermediate columns)
-    trend_df2 = trend_df.copy()
-    trend_df2 = trend_df.drop(columns=["Slope", "Volatility", "Slope_Z", "Volatility_Z"])
-
-    # 13. Show results in Streamlit
-    st.subheader("📈 Müşteri-Ürün Bazında Trend Sınıflandırması")
-    st.dataframe(trend_df2)
     """
     for trend in trend_df["Trend_Type"].unique():
         st.markdown(f"### 🔎 {trend} Trendine Sahip Müşteri-Ürünler")
@@ -162,90 +210,95 @@ def customer_product_trend_analysis(df):
             st.pyplot(fig)
     """
     return trend_df
-def product_trend_analysis(df_test):
+
+
+def show_customer_product_trend(trend_df):
+    """Displays the customer-product trend table, or a warning when compute_customer_product_trend returned None."""
+    if trend_df is None:
+        st.warning("Yeterli temiz müşteri-ürün çifti bulunamadı.")
+        return
+    # Prepare DataFrame for display (remove intermediate columns)
+    trend_df2 = trend_df.drop(columns=["Slope", "Volatility", "Slope_Z", "Volatility_Z"])
+    st.subheader("📈 Müşteri-Ürün Bazında Trend Sınıflandırması")
+    show_table(trend_df2, key="customer_product_trend")
+
+
+def customer_product_trend_analysis(df):
     """
-    Analyzes sales trends for each product in the provided DataFrame, classifies products based on trend and volatility, 
-    and displays the results in a Streamlit dataframe.
+    Computes (compute_customer_product_trend) and displays (show_customer_product_trend) the
+    customer-product trend classification. Returns the trend DataFrame, or None if there is not
+    enough data.
+    """
+    trend_df = compute_customer_product_trend(df)
+    show_customer_product_trend(trend_df)
+    return trend_df
+
+
+def compute_product_trend(df_test, as_of=None):
+    """
+    Analyzes sales trends for each product in the provided DataFrame and classifies products based on trend and volatility.
+    The results are displayed by show_product_trend.
     Parameters:
         df_test (pd.DataFrame): Input DataFrame containing at least the following columns:
             - 'Product_Code': Unique identifier for each product.
             - 'ProductName': Name of the product.
             - 'Date': Date of the sale (string or datetime).
             - 'Sale_Amount': Numeric value representing the amount sold.
+        as_of (str or pd.Timestamp, optional): Analysis date; the windows come from date_index.analysis_windows.
     Returns:
         pd.DataFrame: DataFrame containing trend analysis results for each product, including:
             - 'Product_Code': Product identifier.
             - 'ProductName': Name of the product.
             - 'Trend_Type': Classified trend type ('Increasing', 'Decreasing', or 'Volatile').
             - 'Last_Sale_Date': Most recent sale date for the product.
+        None if no product has enough recent data.
     Notes:
         - Outliers in sales amounts are removed using the IQR method before trend calculation.
-        - Only products with sales data from 2023 onwards and with at least two data points are analyzed.
+        - Only products with sales data from trend_since onwards, a last sale in the
+          recent years and at least two data points are analyzed.
         - Trend is determined using the slope of a linear regression over time.
         - Volatility is measured as the standard deviation of sales amounts.
         - Z-score normalization is used for both slope and volatility to classify trends.
-        - Results are displayed in a Streamlit dataframe and a warning is shown if insufficient data is available.
+        - The input is not modified; a string 'Date' column is parsed on a copy.
     """
 
     # Prepare for cleaning and analysis
-    cleaned_data = []
     name_map = df_test[['Product_Code', 'ProductName']].drop_duplicates()
-    df_test['Date'] = pd.to_datetime(df_test['Date'])
-
-    # Iterate over each product to clean and filter data
-    for product_code, group in df_test.groupby('Product_Code'):
-        group = group.copy()
-
-        # Aggregate sales by date for the product
-        df_grouped_all = group.groupby('Date')['Sale_Amount'].sum().reset_index()
-        if len(df_grouped_all) < 2:
-            continue
-
-        # Remove outliers using IQR method
-        Q1 = df_grouped_all['Sale_Amount'].quantile(0.25)
-        Q3 = df_grouped_all['Sale_Amount'].quantile(0.75)
-        IQR = Q3 - Q1
-        lower = Q1 - 1.5 * IQR
-        upper = Q3 + 1.5 * IQR
-        df_filtered_all = df_grouped_all[(df_grouped_all['Sale_Amount'] >= lower) &
-                                         (df_grouped_all['Sale_Amount'] <= upper)].copy()
-
-        # Filter for sales from 2023 onwards
-        df_filtered_2023 = df_filtered_all[df_filtered_all['Date'] >= '2023-01-01'].copy()
-
-        # Skip if no recent sales or not enough data points
-        if df_filtered_2023.empty or df_filtered_2023['Date'].max().year not in [2024, 2025]:
-            continue
-
-        if len(df_filtered_2023) < 2:
-            continue
-
-        df_filtered_2023['Product_Code'] = product_code
-        cleaned_data.append(df_filtered_2023)
-
-    # If no products passed the filter, show warning and exit
-    if not cleaned_data:
-        st.warning("Yeterli veri yok.")
-        return
-
-    # Concatenate all cleaned product data
-    df_cleaned = pd.concat(cleaned_data, ignore_index=True)
-
-    # Calculate trend (slope) and volatility (std) for each product
-    trend_results = []
-    for product_code, df_p in df_cleaned.groupby('Product_Code'):
-        df_p_sorted = df_p.sort_values('Date').copy()
-        df_p_sorted['Month'] = np.arange(len(df_p_sorted))
-        slope, _, _, _, _ = linregress(df_p_sorted['Month'], df_p_sorted['Sale_Amount'])
-        std_dev = df_p_sorted['Sale_Amount'].std()
-
-        trend_results.append({
-            'Product_Code': product_code,
-            'Slope': slope,
-            'Volatility': std_dev
-        })
-
-    trend_df_product = pd.DataFrame(trend_results)
+    if not pd.api.types.is_datetime64_any_dtype(df_test['Date']):
+        df_test = df_test.assign(Date=pd.to_datetime(df_test['Date']))
+
+    # Aggregate sales by product and date; keep products with at least two sale dates
+    df_grouped_all = df_test.groupby(['Product_Code', 'Date'], observed=True)['Sale_Amount'].sum().reset_index()
+    by_product = df_grouped_all.groupby('Product_Code', observed=True)['Sale_Amount']
+    df_grouped_all = df_grouped_all[by_product.transform('size') >= 2]
+
+    # Remove outliers per product using IQR method
+    by_product = df_grouped_all.groupby('Product_Code', observed=True)['Sale_Amount']
+    Q1 = by_product.transform('quantile', 0.25)
+    Q3 = by_product.transform('quantile', 0.75)
+    IQR = Q3 - Q1
+    lower = Q1 - 1.5 * IQR
+    upper = Q3 + 1.5 * IQR
+    df_filtered_all = df_grouped_all[(df_grouped_all['Sale_Amount'] >= lower) &
+                                     (df_grouped_all['Sale_Amount'] <= upper)]
+
+    # Filter for sales from trend_since onwards; skip products without recent sales or enough data points
+    windows = analysis_windows(as_of, df_test)
+    df_cleaned = df_filtered_all[window_mask(df_filtered_all['Date'], windows['trend_since'])]
+    by_product = df_cleaned.groupby('Product_Code', observed=True)['Date']
+    keep = (by_product.transform('size') >= 2) & window_mask(by_product.transform('max'), windows['recent_since'], windows['stop'])
+    df_cleaned = df_cleaned[keep]
+
+    # If no products passed the filter, there is nothing to classify
+    if df_cleaned.empty:
+        return None
+
+    # Calculate trend (slope) and volatility (std) for all products at once
+    df_cleaned = df_cleaned.sort_values(['Product_Code', 'Date'], kind='stable')
+    df_cleaned = df_cleaned.assign(Month=df_cleaned.groupby('Product_Code', observed=True).cumcount())
+    trend_df_product = grouped_linregress(df_cleaned, ['Product_Code'], 'Month', 'Sale_Amount')[
+        ['Product_Code', 'Slope', 'Volatility']
+    ]
 
     # Standardize slope and volatility using z-score
     trend_df_product["Slope_Z"] = zscore(trend_df_product["Slope"])
@@ -267,23 +320,38 @@ def product_trend_analysis(df_test):
 
     # Add last sale date for each product
     last_sale_dates = (
-        df_test.groupby('Product_Code')['Date']
+        df_test.groupby('Product_Code', observed=True)['Date']
         .max()
         .reset_index()
         .rename(columns={'Date': 'Last_Sale_Date'})
     )
     trend_df_product = trend_df_product.merge(last_sale_dates, on='Product_Code', how='left')
     trend_df_product['Last_Sale_Date'] = trend_df_product['Last_Sale_Date'].dt.strftime('%Y-%m-%d')
+    return trend_df_product
 
-    # Prepare and display the final table
+
+def show_product_trend(trend_df_product):
+    """Displays the product trend table, or a warning when compute_product_trend returned None."""
+    if trend_df_product is None:
+        st.warning("Yeterli veri yok.")
+        return
     display_cols = ['Product_Code', 'ProductName', 'Trend_Type', 'Last_Sale_Date']
     st.subheader("📈 Ürün Bazlı Trend Sonuçları")
-    st.dataframe(trend_df_product[display_cols].sort_values(by='Trend_Type'))
-    return trend_df_product
+    show_table(trend_df_product[display_cols].sort_values(by='Trend_Type'), key="product_trend")
     # Optional: add filtering or CSV download if needed
 
 
-def customer_trend_analysis(df_test):
+def product_trend_analysis(df_test):
+    """
+    Computes (compute_product_trend) and displays (show_product_trend) the product trend
+    classification. Returns the trend DataFrame, or None if there is not enough data.
+    """
+    trend_df_product = compute_product_trend(df_test)
+    show_product_trend(trend_df_product)
+    return trend_df_product
+
+
+def compute_customer_trend(df_test, as_of=None):
     """
     Performs trend analysis on customer sales data over time and classifies customers based on their sales trends.
     This function groups the input DataFrame by customer and time (year, month), aggregates sales data, 
@@ -291,7 +359,7 @@ def customer_trend_analysis(df_test):
     to include only customers with sufficient and recent sales history, computes the trend (slope) and 
     volatility (standard deviation) of the log-transformed total revenue over time for each customer, 
     and classifies customers into trend categories ("Stable", "Increasing", "Decreasing", "Volatile") 
-    using Z-scores. The results are displayed in a Streamlit dataframe and returned as a DataFrame.
+    using Z-scores. The results are returned as a DataFrame and displayed by show_customer_trend.
     Parameters
     ----------
     df_test : pandas.DataFrame
@@ -303,6 +371,8 @@ def customer_trend_analysis(df_test):
         - 'Unit_Price(TL)': Unit price in Turkish Lira.
         - 'Date': Date of the sale (datetime).
         Optionally, may include 'Order_Date' and other columns.
+    as_of : str or pandas.Timestamp, optional
+        Analysis date; the history and recent-year windows come from date_index.analysis_windows.
     Returns
     -------
     trend_df_customer : pandas.DataFrame
@@ -311,93 +381,53 @@ def customer_trend_analysis(df_test):
         - 'Trend_Type': Trend classification ('Stable', 'Increasing', 'Decreasing', 'Volatile').
         - 'Last_Sale_Date': Date of the last sale for each customer (YYYY-MM-DD format).
         - Additional columns: 'Slope', 'Volatility', 'Slope_Z', 'Volatility_Z' (not displayed).
+        None if there is insufficient clean customer data.
     Notes
     -----
-    - Displays a warning in Streamlit if there is insufficient clean customer data.
     - The function uses log transformation and linear regression to determine sales trends.
     - Trend classification is based on Z-scores of slope and volatility.
-    - The function displays the results in a Streamlit dataframe and returns the full result DataFrame.
+    - The function does not write to Streamlit; see customer_trend_analysis.
     """
-    # Bilgilendirici açıklama
-    st.markdown("Bu analiz zaman içerisindeki toplam ciro değeri baz alınarak hesaplanmıştır.")
-
-    # Gruplama için kullanılacak sütunlar ve toplama sözlüğü
+    # Müşteri-Yıl-Ay bazında veriyi grupla (ayın ilk satış tarihi ve birim fiyatı ile)
     group_cols = ['CustomerCode', 'Year', 'Month']
-    agg_dict = {'Sale_Amount': 'sum'}
-
-    # Diğer sütunları ilk değer olarak ekle
-    for col in df_test.columns:
-        if col not in group_cols + ['Sale_Amount']:
-            agg_dict[col] = 'first'
-
-    # Müşteri-Yıl-Ay bazında veriyi grupla
     df_grouped = (
         df_test
-        .groupby(group_cols, as_index=False)
-        .agg(agg_dict)
+        .groupby(group_cols, as_index=False, observed=True)
+        .agg({'Sale_Amount': 'sum', 'Date': 'first', 'Unit_Price(TL)': 'first'})
     )
 
-    # Tarihe göre sırala
-    df_grouped.sort_values(by="Date", ascending=True, inplace=True)
-
-    # Order_Date yoksa oluştur
-    if 'Order_Date' not in df_grouped.columns:
-        df_grouped['Order_Date'] = pd.to_datetime(
-            df_grouped['Year'].astype(str) + '-' + df_grouped['Month'].astype(str).str.zfill(2) + '-01'
-        )
-
     # Toplam ciro hesapla
     df_grouped['Toplam_Ciro'] = df_grouped['Unit_Price(TL)'] * df_grouped['Sale_Amount']
 
     # Son satış tarihini bul
     last_sale_dates = (
-        df_grouped.groupby('CustomerCode')['Date']
+        df_grouped.groupby('CustomerCode', observed=True)['Date']
         .max()
         .reset_index()
         .rename(columns={'Date': 'Last_Sale_Date'})
     )
 
-    # Temiz müşteri verisi oluştur
-    cleaned_data = []
-    for customer_code, group in df_grouped.groupby('CustomerCode'):
-        df_filtered = group[group['Date'] >= '2013-01-01'].copy()
-        if df_filtered.empty or len(df_filtered) < 2:
-            continue
-        if df_filtered['Date'].max().year not in [2024, 2025]:
-            continue
-        df_filtered['CustomerCode'] = customer_code
-        cleaned_data.append(df_filtered)
-
-    # Yeterli veri yoksa uyarı ver
-    if not cleaned_data:
-        st.warning("Yeterli temiz müşteri verisi bulunamadı.")
-        return
-
-    # Temizlenmiş verileri birleştir
-    df_cleaned = pd.concat(cleaned_data, ignore_index=True)
-
-    # Her müşteri için trend ve volatilite hesapla
-    trend_results = []
-    for customer_code, df_p in df_cleaned.groupby('CustomerCode'):
-        df_p_sorted = df_p.sort_values('Date').copy()
-        df_p_sorted['Month_Index'] = np.arange(len(df_p_sorted))
-        df_p_sorted['Toplam_Ciro'] = pd.to_numeric(df_p_sorted['Toplam_Ciro'], errors='coerce').fillna(0)
-        df_p_sorted.loc[df_p_sorted['Toplam_Ciro'] <= 0, 'Toplam_Ciro'] = 1e-5
-        df_p_sorted['Toplam_Ciro_Log'] = np.log(df_p_sorted['Toplam_Ciro'])
-        df_p_sorted = df_p_sorted.dropna(subset=['Month_Index', 'Toplam_Ciro_Log'])
-
-        if len(df_p_sorted) > 1:
-            slope, _, _, _, _ = linregress(df_p_sorted['Month_Index'], df_p_sorted['Toplam_Ciro_Log'])
-            std_dev = df_p_sorted['Toplam_Ciro_Log'].std()
-
-            trend_results.append({
-                'CustomerCode': customer_code,
-                'Slope': slope,
-                'Volatility': std_dev
-            })
-
-    # Trend sonuçlarını DataFrame'e aktar
-    trend_df_customer = pd.DataFrame(trend_results)
+    # Temiz müşteri verisi: en az iki ay ve son satışı as_of'un son iki yılında olan müşteriler
+    windows = analysis_windows(as_of, df_test)
+    df_cleaned = df_grouped[window_mask(df_grouped['Date'], windows['history_since'])]
+    by_customer = df_cleaned.groupby('CustomerCode', observed=True)['Date']
+    keep = (by_customer.transform('size') >= 2) & window_mask(by_customer.transform('max'), windows['recent_since'], windows['stop'])
+    df_cleaned = df_cleaned[keep]
+
+    # Yeterli veri yoksa sınıflandırma yapılamaz
+    if df_cleaned.empty:
+        return None
+
+    # Tüm müşteriler için trend ve volatiliteyi tek seferde hesapla (log ciro ~ ay sırası)
+    df_cleaned = df_cleaned.sort_values(['CustomerCode', 'Date'], kind='stable')
+    ciro = pd.to_numeric(df_cleaned['Toplam_Ciro'], errors='coerce').fillna(0).to_numpy()
+    df_cleaned = df_cleaned.assign(
+        Month_Index=df_cleaned.groupby('CustomerCode', observed=True).cumcount(),
+        Toplam_Ciro_Log=np.log(np.where(ciro <= 0, 1e-5, ciro)),
+    )
+    trend_df_customer = grouped_linregress(df_cleaned, ['CustomerCode'], 'Month_Index', 'Toplam_Ciro_Log')[
+        ['CustomerCode', 'Slope', 'Volatility']
+    ]
 
     # Z-score ile eğim ve volatiliteyi normalize et
     trend_df_customer["Slope_Z"] = zscore(trend_df_customer["Slope"])
@@ -419,82 +449,77 @@ def customer_trend_analysis(df_test):
     # Son satış tarihini ekle
     trend_df_customer = trend_df_customer.merge(last_sale_dates, on='CustomerCode', how='left')
     trend_df_customer['Last_Sale_Date'] = trend_df_customer['Last_Sale_Date'].dt.strftime('%Y-%m-%d')
+    return trend_df_customer
+
 
+def show_customer_trend(trend_df_customer):
+    """Müşteri trend tablosunu gösterir; compute_customer_trend None döndürdüyse uyarı verir."""
+    # Bilgilendirici açıklama
+    st.markdown("Bu analiz zaman içerisindeki toplam ciro değeri baz alınarak hesaplanmıştır.")
+    if trend_df_customer is None:
+        st.warning("Yeterli temiz müşteri verisi bulunamadı.")
+        return
     # Sonuç tablosunu hazırla ve göster
     display_cols = ['CustomerCode', 'Trend_Type', 'Last_Sale_Date']
     st.subheader("📈 Müşteri Trend Sınıflandırması")
-    st.dataframe(trend_df_customer[display_cols].sort_values(by='Trend_Type'))
-    return trend_df_customer
+    show_table(trend_df_customer[display_cols].sort_values(by='Trend_Type'), key="customer_trend")
     # İndirme opsiyonu istersen:
     # st.download_button(" CSV olarak indir", trend_df_customer.to_csv(index=False), "musteri_trendleri.csv")
 
 
-def customer_product_segmentation(trend_df_customer_product):
+def customer_trend_analysis(df_test):
     """
-    Segments customer-product pairs based on sales trends and visualizes the results using Streamlit.
-    This function analyzes the trend data for each customer-product pair, segments them into various categories
-    (such as growing, declining, stable, volatile, etc.) based on dynamic thresholds for slope and volatility,
-    and displays the results as bar plots and data tables in a Streamlit app.
-    Parameters:
-        trend_df_customer_product (pd.DataFrame): 
-            DataFrame containing trend analysis results for customer-product pairs.
-            Expected columns include:
-                - "CustomerCode": Unique identifier for the customer.
-                - "CustomerName": Name of the customer.
-                - "Product_Code": Unique identifier for the product.
-                - "ProductName": Name of the product.
-                - "Last_Sale_Date": Date of the last sale (string or datetime).
-                - "Slope": Trend slope value for the customer-product pair.
-                - "Volatility": Volatility value for the customer-product pair.
-    Returns:
-        None. The function outputs visualizations and tables directly to the Streamlit interface.
+    Müşteri trend sınıflandırmasını hesaplar (compute_customer_trend) ve gösterir
+    (show_customer_trend). Trend DataFrame'ini, yeterli veri yoksa None döndürür.
     """
-    st.header("Müşteri - Ürün Trend Segmentasyonu")
+    trend_df_customer = compute_customer_trend(df_test)
+    show_customer_trend(trend_df_customer)
+    return trend_df_customer
 
-    # Filter for recent customer-product pairs (last sale date >= June 2024)
-    trend_df_customer_product2 = trend_df_customer_product[trend_df_customer_product["Last_Sale_Date"] >= "2024-06"]
 
-    # Create a combined label for plotting
-    trend_df_customer_product2["Customer_Product"] = (
-        trend_df_customer_product2["CustomerCode"].astype(str) + " | " + trend_df_customer_product2["Product_Code"].astype(str)
-    )
+def _segment_by_trend(trend_df):
+    """
+    Splits trend rows into the display segments using dynamic slope/volatility thresholds.
 
+    Thresholds are the slope mean ± one standard deviation and the volatility mean of the
+    given rows. Returns a dict mapping segment title -> DataFrame, in display order.
+    """
     # --- Dynamic thresholds for segmentation ---
-    slope_mean = trend_df_customer_product2["Slope"].mean()
-    slope_std = trend_df_customer_product2["Slope"].std()
-    volatility_mean = trend_df_customer_product2["Volatility"].mean()
+    slope_mean = trend_df["Slope"].mean()
+    slope_std = trend_df["Slope"].std()
+    volatility_mean = trend_df["Volatility"].mean()
 
     slope_threshold_up = slope_mean + slope_std
     slope_threshold_down = slope_mean - slope_std
     volatility_threshold = volatility_mean
 
     # --- Define segments based on slope and volatility ---
-    top_growing = trend_df_customer_product2.sort_values("Slope", ascending=False).head(5)
-    top_declining = trend_df_customer_product2.sort_values("Slope", ascending=True).head(5)
+    top_growing = trend_df.sort_values("Slope", ascending=False).head(5)
+    top_declining = trend_df.sort_values("Slope", ascending=True).head(5)
 
-    stable_rising = trend_df_customer_product2[
-        (trend_df_customer_product2["Slope"] > slope_threshold_up) &
-        (trend_df_customer_product2["Volatility"] <= volatility_threshold)
+    stable_rising = trend_df[
+        (trend_df["Slope"] > slope_threshold_up) &
+        (trend_df["Volatility"] <= volatility_threshold)
     ]
-    volatile_rising = trend_df_customer_product2[
-        (trend_df_customer_product2["Slope"] > slope_threshold_up) &
-        (trend_df_customer_product2["Volatility"] > volatility_threshold)
+    volatile_rising = trend_df[
+        (trend_df["Slope"] > slope_threshold_up) &
+        (trend_df["Volatility"] > volatility_threshold)
     ]
-    stable_falling = trend_df_customer_product2[
-        (trend_df_customer_product2["Slope"] < slope_threshold_down) &
-        (trend_df_customer_product2["Volatility"] <= volatility_threshold)
+    stable_falling = trend_df[
+        (trend_df["Slope"] < slope_threshold_down) &
+        (trend_df["Volatility"] <= volatility_threshold)
     ]
-    volatile_falling = trend_df_customer_product2[
-        (trend_df_customer_product2["Slope"] < slope_threshold_down) &
-        (trend_df_customer_product2["Volatility"] > volatility_threshold)
+    volatile_falling = trend_df[
+        (trend_df["Slope"] < slope_threshold_down) &
+        (trend_df["Volatility"] > volatility_threshold)
     ]
-    stable_products = trend_df_customer_product2[
-        (trend_df_customer_product2["Volatility"] <= volatility_threshold) &
-        (trend_df_customer_product2["Slope"].abs() < 0.01)
+    stable_products = trend_df[
+        (trend_df["Volatility"] <= volatility_threshold) &
+        (trend_df["Slope"].abs() < 0.01)
     ]
 
     # --- Segment mapping for display ---
-    segment_mapping = {
+    return {
         " Büyüyen ve İstikrarlı": stable_rising,
         " Riskli ama Popüler": volatile_rising,
         " Churn Adayları": stable_falling,
@@ -504,7 +529,20 @@ def customer_product_segmentation(trend_df_customer_product):
         " En Çok Düşüş Gösterenler": top_declining
     }
 
-    # --- Plot and display each segment ---
+
+def _segment_figure(sorted_df, y, ylabel, title):
+    """Builds the slope bar chart of one segment; height grows with the number of rows."""
+    fig, ax = plt.subplots(figsize=(12, max(4, len(sorted_df) * 0.4)))
+    sns.barplot(data=sorted_df, y=y, x='Slope', ax=ax, palette='coolwarm')
+    ax.set_xlabel("Trend Eğim (Slope)")
+    ax.set_ylabel(ylabel)
+    ax.set_title(title)
+    ax.grid(True)
+    return fig
+
+
+def _show_segments(segment_mapping, y, ylabel, display_columns):
+    """Plots each segment as a slope bar chart with an expandable data table."""
     for title, df in segment_mapping.items():
         st.subheader(title)
         if df.empty:
@@ -513,23 +551,99 @@ def customer_product_segmentation(trend_df_customer_product):
 
         # Sort for better visualization
         sorted_df = df.sort_values('Slope', ascending=False)
-        fig, ax = plt.subplots(figsize=(12, max(4, len(sorted_df) * 0.4)))
-        sns.barplot(data=sorted_df, y='Customer_Product', x='Slope', ax=ax, palette='coolwarm')
-        ax.set_xlabel("Trend Eğim (Slope)")
-        ax.set_ylabel("Müşteri | Ürün")
-        ax.set_title(title)
-        ax.grid(True)
-        st.pyplot(fig)
+        show_figure(_segment_figure, sorted_df, y, ylabel, title)
 
         # Optionally show the data table for the segment
         with st.expander("📄 Veriyi Göster"):
-            display_columns = [
-                "CustomerCode", "CustomerName",
-                "Product_Code", "ProductName",
-                "Last_Sale_Date"
-            ]
             display_df = sorted_df[display_columns].reset_index(drop=True)
-            st.dataframe(display_df)
+            show_table(display_df, key=f"segments_{y}_{title}")
+
+
+def customer_product_segments(trend_df_customer_product, as_of=None):
+    """
+    Segments recent customer-product pairs (last sale date >= June of the year before as_of; as_of defaults
+    to the last sale in the trend table) by trend slope and volatility.
+
+    Parameters:
+        trend_df_customer_product (pd.DataFrame): Output of compute_customer_product_trend.
+        as_of (str or pd.Timestamp, optional): Analysis date (date_index.analysis_windows).
+    Returns:
+        dict: Segment title -> DataFrame of customer-product pairs, with a 'Customer_Product'
+        label column for plotting.
+    """
+    # Filter for recent customer-product pairs (last sale date >= active_since)
+    active_since = analysis_windows(as_of, trend_df_customer_product)["active_since"]
+    trend_df_customer_product2 = trend_df_customer_product[
+        window_mask(trend_df_customer_product["Last_Sale_Date"], active_since)
+    ].copy()
+
+    # Create a combined label for plotting
+    trend_df_customer_product2["Customer_Product"] = (
+        trend_df_customer_product2["CustomerCode"].astype(str) + " | " + trend_df_customer_product2["Product_Code"].astype(str)
+    )
+    return _segment_by_trend(trend_df_customer_product2)
+
+
+def show_customer_product_segments(segment_mapping):
+    """Displays the customer-product segments returned by customer_product_segments."""
+    st.header("Müşteri - Ürün Trend Segmentasyonu")
+    _show_segments(
+        segment_mapping,
+        y='Customer_Product',
+        ylabel="Müşteri | Ürün",
+        display_columns=["CustomerCode", "CustomerName", "Product_Code", "ProductName", "Last_Sale_Date"],
+    )
+
+
+def customer_product_segmentation(trend_df_customer_product):
+    """
+    Segments customer-product pairs based on sales trends and visualizes the results using Streamlit.
+    This function analyzes the trend data for each customer-product pair, segments them into various categories
+    (such as growing, declining, stable, volatile, etc.) based on dynamic thresholds for slope and volatility,
+    and displays the results as bar plots and data tables in a Streamlit app.
+    Parameters:
+        trend_df_customer_product (pd.DataFrame): 
+            DataFrame containing trend analysis results for customer-product pairs.
+            Expected columns include:
+                - "CustomerCode": Unique identifier for the customer.
+                - "CustomerName": Name of the customer.
+                - "Product_Code": Unique identifier for the product.
+                - "ProductName": Name of the product.
+                - "Last_Sale_Date": Date of the last sale (string or datetime).
+                - "Slope": Trend slope value for the customer-product pair.
+                - "Volatility": Volatility value for the customer-product pair.
+    Returns:
+        None. The function outputs visualizations and tables directly to the Streamlit interface.
+    """
+    show_customer_product_segments(customer_product_segments(trend_df_customer_product))
+
+
+def product_segments(trend_df_product, as_of=None):
+    """
+    Ürünleri (son satışı as_of'tan önceki yılın 1 Haziran'ı ve sonrası; as_of verilmezse trend tablosundaki son satış) trend
+    eğimi ve volatiliteye göre segmentlere ayırır.
+
+    Parameters:
+        trend_df_product (pd.DataFrame): compute_product_trend çıktısı.
+        as_of (str/Timestamp, optional): Analiz tarihi (date_index.analysis_windows).
+    Returns:
+        dict: Segment başlığı -> ürün DataFrame'i.
+    """
+    # Son satış tarihi metin (YYYY-MM-DD) olarak tutulur; karşılaştırma tarih olarak yapılır
+    trend_df_product2 = trend_df_product[window_mask(trend_df_product["Last_Sale_Date"], analysis_windows(as_of, trend_df_product)["active_since"])]
+    return _segment_by_trend(trend_df_product2)
+
+
+def show_product_segments(segment_mapping):
+    """product_segments ile üretilen ürün segmentlerini gösterir."""
+    st.header("Ürün Trend Segmentasyonu")
+    _show_segments(
+        segment_mapping,
+        y='Product_Code',
+        ylabel="Ürün",
+        display_columns=["Product_Code", "ProductName", "Last_Sale_Date"],
+    )
+
 
 # Ürün trend segmentasyonu fonksiyonu: Ürünleri eğim ve volatiliteye göre segmentlere ayırır ve Streamlit ile görselleştirir.
 def product_segmentation(trend_df_product):
@@ -551,82 +665,11 @@ def product_segmentation(trend_df_product):
     Returns:
         None: The function displays visualizations and tables in the Streamlit app, but does not return a value.
     Notes:
-        - Only products with "Last_Sale_Date" >= "2024-06-01" are considered.
+        - Only products with "Last_Sale_Date" on or after active_since (see product_segments) are considered.
         - Dynamic thresholds for segmentation are computed using the mean and standard deviation of "Slope" and the mean of "Volatility".
         - Each segment is visualized with a bar plot and an expandable data table.
     """
-    st.header("Ürün Trend Segmentasyonu")
-    trend_df_product2=trend_df_product[trend_df_product["Last_Sale_Date"]>="2024-06-01"]
-    
-    # 🔧 Dinamik eşikler
-    slope_mean = trend_df_product2["Slope"].mean()
-    slope_std = trend_df_product2["Slope"].std()
-    volatility_mean = trend_df_product2["Volatility"].mean()
-
-    slope_threshold_up = slope_mean + slope_std
-    slope_threshold_down = slope_mean - slope_std
-    volatility_threshold = volatility_mean
-
-    # Segmentler
-    top_growing = trend_df_product2.sort_values("Slope", ascending=False).head(5)
-    top_declining = trend_df_product2.sort_values("Slope", ascending=True).head(5)
-
-    stable_rising = trend_df_product2[
-        (trend_df_product2["Slope"] > slope_threshold_up) &
-        (trend_df_product2["Volatility"] <= volatility_threshold)
-    ]
-    volatile_rising = trend_df_product2[
-        (trend_df_product2["Slope"] > slope_threshold_up) &
-        (trend_df_product2["Volatility"] > volatility_threshold)
-    ]
-    stable_falling = trend_df_product2[
-        (trend_df_product2["Slope"] < slope_threshold_down) &
-        (trend_df_product2["Volatility"] <= volatility_threshold)
-    ]
-    volatile_falling = trend_df_product2[
-        (trend_df_product2["Slope"] < slope_threshold_down) &
-        (trend_df_product2["Volatility"] > volatility_threshold)
-    ]
-    stable_products = trend_df_product2[
-        (trend_df_product2["Volatility"] <= volatility_threshold) &
-        (trend_df_product2["Slope"].abs() < 0.01)
-    ]
-
-    # Segment eşleşmeleri
-    segment_mapping = {
-        " Büyüyen ve İstikrarlı": stable_rising,
-        " Riskli ama Popüler": volatile_rising,
-        " Churn Adayları": stable_falling,
-        " Müdahale Gereken Ürünler": volatile_falling,
-        " Sabit ve Güvenilir": stable_products,
-        " En Çok Artış Gösterenler": top_growing,
-        " En Çok Düşüş Gösterenler": top_declining
-    }
-
-    # Her segmenti çiz ve göster
-    for title, df in segment_mapping.items():
-        st.subheader(title)
-        if df.empty:
-            st.info("Bu segmentte görüntülenecek veri bulunamadı.")
-            continue
-
-        sorted_df = df.sort_values('Slope', ascending=False)
-        fig, ax = plt.subplots(figsize=(12, max(4, len(sorted_df) * 0.4)))
-        sns.barplot(data=sorted_df, y='Product_Code', x='Slope', ax=ax, palette='coolwarm')
-        ax.set_xlabel("Trend Eğim (Slope)")
-        ax.set_ylabel("Ürün")
-        ax.set_title(title)
-        ax.grid(True)
-        st.pyplot(fig)
-
-        # Opsiyonel: tabloyu da göster
-        with st.expander("📄 Veriyi Göster"):
-            display_columns = [
-                "Product_Code", "ProductName",
-                "Last_Sale_Date"
-            ]
-            display_df = sorted_df[display_columns].reset_index(drop=True)
-            st.dataframe(display_df)
+    show_product_segments(product_segments(trend_df_product))
 
 # Customer segmentation function for product trends (duplicate of product_segmentation, can be customized for customer-based segmentation)
 def customer_segmentation(trend_df_product):
@@ -649,75 +692,4 @@ def customer_segmentation(trend_df_product):
         None: 
             The function outputs visualizations and tables directly to the Streamlit app.
     """
-    st.header("Ürün Trend Segmentasyonu")
-    trend_df_product2 = trend_df_product[trend_df_product["Last_Sale_Date"] >= "2024-06-01"]
-    
-    # 🔧 Dynamic thresholds for segmentation
-    slope_mean = trend_df_product2["Slope"].mean()
-    slope_std = trend_df_product2["Slope"].std()
-    volatility_mean = trend_df_product2["Volatility"].mean()
-
-    slope_threshold_up = slope_mean + slope_std
-    slope_threshold_down = slope_mean - slope_std
-    volatility_threshold = volatility_mean
-
-    # Segments
-    top_growing = trend_df_product2.sort_values("Slope", ascending=False).head(5)
-    top_declining = trend_df_product2.sort_values("Slope", ascending=True).head(5)
-
-    stable_rising = trend_df_product2[
-        (trend_df_product2["Slope"] > slope_threshold_up) &
-        (trend_df_product2["Volatility"] <= volatility_threshold)
-    ]
-    volatile_rising = trend_df_product2[
-        (trend_df_product2["Slope"] > slope_threshold_up) &
-        (trend_df_product2["Volatility"] > volatility_threshold)
-    ]
-    stable_falling = trend_df_product2[
-        (trend_df_product2["Slope"] < slope_threshold_down) &
-        (trend_df_product2["Volatility"] <= volatility_threshold)
-    ]
-    volatile_falling = trend_df_product2[
-        (trend_df_product2["Slope"] < slope_threshold_down) &
-        (trend_df_product2["Volatility"] > volatility_threshold)
-    ]
-    stable_products = trend_df_product2[
-        (trend_df_product2["Volatility"] <= volatility_threshold) &
-        (trend_df_product2["Slope"].abs() < 0.01)
-    ]
-
-    # Segment mapping for display
-    segment_mapping = {
-        " Büyüyen ve İstikrarlı": stable_rising,
-        " Riskli ama Popüler": volatile_rising,
-        " Churn Adayları": stable_falling,
-        " Müdahale Gereken Ürünler": volatile_falling,
-        " Sabit ve Güvenilir": stable_products,
-        " En Çok Artış Gösterenler": top_growing,
-        " En Çok Düşüş Gösterenler": top_declining
-    }
-
-    # Plot and display each segment
-    for title, df in segment_mapping.items():
-        st.subheader(title)
-        if df.empty:
-            st.info("Bu segmentte görüntülenecek veri bulunamadı.")
-            continue
-
-        sorted_df = df.sort_values('Slope', ascending=False)
-        fig, ax = plt.subplots(figsize=(12, max(4, len(sorted_df) * 0.4)))
-        sns.barplot(data=sorted_df, y='Product_Code', x='Slope', ax=ax, palette='coolwarm')
-        ax.set_xlabel("Trend Eğim (Slope)")
-        ax.set_ylabel("Ürün")
-        ax.set_title(title)
-        ax.grid(True)
-        st.pyplot(fig)
-
-        # Optionally: show the data table for the segment
-        with st.expander("📄 Veriyi Göster"):
-            display_columns = [
-                "Product_Code", "ProductName",
-                "Last_Sale_Date"
-            ]
-            display_df = sorted_df[display_columns].reset_index(drop=True)
-            st.dataframe(display_df)
+    show_product_segments(product_segments(trend_df_product))
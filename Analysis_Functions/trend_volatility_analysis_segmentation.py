@@ -3,6 +3,8 @@ import numpy as np
 import matplotlib.pyplot as plt 
 import streamlit as st 
 
+from Analysis_Functions.paged_table import show_table
+
 def classify_segment(row):
     """
     Classifies a customer-product pair into a segment based on sales volatility (coefficient of variation),
@@ -51,10 +53,10 @@ def classify_segment(row):
     return "Tanımlanamayan Ürünler"
 
 
-def combine_trend_volatility_results(trend_df_customer_product, volatility_df_customer_product, df_clean):
+def compute_trend_volatility_segments(trend_df_customer_product, volatility_df_customer_product, df_clean):
     """
     Combines trend and volatility analysis results for customer-product pairs, enriches with customer and product names,
-    applies segmentation, and displays the results in a Streamlit dataframe.
+    and applies segmentation. The results are displayed by show_trend_volatility_segments.
 
     Args:
         trend_df_customer_product (pd.DataFrame): DataFrame containing trend analysis results for each customer-product pair.
@@ -68,7 +70,6 @@ def combine_trend_volatility_results(trend_df_customer_product, volatility_df_cu
         - The function merges trend and volatility data on 'CustomerCode' and 'Product_Code'.
         - Customer and product names are added from df_clean.
         - Segmentation is performed using the classify_segment function.
-        - The results are displayed using Streamlit's dataframe component.
     """
     # Merge trend and volatility results on customer and product codes
     combined_df_customer_product = pd.merge(
@@ -95,11 +96,24 @@ def combine_trend_volatility_results(trend_df_customer_product, volatility_df_cu
 
     # Sort by segment for better display
     combined_df_customer_product.sort_values(by="Segment", ascending=False, inplace=True)
+    return combined_df_customer_product
 
-    # Display results in Streamlit
+
+def show_trend_volatility_segments(combined_df_customer_product):
+    """Displays the customer-product segmentation table built by compute_trend_volatility_segments."""
     st.markdown("### MÜŞTERİ-ÜRÜN SEGMENTASYONU")
     columns_to_show = ['CustomerCode', 'CustomerName', 'Product_Code', 'ProductName', 'Last_Sale_Date', 'Segment']
-    st.dataframe(combined_df_customer_product[columns_to_show].reset_index(drop=True))
+    show_table(combined_df_customer_product[columns_to_show].reset_index(drop=True), key="trend_volatility_segments")
+
 
+def combine_trend_volatility_results(trend_df_customer_product, volatility_df_customer_product, df_clean):
+    """
+    Combines trend and volatility results (compute_trend_volatility_segments), displays the segmentation
+    in Streamlit (show_trend_volatility_segments) and returns the combined DataFrame.
+    """
+    combined_df_customer_product = compute_trend_volatility_segments(
+        trend_df_customer_product, volatility_df_customer_product, df_clean
+    )
+    show_trend_volatility_segments(combined_df_customer_product)
     return combined_df_customer_product
     
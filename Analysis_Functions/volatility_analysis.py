@@ -2,78 +2,104 @@ import matplotlib.pyplot as plt
 import seaborn as sns
 import streamlit as st
 
-def volatility_analysis(df):
+from Analysis_Functions.date_index import analysis_windows
+from Analysis_Functions.figure_cache import show_figure
+from Analysis_Functions.month_close import is_month_close_state, require_state_windows
+from Analysis_Functions.paged_table import show_table
+from Analysis_Functions.volatility_engine import compute_volatility_levels
+
+def compute_volatility(df, as_of=None):
     """
-    Perform sales volatility (coefficient of variation, CV) analysis on the given DataFrame.
+    Compute sales volatility (coefficient of variation, CV) on the given DataFrame.
 
     The function generates two analyses:
     1. Customer-Product based CV analysis: Calculates the CV for each customer-product pair
-       where the last sale date is after 2024-06-01, and displays the top 25 riskiest pairs.
-    2. Product based CV analysis: Calculates the CV for each product where the last sale date
-       is after 2024-06-01, and displays the top 25 riskiest products.
+       where the last sale date is on or after June 1st of the year before as_of (as_of defaults to the last sale in the data).
+    2. Product based CV analysis: Calculates the CV for each product with the same last sale date filter.
 
-    Visualizations and data tables are rendered using Streamlit.
+    Mean, standard deviation and CV of the invoice-line sales are derived from per-group
+    count / sum / sum-of-squares computed in a single scan (volatility_engine).
+    Both results are sorted by CV (riskiest first). Nothing is rendered; see show_volatility.
 
     Parameters:
         df (pd.DataFrame): Input DataFrame containing at least the following columns:
             - 'CustomerCode', 'Product_Code', 'ProductName', 'CustomerName', 'Date', 'Sale_Amount'
+            A month-close state (month_close.month_close_state) can be passed instead; the
+            moments are then read from its running sums.
+        as_of (str or pd.Timestamp, optional): Analysis date (date_index.analysis_windows). Rows after
+            as_of are expected to be cut by the caller; a month-close state only serves the default.
 
     Returns:
         tuple: (volatility_cp, volatility_p)
             - volatility_cp (pd.DataFrame): Customer-Product based volatility results.
             - volatility_p (pd.DataFrame): Product based volatility results.
     """
-    st.subheader("SATIŞ VOLATİLİTESİ ANALİZİ")
+    if is_month_close_state(df):
+        require_state_windows(df, as_of)
+    # Customer-product and product moments in one scan; groups whose last sale is before the active window are dropped
+    levels = compute_volatility_levels(
+        df, ['customer_product', 'product'], granularity='line', recent_since=analysis_windows(as_of, df)['active_since']
+    )
 
     # --- Customer-Product Based Volatility ---
-    # Find last sale date for each customer-product group
-    last_sale_dates_cp = (
-        df.groupby(['CustomerCode', 'Product_Code'])['Date']
-        .max()
-        .reset_index()
-        .rename(columns={'Date': 'Customer_Product_Last_Sale_Date'})
-    )
-    # Merge last sale dates into original DataFrame
-    df_cp = df.merge(last_sale_dates_cp, on=['CustomerCode', 'Product_Code'], how='left')
-    # Filter for recent sales (after 2024-06-01)
-    df_cp_recent = df_cp[df_cp['Customer_Product_Last_Sale_Date'] >= "2024-06-01"]
-
-    # Calculate mean, std, and coefficient of variation (CV) for each customer-product pair
-    volatility_cp = (
-        df_cp_recent.groupby(['CustomerCode', 'Product_Code', 'ProductName', 'CustomerName'])['Sale_Amount']
-        .agg(['mean', 'std'])
-        .assign(coef_var=lambda x: x['std'] / x['mean'])
-        .reset_index()
+    cp = levels['customer_product']
+    volatility_cp = cp[['CustomerCode', 'Product_Code', 'ProductName', 'CustomerName']].assign(
+        mean=cp['Mean'], std=cp['Std'], coef_var=cp['CV']
     )
     # Create combined columns for display
     volatility_cp['Customer_Product'] = (
-        volatility_cp['CustomerCode'] + " | " + volatility_cp['Product_Code']
+        volatility_cp['CustomerCode'].astype(str) + " | " + volatility_cp['Product_Code'].astype(str)
     )
     volatility_cp['Customer_Product_Name'] = (
-        volatility_cp['CustomerName'] + " | " + volatility_cp['ProductName']
+        volatility_cp['CustomerName'].astype(str) + " | " + volatility_cp['ProductName'].astype(str)
     )
-    # Merge last sale dates and sort by CV
-    volatility_cp = volatility_cp.merge(last_sale_dates_cp, on=['CustomerCode', 'Product_Code'], how='left')
-    volatility_cp = volatility_cp.sort_values(by='coef_var', ascending=False)
+    # Attach last sale dates and sort by CV
+    volatility_cp['Customer_Product_Last_Sale_Date'] = cp['Last_Sale_Date']
+    volatility_cp = volatility_cp.sort_values(by='coef_var', ascending=False, kind='stable')
 
-    # Plot top 25 customer-product pairs by CV
-    st.markdown("### 1- Müşteri – Ürün Bazlı CV Analizi")
-    fig1, ax1 = plt.subplots(figsize=(20, 9))
+    # --- Product Based Volatility ---
+    p = levels['product']
+    volatility_p = p[['Product_Code', 'ProductName']].assign(
+        mean=p['Mean'], std=p['Std'], coef_var=p['CV'], Product_Last_Sale_Date=p['Last_Sale_Date']
+    )
+    volatility_p = volatility_p.sort_values(by='coef_var', ascending=False, kind='stable')
+
+    return volatility_cp, volatility_p
+
+
+def _cv_bar_figure(data, x, title, xlabel):
+    """Builds a 20x9 CV bar chart with the risk threshold line (CV = 0.5)."""
+    fig, ax = plt.subplots(figsize=(20, 9))
     sns.barplot(
-        data=volatility_cp.head(25),
-        x='Customer_Product_Name',
+        data=data,
+        x=x,
         y='coef_var',
         palette='coolwarm',
-        ax=ax1
+        ax=ax
+    )
+    ax.set_title(title, fontsize=14)
+    ax.set_xlabel(xlabel)
+    ax.set_ylabel("CV (Varyasyon Katsayısı)")
+    ax.axhline(0.5, color='gray', linestyle='--', label='Riskli Eşik (CV = 0.5)')
+    ax.tick_params(axis='x', rotation=90)
+    ax.legend()
+    fig.tight_layout()
+    return fig
+
+
+def show_volatility(volatility_cp, volatility_p):
+    """
+    Render the volatility results of compute_volatility: a bar chart and a table of the
+    top 25 riskiest customer-product pairs, then the same for products.
+    """
+    st.subheader("SATIŞ VOLATİLİTESİ ANALİZİ")
+
+    # Plot top 25 customer-product pairs by CV
+    st.markdown("### 1- Müşteri – Ürün Bazlı CV Analizi")
+    show_figure(
+        _cv_bar_figure, volatility_cp.head(25), 'Customer_Product_Name',
+        "Müşteri – Ürün Bazlı Varyasyon Katsayısı (CV)", "Müşteri | Ürün"
     )
-    ax1.set_title("Müşteri – Ürün Bazlı Varyasyon Katsayısı (CV)", fontsize=14)
-    ax1.set_xlabel("Müşteri | Ürün")
-    ax1.set_ylabel("CV (Varyasyon Katsayısı)")
-    ax1.axhline(0.5, color='gray', linestyle='--', label='Riskli Eşik (CV = 0.5)')
-    ax1.tick_params(axis='x', rotation=90)
-    ax1.legend()
-    plt.tight_layout()
-    st.pyplot(fig1)
 
     # Display top 25 riskiest customer-product pairs in a table
     columns_cp = [
@@ -84,48 +110,12 @@ def volatility_analysis(df):
     with st.expander("En Riskli 25 Müşteri – Ürün (CV En Yüksek)"):
         st.dataframe(top25_cp.reset_index(drop=True))
 
-    # --- Product Based Volatility ---
-    # Find last sale date for each product
-    last_sale_dates_p = (
-        df.groupby('Product_Code')['Date']
-        .max()
-        .reset_index()
-        .rename(columns={'Date': 'Product_Last_Sale_Date'})
-    )
-    # Merge last sale dates into original DataFrame
-    df_p = df.merge(last_sale_dates_p, on='Product_Code', how='left')
-    # Filter for recent sales (after 2024-06-01)
-    df_p_recent = df_p[df_p['Product_Last_Sale_Date'] >= "2024-06-01"]
-
-    # Calculate mean, std, and coefficient of variation (CV) for each product
-    volatility_p = (
-        df_p_recent.groupby(['Product_Code', 'ProductName'])['Sale_Amount']
-        .agg(['mean', 'std'])
-        .assign(coef_var=lambda x: x['std'] / x['mean'])
-        .reset_index()
-    )
-    # Merge last sale dates and sort by CV
-    volatility_p = volatility_p.merge(last_sale_dates_p, on='Product_Code', how='left')
-    volatility_p = volatility_p.sort_values(by='coef_var', ascending=False)
-
     # Plot top 25 products by CV
     st.markdown("### 2-Ürün Bazlı CV Analizi")
-    fig2, ax2 = plt.subplots(figsize=(20, 9))
-    sns.barplot(
-        data=volatility_p.head(25),
-        x='ProductName',
-        y='coef_var',
-        palette='coolwarm',
-        ax=ax2
+    show_figure(
+        _cv_bar_figure, volatility_p.head(25).astype({'ProductName': str}), 'ProductName',
+        "Ürün Bazlı Varyasyon Katsayısı (CV)", "Ürün"
     )
-    ax2.set_title("Ürün Bazlı Varyasyon Katsayısı (CV)", fontsize=14)
-    ax2.set_xlabel("Ürün")
-    ax2.set_ylabel("CV (Varyasyon Katsayısı)")
-    ax2.axhline(0.5, color='gray', linestyle='--', label='Riskli Eşik (CV = 0.5)')
-    ax2.tick_params(axis='x', rotation=90)
-    ax2.legend()
-    plt.tight_layout()
-    st.pyplot(fig2)
 
     # Display product-based CV data in a table
     columns_p = [
@@ -133,6 +123,15 @@ def volatility_analysis(df):
         'coef_var', 'Product_Last_Sale_Date'
     ]
     with st.expander("Ürün Bazlı CV Verisi"):
-        st.dataframe(volatility_p[columns_p])
+        show_table(volatility_p[columns_p], key="product_cv")
+
 
+def volatility_analysis(df):
+    """
+    Perform sales volatility (CV) analysis and render it with Streamlit.
+
+    Runs compute_volatility and show_volatility. Returns (volatility_cp, volatility_p).
+    """
+    volatility_cp, volatility_p = compute_volatility(df)
+    show_volatility(volatility_cp, volatility_p)
     return volatility_cp, volatility_p
@@ -0,0 +1,160 @@
+import numpy as np
+import pandas as pd
+
+from Analysis_Functions.month_close import is_month_close_state
+from Analysis_Functions.sales_cube import is_sales_cube
+
+# Seviye adı → gruplama sütunları
+VOLATILITY_LEVELS = {
+    "customer": ["CustomerCode"],
+    "product": ["Product_Code"],
+    "customer_product": ["CustomerCode", "Product_Code"],
+}
+# Kod sütunu → ad sütunu; seviyenin kodları varsa adları da sonuca eklenir
+NAME_COLUMNS = {"CustomerCode": "CustomerName", "Product_Code": "ProductName"}
+
+
+def _finest_keys(levels):
+    """Tüm seviyelerin anahtarlarının birleşimi (ilk görülme sırasıyla); her seviye bunun alt kümesidir."""
+    keys = []
+    for level in levels:
+        keys += [key for key in VOLATILITY_LEVELS[level] if key not in keys]
+    return keys
+
+
+def _name_columns(keys, df):
+    return [NAME_COLUMNS[key] for key in keys if key in NAME_COLUMNS and NAME_COLUMNS[key] in df.columns]
+
+
+def _scan(df, keys, granularity):
+    """
+    Veriyi tek kez tarar ve en ince seviyede (keys) toplamları üretir.
+
+    granularity='line' için her fatura satırı bir gözlemdir: grup başına Count, Sum, SumSq ve
+    Last_Sale_Date döner. granularity='month' için gözlem, grubun aylık satış toplamıdır:
+    (keys, YearMonth) hücresi başına Sale_Amount ve Last_Sale_Date döner.
+    """
+    if granularity not in ("line", "month"):
+        raise ValueError(f"Bilinmeyen granularity: {granularity!r} ('line' ya da 'month' olmalı)")
+    if is_sales_cube(df) and granularity == "line":
+        raise ValueError("Satış küpü ay düzeyindedir; fatura satırı düzeyinde volatilite hesaplanamaz.")
+
+    names = _name_columns(keys, df)
+    first_names = {name: (name, "first") for name in names}
+    values = df["Sale_Amount"].astype(float)
+    dates = df["Last_Sale_Date"] if is_sales_cube(df) else df["Date"]
+    frame = pd.DataFrame({**{col: df[col] for col in keys + names}, "Sale_Amount": values, "Last_Sale_Date": dates})
+
+    if granularity == "line":
+        frame["SumSq"] = values ** 2
+        return frame.groupby(keys, observed=True, sort=True).agg(
+            Count=("Sale_Amount", "count"), Sum=("Sale_Amount", "sum"), SumSq=("SumSq", "sum"),
+            Last_Sale_Date=("Last_Sale_Date", "max"), **first_names,
+        ).reset_index()
+
+    if is_sales_cube(df):
+        frame["YearMonth"] = df["YearMonth"]
+    else:
+        # Ay başı tarihi (datetime64[M]); satır başına Period nesnesi üretilmez
+        frame["YearMonth"] = dates.to_numpy().astype("datetime64[M]").astype("datetime64[ns]")
+    return frame.groupby(keys + ["YearMonth"], observed=True, sort=True).agg(
+        Sale_Amount=("Sale_Amount", "sum"), Last_Sale_Date=("Last_Sale_Date", "max"), **first_names,
+    ).reset_index()
+
+
+def _state_moments(pairs, keys):
+    """
+    Ay kapanışı durumundaki müşteri-ürün satır momentlerini _scan(granularity='line') biçiminde
+    keys seviyesine indirger.
+    """
+    names = _name_columns(keys, pairs)
+    moments = pairs[keys + names + ["Line_Count", "Sales_Sum", "Line_SumSq", "Last_Sale_Date"]].rename(
+        columns={"Line_Count": "Count", "Sales_Sum": "Sum", "Line_SumSq": "SumSq"}
+    )
+    if sorted(keys) == sorted(VOLATILITY_LEVELS["customer_product"]):
+        return moments.sort_values(keys, ignore_index=True)
+    return moments.groupby(keys, sort=True).agg(
+        Count=("Count", "sum"), Sum=("Sum", "sum"), SumSq=("SumSq", "sum"),
+        Last_Sale_Date=("Last_Sale_Date", "max"), **{name: (name, "first") for name in names},
+    ).reset_index()
+
+
+def _level_moments(scanned, keys, level_keys, granularity, df):
+    """En ince seviyedeki toplamları seviye anahtarlarına indirger: Count, Sum, SumSq, Last_Sale_Date."""
+    names = _name_columns(level_keys, df)
+    first_names = {name: (name, "first") for name in names}
+    if granularity == "line":
+        if level_keys == keys:
+            return scanned[level_keys + names + ["Count", "Sum", "SumSq", "Last_Sale_Date"]]
+        return scanned.groupby(level_keys, observed=True, sort=True).agg(
+            Count=("Count", "sum"), Sum=("Sum", "sum"), SumSq=("SumSq", "sum"),
+            Last_Sale_Date=("Last_Sale_Date", "max"), **first_names,
+        ).reset_index()
+
+    monthly = scanned
+    if level_keys != keys:
+        monthly = scanned.groupby(level_keys + ["YearMonth"], observed=True, sort=True).agg(
+            Sale_Amount=("Sale_Amount", "sum"), Last_Sale_Date=("Last_Sale_Date", "max"), **first_names,
+        ).reset_index()
+    monthly = monthly.assign(SumSq=monthly["Sale_Amount"] ** 2)
+    return monthly.groupby(level_keys, observed=True, sort=True).agg(
+        Count=("Sale_Amount", "count"), Sum=("Sale_Amount", "sum"), SumSq=("SumSq", "sum"),
+        Last_Sale_Date=("Last_Sale_Date", "max"), **first_names,
+    ).reset_index()
+
+
+def compute_volatility_levels(df, levels, granularity="line", recent_since=None, recent_years=None):
+    """
+    Birden çok gruplama seviyesi için satış volatilitesini (varyasyon katsayısı, CV) tek taramada hesaplar.
+
+    Veri bir kez taranarak en ince seviyede (ör. müşteri-ürün) adet, toplam ve kareler toplamı
+    çıkarılır; daha kaba seviyeler (müşteri, ürün) bu toplamlardan türetilir. Böylece satır
+    düzeyinde merge yapılmaz ve ara tablolar grup sayısıyla orantılı kalır. Ortalama, standart
+    sapma (ddof=1), CV ve son satış tarihi bu momentlerden hesaplanır; yakınlık filtresi de
+    son satış tarihine uygulanır.
+
+    Parameters:
+        df (pd.DataFrame): preprocessing çıktısı, build_sales_cube küpü (yalnızca granularity='month')
+            ya da ay kapanışı durumu (month_close.month_close_state; yalnızca granularity='line',
+            momentler durumdan okunur, veri taranmaz).
+        levels (list of str): VOLATILITY_LEVELS anahtarları (ör. ['customer_product', 'product']).
+        granularity (str): 'line' (her fatura satırı bir gözlem) ya da 'month' (grubun aylık satış toplamları).
+        recent_since (str or pd.Timestamp, optional): Son satış tarihi bu tarihten önce olan gruplar çıkarılır.
+        recent_years (iterable of int, optional): Son satış yılı bu yıllardan biri olmayan gruplar çıkarılır.
+
+    Returns:
+        dict: Seviye adı → DataFrame (seviye anahtarları, varsa ad sütunları, 'Count', 'Mean',
+        'Std', 'CV', 'Last_Sale_Date'); satırlar anahtarlara göre sıralıdır.
+    """
+    keys = _finest_keys(levels)
+    if is_month_close_state(df):
+        if granularity != "line":
+            raise ValueError("Ay kapanışı durumu yalnızca fatura satırı düzeyinde (granularity='line') moment tutar.")
+        df = df["pairs"]
+        scanned = _state_moments(df, keys)
+    else:
+        scanned = _scan(df, keys, granularity)
+
+    results = {}
+    for level in levels:
+        level_keys = VOLATILITY_LEVELS[level]
+        moments = _level_moments(scanned, keys, level_keys, granularity, df)
+        if recent_since is not None:
+            moments = moments[moments["Last_Sale_Date"] >= pd.Timestamp(recent_since)]
+        if recent_years is not None:
+            moments = moments[moments["Last_Sale_Date"].dt.year.isin(list(recent_years))]
+
+        n = moments["Count"].astype(float)
+        mean = moments["Sum"] / n
+        # Örneklem varyansı (ddof=1), toplam ve kareler toplamından; yuvarlama kaynaklı negatifler sıfırlanır
+        variance = ((moments["SumSq"] - moments["Sum"] ** 2 / n) / (n - 1)).clip(lower=0)
+        std = np.sqrt(variance).where(n > 1)
+
+        names = _name_columns(level_keys, df)
+        out = moments[level_keys + names + ["Count"]].reset_index(drop=True)
+        out["Mean"] = mean.to_numpy()
+        out["Std"] = std.to_numpy()
+        out["CV"] = out["Std"] / out["Mean"]
+        out["Last_Sale_Date"] = moments["Last_Sale_Date"].to_numpy()
+        results[level] = out
+    return results
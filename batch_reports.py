@@ -0,0 +1,144 @@
+"""
+Gece çalışan toplu rapor üretici.
+
+Her analiz tipi (option) için veriyi yükler, ön işler, dashboard'daki tüm bölümleri Streamlit
+arayüzü olmadan çalıştırır ve sonuçları sürümlü bir klasöre yazar:
+
+    reports/<YYYYmmdd-HHMMSS>/<analiz_tipi>/manifest.json, table_*.parquet, figure_*.png, view_*.img
+
+Dashboard en yeni tamamlanmış raporu bulur ve "Gece raporunu kullan" seçiliyse hiçbir analizi
+hesaplamadan bu klasörden gösterir. Böylece analizler her kullanıcı tıklamasında değil gecede
+bir kez çalışır.
+
+Kullanım (depo kök klasöründen, ör. cron ile):
+
+    python batch_reports.py
+    python batch_reports.py --options "İhracat-Dipsos/Sachet" --keep 3
+"""
+import argparse
+import logging
+import os
+import shutil
+import sys
+import time
+
+import matplotlib
+
+matplotlib.use("Agg")
+
+import pandas as pd
+from streamlit import logger as st_logger
+
+from Analysis_Functions.analysis_sections import ANALYSIS_SECTIONS, render_sections
+from Analysis_Functions.database import ANALYSIS_OPTIONS
+from Analysis_Functions.report_store import REPORT_DIR, new_recorder, save_report
+from Analysis_Functions.result_cache import clear_cache, dataset_fingerprint
+from Analysis_Functions.snapshot_cache import LOOKBACK_DAYS, load_sales_data, option_slug
+from Analysis_Functions.sql_backend import BACKENDS, active_backend, configure_backend
+
+# Arayüz olmadan çalışan iş parçacıklarında "missing ScriptRunContext" uyarısını yazan günlük
+SCRIPT_RUNNER_LOGGER = "streamlit.runtime.scriptrunner_utils"
+
+
+def run_option(option, version_dir, refresh=True, sections=None, incremental=False, calendar=False, as_of=None,
+               lookback_days=LOOKBACK_DAYS):
+    """
+    Bir analiz tipinin tüm bölümlerini çalıştırır ve raporunu version_dir altına yazar.
+    incremental True ise trend, volatilite, düzenlilik ve yaşlanma ay kapanışı durumundan
+    hesaplanır (bkz. month_close); kapanmış aylar gece gece yeniden taranmaz. calendar True ise
+    trend ve yaşlanma takvim ayına hizalı satış panelinden hesaplanır (bkz. sales_panel). as_of
+    verilirse rapor o güne kadarki satırlardan ve o tarihe göre kurulan pencerelerden hazırlanır
+    (bkz. date_index.analysis_windows). Artımlı yenilemede filigrandan lookback_days gün öncesinden
+    itibaren yeniden çekilir (bkz. snapshot_cache.load_sales_data).
+
+    Returns:
+        dict: Yazılan manifest; veri yüklenemezse ('error' anahtarlı) hata sözlüğü.
+    """
+    start = time.perf_counter()
+    df_raw = load_sales_data(option, refresh=refresh, lookback_days=lookback_days)
+    if isinstance(df_raw, tuple):
+        return {"option": option, "error": df_raw[1]}
+
+    fingerprint = dataset_fingerprint(df_raw, option)
+    titles = sections or list(ANALYSIS_SECTIONS)
+    recorder = new_recorder()
+    render_sections(
+        titles, df_raw, fingerprint, recorder=recorder, incremental=incremental, calendar=calendar, as_of=as_of,
+    )
+    meta = {
+        "option": option,
+        "fingerprint": list(fingerprint),
+        "rows": int(len(df_raw)),
+        "snapshot": df_raw.attrs.get("snapshot"),
+        "load_stats": df_raw.attrs.get("load_stats"),
+        "sections": titles,
+        "incremental": incremental,
+        "calendar": calendar,
+        "as_of": None if as_of is None else pd.Timestamp(as_of).date().isoformat(),
+        "data_as_of": recorder["data_as_of"],
+        "backend": active_backend(),
+        "created_at": pd.Timestamp.now().isoformat(),
+        "seconds": round(time.perf_counter() - start, 1),
+    }
+    manifest = save_report(recorder, os.path.join(version_dir, option_slug(option)), meta)
+    # Sonraki analiz tipinin sonuçları için önbellek boşaltılır
+    clear_cache()
+    return manifest
+
+
+def prune_versions(root, keep):
+    """En yeni keep sürüm klasörü dışındakileri siler."""
+    if keep <= 0 or not os.path.isdir(root):
+        return
+    versions = sorted(name for name in os.listdir(root) if os.path.isdir(os.path.join(root, name)))
+    for name in versions[:-keep]:
+        shutil.rmtree(os.path.join(root, name))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--output", default=REPORT_DIR, help="Sürüm klasörlerinin yazılacağı kök klasör.")
+    parser.add_argument("--options", nargs="+", default=list(ANALYSIS_OPTIONS), help="Çalıştırılacak analiz tipleri.")
+    parser.add_argument("--sections", nargs="+", default=None, help="Yalnızca bu bölümler (varsayılan: tümü).")
+    parser.add_argument("--no-refresh", action="store_true", help="Veritabanına gitmeden yerel anlık görüntüyü kullan.")
+    parser.add_argument(
+        "--lookback-days", type=int, default=LOOKBACK_DAYS,
+        help="Artımlı yenilemede son fatura tarihinden geriye yeniden çekilecek gün sayısı.",
+    )
+    parser.add_argument("--incremental", action="store_true", help="Trend, volatilite, düzenlilik ve yaşlanmayı ay kapanışı durumundan hesapla.")
+    parser.add_argument("--calendar", action="store_true", help="Trend ve yaşlanma eğimini takvim ayına hizalı panelden hesapla.")
+    parser.add_argument("--as-of", default=None, help="Analiz tarihi (YYYY-AA-GG); varsayılan: verideki son satış günü.")
+    parser.add_argument("--backend", choices=BACKENDS, default="pandas", help="Ağır gruplama analizlerinin hesaplama motoru.")
+    parser.add_argument("--keep", type=int, default=7, help="Saklanacak sürüm sayısı (0: hepsi).")
+    args = parser.parse_args()
+    # Streamlit çağrıları arayüz olmadan çalışır; "bare mode" uyarıları bastırılır
+    st_logger.set_log_level("error")
+    # Streamlit ilk çağrıda günlük düzeyini yapılandırmadan yeniden kurar; bu yüzden SCRIPT_RUNNER_LOGGER
+    # günlüklerine düzeyden bağımsız bir süzgeç eklenir
+    for name in list(logging.root.manager.loggerDict):
+        if name.startswith(SCRIPT_RUNNER_LOGGER):
+            logging.getLogger(name).addFilter(lambda record: record.levelno >= logging.ERROR)
+    configure_backend(args.backend)
+
+    version_dir = os.path.join(args.output, pd.Timestamp.now().strftime("%Y%m%d-%H%M%S"))
+    failed = False
+    for option in args.options:
+        manifest = run_option(
+            option, version_dir, refresh=not args.no_refresh, sections=args.sections,
+            incremental=args.incremental, calendar=args.calendar, as_of=args.as_of,
+            lookback_days=args.lookback_days,
+        )
+        if "error" in manifest:
+            failed = True
+            print(f"{option}: veri yüklenemedi: {manifest['error']}")
+            continue
+        print(
+            f"{option}: {manifest['rows']:,} satır, {len(manifest['results'])} tablo/sonuç, "
+            f"{len(manifest['figures'])} görüntü, {len(manifest['skipped'])} atlanan, {manifest['seconds']} sn"
+        )
+    prune_versions(args.output, args.keep)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,196 @@
+"""
+Benchmark: binary-search date windows (date_index) vs. boolean masks over the cleaned rows.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_date_index --rows 1000000
+
+preprocessing returns df_clean sorted by Date and registered as sorted. Every recency filter is then
+two searchsorted calls and an iloc slice that shares memory with df_clean.
+
+Checks first:
+- For several windows, date_window equals the boolean mask and does not copy the data.
+- partition_offsets matches the per-month and per-year row counts of a groupby.
+- The month-close totals are unchanged.
+- Analyses run without as_of equal the same analyses run with the data's last sale day as as_of.
+- Cutting the rows at an earlier as_of and the sliced-vs-masked inputs give the same results.
+- Through the process pool (submit_analyses), the full cube and the cube of the as_of cut share a
+  fingerprint but must come back as their own results, whichever is published first.
+
+The timings compare the mask and the slice for each window (best of --repeat runs).
+"""
+import argparse
+import contextlib
+import io
+import time
+
+import numpy as np
+import pandas as pd
+
+from Analysis_Functions.AgingFactor import aging_factor_analysis
+from Analysis_Functions.Aylık_Değişim_Oranı import rate_of_change_per_month
+from Analysis_Functions.date_index import (
+    analysis_windows,
+    data_as_of,
+    date_window,
+    is_date_sorted,
+    partition_offsets,
+    until_as_of,
+)
+from Analysis_Functions.month_close import _month_starts, _open_month_and_totals
+from Analysis_Functions.parallel_analyses import collect_analyses, configure_parallel, submit_analyses
+from Analysis_Functions.prepare_data import preprocessing
+from Analysis_Functions.result_cache import cache_key, cache_lookup, clear_cache
+from Analysis_Functions.sales_cube import build_sales_cube
+from Analysis_Functions.sales_revenue import compute_sales_revenue_product
+from Analysis_Functions.trend_analysis import compute_customer_product_trend, compute_product_trend
+from Analysis_Functions.volatility_analysis import compute_volatility
+from benchmarks.synthetic_sales import generate_sales_data
+
+# (analiz, girdi): bölümlerin kullandığı tablo
+ANALYSES = [
+    (compute_customer_product_trend, "cube"),
+    (compute_product_trend, "clean"),
+    (compute_volatility, "clean"),
+    (aging_factor_analysis, "cube"),
+    (compute_sales_revenue_product, "clean"),
+]
+
+
+def _masked(df, start, stop):
+    mask = np.ones(len(df), dtype=bool)
+    if start is not None:
+        mask &= (df["Date"] >= start).to_numpy()
+    if stop is not None:
+        mask &= (df["Date"] < stop).to_numpy()
+    return df[mask]
+
+
+def _windows(df):
+    windows = analysis_windows(data=df)
+    return {
+        "last two years": (windows["recent_since"], windows["stop"]),
+        "since trend start": (windows["trend_since"], None),
+        "since active start": (windows["active_since"], windows["stop"]),
+        "overview years": (windows["overview_since"], windows["stop"]),
+        "one month": (pd.Timestamp("2024-03-01"), pd.Timestamp("2024-04-01")),
+    }
+
+
+def _assert_view(window, df):
+    if len(window):
+        assert np.shares_memory(window["Sale_Amount"].to_numpy(), df["Sale_Amount"].to_numpy())
+
+
+def _assert_partitions(df):
+    for freq, period in (("MS", "M"), ("YS", "Y")):
+        starts, offsets = partition_offsets(df, freq=freq)
+        counts = df.groupby(df["Date"].dt.to_period(period), observed=True).size()
+        sizes = pd.Series(np.diff(offsets), index=starts.to_period(period))
+        pd.testing.assert_series_equal(sizes[sizes > 0], counts, check_names=False)
+
+
+def _assert_same(a, b):
+    if isinstance(a, pd.DataFrame):
+        pd.testing.assert_frame_equal(a, b)
+    elif isinstance(a, pd.Series):
+        pd.testing.assert_series_equal(a, b)
+    elif isinstance(a, dict):
+        assert a.keys() == b.keys()
+        for key in a:
+            _assert_same(a[key], b[key])
+    elif isinstance(a, (tuple, list)):
+        assert len(a) == len(b)
+        for x, y in zip(a, b):
+            _assert_same(x, y)
+
+
+def _assert_pooled(cubes, workers):
+    """Aynı parmak izli iki küp havuzdan (her iki sırayla) kendi sonuçlarıyla dönmeli."""
+    configure_parallel(max_workers=workers, directory=".cache/bench_shared")
+    fingerprint = ("bench_date_index",)
+    expected = [rate_of_change_per_month(cube, **kwargs) for cube, kwargs in cubes]
+    for order in (cubes, cubes[::-1]):
+        clear_cache()
+        for cube, kwargs in order:
+            futures = {}
+            submit_analyses([(rate_of_change_per_month, "cube", kwargs)], {"cube": cube}, fingerprint, futures)
+            collect_analyses(futures)
+        for (cube, kwargs), value in zip(cubes, expected):
+            hit, pooled = cache_lookup(cache_key(fingerprint, rate_of_change_per_month, cube, **kwargs))
+            assert hit, "rate_of_change_per_month did not come back from the pool"
+            _assert_same(pooled, value)
+    clear_cache()
+
+
+def _best(func, repeat):
+    best, value = None, None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        value = func()
+        seconds = time.perf_counter() - start
+        best = seconds if best is None else min(best, seconds)
+    return value, best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--skew", type=float, default=1.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--workers", type=int, default=2)
+    args = parser.parse_args()
+
+    raw = generate_sales_data(args.rows, seed=args.seed, skew=args.skew)
+    with contextlib.redirect_stdout(io.StringIO()):
+        df_clean = preprocessing(raw)
+    assert is_date_sorted(df_clean)
+    cube = build_sales_cube(df_clean)
+    print(f"{len(df_clean):,} cleaned rows, {len(cube):,} cube cells")
+
+    timings = []
+    for name, (start, stop) in _windows(df_clean).items():
+        masked, mask_s = _best(lambda: _masked(df_clean, start, stop), args.repeat)
+        sliced, slice_s = _best(lambda: date_window(df_clean, start, stop, column="Date"), args.repeat)
+        pd.testing.assert_frame_equal(sliced, masked)
+        _assert_view(sliced, df_clean)
+        timings.append((name, len(sliced), mask_s, slice_s))
+
+    _assert_partitions(df_clean)
+    open_month, totals = _open_month_and_totals(df_clean)
+    unsorted = df_clean.iloc[::-1]
+    assert not is_date_sorted(unsorted)
+    open_month_ref, totals_ref = _open_month_and_totals(unsorted)
+    assert open_month == open_month_ref == _month_starts(df_clean["Date"]).max()
+    pd.testing.assert_frame_equal(
+        totals.sort_values("YearMonth").reset_index(drop=True),
+        totals_ref.sort_values("YearMonth").reset_index(drop=True),
+        check_dtype=False, check_exact=False,
+    )
+
+    frames = {"clean": df_clean, "cube": cube}
+    for func, frame_name in ANALYSES:
+        _assert_same(func(frames[frame_name]), func(frames[frame_name], as_of=data_as_of(frames[frame_name])))
+    as_of = "2024-06-30"
+    cut = until_as_of(df_clean, as_of)
+    reference = _masked(df_clean, None, analysis_windows(as_of)["stop"])
+    _assert_view(cut, df_clean)
+    _assert_same(compute_sales_revenue_product(cut, as_of=as_of), compute_sales_revenue_product(reference, as_of=as_of))
+    cut_cube = build_sales_cube(cut)
+    _assert_same(
+        compute_customer_product_trend(cut_cube, as_of=as_of),
+        compute_customer_product_trend(build_sales_cube(reference), as_of=as_of),
+    )
+    if args.workers > 0:
+        _assert_pooled([(cube, {}), (cut_cube, {"as_of": as_of})], args.workers)
+    print("parity OK (slices vs. masks, views, partition offsets, month-close totals, default vs. explicit as_of, "
+          "pooled as_of cut)")
+
+    print(f"{'window':<24} {'rows':>10} {'mask s':>10} {'slice s':>10} {'speedup':>9}")
+    for name, n_rows, mask_s, slice_s in timings:
+        print(f"{name:<24} {n_rows:>10,} {mask_s:>10.5f} {slice_s:>10.6f} {mask_s / slice_s:>8.0f}x")
+
+
+if __name__ == "__main__":
+    main()
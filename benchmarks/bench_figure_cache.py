@@ -0,0 +1,139 @@
+"""
+Benchmark: figure rendering cache (figure_cache) vs. rendering every figure with st.pyplot.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_figure_cache --figures 8
+
+The legacy path below is what st.pyplot does per call (savefig to a 200 dpi PNG with a tight
+bounding box) for a set of annotated heatmaps, rendered one after another. The same figures are
+then shown inside a figure_scope twice: the first (cold) pass rasterizes them on the process pool
+(in place with --workers 0, the default on single-core machines), the second (warm) pass serves
+the cached bytes without building the figures at all. The cold output must be byte-identical to
+the legacy PNGs, and no figure may be left open in pyplot. A third pass shows new heatmaps of the
+same shape under the same titles (as after switching as_of or mode): they must be rendered again,
+not served from the cache. Pool speedups need several cores; on
+one core the pickle round trip only adds cost.
+
+Finally a scope with a failing rasterization is checked: the rasterization error is raised when
+the block ends normally, but an error raised by the block itself must come out unchanged.
+"""
+import argparse
+import time
+from concurrent.futures import Future
+
+import matplotlib
+
+matplotlib.use("Agg")
+
+import matplotlib.pyplot as plt
+import numpy as np
+import pandas as pd
+import seaborn as sns
+
+from Analysis_Functions import figure_cache
+from Analysis_Functions.figure_cache import figure_scope, figure_to_bytes, show_figure
+from Analysis_Functions.result_cache import cache_lookup
+
+
+def heatmap_figure(data, title):
+    fig, ax = plt.subplots(figsize=(14, 9))
+    sns.heatmap(data, cmap='YlGnBu', annot=True, fmt=".1f", linewidths=0.1, ax=ax)
+    ax.set_title(title)
+    fig.tight_layout()
+    return fig
+
+
+def legacy_render(frames):
+    images = []
+    for i, data in enumerate(frames):
+        fig = heatmap_figure(data, f"Heatmap {i}")
+        images.append(figure_to_bytes(fig))
+        plt.close(fig)
+    return images
+
+
+def cached_render(frames, fingerprint):
+    with figure_scope(fingerprint, "bench"):
+        for i, data in enumerate(frames):
+            show_figure(heatmap_figure, data, f"Heatmap {i}")
+
+
+def _assert_block_error_kept(fingerprint):
+    """Bekleyen çizim hata verse de bloğun kendi hatası yükselmeli; blok hatasızsa çizim hatası yükselir."""
+    original = figure_cache._submit
+
+    def failing_submit(fig):
+        future = Future()
+        future.set_exception(RuntimeError("rasterization failed"))
+        return future
+
+    figure_cache._submit = failing_submit
+    try:
+        for block_error, expected in ((None, RuntimeError), (ValueError("section failed"), ValueError)):
+            try:
+                with figure_scope(fingerprint + ("failing", repr(block_error)), "bench"):
+                    show_figure(heatmap_figure, pd.DataFrame(np.eye(3)), "Failing")
+                    if block_error is not None:
+                        raise block_error
+            except Exception as e:
+                assert type(e) is expected, f"expected {expected.__name__}, got {e!r}"
+            else:
+                raise AssertionError(f"{expected.__name__} was not raised")
+    finally:
+        figure_cache._submit = original
+
+
+def _time(func, *args):
+    start = time.perf_counter()
+    func(*args)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--figures", type=int, default=8)
+    parser.add_argument("--workers", type=int, default=figure_cache.MAX_WORKERS)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    frames = [pd.DataFrame(rng.random((12, 24)) * 100) for _ in range(args.figures)]
+    fingerprint = ("bench", args.seed, args.figures)
+    figure_cache.configure_figures(max_workers=args.workers)
+    # Havuz süreçleri ilk kullanımda başlar; başlatma süresi ölçüme katılmaz
+    if figure_cache._pool() is not None:
+        figure_cache._pool().submit(int).result()
+
+    start = time.perf_counter()
+    legacy = legacy_render(frames)
+    legacy_s = time.perf_counter() - start
+    cold_s = _time(cached_render, frames, fingerprint)
+    warm_s = _time(cached_render, frames, fingerprint)
+
+    def cached_image(i, data):
+        key = ("figure", fingerprint, "bench", i, "png", figure_cache.SAVEFIG_OPTIONS["dpi"],
+               f"{heatmap_figure.__module__}.{heatmap_figure.__qualname__}",
+               figure_cache.describe_argument((data, f"Heatmap {i}")), figure_cache.describe_argument({}))
+        hit, image = cache_lookup(key)
+        assert hit, f"figure {i} is not in the cache"
+        return image
+
+    for i, data in enumerate(frames):
+        assert cached_image(i, data) == legacy[i], f"figure {i} differs from the st.pyplot rendering"
+    # Aynı boyutta, farklı içerikte tablolar: anahtar içerikten türediği için eski görüntü gelmemeli
+    changed = [data.iloc[::-1].reset_index(drop=True) for data in frames]
+    cached_render(changed, fingerprint)
+    for i, (data, image) in enumerate(zip(changed, legacy_render(changed))):
+        assert cached_image(i, data) == image != legacy[i], f"figure {i} was served stale"
+    _assert_block_error_kept(fingerprint)
+    assert not plt.get_fignums(), f"open figures left behind: {plt.get_fignums()}"
+
+    print(f"{args.figures} heatmaps, {args.workers} workers")
+    print(f"{'st.pyplot (sequential)':<26} {legacy_s:>8.3f} s")
+    print(f"{'figure_scope cold':<26} {cold_s:>8.3f} s {legacy_s / cold_s:>7.1f}x")
+    print(f"{'figure_scope cached':<26} {warm_s:>8.3f} s {legacy_s / warm_s:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
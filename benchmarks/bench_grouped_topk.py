@@ -0,0 +1,104 @@
+"""
+Benchmark: grouped top-k engine (compute_top_k) vs. the per-year groupby/apply/sort leaderboards.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_grouped_topk --rows 1000000
+
+The legacy functions below are the data halves of the seasonal leaderboard plots (one groupby per
+year, then groupby('Season').apply(sort_values(...).head(5))) and of the monthly top-3 tables
+(full sort_values + groupby.head(3)). For the monthly tables the result must match exactly. The
+seasonal version sorted each season with an unstable sort, so only the selected values per
+partition are compared there (items tied at the k-th place may legitimately differ).
+"""
+import argparse
+import contextlib
+import io
+import time
+import warnings
+
+import pandas as pd
+
+from Analysis_Functions.grouped_topk import compute_top_k
+from Analysis_Functions.prepare_data import preprocessing
+from benchmarks.synthetic_sales import generate_sales_data
+
+YEARS = [2024, 2025]
+
+
+def legacy_season_top5(df, item_keys, aggfunc):
+    frames = []
+    df_filtered = df[df['Year'].isin(YEARS)].copy()
+    # groupby.apply gruplama sütunlarını da görür; pandas bunun için FutureWarning verir
+    warnings.simplefilter("ignore", FutureWarning)
+    for year in YEARS:
+        year_df = df_filtered[df_filtered['Year'] == year]
+        sales = year_df.groupby(['Season'] + item_keys, observed=True)['Sale_Amount'].agg(aggfunc).reset_index()
+        top = (
+            sales.groupby('Season', observed=True)
+            .apply(lambda x: x.sort_values('Sale_Amount', ascending=False).head(5))
+            .reset_index(drop=True)
+        )
+        frames.append(top.assign(Year=year))
+    return pd.concat(frames, ignore_index=True)
+
+
+def legacy_month_top3(df):
+    frames = []
+    for year in range(2023, 2026):
+        df_filtered = df[df["Year"] == year]
+        sales_by_month = (
+            df_filtered.groupby(["Month", "CustomerName", "ProductName"], observed=True)["Sale_Amount"].sum().reset_index()
+            .sort_values(by=["Month", "Sale_Amount"], ascending=[True, False])
+        )
+        frames.append(sales_by_month.groupby("Month").head(3).assign(Year=year))
+    return pd.concat(frames, ignore_index=True)
+
+
+def _values(df, partition_keys):
+    """(partition, value) pairs in partition order, value descending."""
+    return (
+        df[partition_keys + ['Sale_Amount']].astype({key: str for key in partition_keys})
+        .sort_values(partition_keys + ['Sale_Amount'], ascending=[True] * len(partition_keys) + [False], ignore_index=True)
+    )
+
+
+def _time(func, *args, **kwargs):
+    start = time.perf_counter()
+    out = func(*args, **kwargs)
+    return out, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=500_000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    raw = generate_sales_data(args.rows, seed=args.seed)
+    with contextlib.redirect_stdout(io.StringIO()):
+        df_clean = preprocessing(raw)
+    print(f"{len(df_clean):,} cleaned rows")
+    print(f"{'leaderboard':<34} {'legacy (s)':>10} {'top-k (s)':>10} {'speedup':>8}")
+
+    cases = [
+        ("season top5 products (frequency)", ['ProductName'], 'count', 'frequency'),
+        ("season top5 products (quantity)", ['ProductName'], 'sum', 'quantity'),
+        ("season top5 product-customer", ['ProductName', 'CustomerName'], 'sum', 'quantity'),
+    ]
+    for name, item_keys, aggfunc, metric in cases:
+        old, old_s = _time(legacy_season_top5, df_clean, item_keys, aggfunc)
+        new, new_s = _time(compute_top_k, df_clean[df_clean['Year'].isin(YEARS)], ['Year', 'Season'], item_keys, metric, 5)
+        pd.testing.assert_frame_equal(_values(old, ['Year', 'Season']), _values(new, ['Year', 'Season']), check_dtype=False)
+        print(f"{name:<34} {old_s:>10.3f} {new_s:>10.3f} {old_s / new_s:>7.1f}x")
+
+    old, old_s = _time(legacy_month_top3, df_clean)
+    new, new_s = _time(compute_top_k, df_clean[df_clean['Year'].isin(range(2023, 2026))],
+                       ['Year', 'Month'], ['CustomerName', 'ProductName'], 'quantity', 3)
+    columns = ['Year', 'Month', 'CustomerName', 'ProductName', 'Sale_Amount']
+    pd.testing.assert_frame_equal(old[columns].astype(str), new[columns].astype(str))
+    print(f"{'month top3 customer-product':<34} {old_s:>10.3f} {new_s:>10.3f} {old_s / new_s:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,176 @@
+"""
+Benchmark: month-close incremental statistics (month_close) vs. recomputing trend, volatility,
+order regularity and aging over the full history.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_month_close --rows 1000000
+
+The data is split at its last month. The state for all earlier (closed) months is built once and
+saved, as a previous nightly run or dashboard session would have done. Then the last month is
+folded in and the four analyses are derived from the state. Results are compared with the
+full-history functions on the sales cube and the cleaned rows; names and codes are compared as
+text and rows in key order. The same comparison runs on a state built month by month, which checks
+that folding one month at a time gives the same sums as folding everything at once, and on a state
+saved while the data still ended in the previous year: its windows (trend start, recent years) follow
+that year, so it must be rebuilt rather than extended. The timings
+compare the full recomputation (cube build included) with the month-close update.
+"""
+import argparse
+import contextlib
+import io
+import shutil
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from Analysis_Functions.AgingFactor import aging_factor_analysis
+from Analysis_Functions.Ciro_Büyüme_Oranı import (
+    düzenlisiparişverenler_aralıklı_müşteriler_ürünler,
+    düzenlisiparişverenler_aralıklımüşteriler,
+    düzenlisiparişverenler_aralıklıürünler,
+)
+from Analysis_Functions.date_index import data_as_of
+from Analysis_Functions.month_close import (
+    fold_month_close,
+    load_month_close_state,
+    month_close_state,
+    new_month_close_state,
+)
+from Analysis_Functions.prepare_data import preprocessing
+from Analysis_Functions.sales_cube import build_sales_cube
+from Analysis_Functions.trend_analysis import compute_customer_product_trend
+from Analysis_Functions.volatility_analysis import compute_volatility
+from benchmarks.synthetic_sales import generate_sales_data
+
+REGULARITY = [
+    düzenlisiparişverenler_aralıklı_müşteriler_ürünler,
+    düzenlisiparişverenler_aralıklımüşteriler,
+    düzenlisiparişverenler_aralıklıürünler,
+]
+
+
+def full_analyses(df_clean):
+    """Dashboard'daki gibi: trend, düzenlilik ve yaşlanma küpten, volatilite satırlardan."""
+    cube = build_sales_cube(df_clean)
+    return {
+        "trend": compute_customer_product_trend(cube),
+        "volatility": compute_volatility(df_clean),
+        **{func.__name__: func(cube) for func in REGULARITY},
+        "aging": aging_factor_analysis(cube),
+    }
+
+
+def state_analyses(state):
+    return {
+        "trend": compute_customer_product_trend(state),
+        "volatility": compute_volatility(state),
+        **{func.__name__: func(state) for func in REGULARITY},
+        "aging": aging_factor_analysis(state),
+    }
+
+
+def _normalize(df):
+    df = df.copy()
+    for col in df.columns:
+        if isinstance(df[col].dtype, pd.CategoricalDtype) or df[col].dtype == object:
+            df[col] = df[col].astype(str)
+    keys = [col for col in df.columns if df[col].dtype == object]
+    return df.sort_values(keys, ignore_index=True)
+
+
+def _assert_same(old, new, atol=1e-9):
+    if isinstance(old, tuple):
+        for a, b in zip(old, new):
+            _assert_same(a, b, atol)
+        return
+    pd.testing.assert_frame_equal(_normalize(old), _normalize(new), check_dtype=False, rtol=1e-9, atol=atol)
+
+
+def _zero_slope_as_stable(df):
+    # Tam sayı toplamlarında eğim tam 0 çıkarken iki geçişli hesap ±1e-16 bırakıp "Artıyor"/"Azalıyor"
+    # diyebilir; 2 haneye yuvarlanmış eğimi 0 olan çiftlerde eğilim etiketi karşılaştırılmaz
+    df = df.copy()
+    df.loc[df['Eğim'] == 0, 'Satış_Eğilimi'] = 'Sabit'
+    return df
+
+
+def _comparable(name, df):
+    return _zero_slope_as_stable(df) if name == "aging" else df
+
+
+def _tolerance(name):
+    # Yaşlanma eğimi 2 haneye yuvarlanır; iki geçişli ve toplamlardan eğim arasındaki ~1e-12 fark
+    # yuvarlama sınırında 0.01 oynatabilir
+    return 0.0101 if name == "aging" else 1e-9
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=500_000)
+    parser.add_argument("--skew", type=float, default=1.0)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    raw = generate_sales_data(args.rows, seed=args.seed, skew=args.skew)
+    with contextlib.redirect_stdout(io.StringIO()):
+        df_clean = preprocessing(raw)
+    months = df_clean["Date"].dt.to_period("M")
+    last_month = months.max()
+    history = df_clean[months < last_month]
+    print(f"{len(df_clean):,} cleaned rows, {len(df_clean) - len(history):,} in the last month ({last_month})")
+
+    directory = tempfile.mkdtemp(prefix="month_close_")
+    try:
+        # Önceki çalıştırma: son ay henüz yok; kapanmış aylar saklanır
+        month_close_state(history, option="bench", directory=directory)
+        # Parquet okuyucusunun ilk kullanım maliyeti ölçüme girmesin (sunucuda bir kez ödenir)
+        load_month_close_state("bench", directory)
+
+        start = time.perf_counter()
+        full = full_analyses(df_clean)
+        full_s = time.perf_counter() - start
+
+        start = time.perf_counter()
+        state = month_close_state(df_clean, option="bench", directory=directory)
+        fold_s = time.perf_counter() - start
+        start = time.perf_counter()
+        derived = state_analyses(state)
+        derive_s = time.perf_counter() - start
+    finally:
+        shutil.rmtree(directory)
+
+    for name, value in full.items():
+        _assert_same(_comparable(name, value), _comparable(name, derived[name]), _tolerance(name))
+
+    # Ay ay katlanan durum, tek seferde katlananla aynı sonuçları vermeli
+    stepwise = new_month_close_state(data_as_of(df_clean))
+    for _, month_rows in df_clean.groupby(months, sort=True):
+        stepwise = fold_month_close(stepwise, month_rows)
+    for name, value in state_analyses(stepwise).items():
+        _assert_same(_comparable(name, full[name]), _comparable(name, value), _tolerance(name))
+
+    # Geçen yıl saklanan durumun pencereleri farklı; yeni yılın verisiyle baştan kurulmalı
+    directory = tempfile.mkdtemp(prefix="month_close_")
+    try:
+        month_close_state(df_clean[df_clean["Date"].dt.year < last_month.year], option="bench", directory=directory)
+        rolled = month_close_state(df_clean, option="bench", directory=directory)
+    finally:
+        shutil.rmtree(directory)
+    for name, value in state_analyses(rolled).items():
+        _assert_same(_comparable(name, full[name]), _comparable(name, value), _tolerance(name))
+    print(f"parity OK for {len(full)} analyses (saved state + last month, month-by-month folding, "
+          "state saved in the previous year)")
+
+    print(f"{'full recompute (cube + 6 analyses)':<40} {full_s:>8.3f} s")
+    print(f"{'month close: load, fold, save':<40} {fold_s:>8.3f} s")
+    print(f"{'month close: derive 6 analyses':<40} {derive_s:>8.3f} s")
+    print(f"{'speedup':<40} {full_s / (fold_s + derive_s):>7.1f}x")
+    print(f"state: {len(state['pairs']):,} customer-product pairs, "
+          f"{np.sum([len(t) for t in state['activity'].values()]):,} activity rows")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+Benchmark: server-side paging (paged_table.show_table) vs. sending a whole table to the browser.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_paged_table --rows 1000000
+
+The table is the raw invoice download, the largest frame the dashboard displays. For a few
+filter/sort settings, every checked page must equal the same rows of the frame filtered and sorted
+with plain pandas. The settings are a text filter on a categorical column, a numeric comparison,
+a date comparison and a descending sort.
+
+The output lists:
+- the Arrow IPC size of the whole frame and of one page (what st.dataframe sends over the
+  websocket);
+- the time for the first filter/sort, and for a page change that reuses the stored row order.
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from Analysis_Functions.paged_table import PAGE_SIZE, compact_categories, table_order
+from benchmarks.synthetic_sales import generate_sales_data
+
+CASES = [
+    # (filter sütunu, filtre metni, pandas karşılığı, sıralama sütunu, artan)
+    ("CustomerName", "müşteri 1", lambda df: df["CustomerName"].astype(str).str.lower().str.contains("müşteri 1"), "Sale_Amount", False),
+    ("Sale_Amount", ">= 150", lambda df: df["Sale_Amount"] >= 150, "Date", True),
+    ("Date", "< 2020-01-01", lambda df: df["Date"] < pd.Timestamp("2020-01-01"), None, True),
+]
+
+
+def _arrow_bytes(df):
+    sink = pa.BufferOutputStream()
+    table = pa.Table.from_pandas(df)
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().size
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--skew", type=float, default=1.0)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    df = generate_sales_data(args.rows, seed=args.seed, skew=args.skew)
+    for col in ("CustomerName", "ProductName", "CustomerCode", "Product_Code"):
+        df[col] = df[col].astype("category")
+    print(f"{len(df):,} raw rows")
+
+    timings = []
+    for filter_by, query, reference, sort_by, ascending in CASES:
+        expected = df[reference(df).to_numpy()]
+        if sort_by is not None:
+            expected = expected.sort_values(sort_by, ascending=ascending, kind="stable", na_position="last")
+        start = time.perf_counter()
+        rows = table_order(df, sort_by=sort_by, ascending=ascending, filter_by=filter_by, query=query)
+        first_s = time.perf_counter() - start
+        assert len(rows) == len(expected) > 0
+        n_pages = -(-len(rows) // PAGE_SIZE)
+        for page in sorted({0, 1, n_pages // 2, n_pages - 1}):
+            start_row = page * PAGE_SIZE
+            pd.testing.assert_frame_equal(
+                df.iloc[rows[start_row:start_row + PAGE_SIZE]], expected.iloc[start_row:start_row + PAGE_SIZE]
+            )
+        start = time.perf_counter()
+        again = table_order(df, sort_by=sort_by, ascending=ascending, filter_by=filter_by, query=query)
+        page_s = time.perf_counter() - start
+        assert again is rows
+        timings.append((f"{filter_by} {query!r}, sort {sort_by}", len(rows), first_s, page_s))
+    print(f"parity OK for {len(CASES)} filter/sort settings")
+
+    full_mb = _arrow_bytes(df) / 2**20
+    page_mb = _arrow_bytes(compact_categories(df.iloc[np.arange(PAGE_SIZE)])) / 2**20
+    print(f"{'whole frame (Arrow IPC)':<48} {full_mb:>10.2f} MB")
+    print(f"{'one page of ' + str(PAGE_SIZE) + ' rows (Arrow IPC)':<48} {page_mb:>10.3f} MB")
+    print(f"{'setting':<48} {'rows':>10} {'first s':>9} {'page s':>9}")
+    for name, n_rows, first_s, page_s in timings:
+        print(f"{name:<48} {n_rows:>10,} {first_s:>9.3f} {page_s:>9.5f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+"""
+Benchmark: independent dashboard analyses on the process pool (parallel_analyses) vs. one after
+another in the main thread.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_parallel_analyses --rows 1000000 --workers 4
+
+The sequential baseline calls each analysis directly on df_clean or the sales cube, which is what
+render_sections did before. The parallel run publishes both tables once as Arrow IPC files and
+submits every analysis to the pool; results are collected through result_cache and must equal the
+sequential ones. The table lists each analysis alone, their sum, the slowest one and the parallel
+wall-clock time including the Arrow writes, for a cold pool (process start-up and module imports)
+and a warm one (a rerun on new data in a long-lived server). Speedups need as many free cores as
+workers; on a single core the pool only adds process start-up and transfer costs.
+
+Finally every dashboard section is rendered with render_sections in the default, incremental,
+calendar and as_of modes. Each result that SECTION_TASKS submitted to the pool must then be read by
+a section through the same cache key. A SECTION_TASKS entry that no longer matches its section's
+_cached call would otherwise be computed on the pool and never used.
+"""
+import argparse
+import contextlib
+import io
+import time
+
+import matplotlib
+
+matplotlib.use("Agg")
+
+import pandas as pd
+
+from Analysis_Functions import analysis_sections
+from Analysis_Functions.AgingFactor import aging_factor_analysis
+from Analysis_Functions.Aylık_Değişim_Oranı import rate_of_change_per_month
+from Analysis_Functions.parallel_analyses import collect_analyses, configure_parallel, submit_analyses
+from Analysis_Functions.plot_top10 import compute_top10_products_per_year
+from Analysis_Functions.prepare_data import preprocessing
+from Analysis_Functions.result_cache import cache_key, cache_lookup, clear_cache, dataset_fingerprint
+from Analysis_Functions.sales_cube import build_sales_cube
+from Analysis_Functions.sales_volatility import compute_sales_volatility
+from Analysis_Functions.seasonal_sales_by_year import seasonal_sales_by_year
+from Analysis_Functions.trend_analysis import compute_customer_product_trend
+from Analysis_Functions.volatility_analysis import compute_volatility
+from benchmarks.synthetic_sales import generate_sales_data
+
+# render_sections modları: SECTION_TASKS'ın havuza gönderdiği her sonuç bölümlerce okunmalı
+SECTION_MODES = {
+    "default": {},
+    "incremental": {"incremental": True},
+    "calendar": {"calendar": True},
+    "as_of": {"as_of": "2024-06-30"},
+}
+
+TASKS = [
+    (seasonal_sales_by_year, "clean", {"plot": False}),
+    (compute_volatility, "clean", {}),
+    (compute_top10_products_per_year, "clean", {}),
+    (compute_sales_volatility, "cube", {}),
+    (aging_factor_analysis, "cube", {}),
+    (rate_of_change_per_month, "cube", {}),
+    (compute_customer_product_trend, "cube", {}),
+]
+
+
+def _assert_same(old, new):
+    if isinstance(old, (tuple, list)):
+        for a, b in zip(old, new):
+            _assert_same(a, b)
+    elif isinstance(old, pd.DataFrame):
+        pd.testing.assert_frame_equal(old, new)
+    elif isinstance(old, pd.Series):
+        pd.testing.assert_series_equal(old, new)
+    elif isinstance(old, dict):
+        assert old.keys() == new.keys()
+        for key in old:
+            _assert_same(old[key], new[key])
+    else:
+        assert old == new
+
+
+def _assert_section_tasks_read(raw):
+    """Her modda havuza gönderilen SECTION_TASKS anahtarlarının hepsi bölümlerin _cached çağrılarınca okunmalı."""
+    submit, cached_call = analysis_sections.submit_analyses, analysis_sections.cached_call
+    submitted, read = set(), set()
+
+    def recording_submit(*args, **kwargs):
+        keys = submit(*args, **kwargs)
+        submitted.update(keys)
+        return keys
+
+    def recording_call(fingerprint, func, *args, **kwargs):
+        read.add(cache_key(fingerprint, func, *args, **kwargs))
+        return cached_call(fingerprint, func, *args, **kwargs)
+
+    analysis_sections.submit_analyses, analysis_sections.cached_call = recording_submit, recording_call
+    try:
+        for mode, options in SECTION_MODES.items():
+            submitted.clear()
+            read.clear()
+            clear_cache()
+            with contextlib.redirect_stdout(io.StringIO()):
+                analysis_sections.render_sections(
+                    list(analysis_sections.ANALYSIS_SECTIONS), raw, dataset_fingerprint(raw, "bench_parallel_analyses"),
+                    **options,
+                )
+            assert submitted, f"{mode}: nothing was submitted to the pool"
+            unread = sorted(key[1] for key in submitted - read)
+            assert not unread, f"{mode}: SECTION_TASKS results no section reads: {unread}"
+    finally:
+        analysis_sections.submit_analyses, analysis_sections.cached_call = submit, cached_call
+        clear_cache()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=500_000)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--section-rows", type=int, default=20_000, help="Rows for the render_sections check.")
+    args = parser.parse_args()
+
+    raw = generate_sales_data(args.rows, seed=args.seed)
+    with contextlib.redirect_stdout(io.StringIO()):
+        df_clean = preprocessing(raw)
+    frames = {"clean": df_clean, "cube": build_sales_cube(df_clean)}
+    print(f"{len(df_clean):,} cleaned rows, {len(frames['cube']):,} cube rows, {args.workers} workers")
+
+    sequential, durations = {}, {}
+    for func, frame_name, kwargs in TASKS:
+        start = time.perf_counter()
+        sequential[func.__name__] = func(frames[frame_name], **kwargs)
+        durations[func.__name__] = time.perf_counter() - start
+        print(f"{func.__name__:<34} {durations[func.__name__]:>8.3f} s")
+
+    configure_parallel(max_workers=args.workers, directory=".cache/bench_shared")
+    # İlk geçişte süreçler başlar, analiz modüllerini içe aktarır ve pyarrow'u ısıtır; ikinci
+    # geçiş (yeni parmak izi, tablolar yeniden yazılır) uzun yaşayan bir sunucudaki yeniden çalıştırmadır
+    timings = []
+    for run in ("cold", "warm"):
+        fingerprint = ("bench", args.rows, args.seed, run)
+        clear_cache()
+        start = time.perf_counter()
+        futures = {}
+        submit_analyses(TASKS, frames, fingerprint, futures)
+        collect_analyses(futures)
+        timings.append(time.perf_counter() - start)
+
+        for func, frame_name, kwargs in TASKS:
+            hit, value = cache_lookup(cache_key(fingerprint, func, frames[frame_name], **kwargs))
+            assert hit, f"{func.__name__} did not come back from the pool"
+            _assert_same(sequential[func.__name__], value)
+
+    _assert_section_tasks_read(generate_sales_data(args.section_rows, seed=args.seed))
+    print(f"SECTION_TASKS keys read by their sections in {len(SECTION_MODES)} modes: OK")
+    print(f"{'sum (sequential)':<34} {sum(durations.values()):>8.3f} s")
+    print(f"{'slowest analysis':<34} {max(durations.values()):>8.3f} s")
+    print(f"{'process pool, cold (wall clock)':<34} {timings[0]:>8.3f} s")
+    print(f"{'process pool, warm (wall clock)':<34} {timings[1]:>8.3f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""
+Benchmark: vectorized Season / Special_Day / Ürün Grubu columns vs. the previous row-wise apply.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_preprocessing --rows 1000000
+
+The legacy implementations below are copies of the row-wise versions that prepare_data used
+before vectorization. Both paths run on the same prepared frame and the resulting columns are
+compared for exact equality before timings are printed.
+"""
+import argparse
+import time
+
+import pandas as pd
+
+from Analysis_Functions.prepare_data import (
+    DIPSOS_SACHET_PAIRS,
+    create_season_column,
+    create_season_data,
+    create_special_day_data,
+    label_data,
+    prepare_data,
+)
+from benchmarks.synthetic_sales import generate_sales_data
+
+
+def legacy_season(df):
+    df["Season"] = df["Month"].apply(create_season_data)
+    df["Season"] = df["Season"].astype('category')
+    return df
+
+
+def legacy_special_day(df):
+    ramazan_bayrami = {
+        2013: "Ağustos", 2014: "Temmuz", 2015: "Temmuz", 2016: "Temmuz", 2017: "Haziran",
+        2018: "Haziran", 2019: "Haziran", 2020: "Mayıs", 2021: "Mayıs", 2022: "Mayıs",
+        2023: "Nisan", 2024: "Nisan", 2025: "Mart", 2026: "Şubat", 2027: "Şubat",
+        2028: "Ocak", 2029: "Aralık", 2030: "Kasım"
+    }
+    kurban_bayrami = {
+        2013: "Ekim", 2014: "Ekim", 2015: "Eylül", 2016: "Eylül", 2017: "Eylül",
+        2018: "Ağustos", 2019: "Ağustos", 2020: "Temmuz", 2021: "Temmuz", 2022: "Temmuz",
+        2023: "Haziran", 2024: "Haziran", 2025: "Haziran", 2026: "Mayıs", 2027: "Mayıs",
+        2028: "Nisan", 2029: "Mart", 2030: "Şubat"
+    }
+    month_to_number = {
+        "Ocak": 1, "Şubat": 2, "Mart": 3, "Nisan": 4, "Mayıs": 5, "Haziran": 6,
+        "Temmuz": 7, "Ağustos": 8, "Eylül": 9, "Ekim": 10, "Kasım": 11, "Aralık": 12
+    }
+    number_to_month = {v: k for k, v in month_to_number.items()}
+
+    def is_special_day(row):
+        year = row["Year"]
+        month = number_to_month.get(row["Month"])
+        if month is None:
+            return False
+        return (
+            ramazan_bayrami.get(year) == month or
+            kurban_bayrami.get(year) == month
+        )
+
+    df["Special_Day"] = df.apply(is_special_day, axis=1)
+    return df
+
+
+def legacy_label(df):
+    dipsos_set = set((c, p) for c, p in DIPSOS_SACHET_PAIRS)
+    df["Ürün Grubu"] = df.apply(
+        lambda row: "Dipsos/Sachet" if (row["CustomerCode"], row["Product_Code"]) in dipsos_set else "Other Products",
+        axis=1
+    )
+    return df
+
+
+def _time(func, df):
+    start = time.perf_counter()
+    out = func(df)
+    return out, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    base = prepare_data(generate_sales_data(args.rows, seed=args.seed))
+    print(f"{len(base):,} prepared rows")
+
+    steps = [
+        ("Season", legacy_season, create_season_column),
+        ("Special_Day", legacy_special_day, create_special_day_data),
+        ("Ürün Grubu", legacy_label, label_data),
+    ]
+    print(f"{'column':<12} {'row-wise (s)':>13} {'vectorized (s)':>15} {'speedup':>8}")
+    for column, legacy, vectorized in steps:
+        old, old_s = _time(legacy, base.copy())
+        new, new_s = _time(vectorized, base.copy())
+        pd.testing.assert_series_equal(old[column], new[column])
+        print(f"{column:<12} {old_s:>13.3f} {new_s:>15.3f} {old_s / new_s:>7.0f}x")
+
+
+if __name__ == "__main__":
+    main()
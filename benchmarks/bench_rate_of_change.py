@@ -0,0 +1,131 @@
+"""
+Benchmark: vectorized rate_of_change_per_month vs. the original per-pair loop.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_rate_of_change --pairs 150000
+
+The original loop looked up each pair's last sale date by masking the whole last_sales frame, so
+its cost grows with pairs × pairs. It is therefore only run on the first --legacy-pairs pairs, where
+both versions are compared: row order and categorical dtypes are ignored, and the rounded mean /
+std / ratio columns may differ by one unit in the second decimal, because grouped sums are
+accumulated in a different order than numpy's per-pair mean. The vectorized version is then timed
+on the full data set. The input DataFrame must not be modified by the new version.
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from Analysis_Functions.Aylık_Değişim_Oranı import rate_of_change_per_month
+
+
+def legacy_rate_of_change_per_month(df):
+    """Original implementation (row input only), kept for parity and timing comparisons."""
+    df['Date'] = pd.to_datetime(df['Date'])
+    df['YearMonth'] = df['Date'].dt.to_period('M')
+    monthly_sales = df.groupby(['CustomerCode', 'Product_Code', 'YearMonth'], observed=True)['Sale_Amount'].sum().reset_index()
+    last_sales = df.groupby(['CustomerCode', 'Product_Code'], observed=True)['Date'].max().reset_index().rename(columns={'Date': 'Last_Sale_Date'})
+    results = []
+
+    for (customer, product), group in monthly_sales.groupby(['CustomerCode', 'Product_Code'], observed=True):
+        sales_series = group.sort_values('YearMonth')['Sale_Amount'].values
+        last_sale = last_sales[(last_sales['CustomerCode'] == customer) & (last_sales['Product_Code'] == product)]['Last_Sale_Date'].values[0]
+        if len(sales_series) < 6:
+            results.append({
+                'CustomerCode': customer, 'Product_Code': product, 'Ay_Sayısı': len(sales_series),
+                'Aylık_Ortalama': None, 'StdSapma': None, 'Volatilite_Oranı': None,
+                'Değişkenlik_Durumu': '6 Aydan az veriye sahiptir hesaplanamaz', 'Last_Sale_Date': last_sale,
+            })
+        else:
+            mean = sales_series.mean()
+            std = sales_series.std()
+            volatility_ratio = std / mean if mean != 0 else None
+            if volatility_ratio is None:
+                volatility_label = 'Sabit (0 ortalama)'
+            elif volatility_ratio < 0.3:
+                volatility_label = 'Düşük Değişkenlik'
+            elif volatility_ratio < 1.0:
+                volatility_label = 'Orta Değişkenlik'
+            else:
+                volatility_label = 'Yüksek Değişkenlik'
+            results.append({
+                'CustomerCode': customer, 'Product_Code': product, 'Ay_Sayısı': len(sales_series),
+                'Aylık_Ortalama': round(mean, 2), 'StdSapma': round(std, 2),
+                'Volatilite_Oranı': round(volatility_ratio, 2) if volatility_ratio is not None else None,
+                'Değişkenlik_Durumu': volatility_label, 'Last_Sale_Date': last_sale,
+            })
+
+    volatility_df = pd.DataFrame(results)
+    volatility_df.sort_values(by='Volatilite_Oranı', ascending=True, inplace=True, na_position='last')
+    volatility_df["Year"] = volatility_df["Last_Sale_Date"].dt.year
+    df_final = volatility_df[volatility_df["Year"] >= 2024]
+    return df_final.drop(columns=["Year"])
+
+
+N_PRODUCTS = 200
+
+
+def generate_pair_sales(n_pairs, n_products=N_PRODUCTS, max_months=30, seed=0):
+    """Invoice lines for n_pairs customer-product pairs, 1..max_months active months each (2021-2025)."""
+    rng = np.random.default_rng(seed)
+    months = rng.integers(1, max_months + 1, size=n_pairs)
+    pair = np.repeat(np.arange(n_pairs), months)
+    # Rastgele aylar (2021-01 .. 2025-12 arası 60 ay); aynı aya düşen satırlar toplanır
+    month_index = rng.integers(0, 60, size=len(pair))
+    day = rng.integers(0, 28, size=len(pair))
+    dates = pd.to_datetime({'year': 2021 + month_index // 12, 'month': month_index % 12 + 1, 'day': day + 1})
+    customers = pd.Categorical.from_codes(pair // n_products, [f"C{i:06d}" for i in range(n_pairs // n_products + 1)])
+    products = pd.Categorical.from_codes(pair % n_products, [f"P{i:04d}" for i in range(n_products)])
+    sales = np.round(rng.gamma(2.0, 50.0, size=len(pair)), 2)
+    # Küçük bir bölüm sıfır satış içerir (sıfır ortalamalı çiftler de oluşabilir)
+    sales[rng.random(len(pair)) < 0.02] = 0.0
+    return pd.DataFrame({'CustomerCode': customers, 'Product_Code': products, 'Date': dates, 'Sale_Amount': sales})
+
+
+def _normalize(df):
+    df = df.copy()
+    for col in ['CustomerCode', 'Product_Code']:
+        df[col] = df[col].astype(str)
+    return df.sort_values(['CustomerCode', 'Product_Code'], ignore_index=True)
+
+
+def _time(func, df, repeat=1):
+    """Returns the result and the best wall time of `repeat` runs."""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        out = func(df)
+        best = min(best, time.perf_counter() - start)
+    return out, best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pairs", type=int, default=150_000)
+    parser.add_argument("--legacy-pairs", type=int, default=5_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    df = generate_pair_sales(args.pairs, seed=args.seed)
+    pair_codes = df['CustomerCode'].cat.codes.astype(np.int64) * N_PRODUCTS + df['Product_Code'].cat.codes
+    small = df[pair_codes < args.legacy_pairs].reset_index(drop=True)
+
+    old, old_s = _time(legacy_rate_of_change_per_month, small.copy())
+    before = small.copy()
+    new_small, new_small_s = _time(rate_of_change_per_month, small, args.repeat)
+    pd.testing.assert_frame_equal(small, before)
+    pd.testing.assert_frame_equal(_normalize(old), _normalize(new_small), check_dtype=False, rtol=0, atol=0.0101)
+    print(f"{args.legacy_pairs:,} pairs ({len(small):,} rows): parity OK, input unchanged")
+
+    new, new_s = _time(rate_of_change_per_month, df, args.repeat)
+    print(f"{'pairs':>9} {'rows':>11} {'loop (s)':>9} {'vectorized (s)':>15}")
+    print(f"{args.legacy_pairs:>9,} {len(small):>11,} {old_s:>9.3f} {new_small_s:>15.3f}")
+    print(f"{args.pairs:>9,} {len(df):>11,} {'-':>9} {new_s:>15.3f}")
+    print(f"{len(new):,} pairs with a last sale in 2024 or later")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+Benchmark: analyses fed with the shared customer × product × month cube vs. the cleaned rows.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_sales_cube --rows 1000000
+
+The cube is built once with build_sales_cube. Every analysis that accepts the cube is then run
+twice, once on df_clean and once on the cube. The two results are compared (row order and
+categorical dtypes ignored, floats with a relative tolerance) before timings are printed. Half of
+the Inflation values are blanked (NULL in the database), so the cube's macro means must skip
+missing values the way groupby.mean on the rows does.
+"""
+import argparse
+import contextlib
+import io
+import time
+
+import pandas as pd
+
+from Analysis_Functions.AgingFactor import aging_factor_analysis
+from Analysis_Functions.Aylık_Değişim_Oranı import rate_of_change_per_month
+from Analysis_Functions.Aylık_Yıllık_Ciro_Büyüme_Oranı import ciro_buyume_orani_analizi
+from Analysis_Functions.Ciro_Büyüme_Oranı import (
+    aylik_en_yuksek_ciroya_sahip_3_musteri,
+    aylik_en_yuksek_ciroya_sahip_3_ürün,
+    düzenlisiparişverenler_aralıklı_müşteriler_ürünler,
+    düzenlisiparişverenler_aralıklımüşteriler,
+    düzenlisiparişverenler_aralıklıürünler,
+)
+from Analysis_Functions.macroeconomic_analysis import macroeconomic_parameters
+from Analysis_Functions.prepare_data import preprocessing
+from Analysis_Functions.sales_cube import build_sales_cube
+from Analysis_Functions.sales_volatility import sales_volatility
+from Analysis_Functions.trend_analysis import customer_product_trend_analysis
+from Analysis_Functions.Yıllık_Satış_Rakamları import yıllık_satış_rakamları
+from benchmarks.synthetic_sales import generate_sales_data
+
+ANALYSES = [
+    ("yıllık_satış_rakamları", yıllık_satış_rakamları),
+    ("ciro_buyume_orani_analizi", ciro_buyume_orani_analizi),
+    ("customer_product_trend_analysis", customer_product_trend_analysis),
+    ("düzenli_müşteri_ürün", düzenlisiparişverenler_aralıklı_müşteriler_ürünler),
+    ("düzenli_müşteri", düzenlisiparişverenler_aralıklımüşteriler),
+    ("düzenli_ürün", düzenlisiparişverenler_aralıklıürünler),
+    ("top3_müşteri_ciro", aylik_en_yuksek_ciroya_sahip_3_musteri),
+    ("top3_ürün_ciro", aylik_en_yuksek_ciroya_sahip_3_ürün),
+    ("sales_volatility", lambda df: sales_volatility(df, top_n=10)),
+    ("aging_factor_analysis", aging_factor_analysis),
+    ("rate_of_change_per_month", rate_of_change_per_month),
+    ("macroeconomic_parameters", lambda df: macroeconomic_parameters(df, "Inflation", "Enflasyon", plot=False)[:2]),
+]
+
+
+def _normalize(df):
+    """Categoricals -> str, rows sorted by identifiers first, so only the content is compared."""
+    df = df.copy()
+    for col in df.columns:
+        if isinstance(df[col].dtype, pd.CategoricalDtype) or df[col].dtype == object:
+            df[col] = df[col].astype(str)
+    floats = [col for col in df.columns if pd.api.types.is_float_dtype(df[col])]
+    others = [col for col in df.columns if col not in floats]
+    return df.sort_values(others + floats, ignore_index=True)
+
+
+def _assert_same(old, new):
+    old = old if isinstance(old, tuple) else (old,)
+    new = new if isinstance(new, tuple) else (new,)
+    for a, b in zip(old, new):
+        pd.testing.assert_frame_equal(_normalize(a), _normalize(b), check_dtype=False, rtol=1e-6)
+
+
+def _time(func, df):
+    start = time.perf_counter()
+    # Analizler Streamlit'e yazar; terminal çıktısını sade tutmak için bastırılır
+    with contextlib.redirect_stdout(io.StringIO()):
+        out = func(df)
+    return out, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--customers", type=int, default=200)
+    parser.add_argument("--products", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    raw = generate_sales_data(args.rows, n_customers=args.customers, n_products=args.products, seed=args.seed)
+    raw.loc[raw.index % 2 == 0, "Inflation"] = float("nan")
+    with contextlib.redirect_stdout(io.StringIO()):
+        df_clean = preprocessing(raw)
+    cube, cube_s = _time(build_sales_cube, df_clean)
+    print(f"{len(df_clean):,} cleaned rows -> {len(cube):,} cube cells in {cube_s:.3f} s")
+
+    print(f"{'analysis':<34} {'rows (s)':>9} {'cube (s)':>9} {'speedup':>8}")
+    total_old = total_new = 0.0
+    for name, func in ANALYSES:
+        old, old_s = _time(func, df_clean.copy())
+        new, new_s = _time(func, cube)
+        _assert_same(old, new)
+        total_old += old_s
+        total_new += new_s
+        print(f"{name:<34} {old_s:>9.3f} {new_s:>9.3f} {old_s / new_s:>7.1f}x")
+    print(f"{'total (cube build included)':<34} {total_old:>9.3f} {total_new + cube_s:>9.3f} "
+          f"{total_old / (total_new + cube_s):>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
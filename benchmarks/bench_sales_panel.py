@@ -0,0 +1,179 @@
+"""
+Benchmark: calendar-aligned sales panel (sales_panel) vs. the per-pair monthly series used by the
+customer-product trend and aging analyses.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_sales_panel --rows 1000000
+
+Checks first:
+- The panel built from the sales cube equals the panel built from the cleaned rows.
+- Panel cells equal the cube rolled up to customer-product-month.
+- The memory-mapped copy written to disk reads back identical.
+- The volatility and month-of-year kernels match pandas groupby.
+- Trend and aging slopes from the panel match the existing analyses for pairs whose observed months
+  are contiguous. For those pairs the calendar month and the index of observed months differ only
+  by a constant.
+- Segments of the calendar trend table, read through result_cache after the segments of the
+  same-length cube trend table were cached, equal a fresh computation (derived frames are keyed by
+  content, not by length).
+
+The timings compare the existing trend + aging analyses on the cube with building the panel and
+running both analyses on it (best of --repeat runs).
+"""
+import argparse
+import contextlib
+import io
+import shutil
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from Analysis_Functions.AgingFactor import aging_factor_analysis
+from Analysis_Functions.prepare_data import preprocessing
+from Analysis_Functions.result_cache import cached_call, clear_cache
+from Analysis_Functions.sales_cube import build_sales_cube, rollup_sales_cube
+from Analysis_Functions.sales_panel import (
+    PANEL_ARRAYS,
+    build_sales_panel,
+    load_sales_panel,
+    observed_bounds,
+    panel_month_of_year,
+    panel_volatility,
+    panel_window,
+)
+from Analysis_Functions.trend_analysis import compute_customer_product_trend, customer_product_segments
+from benchmarks.synthetic_sales import generate_sales_data
+
+KEYS = ["CustomerCode", "Product_Code"]
+
+
+def _pair_labels(df):
+    return df["CustomerCode"].astype(str) + "|" + df["Product_Code"].astype(str)
+
+
+def _contiguous(panel, start=None):
+    """Gözlenen ayları (start'tan itibaren) arasız olan varlıkların anahtar etiketleri."""
+    window = panel_window(panel, start=start)
+    observed = window["Line_Count"] > 0
+    first, last = observed_bounds(observed)
+    contiguous = (first >= 0) & (observed.sum(axis=1) == last - first + 1)
+    return set(_pair_labels(panel["entities"])[contiguous])
+
+
+def _assert_same_panel(a, b):
+    pd.testing.assert_frame_equal(a["entities"], b["entities"], check_categorical=False)
+    pd.testing.assert_index_equal(a["months"], b["months"])
+    for name in PANEL_ARRAYS:
+        np.testing.assert_array_equal(np.asarray(a[name]), np.asarray(b[name]))
+
+
+def _assert_matches_cube(panel, cube):
+    monthly = rollup_sales_cube(cube, KEYS)
+    rows = pd.Index(_pair_labels(panel["entities"])).get_indexer(_pair_labels(monthly))
+    cols = panel["months"].get_indexer(pd.to_datetime(monthly["YearMonth"]))
+    assert (rows >= 0).all() and (cols >= 0).all()
+    for name in PANEL_ARRAYS:
+        expected = monthly[name].to_numpy(dtype=np.float64)
+        np.testing.assert_allclose(panel[name][rows, cols], expected, rtol=1e-6)
+    # Küpte olmayan hücreler boş
+    assert int((panel["Line_Count"] > 0).sum()) == len(monthly)
+
+
+def _assert_kernels(panel):
+    observed = panel["Line_Count"] > 0
+    rows, cols = np.nonzero(observed)
+    cells = pd.DataFrame({
+        "row": rows,
+        "month": panel["months"].month[cols],
+        "sales": np.asarray(panel["Sale_Amount"], dtype=np.float64)[rows, cols],
+    })
+    by_row = cells.groupby("row")["sales"]
+    stats = panel_volatility(panel["Sale_Amount"], observed)
+    np.testing.assert_allclose(stats["mean"][by_row.mean().index], by_row.mean().to_numpy(), rtol=1e-9)
+    np.testing.assert_allclose(stats["std"][by_row.std().index], by_row.std().to_numpy(), rtol=1e-9, atol=1e-9)
+    seasonal = cells.pivot_table(index="row", columns="month", values="sales", aggfunc="sum", fill_value=0)
+    profile = panel_month_of_year(panel["Sale_Amount"], panel["months"])
+    np.testing.assert_allclose(profile[seasonal.index][:, seasonal.columns - 1], seasonal.to_numpy(), rtol=1e-9)
+
+
+def _assert_contiguous_slopes(old, new, pairs, columns, atol):
+    old = old[_pair_labels(old).isin(pairs)].set_index(KEYS)[columns]
+    new = new[_pair_labels(new).isin(pairs)].set_index(KEYS)[columns]
+    assert len(old) == len(new) > 0
+    pd.testing.assert_frame_equal(old.sort_index(), new.loc[old.sort_index().index], check_exact=False, atol=atol)
+
+
+def _assert_cached_segments(trends):
+    """Aynı uzunlukta iki trend tablosunun segmentleri önbellekte birbirine karışmamalı."""
+    clear_cache()
+    fingerprint = ("bench_sales_panel",)
+    for trend in trends:
+        cached = cached_call(fingerprint, customer_product_segments, trend)
+        fresh = customer_product_segments(trend)
+        assert cached.keys() == fresh.keys()
+        for title in fresh:
+            pd.testing.assert_frame_equal(cached[title], fresh[title])
+    clear_cache()
+
+
+def _analyses(data):
+    return compute_customer_product_trend(data), aging_factor_analysis(data)
+
+
+def _timed(func, data, repeat):
+    best, value = None, None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        value = func(data)
+        seconds = time.perf_counter() - start
+        best = seconds if best is None else min(best, seconds)
+    return value, best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--skew", type=float, default=1.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    raw = generate_sales_data(args.rows, seed=args.seed, skew=args.skew)
+    with contextlib.redirect_stdout(io.StringIO()):
+        df_clean = preprocessing(raw)
+    cube = build_sales_cube(df_clean)
+    print(f"{len(df_clean):,} cleaned rows, {len(cube):,} cube cells")
+
+    legacy, legacy_s = _timed(_analyses, cube, args.repeat)
+    panel, build_s = _timed(build_sales_panel, cube, args.repeat)
+    calendar, panel_s = _timed(_analyses, panel, args.repeat)
+
+    _assert_same_panel(panel, build_sales_panel(df_clean))
+    _assert_matches_cube(panel, cube)
+    directory = tempfile.mkdtemp(prefix="sales_panel_")
+    try:
+        build_sales_panel(cube, directory=directory)
+        _assert_same_panel(panel, load_sales_panel(directory))
+    finally:
+        shutil.rmtree(directory)
+    _assert_kernels(panel)
+    # Float32 saklanan aylık toplamlar: trendin log eğimi ~1e-7, yaşlanmanın 2 haneye yuvarlanmış eğimi 0.01 oynayabilir
+    _assert_contiguous_slopes(legacy[0], calendar[0], _contiguous(panel, start="2023-01-01"), ["Slope", "Volatility"], 1e-5)
+    _assert_contiguous_slopes(legacy[1], calendar[1], _contiguous(panel), ["Eğim"], 0.0101)
+    _assert_cached_segments([legacy[0], calendar[0]])
+    print("parity OK (rows vs. cube, cube rollup, memmap round trip, kernels, contiguous-pair slopes, "
+          "cached segments)")
+
+    shape = panel["Sale_Amount"].shape
+    print(f"panel: {shape[0]:,} pairs x {shape[1]} months, "
+          f"{sum(panel[name].nbytes for name in PANEL_ARRAYS) / 2**20:,.1f} MB")
+    print(f"{'trend + aging on the cube':<40} {legacy_s:>8.3f} s")
+    print(f"{'build panel from the cube':<40} {build_s:>8.3f} s")
+    print(f"{'trend + aging on the panel':<40} {panel_s:>8.3f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,218 @@
+"""
+Benchmark: run time and peak memory of preprocessing and every dashboard analysis as the data grows.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_scaling --sizes 100000 1000000 10000000
+    python -m benchmarks.bench_scaling --sizes 100000 --baseline .cache/benchmarks/scaling-old.json
+
+For each size a synthetic data set is generated (see synthetic_sales.generate_sales_data; --skew
+sets how concentrated customers and products are), preprocessed and turned into the sales cube.
+Then every analysis the dashboard sections compute runs in dependency order: the independent
+analyses listed in analysis_sections.SECTION_TASKS and the ones built on their results (segments,
+trend-volatility, price and sales). Each step is timed on its own (best of --repeat runs). Its
+peak memory is measured in a separate run under tracemalloc, because tracing slows allocation-heavy
+code down. Pass --no-memory to skip that run, e.g. at 10M rows.
+
+Results are written as JSON to --output after every size, so a long run that is interrupted still
+leaves the finished sizes behind. The file holds the environment (versions, CPU count), the
+arguments and one record per (rows, step). With --baseline, each step is compared with the same
+(rows, step) record of an earlier file. Steps slower than --tolerance times the baseline are listed
+and the script exits with status 1.
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+
+import matplotlib
+
+matplotlib.use("Agg")
+
+import matplotlib.pyplot as plt
+import numpy as np
+import pandas as pd
+
+from Analysis_Functions.analysis_sections import SECTION_TASKS
+from Analysis_Functions.prepare_data import preprocessing
+from Analysis_Functions.sales_cube import build_sales_cube
+from Analysis_Functions.seasonality_channel_price_specialday_analysis import (
+    compute_price_and_sales,
+    compute_seasonality_specialday_channel_price,
+)
+from Analysis_Functions.trend_analysis import (
+    compute_customer_product_trend,
+    compute_product_trend,
+    customer_product_segments,
+    product_segments,
+)
+from Analysis_Functions.trend_volatility_analysis_segmentation import compute_trend_volatility_segments
+from Analysis_Functions.volatility_analysis import compute_volatility
+from benchmarks.synthetic_sales import generate_sales_data
+
+
+def _step_name(func, kwargs):
+    # Aynı fonksiyonun farklı parametreli çağrıları (ör. makro göstergeler) ayrı adımlardır
+    if "macro_col" in kwargs:
+        return f"{func.__name__}[{kwargs['macro_col']}]"
+    return func.__name__
+
+
+def analysis_steps():
+    """
+    Ölçülecek adımlar, bağımlılık sırasıyla: (ad, state sözlüğünden sonucu hesaplayan fonksiyon).
+
+    state 'raw', 'clean', 'cube' ve önceki adımların sonuçlarını (adlarıyla) içerir.
+    """
+    steps = [
+        ("preprocessing", lambda state: preprocessing(state["raw"].copy(deep=False))),
+        ("build_sales_cube", lambda state: build_sales_cube(state["clean"])),
+    ]
+    seen = set()
+    for tasks in SECTION_TASKS.values():
+        for func, frame_name, kwargs in tasks:
+            name = _step_name(func, kwargs)
+            if name in seen:
+                continue
+            seen.add(name)
+            steps.append((name, lambda state, func=func, frame_name=frame_name, kwargs=kwargs: func(state[frame_name], **kwargs)))
+
+    steps += [
+        ("customer_product_segments",
+         lambda state: customer_product_segments(state[compute_customer_product_trend.__name__])),
+        ("product_segments", lambda state: product_segments(state[compute_product_trend.__name__])),
+        ("compute_trend_volatility_segments", lambda state: compute_trend_volatility_segments(
+            state[compute_customer_product_trend.__name__], state[compute_volatility.__name__][0], state["clean"])),
+        ("compute_price_and_sales", lambda state: compute_price_and_sales(
+            state["compute_trend_volatility_segments"],
+            state[compute_seasonality_specialday_channel_price.__name__]["price_std2"])),
+    ]
+    return steps
+
+
+def _output_rows(value):
+    """Sonucun ilk tablosunun satır sayısı (çıktı boyutunun kaba ölçüsü); tablo yoksa None."""
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        return int(len(value))
+    items = value.values() if isinstance(value, dict) else value if isinstance(value, (list, tuple)) else ()
+    for item in items:
+        rows = _output_rows(item)
+        if rows is not None:
+            return rows
+    return None
+
+
+def _timed(step, state, repeat):
+    best, value = None, None
+    for _ in range(repeat):
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            value = step(state)
+            seconds = time.perf_counter() - start
+        plt.close("all")
+        best = seconds if best is None else min(best, seconds)
+    return value, best
+
+
+def _peak_memory(step, state):
+    """Adımın çalışırken ayırdığı en yüksek ek bellek (MB, tracemalloc)."""
+    tracemalloc.start()
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            step(state)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+        plt.close("all")
+    return round(peak / 1024 ** 2, 1)
+
+
+def run_size(n_rows, args):
+    """Bir veri boyutu için tüm adımları ölçer ve kayıtları döndürür."""
+    start = time.perf_counter()
+    raw = generate_sales_data(
+        n_rows, n_customers=args.customers, n_products=args.products,
+        start_year=args.start_year, end_year=args.end_year, seed=args.seed, skew=args.skew,
+    )
+    print(f"\n{n_rows:,} rows generated in {time.perf_counter() - start:.1f} s")
+    print(f"{'step':<52} {'seconds':>9} {'peak MB':>9} {'out rows':>10}")
+
+    state = {"raw": raw}
+    records = []
+    for name, step in analysis_steps():
+        value, seconds = _timed(step, state, args.repeat)
+        peak = None if args.no_memory else _peak_memory(step, state)
+        state["clean" if name == "preprocessing" else "cube" if name == "build_sales_cube" else name] = value
+        record = {"rows": n_rows, "step": name, "seconds": round(seconds, 4), "peak_mb": peak, "out_rows": _output_rows(value)}
+        records.append(record)
+        print(f"{name:<52} {seconds:>9.3f} {'-' if peak is None else peak:>9} {record['out_rows'] or '-':>10}")
+    return records
+
+
+def compare(records, baseline_path, tolerance):
+    """Baseline dosyasından belirgin biçimde yavaşlayan adımları listeler."""
+    with open(baseline_path, encoding="utf-8") as f:
+        baseline = {(r["rows"], r["step"]): r for r in json.load(f)["results"]}
+    regressions = []
+    for record in records:
+        old = baseline.get((record["rows"], record["step"]))
+        # Çok kısa adımlarda ölçüm gürültüsü oranı anlamsızlaştırır
+        if old is None or old["seconds"] < 0.05:
+            continue
+        ratio = record["seconds"] / old["seconds"]
+        if ratio > tolerance:
+            regressions.append((record, old, ratio))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100_000, 1_000_000, 10_000_000])
+    parser.add_argument("--customers", type=int, default=500)
+    parser.add_argument("--products", type=int, default=300)
+    parser.add_argument("--start-year", type=int, default=2013)
+    parser.add_argument("--end-year", type=int, default=2025)
+    parser.add_argument("--skew", type=float, default=1.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=1)
+    parser.add_argument("--no-memory", action="store_true")
+    parser.add_argument("--output", default=os.path.join(".cache", "benchmarks", f"scaling-{time.strftime('%Y%m%d-%H%M%S')}.json"))
+    parser.add_argument("--baseline", default=None)
+    parser.add_argument("--tolerance", type=float, default=1.25)
+    args = parser.parse_args()
+
+    report = {
+        "environment": {
+            "python": platform.python_version(),
+            "pandas": pd.__version__,
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "created_at": pd.Timestamp.now().isoformat(),
+        },
+        "arguments": {k: v for k, v in vars(args).items() if k not in ("output", "baseline")},
+        "results": [],
+    }
+    os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+    for n_rows in args.sizes:
+        report["results"] += run_size(n_rows, args)
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=1)
+    print(f"\nresults written to {args.output}")
+
+    if args.baseline:
+        regressions = compare(report["results"], args.baseline, args.tolerance)
+        for record, old, ratio in regressions:
+            print(f"REGRESSION {record['rows']:,} rows {record['step']}: {old['seconds']:.3f} s -> {record['seconds']:.3f} s ({ratio:.2f}x)")
+        if regressions:
+            sys.exit(1)
+        print(f"no step slower than {args.tolerance:.2f}x the baseline")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""
+Benchmark: sparse Year x Month sales (yıllık_satış_rakamları_seyrek) vs. the dense wide pivot.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_sparse_monthly_sales --rows 1000000
+
+The reference is the original pivot_table formulation (one column per month, fill_value=0). It is
+checked on both the sales cube and the cleaned rows:
+- The wide table rebuilt from the sparse cells must equal the reference.
+- Every page the dashboard can show must equal the same rows and month window of the reference.
+
+The output lists:
+- the size of the dense table, of the sparse cells, and of one dashboard page;
+- the time to build each form, and to cut one page from the sparse form.
+"""
+import argparse
+import contextlib
+import io
+import time
+
+import pandas as pd
+
+from Analysis_Functions.prepare_data import preprocessing
+from Analysis_Functions.sales_cube import build_sales_cube, is_sales_cube
+from Analysis_Functions.Yıllık_Satış_Rakamları import (
+    AYLAR,
+    SAYFA_BOYUTU,
+    seyrek_geniş_tablo,
+    yıllık_satış_rakamları_seyrek,
+)
+from benchmarks.synthetic_sales import generate_sales_data
+
+
+def reference_pivot(df):
+    """Yoğun geniş pivotun özgün pandas uygulaması."""
+    cube = is_sales_cube(df)
+    mask = df[df['Year'].isin([2024, 2025])]
+    pairs = mask[['CustomerCode', 'Product_Code']].drop_duplicates()
+    filtered = df.merge(pairs, on=['CustomerCode', 'Product_Code'], how='inner')
+    if not cube:
+        filtered['Year'] = filtered['Date'].dt.year
+        filtered['Month'] = filtered['Date'].dt.month
+    monthly_sales = filtered.pivot_table(
+        index=['CustomerCode', 'Product_Code'], columns=['Year', 'Month'], values='Sale_Amount',
+        aggfunc='sum', fill_value=0, observed=True,
+    )
+    monthly_sales.columns = [f"{year}-{AYLAR[month]}" for year, month in monthly_sales.columns]
+    monthly_sales = monthly_sales.reset_index()
+    last_sales = (
+        filtered.groupby(['CustomerCode', 'Product_Code'], observed=True)
+        .agg(
+            Last_Sale_Date=('Last_Sale_Date' if cube else 'Date', 'max'),
+            CustomerName=('CustomerName', 'first'),
+            ProductName=('ProductName', 'first'),
+        )
+        .reset_index()
+    )
+    return monthly_sales.merge(last_sales, on=['CustomerCode', 'Product_Code'], how='left')
+
+
+def _check_pages(dense, seyrek, last_months):
+    month_columns = list(dense.columns[2:-3])[-last_months:]
+    for start in range(0, len(dense), SAYFA_BOYUTU):
+        expected = dense.iloc[start:start + SAYFA_BOYUTU].reset_index(drop=True)
+        expected = expected[list(dense.columns[:2]) + month_columns + list(dense.columns[-3:])]
+        pd.testing.assert_frame_equal(seyrek_geniş_tablo(seyrek, start, start + SAYFA_BOYUTU, last_months), expected)
+
+
+def _timed(func, *args):
+    start = time.perf_counter()
+    value = func(*args)
+    return value, time.perf_counter() - start
+
+
+def _megabytes(frame):
+    return frame.memory_usage(deep=True).sum() / 2**20
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--skew", type=float, default=1.0)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    raw = generate_sales_data(args.rows, seed=args.seed, skew=args.skew)
+    with contextlib.redirect_stdout(io.StringIO()):
+        df_clean = preprocessing(raw)
+    cube = build_sales_cube(df_clean)
+    print(f"{len(df_clean):,} cleaned rows, {len(cube):,} cube cells")
+
+    for name, data in (("cube", cube), ("rows", df_clean)):
+        dense, dense_s = _timed(reference_pivot, data)
+        seyrek, sparse_s = _timed(yıllık_satış_rakamları_seyrek, data)
+        pd.testing.assert_frame_equal(seyrek_geniş_tablo(seyrek), dense)
+        _check_pages(dense, seyrek, 24)
+        page, page_s = _timed(seyrek_geniş_tablo, seyrek, 0, SAYFA_BOYUTU, 24)
+        print(f"[{name}] parity OK: {len(dense):,} pairs x {dense.shape[1] - 5} months, "
+              f"{len(seyrek['cells']):,} non-empty cells")
+        print(f"  {'dense wide pivot':<34} {_megabytes(dense):>9.1f} MB {dense_s:>8.3f} s")
+        print(f"  {'sparse cells + pair table':<34} "
+              f"{_megabytes(seyrek['cells']) + _megabytes(seyrek['pairs']):>9.1f} MB {sparse_s:>8.3f} s")
+        print(f"  {'one page (50 pairs, 24 months)':<34} {_megabytes(page):>9.3f} MB {page_s:>8.3f} s")
+
+
+if __name__ == "__main__":
+    main()
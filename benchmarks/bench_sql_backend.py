@@ -0,0 +1,97 @@
+"""
+Benchmark: pandas vs. DuckDB backend (sql_backend) for the heavy groupby analyses.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_sql_backend --rows 1000000
+    python -m benchmarks.bench_sql_backend --rows 10000000 --threads 16
+
+Each analysis runs on both backends: the Year x Month pivot (yıllık_satış_rakamları) on the sales
+cube and on the cleaned rows, the seasonality / special day / channel / price tables on the rows,
+and the three order regularity analyses (active months) on the cube. The results must be
+identical: same columns, dtypes, row order and values. Sums may differ only in the last bits,
+because DuckDB adds in a different order. The timings show the best of --repeat runs. DuckDB
+groups on integer key codes and uses all cores by default (--threads limits it).
+"""
+import argparse
+import contextlib
+import io
+import time
+
+import pandas as pd
+
+from Analysis_Functions.Ciro_Büyüme_Oranı import (
+    düzenlisiparişverenler_aralıklı_müşteriler_ürünler,
+    düzenlisiparişverenler_aralıklımüşteriler,
+    düzenlisiparişverenler_aralıklıürünler,
+)
+from Analysis_Functions.prepare_data import preprocessing
+from Analysis_Functions.sales_cube import build_sales_cube
+from Analysis_Functions.seasonality_channel_price_specialday_analysis import compute_seasonality_specialday_channel_price
+from Analysis_Functions.sql_backend import configure_backend
+from Analysis_Functions.Yıllık_Satış_Rakamları import yıllık_satış_rakamları
+from benchmarks.synthetic_sales import generate_sales_data
+
+
+def _assert_same(old, new):
+    if isinstance(old, dict):
+        assert old.keys() == new.keys()
+        for key in old:
+            _assert_same(old[key], new[key])
+        return
+    pd.testing.assert_frame_equal(old, new, check_exact=False, rtol=1e-12)
+
+
+def _timed(func, data, repeat):
+    best, value = None, None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        value = func(data)
+        seconds = time.perf_counter() - start
+        best = seconds if best is None else min(best, seconds)
+    return value, best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--skew", type=float, default=1.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--threads", type=int, default=None)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    raw = generate_sales_data(args.rows, seed=args.seed, skew=args.skew)
+    with contextlib.redirect_stdout(io.StringIO()):
+        df_clean = preprocessing(raw)
+    cube = build_sales_cube(df_clean)
+    print(f"{len(df_clean):,} cleaned rows, {len(cube):,} cube cells")
+
+    cases = [
+        ("yıllık_satış_rakamları (cube)", yıllık_satış_rakamları, cube),
+        ("yıllık_satış_rakamları (rows)", yıllık_satış_rakamları, df_clean),
+        ("compute_seasonality_specialday_channel_price", compute_seasonality_specialday_channel_price, df_clean),
+        ("regularity: customer-product", düzenlisiparişverenler_aralıklı_müşteriler_ürünler, cube),
+        ("regularity: customer", düzenlisiparişverenler_aralıklımüşteriler, cube),
+        ("regularity: product", düzenlisiparişverenler_aralıklıürünler, cube),
+    ]
+    timings = []
+    try:
+        for name, func, data in cases:
+            configure_backend("pandas")
+            expected, pandas_s = _timed(func, data, args.repeat)
+            configure_backend("duckdb", threads=args.threads)
+            actual, duckdb_s = _timed(func, data, args.repeat)
+            _assert_same(expected, actual)
+            timings.append((name, pandas_s, duckdb_s))
+    finally:
+        configure_backend("pandas")
+    print(f"parity OK for {len(cases)} analyses")
+
+    print(f"{'analysis':<48} {'pandas s':>9} {'duckdb s':>9} {'speedup':>8}")
+    for name, pandas_s, duckdb_s in timings:
+        print(f"{name:<48} {pandas_s:>9.3f} {duckdb_s:>9.3f} {pandas_s / duckdb_s:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
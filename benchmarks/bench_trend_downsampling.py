@@ -0,0 +1,128 @@
+"""
+Benchmark: calendar mode of total_sales_and_trend_line (time-based windows + LTTB) vs. the
+row-window plot of every daily point.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_trend_downsampling --years 5 10 20 40
+
+reference_lttb below is a plain per-point transcription of the LTTB algorithm; the vectorized
+lttb_indices must select exactly the same points. The default 'rows' mode must still match the
+original function. In the calendar mode the rolling means must average calendar days, counting
+days without sales as zero, and every requested window must be plotted. Timings cover computing the series, building the figure and rendering it to a
+PNG for daily histories of growing length: the row mode grows with the number of days, the
+calendar mode stays flat once the history exceeds the point budget.
+"""
+import argparse
+import time
+
+import matplotlib
+
+matplotlib.use("Agg")
+
+import matplotlib.pyplot as plt
+import numpy as np
+import pandas as pd
+
+from Analysis_Functions.downsampling import lttb_indices
+from Analysis_Functions.figure_cache import figure_to_bytes
+from Analysis_Functions.total_sales_and_trend_line import total_sales_and_trend_line
+
+# Eski fonksiyonun sabit 2020 sınırı: genel görünüm penceresi 2020'de başlayan analiz tarihi. Sentetik
+# geçmiş 2020'den ileri uzadığından varsayılan (verinin son günü) pencereyi kaydırırdı.
+LEGACY_AS_OF = "2025-12-31"
+
+
+def reference_lttb(x, y, n_out):
+    n = len(x)
+    if n_out >= n:
+        return list(range(n))
+    x = [float(v) - float(x[0]) for v in x]
+    every = (n - 2) / (n_out - 2)
+    selected = [0]
+    a = 0
+    for i in range(n_out - 2):
+        start = int(i * every) + 1
+        end = int((i + 1) * every) + 1 if i < n_out - 3 else n - 1
+        next_start = end
+        next_end = int((i + 2) * every) + 1 if i + 1 < n_out - 3 else n - 1
+        if i == n_out - 3:
+            avg_x, avg_y = x[-1], y[-1]
+        else:
+            avg_x = sum(x[next_start:next_end]) / (next_end - next_start)
+            avg_y = sum(y[next_start:next_end]) / (next_end - next_start)
+        best, best_area = start, -1.0
+        for j in range(start, end):
+            area = abs((x[a] - avg_x) * (y[j] - y[a]) - (x[a] - x[j]) * (avg_y - y[a]))
+            if area > best_area:
+                best, best_area = j, area
+        selected.append(best)
+        a = best
+    selected.append(n - 1)
+    return selected
+
+
+def legacy_total_sales_and_trend_line(df):
+    df_filtered = df[df["Year"] >= 2020]
+    sales_by_date = df_filtered.groupby('Date')['Sale_Amount'].sum().sort_index()
+    return sales_by_date.rolling(window=30).mean()
+
+
+def daily_sales(years, seed=0):
+    """Invoice lines on ~70% of the days (weekends and holidays missing) since 2020."""
+    rng = np.random.default_rng(seed)
+    days = pd.date_range("2020-01-01", periods=int(365.25 * years), freq="D")
+    days = days[rng.random(len(days)) < 0.7]
+    dates = np.repeat(days, rng.integers(1, 6, len(days)))
+    trend = np.linspace(100, 300, len(dates))
+    return pd.DataFrame({
+        "Date": dates,
+        "Year": dates.year,
+        "Sale_Amount": rng.gamma(2.0, trend / 2.0),
+    })
+
+
+def _time_plot(df, **kwargs):
+    start = time.perf_counter()
+    fig = total_sales_and_trend_line(df, plot=True, as_of=LEGACY_AS_OF, **kwargs)[-1]
+    figure_to_bytes(fig)
+    plt.close(fig)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--years", type=int, nargs="+", default=[5, 10, 20, 40])
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    for n, n_out in [(10, 5), (1000, 100), (5000, 1200), (1201, 1200)]:
+        x = np.sort(rng.integers(0, 10 ** 12, n))
+        y = rng.normal(size=n).cumsum()
+        assert list(lttb_indices(x, y, n_out)) == reference_lttb(list(x), list(y), n_out), (n, n_out)
+
+    windows = ("7D", "30D", "90D", "180D", "365D")
+    _, _, fig = total_sales_and_trend_line(daily_sales(1, seed=args.seed), windows=windows, mode="calendar")
+    assert len(fig.axes[0].get_lines()) == 1 + len(windows), "a rolling window was not plotted"
+    plt.close(fig)
+
+    print(f"{'years':>5} {'days':>7} {'rows mode (s)':>14} {'calendar (s)':>13} {'points':>7}")
+    for years in args.years:
+        df = daily_sales(years, seed=args.seed)
+        pd.testing.assert_series_equal(
+            total_sales_and_trend_line(df, plot=False, as_of=LEGACY_AS_OF)[0], legacy_total_sales_and_trend_line(df),
+        )
+        full, decimated, _ = total_sales_and_trend_line(df, plot=False, mode="calendar", as_of=LEGACY_AS_OF)
+        assert all(series.index.isin(full.index).all() for series in decimated.values())
+        totals = df.groupby("Date")["Sale_Amount"].sum()
+        days = pd.date_range(totals.index.min(), totals.index.max(), freq="D")
+        reference = totals.reindex(days, fill_value=0).rolling(30).mean()
+        np.testing.assert_allclose(full["Rolling_30D"].to_numpy()[29:], reference.to_numpy()[29:])
+        rows_s = _time_plot(df)
+        calendar_s = _time_plot(df, mode="calendar")
+        print(f"{years:>5} {len(full):>7} {rows_s:>14.3f} {calendar_s:>13.3f} {len(decimated['Sale_Amount']):>7}")
+
+
+if __name__ == "__main__":
+    main()
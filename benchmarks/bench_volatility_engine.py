@@ -0,0 +1,133 @@
+"""
+Benchmark: single-scan volatility engine vs. the merge-based volatility analyses.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_volatility_engine --rows 1000000
+
+The legacy functions below are the original compute_volatility (invoice-line CV per
+customer-product pair and per product, with two row-level merges for last sale dates) and
+compute_sales_volatility (monthly CV per customer and per customer-product pair, with recency
+filters and name/date merges). Results are compared after sorting by identifiers. The engine
+derives std from sums of squares, so floats are compared with a relative tolerance and near-zero
+CVs of constant series with an absolute one. Peak traced memory (tracemalloc) is printed next to
+the timings.
+"""
+import argparse
+import contextlib
+import io
+import time
+import tracemalloc
+
+import pandas as pd
+
+from Analysis_Functions.prepare_data import preprocessing
+from Analysis_Functions.sales_volatility import compute_sales_volatility
+from Analysis_Functions.volatility_analysis import compute_volatility
+from benchmarks.synthetic_sales import generate_sales_data
+
+
+def legacy_compute_volatility(df):
+    last_sale_dates_cp = (
+        df.groupby(['CustomerCode', 'Product_Code'], observed=True)['Date'].max().reset_index()
+        .rename(columns={'Date': 'Customer_Product_Last_Sale_Date'})
+    )
+    df_cp = df.merge(last_sale_dates_cp, on=['CustomerCode', 'Product_Code'], how='left')
+    df_cp_recent = df_cp[df_cp['Customer_Product_Last_Sale_Date'] >= "2024-06-01"]
+    volatility_cp = (
+        df_cp_recent.groupby(['CustomerCode', 'Product_Code', 'ProductName', 'CustomerName'], observed=True)['Sale_Amount']
+        .agg(['mean', 'std']).assign(coef_var=lambda x: x['std'] / x['mean']).reset_index()
+    )
+    volatility_cp['Customer_Product'] = volatility_cp['CustomerCode'].astype(str) + " | " + volatility_cp['Product_Code'].astype(str)
+    volatility_cp['Customer_Product_Name'] = volatility_cp['CustomerName'].astype(str) + " | " + volatility_cp['ProductName'].astype(str)
+    volatility_cp = volatility_cp.merge(last_sale_dates_cp, on=['CustomerCode', 'Product_Code'], how='left')
+    volatility_cp = volatility_cp.sort_values(by='coef_var', ascending=False)
+
+    last_sale_dates_p = (
+        df.groupby('Product_Code', observed=True)['Date'].max().reset_index()
+        .rename(columns={'Date': 'Product_Last_Sale_Date'})
+    )
+    df_p = df.merge(last_sale_dates_p, on='Product_Code', how='left')
+    df_p_recent = df_p[df_p['Product_Last_Sale_Date'] >= "2024-06-01"]
+    volatility_p = (
+        df_p_recent.groupby(['Product_Code', 'ProductName'], observed=True)['Sale_Amount']
+        .agg(['mean', 'std']).assign(coef_var=lambda x: x['std'] / x['mean']).reset_index()
+    )
+    volatility_p = volatility_p.merge(last_sale_dates_p, on='Product_Code', how='left')
+    volatility_p = volatility_p.sort_values(by='coef_var', ascending=False)
+    return volatility_cp, volatility_p
+
+
+def _legacy_level_volatility(df, keys):
+    monthly = df.groupby(keys + ['YearMonth'], observed=True)['Sale_Amount'].sum().reset_index()
+    vol = monthly.groupby(keys, observed=True)['Sale_Amount'].agg(['std', 'mean']).reset_index()
+    vol['Volatility_Score'] = vol['std'] / vol['mean']
+    for key, name in [('CustomerCode', 'CustomerName'), ('Product_Code', 'ProductName')]:
+        if key in keys:
+            vol = vol.merge(df.groupby(key, observed=True)[name].first().reset_index(), on=key, how='left')
+    last_sale = df.groupby(keys, observed=True)['Date'].max().reset_index().rename(columns={'Date': 'Last_Sale_Date'})
+    return vol.merge(last_sale, on=keys, how='left')
+
+
+def legacy_compute_sales_volatility(df):
+    df = df.assign(YearMonth=df['Date'].dt.to_period('M'))
+    results = []
+    for keys, columns in [
+        (['CustomerCode'], ['CustomerCode', 'CustomerName', 'Last_Sale_Date', 'Volatility_Score']),
+        (['CustomerCode', 'Product_Code'], ['CustomerCode', 'CustomerName', 'Product_Code', 'ProductName', 'Last_Sale_Date', 'Volatility_Score']),
+    ]:
+        last_sales = df.groupby(keys, observed=True)['Date'].max().reset_index()
+        recent = last_sales[last_sales['Date'].dt.year.isin((2024, 2025))][keys]
+        df_filtered = df.merge(recent, on=keys, how='inner')
+        vol = _legacy_level_volatility(df_filtered, keys)[columns]
+        results.append(vol.sort_values('Volatility_Score', ascending=False))
+    return tuple(results)
+
+
+def _normalize(df):
+    df = df.copy()
+    for col in df.columns:
+        if isinstance(df[col].dtype, pd.CategoricalDtype) or df[col].dtype == object:
+            df[col] = df[col].astype(str)
+    keys = [col for col in ['CustomerCode', 'Product_Code'] if col in df.columns]
+    return df.sort_values(keys, ignore_index=True)
+
+
+def _assert_same(old, new):
+    for a, b in zip(old, new):
+        pd.testing.assert_frame_equal(_normalize(a), _normalize(b), check_dtype=False, rtol=1e-6, atol=1e-6)
+
+
+def _measure(func, df):
+    tracemalloc.start()
+    start = time.perf_counter()
+    out = func(df)
+    seconds = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1] / 2 ** 20
+    tracemalloc.stop()
+    return out, seconds, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=500_000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    raw = generate_sales_data(args.rows, seed=args.seed)
+    with contextlib.redirect_stdout(io.StringIO()):
+        df_clean = preprocessing(raw)
+    print(f"{len(df_clean):,} cleaned rows")
+    print(f"{'analysis':<26} {'legacy (s)':>10} {'engine (s)':>10} {'legacy MB':>10} {'engine MB':>10}")
+    for name, legacy, func in [
+        ("compute_volatility", legacy_compute_volatility, compute_volatility),
+        ("compute_sales_volatility", legacy_compute_sales_volatility, compute_sales_volatility),
+    ]:
+        old, old_s, old_mb = _measure(legacy, df_clean)
+        new, new_s, new_mb = _measure(func, df_clean)
+        _assert_same(old, new)
+        print(f"{name:<26} {old_s:>10.3f} {new_s:>10.3f} {old_mb:>10.1f} {new_mb:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+Synthetic invoice data in the shape returned by database.get_sales_data.
+
+Used by the benchmark scripts in this folder so the analyses can be timed without access to
+the production SQL Server.
+"""
+import numpy as np
+import pandas as pd
+
+# A few real Dipsos/Sachet (customer, product) pairs so label_data has matches
+DIPSOS_SAMPLE_PAIRS = [
+    ("120-34-063", "LCE008"), ("120-41-004", "YUM005"), ("120-35-021", "PIZ001"),
+    ("120-34-122", "CSSC009"), ("120-34-029", "D40000004"),
+]
+
+
+def _draw_codes(rng, n_codes, n_rows, skew):
+    """Code indices for n_rows lines; with skew > 0 index i is drawn with weight 1 / (i + 1) ** skew."""
+    if skew <= 0:
+        return rng.integers(0, n_codes, n_rows)
+    weights = 1.0 / np.arange(1, n_codes + 1) ** skew
+    # Popularity is shuffled so the heaviest codes are not always the first (Dipsos sample) ones
+    weights = rng.permutation(weights)
+    return rng.choice(n_codes, n_rows, p=weights / weights.sum())
+
+
+def generate_sales_data(n_rows, n_customers=500, n_products=300, start_year=2013, end_year=2025, seed=0, skew=0.0):
+    """
+    Generates random invoice lines with the raw columns prepare_data expects.
+
+    Args:
+        n_rows (int): Number of invoice lines.
+        n_customers (int): Number of distinct customers.
+        n_products (int): Number of distinct products.
+        start_year (int): First invoice year.
+        end_year (int): Last invoice year.
+        seed (int): Random seed.
+        skew (float): Zipf exponent of customer and product popularity. 0 draws them uniformly;
+            around 1 a few customers and products carry most of the invoice lines, as in the
+            production data.
+
+    Returns:
+        pd.DataFrame: Columns 'Date', 'InvoiceDate', 'CustomerCode', 'CustomerName',
+        'Product_Code', 'ProductName', 'Sale_Amount', 'Unit_Price(TL)' (text with comma
+        decimals), 'Label', 'Channel', 'Interest_Rate', 'Inflation', 'PMI', 'Growth_Rate'.
+    """
+    rng = np.random.default_rng(seed)
+
+    customer_codes = np.array([f"120-{i // 1000:02d}-{i % 1000:03d}" for i in range(n_customers)], dtype=object)
+    product_codes = np.array([f"PRD{i:05d}" for i in range(n_products)], dtype=object)
+    customer_codes[:len(DIPSOS_SAMPLE_PAIRS)] = [c for c, _ in DIPSOS_SAMPLE_PAIRS][:n_customers]
+    product_codes[:len(DIPSOS_SAMPLE_PAIRS)] = [p for _, p in DIPSOS_SAMPLE_PAIRS][:n_products]
+    # A small share of raw-material codes that prepare_data filters out
+    n_raw = max(1, n_products // 50)
+    product_codes[-n_raw:] = [f"HAM{i:04d}" for i in range(n_raw)]
+
+    start = pd.Timestamp(f"{start_year}-01-01")
+    n_days = (pd.Timestamp(f"{end_year}-12-31") - start).days + 1
+    dates = start + pd.to_timedelta(rng.integers(0, n_days, n_rows), unit="D")
+
+    customer_idx = _draw_codes(rng, n_customers, n_rows, skew)
+    product_idx = _draw_codes(rng, n_products, n_rows, skew)
+    base_price = rng.uniform(5, 500, n_products)
+    price = np.round(base_price[product_idx] * rng.normal(1, 0.05, n_rows), 2)
+    amount = rng.integers(1, 200, n_rows).astype(float)
+    amount[rng.random(n_rows) < 0.002] *= -1  # returns / cancellations
+
+    months = pd.DatetimeIndex(dates).to_period("M")
+    month_ordinal = (months.year - start_year) * 12 + months.month
+    df = pd.DataFrame({
+        "Date": dates,
+        "InvoiceDate": dates,
+        "CustomerCode": customer_codes[customer_idx],
+        "CustomerName": np.array([f"Müşteri {i}" for i in range(n_customers)], dtype=object)[customer_idx],
+        "Product_Code": product_codes[product_idx],
+        "ProductName": np.array([f"Ürün {i}" for i in range(n_products)], dtype=object)[product_idx],
+        "Sale_Amount": amount,
+        "Unit_Price(TL)": pd.Series(price).map("{:.2f}".format).str.replace(".", ",", regex=False).to_numpy(),
+        "Label": rng.choice(["Private Label", "Own Brand"], n_rows),
+        "Channel": rng.choice(["Horeca Müşteriler", "Endüstriyel Müşteriler", "Perakende Müşteriler"], n_rows),
+        "Interest_Rate": 10 + 0.2 * month_ordinal % 40,
+        "Inflation": 8 + 0.3 * month_ordinal % 70,
+        "PMI": 50 + 3 * np.sin(month_ordinal / 6),
+        "Growth_Rate": 4 + 2 * np.cos(month_ordinal / 9),
+    })
+    return df
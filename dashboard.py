@@ -1,48 +1,12 @@
 # import libraries 
 import streamlit as st
-import pandas as pd
-from Analysis_Functions.Adet_Ciro_Bazında_EnCokSatanlar import yil_ay_bazinda_en_cok_satan_urunler
-from Analysis_Functions.Aylık_Yıllık_Ciro_Büyüme_Oranı import ciro_buyume_orani_analizi
-from Analysis_Functions.Ciro_Büyüme_Oranı import (
-    aylik_en_yuksek_ciroya_sahip_3_musteri,
-    aylik_en_yuksek_ciroya_sahip_3_ürün,
-    düzenlisiparişverenler_aralıklı_müşteriler_ürünler,
-    düzenlisiparişverenler_aralıklımüşteriler,
-    düzenlisiparişverenler_aralıklıürünler,
-)
-from Analysis_Functions.Yıllık_Satış_Rakamları import yıllık_satış_rakamları
-from Analysis_Functions.seasonality_channel_price_specialday_analysis import (
-    check_seasonality_specialday_channel_price,
-    check_price_and_sales,
-)
-from Analysis_Functions.macroeconomic_analysis import macroeconomic_parameters
-from Analysis_Functions.top_3_customer_product_sales_by_month_year import top_3_customer_product_sales_by_month_year
-from Analysis_Functions.plot_top10 import (
-    plot_top10_products_per_year,
-    plot_top10_productsandcustomers_per_year,
-)
-from Analysis_Functions.plot_top_products_by_season import plot_top_products_by_season
-from Analysis_Functions.prepare_data import preprocessing
-from Analysis_Functions.seasonal_sales_by_year import seasonal_sales_by_year
-from Analysis_Functions.top5_products_per_season import top5_products_per_season
-from Analysis_Functions.plot_top_selling_product_customer_by_season import plot_top_selling_product_customer_by_season
-from Analysis_Functions.total_sales_and_trend_line import total_sales_and_trend_line
-from Analysis_Functions.sales_volatility import sales_volatility
-# from Analysis_Modules.ay_bazlı_analiz import ay_bazlı_analiz
-from Analysis_Functions.sales_revenue import sales_revenue_product,sales_revenue_product_customer
-from Analysis_Functions.trend_analysis import (
-    customer_product_trend_analysis,
-    product_trend_analysis,
-    customer_trend_analysis,
-    customer_product_segmentation,
-    product_segmentation,
-    customer_segmentation,
-)
-from Analysis_Functions.volatility_analysis import volatility_analysis
-from Analysis_Functions.trend_volatility_analysis_segmentation import combine_trend_volatility_results
-from Analysis_Functions.database import get_sales_data
-from Analysis_Functions.AgingFactor import aging_factor_analysis
-from Analysis_Functions.Aylık_Değişim_Oranı import rate_of_change_per_month
+from Analysis_Functions.analysis_sections import ANALYSIS_SECTIONS, CUBE_SECTIONS, render_sections
+from Analysis_Functions.database import ANALYSIS_OPTIONS, get_sales_cube
+from Analysis_Functions.profiling import append_profile_log, new_profile, profile_table
+from Analysis_Functions.report_store import latest_report, open_report, report_fingerprint
+from Analysis_Functions.result_cache import cache_stats, dataset_fingerprint
+from Analysis_Functions.snapshot_cache import LOOKBACK_DAYS, load_sales_data
+from Analysis_Functions.sql_backend import available_backends, configure_backend
 
 # Sayfa arka planı ve kenar boşlukları için renkli stil
 st.markdown(
@@ -131,223 +95,177 @@ st.markdown(
 )
 option = st.selectbox(
     "",  # Boş bırakıyoruz, başlığı yukarıda verdik
-    ("Yurtiçi -Dipsos/Sachet", "Yurtiçi-Diğer Ürünler", "İhracat-Dipsos/Sachet", "İhracat-Diğer Ürünler")
+    ANALYSIS_OPTIONS
 )
-#st.write("Seçiminiz:", option)
-# Kullanıcı dosya yüklemeden önce veritabanından çekmek için:
-if st.button("Veritabanından Veriyi Çek"):
-    df_raw2 = get_sales_data(option)
-    st.dataframe(df_raw2)
-    # Sonrasında df_raw ile analizlerine devam edebilirsin
-    df_raw=pd.DataFrame(df_raw2)
-    df_clean = preprocessing(df_raw)
-    
-    # Kullanım:
-    st.title("Yıl-Ay Bazında Satış Rakamları")
-    st.markdown("2024 ve 2025 yıllarında aktif satışı olan müşteri-ürün grupları bazında yapılmıştır.")
-    monthly_sales = yıllık_satış_rakamları(df_clean)
-    st.write(monthly_sales)
-    
-    # Kullanım:
-    st.title("Yıl-Ay Bazında Adet&Ciro Bazında En Çok Satan Ürünler")
-    st.markdown("2024 ve 2025 yıllarında aktif satışı olan müşteri-ürün grupları bazında yapılmıştır.")
-    sonuc = yil_ay_bazinda_en_cok_satan_urunler(df_clean)
-    st.write(sonuc)
 
-    # Örnek kullanım
-    result, result2 = ciro_buyume_orani_analizi(df_clean) 
-    st.title("Aylık ve Yıllık Ciro Büyüme Oranı")
-    st.subheader("Aylık Ciro Büyüme Oranı")
-    st.write(result)
-    st.subheader("Yıllık Ciro Büyüme Oranı")
-    st.write(result2)
 
-    st.title("Trend Analizi Sonuçları")
-    st.markdown("Bu analiz 2024 ve 2025 yıllarında aktif satışı olan müşteri-ürün grupları bazında yapılmıştır. ")
-    musteri_ürün=customer_product_trend_analysis(df_clean)
-    ürün=product_trend_analysis(df_clean)
-    musteri=customer_trend_analysis(df_clean)
-    customer_product_segmentation(musteri_ürün)
-    product_segmentation(ürün) 
-    #customer_segmentation(musteri)
-    volatility_df_customer_product, volatility_df_product = volatility_analysis(df_clean)
-    trend_volatility=combine_trend_volatility_results(musteri_ürün,volatility_df_customer_product,df_clean)
-    price_std=check_seasonality_specialday_channel_price(df_clean)
-    check_price_and_sales(trend_volatility,price_std)
-
-    # Müşteri-Ürün Sipariş Yoğunluğu ve Düzenlilik Analizi
-    st.header("Müşteri-Ürün Sipariş Yoğunluğu ve Düzenlilik Analizi")
-    st.markdown(
-        "Son satışı 2024 ve 2025 yıllarında olan müşteri-ürün gruplarının yaşam süresi boyunca ilgili üründen ne kadar sipariş verildiği hesaplanmıştır. "
-        "Bu analizde, her müşterinin ilgili üründe yaşam süresi boyunca verdiği sipariş sayısı değerlendirilmiştir. "
-        "Müşteri, yaşam süresi boyunca ilgili ürünü **tüm olası ayların %80'inden fazlasında sipariş verdiyse**, **“Düzenli Müşteri”** olarak etiketlenmiştir."
+def select_sections(titles=None):
+    # Yalnızca seçilen bölümler hesaplanır ve çizilir
+    titles = list(titles or ANALYSIS_SECTIONS)
+    return st.multiselect(
+        "Görüntülenecek analizler:",
+        titles,
+        default=[titles[0]],
     )
-    siparis_kategorileri_mu = düzenlisiparişverenler_aralıklı_müşteriler_ürünler(df_clean)
-    st.subheader("Düzenli Siparişi Olan Müşteri-Ürün Grupları")
-    st.dataframe(siparis_kategorileri_mu[siparis_kategorileri_mu["Category"] == "Düzenli Sipariş Verenler"])
-    st.subheader("Aralıklı Siparişi Olan Müşteri-Ürün Grupları")
-    st.dataframe(siparis_kategorileri_mu[siparis_kategorileri_mu["Category"] == "Aralıklı Sipariş Verenler"])
-    st.subheader("Tek Seferlik Siparişi Olan Müşteri-Ürün Grupları")
-    st.dataframe(siparis_kategorileri_mu[siparis_kategorileri_mu["Category"] == "Hesaplanamaz"])
 
-    # Müşteri Sipariş Yoğunluğu ve Düzenlilik Analizi
-    st.header("Müşteri Sipariş Yoğunluğu ve Düzenlilik Analizi")
-    st.markdown(
-        "Son satışı 2024 ve 2025 yıllarında olan müşterilerin yaşam süresi boyunca ne kadar sipariş verdiği hesaplanmıştır. "
-        "Bu analizde, her müşterinin yaşam süresi boyunca verdiği sipariş sayısı değerlendirilmiştir. "
-        "Müşteri, yaşam süresi boyunca **tüm olası ayların %80'inden fazlasında sipariş verdiyse**, **“Düzenli Sipariş Veren Müşteri”** olarak etiketlenmiştir."
-    )
-    siparis_kategorileri_m = düzenlisiparişverenler_aralıklımüşteriler(df_clean)
-    st.subheader("Düzenli Siparişi Olan Müşteriler")
-    st.dataframe(siparis_kategorileri_m[siparis_kategorileri_m["Category"] == "Düzenli Sipariş Verenler"])
-    st.subheader("Aralıklı Siparişi Olan Müşteriler")
-    st.dataframe(siparis_kategorileri_m[siparis_kategorileri_m["Category"] == "Aralıklı Sipariş Verenler"])
-    st.subheader("Tek Seferlik Siparişi Olan Müşteriler")
-    st.dataframe(siparis_kategorileri_m[siparis_kategorileri_m["Category"] == "Hesaplanamaz"])
 
-    # Ürün Sipariş Yoğunluğu ve Düzenlilik Analizi
-    st.header("Ürün Sipariş Yoğunluğu ve Düzenlilik Analizi")
-    st.markdown(
-        "Son satışı 2024 ve 2025 yıllarında olan ürünlerin yaşam süresi boyunca ne kadar sipariş verildiği hesaplanmıştır. "
-        "Bu analizde, yaşam süresi boyunca verilen sipariş sayısı değerlendirilmiştir. "
-        "Ürün, yaşam süresi boyunca **tüm olası ayların %80'inden fazlasında sipariş aldıysa**, **“Düzenli Sipariş Verilen Ürün”** olarak etiketlenmiştir."
+def show_cache_stats():
+    stats = cache_stats()
+    st.sidebar.caption(
+        f"Sonuç önbelleği: {stats['hits']} isabet / {stats['misses']} ıska "
+        f"(%{stats['hit_rate'] * 100:.0f}), {stats['entries']} kayıt, {stats['memory_mb']} MB, "
+        f"{stats['evictions']} atılan"
     )
-    siparis_kategorileri_u = düzenlisiparişverenler_aralıklıürünler(df_clean)
-    st.subheader("Düzenli Siparişi Olan Ürünler")
-    st.dataframe(siparis_kategorileri_u[siparis_kategorileri_u["Category"] == "Düzenli Sipariş Verilenler"])
-    st.subheader("Aralıklı Siparişi Olan Ürünler")
-    st.dataframe(siparis_kategorileri_u[siparis_kategorileri_u["Category"] == "Aralıklı Sipariş Verilenler"])
-    st.subheader("Tek Seferlik Siparişi Olan Ürünler")
-    st.dataframe(siparis_kategorileri_u[siparis_kategorileri_u["Category"] == "Hesaplanamaz"])
-
-    # En yüksek ciroya sahip müşteriler 
-    st.header("En Yüksek Ciroya Sahip Müşteriler")
-    st.markdown("2024 yılı itibari ile her ay en yüksek 3 ciroya sahip müşteriler listelenmiştir.")
-    top3_customers = aylik_en_yuksek_ciroya_sahip_3_musteri(df_clean)
-    st.dataframe(top3_customers)
-    
-    # En yüksek ciroya sahip ürünler
-    st.header("En Yüksek Ciroya Sahip Ürünler")
-    st.markdown("2024 yılı itibari ile her ay en yüksek 3 ciroya sahip ürünler listelenmiştir.")
-    top3_ürünler = aylik_en_yuksek_ciroya_sahip_3_ürün(df_clean)
-    st.dataframe(top3_ürünler)
-
-
-    st.markdown("### 2020-2025 Aralığında Sezon Bazlı Satış Analizi")
-    seasonal_sales_df, fig = seasonal_sales_by_year(df_clean, plot=True)
-    if fig:
-        st.pyplot(fig)
-
-    # En çok satan 5 ürün 
-    top5_figs = plot_top_products_by_season(df_clean, years=[2024, 2025])
-    for year, fig in top5_figs.items():
-      st.markdown(f"#### {year} – Sezon Bazında En Çok Satan 5 Ürün")
-      st.pyplot(fig)
-     
-    #En çok kez satan 5 ürün 
-    top5_frequencyfigs = top5_products_per_season(df_clean, years=[2024, 2025])
-    for year, fig in top5_frequencyfigs.items():
-      st.markdown(f"#### {year} – Sezon Bazında En Çok Kez Satan 5 Ürün")
-      st.pyplot(fig)
-
-    #En çok satan müşteri-ürün kombinasyonları
-    top_combo_figs = plot_top_selling_product_customer_by_season(df_clean, years=[2024, 2025])
-    for year, fig in top_combo_figs.items():
-        st.markdown(f"#### {year} – Sezon Bazında En Çok Satılan Ürün–Müşteri Kombinasyonları")
-        st.pyplot(fig)
-
-    #En çok kez satan müşteri-ürün kombinasyonları
-    top_combo_frequency_figs = plot_top_selling_product_customer_by_season(df_clean, years=[2024, 2025])
-    for year, fig in top_combo_frequency_figs.items():
-        st.markdown(f"#### {year} – Sezon Bazında En Çok Satılan Ürün–Müşteri Kombinasyonları")
-        st.pyplot(fig)
-
-    #Toplam satış ve trend çizgisi
-    st.markdown("### 2020-2025 Aralığında Toplam Satış ve Trend Çizgisi")
-    trend_df, fig = total_sales_and_trend_line(df_clean, plot=True)
-    if fig:
-        st.pyplot(fig)
-
-    #Volatility Analizi
-    st.markdown("## Volatilite Analizi")
-    st.markdown("Bu analizdeki veriler, 2024 ve 2025 yıllarında satış yapan müşterilere aittir.Her müşterinin satın alım hacimlerindeki zaman içindeki değişkenliği ölçmek için standart sapma ve ortalama kullanılarak bir volatilite skoru hesaplanmıştır. Bu skor, her müşterinin satın alım hacimlerinin ne kadar değişken olduğunu gösterir. Skorun yüksek olması, müşterinin satın alım hacimlerinde büyük dalgalanmalar olduğunu gösterir.")
-    customer_vol_df, cust_prod_vol_df = sales_volatility(df_clean, top_n=10)
-
-    st.title("Yaşlandıkça Değişen Satış Eğilimleri")
-    aging_df = aging_factor_analysis(df_clean)
-    st.dataframe(aging_df)
-
-    st.title("Aylık Satış Değişim Oranları")
-    value=rate_of_change_per_month(df_clean)
-    st.dataframe(value)
-
-
-    # Ay bazlı satış dağılımı 
-    #st.markdown("## 2025 yılındaki Gün bazlı satış dağılımı ")
-    #period_sales, fig = ay_bazlı_analiz(df_clean, year=2024, plot=True)
-    #if fig:
-    #    st.pyplot(fig)
-
-
-    # Ay bazlı satış dağılımı 
-    #st.markdown("## 2024 yılındaki Gün bazlı satış dağılımı ")
-    #period_sales, fig = ay_bazlı_analiz(df_clean, year=2024, plot=True)
-    #if fig:
-    #    st.pyplot(fig)
-
-    # Ay bazlı satış dağılımı 
-    #st.markdown("## 2023 yılındaki Gün bazlı satış dağılımı ")
-    #period_sales, fig = ay_bazlı_analiz(df_clean, year=2023, plot=True)
-    #if fig:
-    #    st.pyplot(fig)  
-    
 
-    # Yıl-Ay bazında en çok satan müşteri ürünler
-    st.markdown("## 📈 Yıl–Ay Bazında En Çok Satan Müşteri–Ürünler")
-    results = top_3_customer_product_sales_by_month_year(df_clean, plot=True)
-    for year, (data, fig) in results.items():
-      st.markdown(f"### 📊 {year} Yılı – Aylık En Çok Satanlar")
-      if fig:
-          st.pyplot(fig)
-      st.dataframe(data)
 
+def show_profile(profile):
+    # Bölüm ve analiz süreleri kenar çubuğunda; tablo sütun başlığına tıklanarak sıralanır
+    log_path = append_profile_log(profile)
+    st.sidebar.subheader("Profil")
+    st.sidebar.dataframe(
+        profile_table(profile),
+        hide_index=True,
+        column_config={
+            "kind": "Tür", "section": "Bölüm", "function": "Fonksiyon", "cached": "Önbellek",
+            "wall_s": "Süre (sn)", "cpu_s": "CPU (sn)", "peak_mb": "Tepe MB",
+            "input_rows": "Girdi satır", "output_rows": "Çıktı satır",
+        },
+    )
+    profiled = [r for r in profile["records"] if r.get("cprofile")]
+    if profiled:
+        choice = st.sidebar.selectbox("cProfile çıktısı", [r["function"] for r in profiled])
+        st.sidebar.code(next(r["cprofile"] for r in profiled if r["function"] == choice), language=None)
+    st.sidebar.caption(f"Ölçümler {log_path} dosyasına eklendi.")
+
+
+# Gece çalışan batch_reports.py'nin raporu varsa analizler hesaplanmadan oradan gösterilir
+report_dir = latest_report(option)
+if report_dir and st.checkbox("Gece raporunu kullan (analizler yeniden hesaplanmaz)", value=True):
+    if st.session_state.get("report", {}).get("directory") != report_dir:
+        st.session_state["report"] = open_report(report_dir)
+    report = st.session_state["report"]
+    st.caption(
+        f"Rapor: {report['manifest']['created_at'][:16].replace('T', ' ')} • "
+        f"{report['manifest']['rows']:,} satır"
+    )
+    render_sections(select_sections(), None, report_fingerprint(report), report=report)
+    show_cache_stats()
+    st.stop()
 
-    # Makroekonomik veriler -  satış dağılımı  
-    st.markdown("## Makroekonomik Göstergeler ile Satış Karşılaştırmaları")
-    st.markdown("2013-2025 yılları arasındaki veriler kullanılarak hazırlanmıştır.")
-    metrics = {
-        "Interest_Rate": "Faiz Oranı",
-        "Inflation": "Enflasyon",
-        "PMI": "PMI",
-        "Growth_Rate": "Büyüme Oranı"
+#st.write("Seçiminiz:", option)
+full_refresh = st.checkbox("Yerel kopyayı yok say, tüm veriyi yeniden çek", value=False)
+lookback_days = st.sidebar.number_input(
+    "Yeniden çekilecek gün",
+    min_value=0,
+    value=LOOKBACK_DAYS,
+    step=1,
+    help="Artımlı yenilemede son fatura tarihinden bu kadar gün geriye kadar olan satırlar veritabanından "
+         "yeniden çekilir; bu süre içinde düzeltilen faturalar güncellenir.",
+)
+cube_only = st.checkbox(
+    "Yalnızca aylık toplamları çek",
+    value=False,
+    help="Müşteri × ürün × ay toplamları SQL Server'da hesaplanır; fatura satırları indirilmez. "
+         "Yalnızca aylık toplamlarla çalışan analizler gösterilir.",
+)
+# Kullanıcı dosya yüklemeden önce veritabanından çekmek için:
+# Çekilen veri oturumda saklanır; bölüm seçimi değiştiğinde veri yeniden çekilmez.
+fetch = st.button("Veritabanından Veriyi Çek")
+if fetch and cube_only:
+    # Küp SQL Server'da toplanır; fatura satırları ve yerel kopya kullanılmaz
+    with st.spinner("Aylık toplamlar çekiliyor..."):
+        cube = get_sales_cube(option)
+    if isinstance(cube, tuple):
+        st.error(f"Veri çekilemedi: {cube[1]}")
+        st.stop()
+    st.session_state["sales_data"] = {
+        "option": option,
+        "df_raw": None,
+        "cube": cube,
+        "fingerprint": dataset_fingerprint(cube, option),
+    }
+elif fetch:
+    progress = st.progress(0.0, text="Veri çekiliyor...")
+    def show_progress(rows, chunks):
+        progress.progress(min(chunks / (chunks + 1), 0.99), text=f"{rows:,} satır okundu ({chunks} parça)")
+    # Sürecin tepe RSS'i her yüklemede, yüklemenin Python tepe belleği yalnızca profil modunda (kenar çubuğundaki seçim) ölçülür
+    df_raw2 = load_sales_data(
+        option, full_refresh=full_refresh, lookback_days=int(lookback_days), progress_callback=show_progress,
+        trace_memory=st.session_state.get("profiling", False),
+    )
+    progress.empty()
+    if isinstance(df_raw2, tuple):
+        st.error(f"Veri çekilemedi: {df_raw2[1]}")
+        st.stop()
+    st.session_state["sales_data"] = {
+        "option": option,
+        "df_raw": df_raw2,
+        # Aynı veri seti ve seçim için ön işleme ve analiz sonuçları önbellekten gelir
+        "fingerprint": dataset_fingerprint(df_raw2, option),
     }
-    for col, label in metrics.items():
-        st.markdown(f"###  Aylık Satış ve {label}")
-        sales_df, macro_df, fig = macroeconomic_parameters(df_clean, macro_col=col, macro_label=label, plot=True)
-        if fig:
-          st.pyplot(fig)
-    
-
-    # Customer-Product Performance Matrix
-    st.markdown("## Müşteri-Ürün Performans Analizi")
-    st.markdown("2024 ve 2025 yıllarında satışı bulunan müşteri ürünler için hazırlanmıştır.Ürün her satış işleminde ortalama ne kadar para kazandırıyor sorusunun cevabını verir.")
-    sales_revenue_product_customer(df_clean)
-    # Product Performance Matrix
-    st.markdown("## Ürün Performans Analizi")
-    st.markdown("2024 ve 2025 yıllarında satışı bulunan ürünler için hazırlanmıştır.Ürün her satış işleminde ortalama ne kadar para kazandırıyor sorusunun cevabını verir.")
-    sales_revenue_product(df_clean)
-    
-    #Yıllık çok satan 10 ürün
-    st.title(" Yıllık En Çok Satan 10 Ürün Analizi")
-    plot_top10_products_per_year(df_clean)
-
-    #Yıllık çok satan 10 ürün
-    st.title(" Yıllık En Çok Satan 10 Müşteri-Ürün Analizi")
-    plot_top10_productsandcustomers_per_year(df_clean)
-
-
 
-    
+sales_data = st.session_state.get("sales_data")
+if not sales_data:
+    st.stop()
+if sales_data["option"] != option:
+    st.info(f"Yüklü veri \"{sales_data['option']}\" seçimine ait. Yeni seçim için veriyi tekrar çekin.")
+    st.stop()
 
-    
-    
+df_raw2 = sales_data["df_raw"]
+cube = sales_data.get("cube")
+snapshot_info = getattr(df_raw2, "attrs", {}).get("snapshot")
+if snapshot_info:
+    st.caption(
+        f"Kaynak: {snapshot_info['mode']} • veritabanından çekilen satır: {snapshot_info['fetched_rows']:,} "
+        f"• son fatura tarihi: {snapshot_info['watermark']}"
+    )
+load_stats = getattr(df_raw2, "attrs", {}).get("load_stats")
+if load_stats:
+    peak = f", süreç tepe belleği (RSS) {load_stats['peak_rss_mb']} MB" if "peak_rss_mb" in load_stats else ""
+    if "peak_memory_mb" in load_stats:
+        peak += f", yüklemenin Python tepe belleği {load_stats['peak_memory_mb']} MB"
+    st.caption(f"{load_stats['rows']:,} satır, {load_stats['chunks']} parça, {load_stats['seconds']} sn{peak}")
+if cube is not None:
+    st.caption(f"Aylık toplamlar: {len(cube):,} müşteri-ürün-ay hücresi (fatura satırları çekilmedi)")
+
+backend = st.sidebar.selectbox(
+    "Hesaplama motoru",
+    available_backends(),
+    help="duckdb: yıllık satış pivotu, mevsimsellik/kanal/fiyat ve sipariş düzenliliği analizleri "
+         "süreç içi DuckDB'de çok iş parçacıklı SQL olarak çalışır; sonuçlar pandas ile aynıdır.",
+)
+configure_backend(backend)
+incremental = st.sidebar.checkbox(
+    "Artımlı ay kapanışı istatistikleri",
+    value=False,
+    help="Trend, volatilite, sipariş düzenliliği ve yaşlanma analizleri tüm geçmiş yerine kapanmış "
+         "ayların saklanan toplamlarından hesaplanır; yalnızca yeni kapanan ve açık ay taranır.",
+)
+calendar = st.sidebar.checkbox(
+    "Takvim ayına hizalı trend ve yaşlanma",
+    value=False,
+    help="Müşteri-ürün trendi ve yaşlanma eğimi satış olan ayların sırasına değil takvim ayına göre "
+         "hesaplanır; altı ay ara veren bir çift her ay sipariş verenle aynı görünmez.",
+)
+as_of = st.sidebar.date_input(
+    "Analiz tarihi (as_of)",
+    value=None,
+    help="Bu günden sonraki satışlar atılır; son iki yıl, trend başlangıcı ve aktiflik sınırı bu "
+         "tarihe göre kurulur. Boş bırakılırsa verideki son satış günü kullanılır. Seçiliyken artımlı mod kapanır.",
+)
+profiling = st.sidebar.checkbox(
+    "Profil modu",
+    value=False,
+    key="profiling",
+    help="Her analizin süresini, CPU süresini, tepe belleğini ve satır sayılarını ölçer. "
+         "Ölçüm (tracemalloc) analizleri biraz yavaşlatır; süreç havuzu bu modda kullanılmaz.",
+)
+with_cprofile = profiling and st.sidebar.checkbox("cProfile çıktısını da topla", value=False)
+profile = new_profile(option, sales_data["fingerprint"], cprofile=with_cprofile) if profiling else None
+render_sections(
+    select_sections(CUBE_SECTIONS if cube is not None else None), df_raw2, sales_data["fingerprint"], profile=profile,
+    incremental=incremental, calendar=calendar, as_of=as_of, cube=cube,
+)
+show_cache_stats()
+if profile is not None:
+    show_profile(profile)